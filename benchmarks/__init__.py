@@ -0,0 +1,15 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Performance benchmarks for ssh_assets module
+
+The benchmarks generate synthetic SSH assets configuration, key files, ssh-add output
+and authorized_keys files to a temporary directory and run offline. Commands are never
+executed: the ssh-add and ssh-keygen commands are replaced with sys_toolkit subprocess
+mocks, which also count how many commands each benchmark would run.
+
+Run the benchmarks with 'python -m benchmarks'. Results are written as JSON.
+"""
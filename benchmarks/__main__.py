@@ -0,0 +1,77 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Run ssh_assets benchmarks and write results as JSON
+
+Examples:
+
+    python -m benchmarks --output results.json
+    python -m benchmarks --size small --repeat 3 session filter_set
+    python -m benchmarks --compare results.json
+"""
+import json
+import sys
+import tempfile
+
+from argparse import ArgumentParser, Namespace
+from pathlib import Path
+from typing import List, Optional
+
+from .runner import compare_results, format_results
+from .suites import BENCHMARK_SIZES, DEFAULT_BENCHMARK_REPEAT, DEFAULT_BENCHMARK_SIZE, BenchmarkSuite
+
+
+def parse_args(argv: Optional[List[str]] = None) -> Namespace:
+    """
+    Parse benchmark command line arguments
+    """
+    parser = ArgumentParser(prog='python -m benchmarks', description='Run ssh_assets benchmarks offline')
+    parser.add_argument('--size', choices=sorted(BENCHMARK_SIZES), default=DEFAULT_BENCHMARK_SIZE,
+                        help='Size of generated benchmark data')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_BENCHMARK_REPEAT,
+                        help='Number of timed runs for each benchmark')
+    parser.add_argument('--output', help='Write JSON results to file instead of stdout')
+    parser.add_argument('--compare', help='Compare results to previous JSON results file')
+    parser.add_argument('benchmarks', nargs='*', help='Benchmarks to run, by default all benchmarks are run')
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Run benchmarks and write results
+
+    Returns
+    -------
+    Exit code 1 if compared results have regressions, 0 otherwise
+    """
+    args = parse_args(argv)
+    with tempfile.TemporaryDirectory(prefix='ssh-assets-benchmarks-') as directory:
+        suite = BenchmarkSuite(Path(directory), size=args.size, repeat=args.repeat)
+        try:
+            results = suite.run(args.benchmarks)
+        except ValueError as error:
+            sys.stderr.write(f'{error}\n')
+            return 1
+    data = format_results(results, size=args.size)
+
+    regressions = []
+    if args.compare:
+        previous = json.loads(Path(args.compare).read_text(encoding='utf-8'))
+        data['comparison'] = compare_results(previous, data)
+        regressions = [item['key'] for item in data['comparison'] if item['regression']]
+
+    output = json.dumps(data, indent=2)
+    if args.output:
+        Path(args.output).write_text(f'{output}\n', encoding='utf-8')
+    else:
+        sys.stdout.write(f'{output}\n')
+    for key in regressions:
+        sys.stderr.write(f'Regression: {key}\n')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,182 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Synthetic data generators for benchmarks
+
+All generated data is deterministic for the same arguments, so results of separate
+benchmark runs are comparable.
+"""
+import hashlib
+
+from base64 import b64encode
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+import yaml
+
+from ssh_assets.keys.constants import DEFAULT_KEY_HASH_ALGORITHM
+from ssh_assets.keys.wire import format_key_info_line, get_key_blob_attributes, pack_string
+
+ED25519_KEY_TYPE = 'ssh-ed25519'
+# Every Nth key file has no .pub file and requires ssh-keygen to get the key details
+KEYGEN_REQUIRED_INTERVAL = 4
+# Every Nth key file is loaded to the mocked SSH agent
+AGENT_LOADED_INTERVAL = 2
+# Number of keys in each generated group
+GROUP_KEY_COUNT = 20
+
+AUTHORIZED_KEYS_OPTIONS = (
+    '',
+    'no-pty,no-port-forwarding ',
+    'from="10.0.0.0/8,!10.1.2.3",command="uptime",no-agent-forwarding ',
+    'restrict,port-forwarding,permitopen="localhost:8080" ',
+    'environment="LANG=C",expiry-time="20301231" ',
+)
+
+DURATION_FORMATS = (
+    '{value}s',
+    '{value}m',
+    '{value}h',
+    '{value}d',
+    '{value}w',
+    '{value}w{value}d',
+    '{value}d{value}h{value}m',
+    '{value}h{value}m{value}s',
+)
+
+
+def get_key_blob(index: int) -> bytes:
+    """
+    Return a deterministic ed25519 public key blob for index
+    """
+    return pack_string(ED25519_KEY_TYPE) + pack_string(hashlib.sha256(str(index).encode()).digest())
+
+
+def get_public_key_line(index: int, options: str = '') -> str:
+    """
+    Return public key line for key with index
+    """
+    base64 = str(b64encode(get_key_blob(index)), 'ascii')
+    return f'{options}{ED25519_KEY_TYPE} {base64} benchmark-key-{index}@example.com'
+
+
+def get_key_info_line(index: int) -> str:
+    """
+    Return key info line for key with index in same format as ssh-keygen -l and ssh-add -l
+    """
+    return format_key_info_line(
+        get_key_blob_attributes(get_key_blob(index), f'benchmark-key-{index}@example.com', DEFAULT_KEY_HASH_ALGORITHM)
+    )
+
+
+def get_key_name(index: int) -> str:
+    """
+    Return name of configured key with index
+    """
+    return f'key-{index:06d}'
+
+
+def get_group_name(index: int) -> str:
+    """
+    Return name of configured group with index
+    """
+    return f'group-{index:05d}'
+
+
+def create_key_files(directory: Path, key_count: int) -> Dict[str, str]:
+    """
+    Create dummy private key files and public key files for keys to directory
+
+    Returns
+    -------
+    Dictionary of ssh-keygen -l output lines by key file path for keys without .pub file
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    keygen_lines = {}
+    for index in range(key_count):
+        path = directory.joinpath(get_key_name(index))
+        path.write_text('benchmark private key placeholder\n', encoding='utf-8')
+        if index % KEYGEN_REQUIRED_INTERVAL == 0:
+            keygen_lines[str(path)] = get_key_info_line(index)
+        else:
+            path.with_name(f'{path.name}.pub').write_text(f'{get_public_key_line(index)}\n', encoding='utf-8')
+    return keygen_lines
+
+
+def get_configuration(key_directory: Path, key_count: int, group_count: int) -> dict:
+    """
+    Return SSH assets configuration data with keys in key directory and groups of keys
+    """
+    keys = []
+    for index in range(key_count):
+        key = {
+            'name': get_key_name(index),
+            'path': str(key_directory.joinpath(get_key_name(index))),
+            'autoload': index % 3 != 0,
+        }
+        if index % 5 == 0:
+            key['expire'] = f'{index % 23 + 1}h'
+        keys.append(key)
+    groups = []
+    for index in range(group_count):
+        first = index * GROUP_KEY_COUNT % max(key_count, 1)
+        groups.append({
+            'name': get_group_name(index),
+            'expire': f'{index % 6 + 1}d',
+            'keys': [get_key_name((first + offset) % key_count) for offset in range(min(GROUP_KEY_COUNT, key_count))],
+        })
+    return {'groups': groups, 'keys': keys}
+
+
+def write_configuration(path: Path, key_directory: Path, key_count: int, group_count: int) -> Path:
+    """
+    Write SSH assets configuration file with generated keys and groups
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = get_configuration(key_directory, key_count, group_count)
+    path.write_text(yaml.dump(data, Dumper=yaml.SafeDumper), encoding='utf-8')
+    return path
+
+
+def get_agent_output(key_count: int) -> List[str]:
+    """
+    Return ssh-add -l output lines with every AGENT_LOADED_INTERVAL key loaded to the agent
+    """
+    return [get_key_info_line(index) for index in range(0, key_count, AGENT_LOADED_INTERVAL)]
+
+
+def iter_authorized_keys_lines(line_count: int) -> Iterator[str]:
+    """
+    Iterate authorized keys file lines with comments, empty lines and keys with options
+    """
+    for index in range(line_count):
+        if index % 50 == 0:
+            yield f'# Benchmark authorized keys entry {index}'
+        elif index % 50 == 1:
+            yield ''
+        else:
+            yield get_public_key_line(index, AUTHORIZED_KEYS_OPTIONS[index % len(AUTHORIZED_KEYS_OPTIONS)])
+
+
+def write_authorized_keys(path: Path, line_count: int) -> Path:
+    """
+    Write authorized keys file with specified number of lines
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open('w', encoding='utf-8') as handle:
+        for line in iter_authorized_keys_lines(line_count):
+            handle.write(f'{line}\n')
+    return path
+
+
+def get_duration_values(count: int) -> List[str]:
+    """
+    Return list of unique duration strings
+    """
+    return [
+        DURATION_FORMATS[index % len(DURATION_FORMATS)].format(value=index // len(DURATION_FORMATS) + 1)
+        for index in range(count)
+    ]
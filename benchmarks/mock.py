@@ -0,0 +1,93 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Offline environment for benchmarks
+
+Commands run by ssh_assets are replaced with sys_toolkit subprocess mocks, and the user
+configuration and fingerprint caches are stored to the benchmark data directory.
+"""
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+from unittest.mock import patch
+
+from sys_toolkit.exceptions import CommandError
+from sys_toolkit.tests.mock import MockCalledMethod, MockRunCommandLineOutput
+
+from ssh_assets.keys.cache import FINGERPRINT_CACHES
+from ssh_assets.keys.constants import FINGERPRINT_CACHE_FILENAME, SSH_AUTH_SOCK_ENV_VAR
+
+
+# pylint: disable=too-few-public-methods
+class MockSshKeygenOutput(MockRunCommandLineOutput):
+    """
+    Mock running ssh-keygen -l, returning key info line for the key file path in the command
+    """
+    lines: Dict[str, str]
+
+    def __init__(self, lines: Dict[str, str]) -> None:
+        super().__init__()
+        self.lines = lines
+
+    def __call__(self, *args: List[Any], **kwargs: Dict[Any, Any]) -> Any:
+        super().__call__(*args, **kwargs)
+        line = self.lines.get(args[-1], None)
+        if line is None:
+            raise CommandError(f'Unexpected command: {" ".join(args)}')
+        return [line], []
+
+
+# pylint: disable=too-few-public-methods
+class MockCommands:
+    """
+    Mocked subprocess commands for a benchmark run
+    """
+    mocks: Dict[str, MockCalledMethod]
+
+    def __init__(self, agent_output: List[str], keygen_lines: Dict[str, str]) -> None:
+        self.mocks = {
+            'ssh_assets.keys.agent.run_command': MockCalledMethod(),
+            'ssh_assets.keys.agent.run_command_lineoutput': MockRunCommandLineOutput(stdout=agent_output),
+            'ssh_assets.keys.file.run_command': MockCalledMethod(),
+            'ssh_assets.keys.file.run_command_lineoutput': MockSshKeygenOutput(keygen_lines),
+        }
+
+    @property
+    def call_counts(self) -> Dict[str, int]:
+        """
+        Return number of mocked command calls by mocked function
+        """
+        return {name: mock.call_count for name, mock in self.mocks.items()}
+
+
+@contextmanager
+def offline_environment(directory: Path,
+                        agent_output: Optional[List[str]] = None,
+                        keygen_lines: Optional[Dict[str, str]] = None) -> Iterator[MockCommands]:
+    """
+    Run code with mocked commands, caches in directory and no SSH agent socket
+
+    Returns
+    -------
+    MockCommands object with call counts for mocked commands
+    """
+    commands = MockCommands(agent_output or [], keygen_lines or {})
+    with ExitStack() as stack:
+        for target, mock in commands.mocks.items():
+            stack.enter_context(patch(target, new=mock))
+        cache_directory = directory.joinpath('cache')
+        stack.enter_context(
+            patch('ssh_assets.keys.cache.FINGERPRINT_CACHE_FILE', cache_directory.joinpath(FINGERPRINT_CACHE_FILENAME))
+        )
+        stack.enter_context(
+            patch(
+                'ssh_assets.configuration.cache.CONFIGURATION_CACHE_DIRECTORY',
+                cache_directory.joinpath('configuration'),
+            )
+        )
+        stack.enter_context(patch.dict('os.environ', {SSH_AUTH_SOCK_ENV_VAR: str(directory.joinpath('agent.sock'))}))
+        stack.callback(FINGERPRINT_CACHES.clear)
+        yield commands
@@ -0,0 +1,142 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Benchmark timing and JSON results
+"""
+import platform
+import statistics
+import sys
+import time
+
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from .mock import MockCommands
+
+BENCHMARK_RESULTS_VERSION = 1
+# Ratio of median times considered a regression when comparing results
+REGRESSION_THRESHOLD = 1.25
+
+
+class BenchmarkResult:
+    """
+    Timing results for a single benchmark
+    """
+    name: str
+    parameters: Dict[str, Any]
+    times: List[float]
+    subprocess_calls: Dict[str, int]
+
+    def __init__(self, name: str, parameters: Dict[str, Any]) -> None:
+        self.name = name
+        self.parameters = parameters
+        self.times = []
+        self.subprocess_calls = {}
+
+    def __repr__(self) -> str:
+        return f'{self.name} {self.parameters}'
+
+    @property
+    def key(self) -> str:
+        """
+        Return key identifying the benchmark and its parameters between runs
+        """
+        parameters = ','.join(f'{key}={value}' for key, value in sorted(self.parameters.items()))
+        return f'{self.name}[{parameters}]' if parameters else self.name
+
+    def as_dict(self) -> dict:
+        """
+        Return result as dictionary
+        """
+        return {
+            'name': self.name,
+            'key': self.key,
+            'parameters': self.parameters,
+            'repeat': len(self.times),
+            'min': min(self.times),
+            'max': max(self.times),
+            'mean': statistics.mean(self.times),
+            'median': statistics.median(self.times),
+            'subprocess_calls': self.subprocess_calls,
+        }
+
+
+def run_benchmark(name: str,
+                  callback: Callable[[], Any],
+                  commands: MockCommands,
+                  repeat: int,
+                  setup: Optional[Callable[[], Any]] = None,
+                  **parameters: Any) -> BenchmarkResult:
+    """
+    Run benchmark callback repeat times, calling setup callback before each untimed
+
+    Mocked subprocess calls are counted for the first run, so the counts show the commands
+    a single operation would run.
+
+    Returns
+    -------
+    BenchmarkResult with run times in seconds
+    """
+    result = BenchmarkResult(name, parameters)
+    for iteration in range(max(1, repeat)):
+        if setup is not None:
+            setup()
+        counts = commands.call_counts
+        start = time.perf_counter()
+        callback()
+        result.times.append(time.perf_counter() - start)
+        if iteration == 0:
+            result.subprocess_calls = {
+                target: count - counts[target]
+                for target, count in commands.call_counts.items()
+                if count != counts[target]
+            }
+    return result
+
+
+def format_results(results: List[BenchmarkResult], **details: Any) -> dict:
+    """
+    Return benchmark results with environment details as dictionary for JSON output
+    """
+    return {
+        'version': BENCHMARK_RESULTS_VERSION,
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        **details,
+        'results': [result.as_dict() for result in results],
+    }
+
+
+def compare_results(previous: dict, current: dict, threshold: float = REGRESSION_THRESHOLD) -> List[dict]:
+    """
+    Compare median times of benchmarks in current results to previous results
+
+    A benchmark is flagged as regression if the median time grew more than threshold or it
+    runs more commands than before
+
+    Returns
+    -------
+    List of comparisons for benchmarks found in both results
+    """
+    previous_results = {result['key']: result for result in previous.get('results', [])}
+    comparisons = []
+    for result in current.get('results', []):
+        old = previous_results.get(result['key'], None)
+        if old is None or not old['median']:
+            continue
+        ratio = result['median'] / old['median']
+        comparisons.append({
+            'key': result['key'],
+            'previous': old['median'],
+            'current': result['median'],
+            'ratio': ratio,
+            'regression': (
+                ratio > threshold or
+                sum(result['subprocess_calls'].values()) > sum(old['subprocess_calls'].values())
+            ),
+        })
+    return comparisons
@@ -0,0 +1,313 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Benchmarks for configuration, SSH agent, key filter and authorized_keys hot paths
+"""
+import shutil
+
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from ssh_assets.authorized_keys.loader import AuthorizedKeys
+from ssh_assets.authorized_keys.public_key import PublicKey
+from ssh_assets.authorized_keys.writer import AuthorizedKeysWriter
+from ssh_assets.duration import DURATION_PARSER_CACHE_SIZE, Duration, parse_duration
+from ssh_assets.keys.cache import FINGERPRINT_CACHES
+from ssh_assets.session import SshAssetSession
+
+from .data import (
+    create_key_files,
+    get_agent_output,
+    get_duration_values,
+    get_group_name,
+    get_key_name,
+    iter_authorized_keys_lines,
+    write_authorized_keys,
+    write_configuration,
+)
+from .mock import MockCommands, offline_environment
+from .runner import BenchmarkResult, run_benchmark
+
+# Benchmark data sizes
+BENCHMARK_SIZES = {
+    'small': {
+        'keys': 100,
+        'groups': 10,
+        'authorized_keys_lines': (1000,),
+        'public_keys': 1000,
+        'durations': 1000,
+    },
+    'default': {
+        'keys': 2000,
+        'groups': 200,
+        'authorized_keys_lines': (10000, 100000),
+        'public_keys': 10000,
+        'durations': 10000,
+    },
+    'large': {
+        'keys': 10000,
+        'groups': 1000,
+        'authorized_keys_lines': (10000, 100000, 1000000),
+        'public_keys': 100000,
+        'durations': 100000,
+    },
+}
+DEFAULT_BENCHMARK_SIZE = 'default'
+DEFAULT_BENCHMARK_REPEAT = 5
+
+
+class BenchmarkSuite:
+    """
+    Benchmarks with synthetic data generated to a directory
+    """
+    directory: Path
+    size: str
+    repeat: int
+    commands: Optional[MockCommands]
+
+    def __init__(self,
+                 directory: Path,
+                 size: str = DEFAULT_BENCHMARK_SIZE,
+                 repeat: int = DEFAULT_BENCHMARK_REPEAT) -> None:
+        if size not in BENCHMARK_SIZES:
+            raise ValueError(f'Unknown benchmark size: {size}')
+        self.directory = Path(directory)
+        self.size = size
+        self.repeat = repeat
+        self.sizes = BENCHMARK_SIZES[size]
+        self.key_directory = self.directory.joinpath('keys')
+        self.configuration_file = self.directory.joinpath('ssh-assets.yml')
+        self.cache_directory = self.directory.joinpath('cache')
+        self.commands = None
+        self.__keygen_lines__ = None
+        self.__agent_output__ = None
+
+    def __repr__(self) -> str:
+        return f'{self.size} {self.directory}'
+
+    @property
+    def benchmarks(self) -> Dict[str, Callable[[], List[BenchmarkResult]]]:
+        """
+        Return benchmark methods by benchmark name
+        """
+        return {
+            'session': self.benchmark_session,
+            'filter_set': self.benchmark_filter_set,
+            'agent': self.benchmark_agent,
+            'pending_loaded': self.benchmark_pending_loaded,
+            'authorized_keys': self.benchmark_authorized_keys,
+            'public_key': self.benchmark_public_key,
+            'duration': self.benchmark_duration,
+        }
+
+    def prepare(self) -> None:
+        """
+        Generate key files and configuration file for benchmarks
+        """
+        self.__keygen_lines__ = create_key_files(self.key_directory, self.sizes['keys'])
+        self.__agent_output__ = get_agent_output(self.sizes['keys'])
+        write_configuration(self.configuration_file, self.key_directory, self.sizes['keys'], self.sizes['groups'])
+
+    def clear_caches(self) -> None:
+        """
+        Remove configuration and fingerprint caches, so that data is loaded from files
+        """
+        shutil.rmtree(self.cache_directory, ignore_errors=True)
+        FINGERPRINT_CACHES.clear()
+
+    def get_session(self) -> SshAssetSession:
+        """
+        Return new session listing keys loaded to the mocked agent with ssh-add
+        """
+        session = SshAssetSession(self.configuration_file)
+        session.agent.use_ssh_add = True
+        return session
+
+    def __run__(self,
+                name: str,
+                callback: Callable[[], Any],
+                setup: Optional[Callable[[], Any]] = None,
+                **parameters: Any) -> BenchmarkResult:
+        """
+        Run benchmark with suite commands and repeat count
+        """
+        return run_benchmark(name, callback, self.commands, self.repeat, setup, **parameters)
+
+    def benchmark_session(self) -> List[BenchmarkResult]:
+        """
+        Benchmark session construction with parsed and cached configuration file
+        """
+        def create_session() -> int:
+            return len(self.get_session().configuration.keys)  # pylint: disable=no-member
+
+        return [
+            self.__run__('session', create_session, setup=self.clear_caches, cache=False),
+            self.__run__('session', create_session, setup=create_session, cache=True),
+        ]
+
+    def benchmark_filter_set(self) -> List[BenchmarkResult]:
+        """
+        Benchmark chained key filter sets by names, groups and available flag
+        """
+        session = self.get_session()
+        key_count = self.sizes['keys']
+        names = [get_key_name(index) for index in range(0, key_count, 3)]
+        groups = [get_group_name(index) for index in range(0, self.sizes['groups'], 2)]
+
+        def filter_names_groups() -> list:
+            return session.key_filter_set.filter_names(names).filter_groups(groups).keys
+
+        def filter_available_groups() -> list:
+            return session.key_filter_set.filter_groups(groups).filter_available(True).keys
+
+        def filter_name_patterns() -> list:
+            return session.key_filter_set.filter_names(['key-0000*', '*5']).filter_available(True).keys
+
+        return [
+            self.__run__('filter_set', filter_names_groups, filters='names,groups', keys=key_count),
+            self.__run__('filter_set', filter_available_groups, filters='groups,available', keys=key_count),
+            self.__run__('filter_set', filter_name_patterns, filters='patterns,available', keys=key_count),
+        ]
+
+    def benchmark_agent(self) -> List[BenchmarkResult]:
+        """
+        Benchmark listing keys loaded to the SSH agent from ssh-add output
+        """
+        agent = self.get_session().agent
+        return [
+            self.__run__('agent_update', agent.update, agent_keys=len(self.__agent_output__)),
+        ]
+
+    def benchmark_pending_loaded(self) -> List[BenchmarkResult]:
+        """
+        Benchmark pending and loaded key computation with cold and warm fingerprint caches
+        """
+        state = {}
+
+        def setup_cold() -> None:
+            self.clear_caches()
+            state['session'] = self.get_session()
+
+        def setup_warm() -> None:
+            state['session'] = self.get_session()
+
+        def pending() -> list:
+            return state['session'].configuration.keys.pending
+
+        def loaded() -> list:
+            return [key.loaded for key in state['session'].configuration.keys]
+
+        key_count = self.sizes['keys']
+        return [
+            self.__run__('pending', pending, setup=setup_cold, fingerprint_cache=False, keys=key_count),
+            self.__run__('loaded', loaded, setup=setup_cold, fingerprint_cache=False, keys=key_count),
+            self.__run__('pending', pending, setup=setup_warm, fingerprint_cache=True, keys=key_count),
+            self.__run__('loaded', loaded, setup=setup_warm, fingerprint_cache=True, keys=key_count),
+        ]
+
+    def benchmark_authorized_keys(self) -> List[BenchmarkResult]:
+        """
+        Benchmark loading authorized keys files of various sizes
+
+        Updating loaded object again reuses keys parsed from same lines, and refreshing an
+        unmodified file does not read the file. Merging writes the deduplicated keys of the
+        file to another file.
+        """
+        results = []
+        for line_count in self.sizes['authorized_keys_lines']:
+            path = write_authorized_keys(self.directory.joinpath(f'authorized_keys.{line_count}'), line_count)
+            authorized_keys = AuthorizedKeys(path)
+
+            def load(path: Path = path) -> AuthorizedKeys:
+                authorized_keys = AuthorizedKeys(path)
+                authorized_keys.update()
+                return authorized_keys
+
+            results.append(self.__run__('authorized_keys_load', load, lines=line_count))
+            results.append(self.__run__('authorized_keys_update', authorized_keys.update, lines=line_count))
+            results.append(self.__run__('authorized_keys_refresh', authorized_keys.refresh, lines=line_count))
+
+            output = self.directory.joinpath(f'authorized_keys.{line_count}.merged')
+
+            def merge(path: Path = path, output: Path = output) -> bool:
+                writer = AuthorizedKeysWriter(output)
+                writer.merge_file(path)
+                return writer.write()
+
+            setup = partial(output.unlink, missing_ok=True)
+            results.append(self.__run__('authorized_keys_merge', merge, setup=setup, lines=line_count))
+            path.unlink()
+            output.unlink()
+        return results
+
+    def benchmark_public_key(self) -> List[BenchmarkResult]:
+        """
+        Benchmark parsing public key lines with and without lazy attributes
+        """
+        lines = [line for line in iter_authorized_keys_lines(self.sizes['public_keys']) if line and line[0] != '#']
+
+        def parse() -> None:
+            for line in lines:
+                PublicKey(line)
+
+        def parse_lazy() -> None:
+            for line in lines:
+                PublicKey(line, lazy=True)
+
+        return [
+            self.__run__('public_key', parse, lazy=False, lines=len(lines)),
+            self.__run__('public_key', parse_lazy, lazy=True, lines=len(lines)),
+        ]
+
+    def benchmark_duration(self) -> List[BenchmarkResult]:
+        """
+        Benchmark parsing duration strings without and with the parser cache
+
+        Without the cache unique strings are parsed with the cache cleared before each run. With
+        the cache the same number of strings is parsed from a set of strings fitting in the cache,
+        with the cache filled before each run, like repeated values in configuration files.
+        """
+        values = get_duration_values(self.sizes['durations'])
+        cached_values = [values[index % DURATION_PARSER_CACHE_SIZE] for index in range(len(values))]
+
+        def parse(items: List[str]) -> None:
+            for value in items:
+                Duration(value)
+
+        return [
+            self.__run__(
+                'duration', partial(parse, values), setup=parse_duration.cache_clear, cache=False, values=len(values)
+            ),
+            self.__run__(
+                'duration', partial(parse, cached_values), setup=partial(parse, cached_values), cache=True,
+                values=len(cached_values)
+            ),
+        ]
+
+    def run(self, names: Optional[List[str]] = None) -> List[BenchmarkResult]:
+        """
+        Run benchmarks offline, optionally limited to benchmark names
+
+        Returns
+        -------
+        List of BenchmarkResult objects
+        """
+        benchmarks = self.benchmarks
+        names = names if names else list(benchmarks)
+        for name in names:
+            if name not in benchmarks:
+                raise ValueError(f'Unknown benchmark: {name}')
+        self.prepare()
+        results = []
+        with offline_environment(self.directory, self.__agent_output__, self.__keygen_lines__) as commands:
+            self.commands = commands
+            try:
+                for name in names:
+                    results.extend(benchmarks[name]())
+            finally:
+                self.commands = None
+        return results
@@ -0,0 +1,34 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Asyncio API for SSH assets session, SSH agent and key operations
+"""
+from typing import TYPE_CHECKING
+
+from ..lazy import lazy_attributes
+
+if TYPE_CHECKING:
+    from .agent import AsyncSshAgent  # noqa: F401
+    from .agent_client import AsyncSshAgentClient  # noqa: F401
+    from .authorized_keys import update_authorized_keys  # noqa: F401
+    from .keys import load_key_attributes  # noqa: F401
+    from .session import AsyncSshAssetSession  # noqa: F401
+
+__all__ = [
+    'AsyncSshAgent',
+    'AsyncSshAgentClient',
+    'update_authorized_keys',
+    'load_key_attributes',
+    'AsyncSshAssetSession',
+]
+
+__getattr__, __dir__ = lazy_attributes(__name__, {
+    'AsyncSshAgent': '.agent',
+    'AsyncSshAgentClient': '.agent_client',
+    'update_authorized_keys': '.authorized_keys',
+    'load_key_attributes': '.keys',
+    'AsyncSshAssetSession': '.session',
+})
@@ -0,0 +1,250 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Asyncio SSH agent API
+
+The asyncio agent wraps the SshAgent object of a session and shares the cached list of keys
+loaded to the agent with it. Keys are listed and unloaded with asyncio SSH agent protocol
+requests, and ssh-add and ssh-keygen commands are run as asyncio subprocesses. Checking key
+files and the fingerprint cache is run in worker threads.
+"""
+import asyncio
+
+from typing import List, Optional, Tuple, TYPE_CHECKING
+
+from sys_toolkit.exceptions import CommandError
+
+from ..exceptions import SSHKeyError
+from ..keys.agent import AgentKey, SshAgent, SshKeyLoadResult, SshKeyUnloadResult
+from ..keys.constants import SshKeyLoadStatus, SshKeyUnloadStatus
+from ..keys.file import get_load_key_files_command, get_unload_key_files_command
+from .agent_client import AsyncSshAgentClient
+from .constants import ASYNC_MAX_CONCURRENCY
+from .keys import get_available_key_files, load_key_attributes
+from .subprocess import run_command, run_command_lineoutput
+
+if TYPE_CHECKING:
+    from ..configuration.keys import SshKeyConfiguration
+    from ..duration import Duration
+
+
+class AsyncSshAgent:
+    """
+    Asyncio API to list, load and unload keys from SSH agent
+
+    At most max_concurrency ssh-add or ssh-keygen commands are run at the same time
+    """
+    agent: SshAgent
+    max_concurrency: int
+
+    def __init__(self, agent: SshAgent, max_concurrency: int = ASYNC_MAX_CONCURRENCY) -> None:
+        self.agent = agent
+        self.max_concurrency = max_concurrency
+
+    def __repr__(self) -> str:
+        return str(self.agent.agent_socket_path)
+
+    @property
+    def client(self) -> AsyncSshAgentClient:
+        """
+        Return asyncio SSH agent protocol client for the agent socket
+        """
+        return AsyncSshAgentClient(self.agent.agent_socket_path)
+
+    async def __list_keys__(self) -> List[AgentKey]:
+        """
+        List keys loaded to the agent with SSH agent protocol request or ssh-add -l command
+        """
+        if self.agent.use_ssh_add:
+            try:
+                stdout, _stderr = await run_command_lineoutput(
+                    *self.agent.__list_keys_command__,
+                    expected_return_codes=(0, 1)
+                )
+            except CommandError as error:
+                raise SSHKeyError(f'Error listing SSH keys loaded to ssh-agent: {error}') from error
+            return self.agent.__parse_ssh_add_output__(stdout)
+        try:
+            identities = await self.client.list_identities()
+        except SSHKeyError as error:
+            raise SSHKeyError(f'Error listing SSH keys loaded to ssh-agent: {error}') from error
+        return self.agent.__parse_identities__(identities)
+
+    async def update(self) -> None:
+        """
+        Update list of keys loaded to the ssh agent
+        """
+        self.agent.__start_update__()
+        try:
+            keys = await self.__list_keys__()
+        except SSHKeyError:
+            self.agent.__reset__()
+            raise
+        self.agent.__set_loaded_keys__(keys)
+
+    async def refresh(self) -> None:
+        """
+        List keys loaded to the agent if the keys have not been listed yet
+        """
+        if self.agent.__requires_reload__:
+            await self.update()
+
+    async def get_keys(self) -> List[AgentKey]:
+        """
+        Return keys loaded to the agent, listing the keys if necessary
+        """
+        await self.refresh()
+        return list(self.agent)
+
+    async def __prepare_keys__(self, keys: List['SshKeyConfiguration']) -> None:
+        """
+        List keys loaded to the agent and load attributes for available key files, so that
+        the keys can be processed without blocking commands
+        """
+        await self.refresh()
+        await load_key_attributes(
+            await asyncio.to_thread(get_available_key_files, keys),
+            self.max_concurrency
+        )
+
+    async def unload_all_keys(self) -> None:
+        """
+        Remove all keys from the SSH agent
+        """
+        if self.agent.use_ssh_add:
+            try:
+                await run_command('ssh-add', '-D')
+            except CommandError as error:
+                raise SSHKeyError(f'Error unloading SSH keys from agent: {error}') from error
+        else:
+            try:
+                if not await self.client.remove_all_identities():
+                    raise SSHKeyError('SSH agent refused to remove all identities')
+            except SSHKeyError as error:
+                raise SSHKeyError(f'Error unloading SSH keys from agent: {error}') from error
+        self.agent.__set_loaded_keys__([])
+
+    async def __unload_key_batch__(self, keys: List['SshKeyConfiguration']) -> List[SshKeyUnloadResult]:
+        """
+        Unload a batch of keys from the agent with one ssh-add command
+
+        If the command fails, the keys are unloaded one by one to detect which keys failed
+        """
+        try:
+            await run_command(*get_unload_key_files_command([key.private_key for key in keys]))
+            return [SshKeyUnloadResult(key, SshKeyUnloadStatus.UNLOADED) for key in keys]
+        except CommandError as error:
+            if len(keys) == 1:
+                return [SshKeyUnloadResult(
+                    keys[0], SshKeyUnloadStatus.FAILED, f'Error unloading key from SSH agent: {error}'
+                )]
+        results = []
+        for key in keys:
+            results.extend(await self.__unload_key_batch__([key]))
+        return results
+
+    async def __unload_keys_with_agent_protocol__(self, keys: List[Tuple]) -> List[SshKeyUnloadResult]:
+        """
+        Unload keys from the agent with REMOVE_IDENTITY requests over one agent connection
+        """
+        results = []
+        try:
+            async with self.client as client:
+                for key, key_blob in keys:
+                    try:
+                        removed = await client.remove_identity(key_blob)
+                        results.append(self.agent.__get_remove_identity_result__(key, removed))
+                    except SSHKeyError as error:
+                        results.append(SshKeyUnloadResult(key, SshKeyUnloadStatus.FAILED, str(error)))
+        except SSHKeyError as error:
+            self.agent.__add_unload_error_results__(results, keys, error)
+        return results
+
+    async def unload_keys_from_agent(self,
+                                     keys: Optional[List['SshKeyConfiguration']] = None,
+                                     unload_all_keys: bool = False) -> List[SshKeyUnloadResult]:
+        """
+        Unload any named or configured keys from SSH agent
+
+        If unload_all_keys is True, all keys are removed from the agent
+
+        Returns
+        -------
+        List of SshKeyUnloadResult objects for processed keys, in same order as the keys
+        """
+        if unload_all_keys:
+            await self.unload_all_keys()
+
+        if not keys:
+            return []
+        keys = list(keys)
+
+        await self.__prepare_keys__(keys)
+        results, protocol_keys, ssh_add_keys = await asyncio.to_thread(self.agent.__get_key_unload_batches__, keys)
+        if protocol_keys:
+            results.extend(await self.__unload_keys_with_agent_protocol__(protocol_keys))
+        if ssh_add_keys:
+            results.extend(await self.__unload_key_batch__(ssh_add_keys))
+        return self.agent.__finish_unload_results__(keys, results)
+
+    async def __load_key_batch__(self,
+                                 keys: List['SshKeyConfiguration'],
+                                 expire: Optional['Duration']) -> List[SshKeyLoadResult]:
+        """
+        Load a batch of keys with same expiration value to the agent with one ssh-add command
+
+        If the command fails, the keys are loaded one by one to detect which keys failed
+        """
+        try:
+            await run_command(*get_load_key_files_command([key.private_key for key in keys], expire))
+            return [SshKeyLoadResult(key, SshKeyLoadStatus.LOADED, expire) for key in keys]
+        except CommandError as error:
+            if len(keys) == 1:
+                return [SshKeyLoadResult(
+                    keys[0], SshKeyLoadStatus.FAILED, expire, f'Error loading key to SSH agent: {error}'
+                )]
+        results = []
+        for key in keys:
+            results.extend(await self.__load_key_batch__([key], expire))
+        return results
+
+    async def load_keys_to_agent(self,
+                                 keys: Optional[List['SshKeyConfiguration']] = None,
+                                 load_all_keys: bool = False) -> List[SshKeyLoadResult]:
+        """
+        Load any available configured keys
+
+        If load_all_keys is False, only keys marked as autoload are loaded
+
+        Keys with same expiration value are loaded with one ssh-add command. Batches of keys
+        without passphrase are loaded concurrently. Passphrase protected keys may ask for the
+        passphrase and are loaded sequentially.
+
+        Returns
+        -------
+        List of SshKeyLoadResult objects for processed keys, in same order as the keys
+        """
+        if not keys:
+            keys = await asyncio.to_thread(lambda: self.agent.configured_keys)
+        keys = list(keys)
+
+        await self.__prepare_keys__([key for key in keys if load_all_keys or key.autoload])
+        results, encrypted_batches, batches = await asyncio.to_thread(
+            self.agent.__get_key_load_batches__, keys, load_all_keys
+        )
+        for batch_keys, expire in encrypted_batches:
+            results.extend(await self.__load_key_batch__(batch_keys, expire))
+
+        semaphore = asyncio.Semaphore(max(1, self.max_concurrency))
+
+        async def load_batch(batch_keys: List['SshKeyConfiguration'],
+                             expire: Optional['Duration']) -> List[SshKeyLoadResult]:
+            async with semaphore:
+                return await self.__load_key_batch__(batch_keys, expire)
+
+        for batch_results in await asyncio.gather(*[load_batch(*batch) for batch in batches]):
+            results.extend(batch_results)
+        return self.agent.__finish_load_results__(keys, results)
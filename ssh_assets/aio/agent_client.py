@@ -0,0 +1,174 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Asyncio SSH agent protocol client
+
+Communicates with the SSH agent over the agent UNIX socket with asyncio streams. Messages
+are formatted and parsed as in ssh_assets.keys.agent_client.SshAgentClient.
+"""
+import asyncio
+import os
+
+from typing import List, Optional, Tuple
+
+from ..exceptions import SSHKeyError
+from ..keys.agent_client import SshAgentClient
+from ..keys.constants import (
+    SshAgentMessage,
+    SSH_AGENT_MAX_MESSAGE_SIZE,
+    SSH_AGENT_SOCKET_TIMEOUT,
+    SSH_AUTH_SOCK_ENV_VAR,
+)
+from ..keys.wire import WireFormatReader, pack_string, pack_uint32
+
+
+class AsyncSshAgentClient:
+    """
+    Asyncio client for the SSH agent protocol over UNIX socket
+
+    The client can be used as async context manager to send multiple requests over the same
+    socket connection. Otherwise a new connection is opened for each request.
+    """
+    socket_path: Optional[str]
+    timeout: float
+
+    def __init__(self, socket_path: Optional[str] = None, timeout: float = SSH_AGENT_SOCKET_TIMEOUT) -> None:
+        self.socket_path = socket_path if socket_path is not None else os.environ.get(SSH_AUTH_SOCK_ENV_VAR, None)
+        self.timeout = timeout
+        self.__reader__ = None
+        self.__writer__ = None
+
+    def __repr__(self) -> str:
+        return str(self.socket_path)
+
+    async def __aenter__(self) -> 'AsyncSshAgentClient':
+        await self.connect()
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.close()
+
+    @property
+    def connected(self) -> bool:
+        """
+        Check if the client has an open connection to the agent
+        """
+        return self.__writer__ is not None
+
+    async def connect(self) -> None:
+        """
+        Open connection to the SSH agent socket
+        """
+        if self.__writer__ is not None:
+            return
+        if not self.socket_path:
+            raise SSHKeyError(f'SSH agent socket is not defined: {SSH_AUTH_SOCK_ENV_VAR} is not set')
+        try:
+            self.__reader__, self.__writer__ = await asyncio.wait_for(
+                asyncio.open_unix_connection(self.socket_path),
+                self.timeout
+            )
+        except (OSError, asyncio.TimeoutError) as error:
+            raise SSHKeyError(f'Error connecting to SSH agent socket {self.socket_path}: {error}') from error
+
+    async def close(self) -> None:
+        """
+        Close connection to the SSH agent socket
+        """
+        if self.__writer__ is not None:
+            writer = self.__writer__
+            self.__reader__ = None
+            self.__writer__ = None
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+
+    async def __exchange__(self, message: bytes) -> Tuple[int, bytes]:
+        """
+        Send a framed message to the agent and return response message type and payload
+        """
+        self.__writer__.write(pack_uint32(len(message)) + message)
+        await self.__writer__.drain()
+        length = WireFormatReader(await self.__reader__.readexactly(4)).read_uint32()
+        if length == 0 or length > SSH_AGENT_MAX_MESSAGE_SIZE:
+            raise SSHKeyError(f'Invalid SSH agent response message length: {length}')
+        response = await self.__reader__.readexactly(length)
+        return response[0], response[1:]
+
+    async def request(self, message_type: SshAgentMessage, payload: bytes = b'') -> Tuple[int, bytes]:
+        """
+        Send request to the SSH agent
+
+        Returns
+        -------
+        Response message type and response payload as tuple
+        """
+        close = not self.connected
+        await self.connect()
+        try:
+            return await asyncio.wait_for(self.__exchange__(bytes([message_type]) + payload), self.timeout)
+        except asyncio.IncompleteReadError as error:
+            close = True
+            raise SSHKeyError('SSH agent closed the connection unexpectedly') from error
+        except (OSError, asyncio.TimeoutError) as error:
+            close = True
+            raise SSHKeyError(f'Error communicating with SSH agent {self.socket_path}: {error}') from error
+        finally:
+            if close:
+                await self.close()
+
+    async def __request_success__(self, message_type: SshAgentMessage, payload: bytes = b'') -> bool:
+        """
+        Send request which expects a SUCCESS or FAILURE response from the agent
+        """
+        response_type, _payload = await self.request(message_type, payload)
+        return SshAgentClient.__parse_success_response__(message_type, response_type)
+
+    async def list_identities(self) -> List[Tuple[bytes, str]]:
+        """
+        List identities loaded to the SSH agent
+
+        Returns
+        -------
+        List of public key blob and comment tuples
+        """
+        return SshAgentClient.__parse_identities_answer__(
+            *await self.request(SshAgentMessage.REQUEST_IDENTITIES)
+        )
+
+    async def add_identity(self,
+                           key_data: bytes,
+                           comment: str,
+                           lifetime: Optional[int] = None,
+                           confirm: bool = False) -> bool:
+        """
+        Add private key to the SSH agent
+
+        Returns
+        -------
+        True if agent accepted the key
+        """
+        return await self.__request_success__(
+            *SshAgentClient.__get_add_identity_request__(key_data, comment, lifetime, confirm)
+        )
+
+    async def remove_identity(self, key_blob: bytes) -> bool:
+        """
+        Remove key matching specified public key blob from SSH agent
+
+        Returns
+        -------
+        True if the key was removed, False if agent refused the request
+        """
+        return await self.__request_success__(SshAgentMessage.REMOVE_IDENTITY, pack_string(key_blob))
+
+    async def remove_all_identities(self) -> bool:
+        """
+        Remove all keys from the SSH agent
+        """
+        return await self.__request_success__(SshAgentMessage.REMOVE_ALL_IDENTITIES)
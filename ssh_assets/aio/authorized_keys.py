@@ -0,0 +1,46 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Asyncio loading of OpenSSH authorized keys files
+"""
+import asyncio
+
+from typing import Iterable, List, Tuple
+
+from ..authorized_keys import AuthorizedKeys
+from ..exceptions import SSHKeyError
+from .constants import ASYNC_MAX_CONCURRENCY
+
+
+async def update_authorized_keys(
+        authorized_keys: Iterable[AuthorizedKeys],
+        refresh: bool = True,
+        max_concurrency: int = ASYNC_MAX_CONCURRENCY) -> List[Tuple[AuthorizedKeys, SSHKeyError]]:
+    """
+    Load authorized keys files concurrently
+
+    The files are read in worker threads, at most max_concurrency files at the same time. If
+    refresh is True, files that were loaded and not modified after loading are not read again.
+
+    Returns
+    -------
+    List of authorized keys and SSHKeyError tuples for files with errors
+    """
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def update(item: AuthorizedKeys) -> None:
+        async with semaphore:
+            await asyncio.to_thread(item.refresh if refresh else item.update)
+
+    authorized_keys = list(authorized_keys)
+    results = await asyncio.gather(*[update(item) for item in authorized_keys], return_exceptions=True)
+    errors = []
+    for item, result in zip(authorized_keys, results):
+        if isinstance(result, SSHKeyError):
+            errors.append((item, result))
+        elif isinstance(result, BaseException):
+            raise result
+    return errors
@@ -0,0 +1,11 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Constants for asyncio SSH assets API
+"""
+
+# Maximum number of concurrent subprocesses or file loads in asyncio API calls
+ASYNC_MAX_CONCURRENCY = 8
@@ -0,0 +1,120 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Asyncio loading of SSH key file attributes
+
+Reading key files, public key files and the fingerprint cache is blocking file I/O, and is
+run in worker threads to avoid blocking the event loop.
+"""
+import asyncio
+
+from typing import Iterable, List, Tuple, TYPE_CHECKING
+
+from sys_toolkit.exceptions import CommandError
+
+from ..exceptions import SSHKeyError
+from ..keys.cache import batch_fingerprint_cache_updates
+from ..keys.file import SSHKeyFile
+from .constants import ASYNC_MAX_CONCURRENCY
+from .subprocess import run_command_lineoutput
+
+if TYPE_CHECKING:
+    from ..configuration.keys import SshKeyConfiguration
+
+
+def get_available_key_files(keys: Iterable['SshKeyConfiguration']) -> List[SSHKeyFile]:
+    """
+    Return private key files for configured keys with the key file available
+
+    Checking the key files is blocking and must be run in a worker thread from asyncio code
+    """
+    return [key.private_key for key in keys if key.available]
+
+
+@batch_fingerprint_cache_updates
+def load_cached_key_attributes(
+        keys: Iterable[SSHKeyFile]) -> Tuple[List[SSHKeyFile], List[Tuple[SSHKeyFile, SSHKeyError]]]:
+    """
+    Load attributes for SSH key files from fingerprint cache or public key files
+
+    Loading the attributes is blocking and must be run in a worker thread from asyncio code
+
+    Returns
+    -------
+    Tuple of keys requiring ssh-keygen to load the attributes and list of key and SSHKeyError
+    tuples for keys with errors loading the attributes
+    """
+    pending = []
+    errors = []
+    for key in keys:
+        try:
+            if not key.__key_attributes__ and not key.__load_cached_key_attributes__():
+                pending.append(key)
+        except SSHKeyError as error:
+            errors.append((key, error))
+    return pending, errors
+
+
+@batch_fingerprint_cache_updates
+def set_key_info_outputs(outputs: Iterable[Tuple[SSHKeyFile, List[str]]]) -> List[Tuple[SSHKeyFile, SSHKeyError]]:
+    """
+    Set attributes of SSH key files from ssh-keygen -l command output and store them to the
+    fingerprint cache
+
+    Storing the attributes is blocking and must be run in a worker thread from asyncio code
+
+    Returns
+    -------
+    List of key and SSHKeyError tuples for keys with errors in the command output
+    """
+    errors = []
+    for key, stdout in outputs:
+        try:
+            key.__set_key_info_output__(stdout)
+        except SSHKeyError as error:
+            errors.append((key, error))
+    return errors
+
+
+async def load_key_attributes(keys: Iterable[SSHKeyFile],
+                              max_concurrency: int = ASYNC_MAX_CONCURRENCY) -> List[Tuple[SSHKeyFile, SSHKeyError]]:
+    """
+    Load fingerprint and other attributes for SSH key files
+
+    Attributes are loaded from the fingerprint cache or public key files when possible. Other
+    keys are processed with ssh-keygen subprocesses, running at most max_concurrency commands
+    at the same time. Keys with attributes already loaded are skipped.
+
+    Returns
+    -------
+    List of key and SSHKeyError tuples for keys with errors loading the attributes
+    """
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def get_key_info_output(key: SSHKeyFile) -> List[str]:
+        async with semaphore:
+            try:
+                stdout, _stderr = await run_command_lineoutput(*key.__key_info_command__)
+            except CommandError as error:
+                raise SSHKeyError(f'Error loading SSH key attributes: {error}') from error
+        return stdout
+
+    keys = list({id(key): key for key in keys}.values())
+    pending, errors = await asyncio.to_thread(load_cached_key_attributes, keys)
+    outputs = []
+    results = await asyncio.gather(*[get_key_info_output(key) for key in pending], return_exceptions=True)
+    for key, result in zip(pending, results):
+        if isinstance(result, SSHKeyError):
+            errors.append((key, result))
+        elif isinstance(result, BaseException):
+            raise result
+        else:
+            outputs.append((key, result))
+    errors.extend(await asyncio.to_thread(set_key_info_outputs, outputs))
+
+    order = {id(key): index for index, key in enumerate(keys)}
+    errors.sort(key=lambda item: order[id(item[0])])
+    return errors
@@ -0,0 +1,81 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Asyncio SSH assets manager session
+"""
+import asyncio
+
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
+
+from ..authorized_keys import AuthorizedKeys
+from ..configuration import SshAssetsConfiguration
+from ..exceptions import SSHKeyError
+from ..keys.file import SSHKeyFile
+from ..session import SshAssetSession
+from .agent import AsyncSshAgent
+from .authorized_keys import update_authorized_keys
+from .constants import ASYNC_MAX_CONCURRENCY
+from .keys import get_available_key_files, load_key_attributes
+
+
+class AsyncSshAssetSession:
+    """
+    Asyncio SSH asset manager session
+
+    Wraps a SshAssetSession, sharing the configuration, cached agent key listing and
+    authorized keys with it
+    """
+    session: SshAssetSession
+    max_concurrency: int
+
+    def __init__(self,
+                 configuration_file: Optional[Union[Path, str]] = None,
+                 session: Optional[SshAssetSession] = None,
+                 max_concurrency: int = ASYNC_MAX_CONCURRENCY) -> None:
+        self.session = session if session is not None else SshAssetSession(configuration_file)
+        self.max_concurrency = max_concurrency
+        self.__agent__ = None
+
+    @property
+    def configuration(self) -> SshAssetsConfiguration:
+        """
+        Return SSH assets configuration for the session
+        """
+        return self.session.configuration
+
+    @property
+    def agent(self) -> AsyncSshAgent:
+        """
+        Return asyncio SSH agent object for the session agent
+        """
+        if self.__agent__ is None:
+            self.__agent__ = AsyncSshAgent(self.session.agent, self.max_concurrency)
+        return self.__agent__
+
+    async def load_key_attributes(self,
+                                  keys: Optional[List[SSHKeyFile]] = None) -> List[Tuple[SSHKeyFile, SSHKeyError]]:
+        """
+        Load attributes for SSH key files, by default for all available configured keys
+
+        Returns
+        -------
+        List of key and SSHKeyError tuples for keys with errors loading the attributes
+        """
+        if keys is None:
+            # pylint: disable=no-member
+            keys = await asyncio.to_thread(lambda: get_available_key_files(self.configuration.keys))
+        return await load_key_attributes(keys, self.max_concurrency)
+
+    async def get_user_authorized_keys(self) -> AuthorizedKeys:
+        """
+        Return user authorized keys, loading the file if it was not loaded or was modified
+        """
+        authorized_keys = self.session.user_authorized_keys
+        errors = await update_authorized_keys([authorized_keys], max_concurrency=self.max_concurrency)
+        if errors:
+            raise errors[0][1]
+        return authorized_keys
@@ -0,0 +1,96 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Run commands as asyncio subprocesses
+
+These functions match the sys_toolkit.subprocess run_command and run_command_lineoutput
+functions, raising CommandError in case of errors running the commands. Commands are
+accounted in the subprocess dispatcher in ssh_assets.subprocess.
+"""
+import asyncio
+import os
+
+from subprocess import PIPE
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sys_toolkit.exceptions import CommandError
+from sys_toolkit.subprocess import DEFAULT_ENCODINGS, DEFAULT_RETURN_CODES_OK
+
+from ..subprocess import SUBPROCESS_DISPATCHER
+
+
+async def run_command(*args: str,
+                      cwd: Optional[str] = None,
+                      expected_return_codes: Optional[Sequence[int]] = None,
+                      env: Optional[Dict] = None,
+                      timeout: Optional[float] = None) -> Tuple[bytes, bytes]:
+    """
+    Run command as asyncio subprocess, checking the return code and returning stdout
+    and stderr as bytes
+
+    Standard input is inherited, allowing commands like ssh-add to ask for passphrases
+    """
+    with SUBPROCESS_DISPATCHER.trace(args):
+        if cwd is not None and not os.path.isdir(cwd):
+            raise CommandError(f'No such directory: {cwd}')
+        expected_return_codes = expected_return_codes if expected_return_codes is not None \
+            else DEFAULT_RETURN_CODES_OK
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *args,
+                stdout=PIPE,
+                stderr=PIPE,
+                cwd=cwd,
+                env=env if env is not None else os.environ.copy(),
+            )
+        except OSError as error:
+            raise CommandError(error) from error
+        try:
+            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+        except asyncio.TimeoutError as error:
+            process.kill()
+            await process.wait()
+            raise CommandError(f'Timeout running {" ".join(args)} after {timeout} seconds') from error
+        if process.returncode not in expected_return_codes:
+            raise CommandError(f'Error running {" ".join(args)}: returns {process.returncode}: {stderr}')
+        return stdout, stderr
+
+
+def parse_output_lines(data: bytes, encodings: Sequence[str] = DEFAULT_ENCODINGS) -> List[str]:
+    """
+    Split command output to lines decoded with first suitable encoding
+    """
+    lines = []
+    for line in data.splitlines():
+        for encoding in encodings:
+            try:
+                lines.append(str(line, encoding))
+                break
+            except ValueError:
+                pass
+        else:
+            raise CommandError(f'Error parsing line {line}')
+    return lines
+
+
+async def run_command_lineoutput(*args: str,
+                                 cwd: Optional[str] = None,
+                                 expected_return_codes: Optional[Sequence[int]] = None,
+                                 timeout: Optional[float] = None,
+                                 env: Optional[Dict] = None,
+                                 encodings: Sequence[str] = DEFAULT_ENCODINGS) -> Tuple[List[str], List[str]]:
+    """
+    Run command as asyncio subprocess, checking the return code and returning stdout
+    and stderr split to lines
+    """
+    stdout, stderr = await run_command(
+        *args,
+        cwd=cwd,
+        expected_return_codes=expected_return_codes,
+        env=env,
+        timeout=timeout,
+    )
+    return parse_output_lines(stdout, encodings), parse_output_lines(stderr, encodings)
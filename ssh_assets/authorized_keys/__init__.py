@@ -6,6 +6,20 @@
 """
 Parser for OpenSSH authorized keys files
 """
+from typing import TYPE_CHECKING
 
-# flake8: noqa: F401
-from .loader import AuthorizedKeys
+from ..lazy import lazy_attributes
+
+if TYPE_CHECKING:
+    from .loader import AuthorizedKeys  # noqa: F401
+    from .writer import AuthorizedKeysWriter  # noqa: F401
+
+__all__ = [
+    'AuthorizedKeys',
+    'AuthorizedKeysWriter',
+]
+
+__getattr__, __dir__ = lazy_attributes(__name__, {
+    'AuthorizedKeys': '.loader',
+    'AuthorizedKeysWriter': '.writer',
+})
@@ -0,0 +1,251 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Audit authorized keys files of multiple users
+
+Authorized keys files are discovered from the password database or with glob patterns and
+parsed in parallel in a process pool. Each file is parsed to a result with the fingerprint,
+options and comment of each key, and the results can be aggregated to an index of keys by
+fingerprint, listing the users allowed to login with the key.
+
+The results are returned as iterators in the order the files are parsed, with a bounded
+number of files processed at a time, so that results can be written as JSON lines without
+collecting results for all files to memory.
+"""
+import glob
+import os
+import pwd
+
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional, Set, Tuple
+
+from ..exceptions import SSHKeyError
+from ..keys.constants import DEFAULT_KEY_HASH_ALGORITHM, KEY_HASH_ALGORITHM_LABELS, KeyHashAlgorithm
+from .constants import DEFAULT_AUTHORIZED_KEYS_FILE
+from .loader import AuthorizedKeys
+from .public_key import PublicKey
+
+# Number of files submitted to each worker process at a time
+AUDIT_FILES_PER_PROCESS = 4
+
+
+def get_file_owner(path: Path) -> str:
+    """
+    Return name of the user owning a file, or the user ID if the user is not known
+    """
+    uid = path.stat().st_uid
+    try:
+        return pwd.getpwuid(uid).pw_name
+    except KeyError:
+        return str(uid)
+
+
+def discover_user_authorized_keys_files(users: Optional[Iterable[str]] = None,
+                                        filename: str = DEFAULT_AUTHORIZED_KEYS_FILE) -> Iterator[Tuple[str, Path]]:
+    """
+    Discover authorized keys files of users in the password database
+
+    The filename is relative to the user home directory. If users is given, only files of
+    the named users are returned.
+
+    Returns
+    -------
+    Iterator of user name and path tuples for existing authorized keys files
+    """
+    users = set(users) if users else None
+    filename = filename[2:] if filename.startswith('~/') else filename
+    seen = set()
+    for entry in pwd.getpwall():
+        if entry.pw_name in seen or (users is not None and entry.pw_name not in users):
+            continue
+        seen.add(entry.pw_name)
+        if not entry.pw_dir:
+            continue
+        path = Path(entry.pw_dir).joinpath(filename)
+        try:
+            if path.is_file():
+                yield entry.pw_name, path
+        except OSError:
+            continue
+
+
+def discover_glob_authorized_keys_files(patterns: Iterable[str]) -> Iterator[Tuple[str, Path]]:
+    """
+    Discover authorized keys files matching glob patterns
+
+    The user for each file is the owner of the file
+
+    Returns
+    -------
+    Iterator of user name and path tuples for matching files
+    """
+    seen = set()
+    for pattern in patterns:
+        for match in sorted(glob.iglob(os.path.expanduser(pattern))):
+            path = Path(match)
+            if path in seen:
+                continue
+            seen.add(path)
+            try:
+                if path.is_file():
+                    yield get_file_owner(path), path
+            except OSError:
+                continue
+
+
+def audit_authorized_keys_file(user: str,
+                               path: Path,
+                               hash_algorithm: KeyHashAlgorithm = DEFAULT_KEY_HASH_ALGORITHM) -> dict:
+    """
+    Parse authorized keys file of a user
+
+    Lines which can't be parsed are reported in the errors of the result and do not stop
+    processing the file. This function is run in the worker processes of the audit.
+
+    Returns
+    -------
+    Dictionary with user, path, parsed keys and errors
+    """
+    result = {
+        'user': user,
+        'path': str(path),
+        'keys': [],
+        'errors': [],
+    }
+    label = KEY_HASH_ALGORITHM_LABELS[hash_algorithm]
+    try:
+        for line in AuthorizedKeys(path).iter_lines():
+            try:
+                public_key = PublicKey(line, lazy=True)
+                result['keys'].append({
+                    'fingerprint': f'{label}:{public_key.fingerprint(hash_algorithm)}',
+                    'key_type': public_key.key_type.value,
+                    'options': ','.join(str(option) for option in public_key.options),
+                    'comment': public_key.comment,
+                })
+            except (SSHKeyError, ValueError) as error:
+                result['errors'].append(str(error))
+    except SSHKeyError as error:
+        result['errors'].append(str(error))
+    return result
+
+
+class AuthorizedKeysIndex:
+    """
+    Index of authorized keys by fingerprint aggregated from audit results
+
+    Only unique values are stored for each fingerprint, so the index size depends on the
+    number of distinct keys, not on the number of parsed lines.
+    """
+    def __init__(self) -> None:
+        self.__key_types__: Dict[str, str] = {}
+        self.__users__: Dict[str, Set[str]] = defaultdict(set)
+        self.__options__: Dict[str, Set[str]] = defaultdict(set)
+        self.__comments__: Dict[str, Set[str]] = defaultdict(set)
+
+    def __len__(self) -> int:
+        return len(self.__key_types__)
+
+    def __contains__(self, fingerprint: str) -> bool:
+        return fingerprint in self.__key_types__
+
+    def add(self, result: dict) -> None:
+        """
+        Add keys in a file audit result to the index
+        """
+        for key in result['keys']:
+            fingerprint = key['fingerprint']
+            self.__key_types__[fingerprint] = key['key_type']
+            self.__users__[fingerprint].add(result['user'])
+            self.__options__[fingerprint].add(key['options'])
+            self.__comments__[fingerprint].add(key['comment'])
+
+    def get(self, fingerprint: str) -> Optional[dict]:
+        """
+        Return index entry for a fingerprint
+
+        Returns
+        -------
+        Dictionary with fingerprint, key type, users, options and comments or None
+        """
+        if fingerprint not in self.__key_types__:
+            return None
+        return {
+            'fingerprint': fingerprint,
+            'key_type': self.__key_types__[fingerprint],
+            'users': sorted(self.__users__[fingerprint]),
+            'options': sorted(self.__options__[fingerprint]),
+            'comments': sorted(self.__comments__[fingerprint]),
+        }
+
+    def __iter__(self) -> Iterator[dict]:
+        for fingerprint in sorted(self.__key_types__):
+            yield self.get(fingerprint)
+
+
+class AuthorizedKeysAudit:
+    """
+    Audit authorized keys files in parallel with a process pool
+
+    If processes is 1, the files are parsed in the current process
+    """
+    files: Iterable[Tuple[str, Path]]
+    processes: int
+    hash_algorithm: KeyHashAlgorithm
+
+    def __init__(self,
+                 files: Iterable[Tuple[str, Path]],
+                 processes: Optional[int] = None,
+                 hash_algorithm: KeyHashAlgorithm = DEFAULT_KEY_HASH_ALGORITHM) -> None:
+        self.files = files
+        self.processes = max(1, processes if processes is not None else os.cpu_count() or 1)
+        self.hash_algorithm = hash_algorithm
+
+    def __repr__(self) -> str:
+        return f'authorized keys audit with {self.processes} processes'
+
+    def __iter_process_pool_results__(self) -> Iterator[dict]:
+        """
+        Parse files in worker processes, limiting number of files processed at a time
+        """
+        max_pending = self.processes * AUDIT_FILES_PER_PROCESS
+        pending: Set[Future] = set()
+        with ProcessPoolExecutor(max_workers=self.processes) as executor:
+            for user, path in self.files:
+                if len(pending) >= max_pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+                pending.add(executor.submit(audit_authorized_keys_file, user, path, self.hash_algorithm))
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+
+    def __iter__(self) -> Iterator[dict]:
+        """
+        Iterate audit results for files in the order the files were parsed
+        """
+        if self.processes == 1:
+            for user, path in self.files:
+                yield audit_authorized_keys_file(user, path, self.hash_algorithm)
+        else:
+            yield from self.__iter_process_pool_results__()
+
+    def build_index(self) -> AuthorizedKeysIndex:
+        """
+        Audit the files and aggregate keys to an index by fingerprint
+
+        Returns
+        -------
+        AuthorizedKeysIndex with keys from all audited files
+        """
+        index = AuthorizedKeysIndex()
+        for result in self:
+            index.add(result)
+        return index
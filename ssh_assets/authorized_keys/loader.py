@@ -6,11 +6,16 @@
 """
 Class to load OpenSSH authorized keys files
 """
+import mmap
+import os
+
 from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
 
 from sys_toolkit.collection import CachedMutableSequence
 
 from ..exceptions import SSHKeyError
+from ..keys.constants import DEFAULT_KEY_HASH_ALGORITHM, KEY_HASH_ALGORITHM_LABELS, KeyHashAlgorithm
 from .constants import DEFAULT_AUTHORIZED_KEYS_FILE
 from .public_key import PublicKey
 
@@ -18,32 +23,185 @@ from .public_key import PublicKey
 class AuthorizedKeys(CachedMutableSequence):
     """
     List of OpenSSH authorized keys items
+
+    The keys in the file can also be processed without loading all keys to memory with
+    iter_public_keys()
+
+    The file stat signature and parsed keys by line are stored when the file is loaded. Use
+    refresh() to reload the file only if it was modified. Keys for unchanged lines are not
+    parsed again when the file is reloaded.
+
+    Keys can be looked up by fingerprint with find_by_fingerprint() and contains(). The
+    fingerprint index for each hash algorithm is built when first needed.
     """
     path: Path
 
     def __init__(self, path: str = DEFAULT_AUTHORIZED_KEYS_FILE) -> None:
         super().__init__()
         self.path = Path(path).expanduser().resolve()
+        self.__signature__ = None
+        self.__public_keys__ = {}
+        self.__fingerprint_indexes__: Dict[KeyHashAlgorithm, Dict[str, PublicKey]] = {}
 
-    def update(self) -> None:
+    def __file_signature__(self) -> Optional[Tuple[int, int, int]]:
         """
-        Update items in authorized keys file data by reading the file
+        Return signature of the file as inode, size and modification time in nanoseconds
         """
-        self.__start_update__()
-        self.__items__ = []
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+    @property
+    def modified(self) -> bool:
+        """
+        Check if the file was modified after it was loaded
+        """
+        if self.__signature__ is None:
+            return False
+        return self.__file_signature__() != self.__signature__
+
+    def __delitem__(self, index: int) -> None:
+        super().__delitem__(index)
+        self.__fingerprint_indexes__ = {}
 
+    def __setitem__(self, index: int, value: Any) -> None:
+        super().__setitem__(index, value)
+        self.__fingerprint_indexes__ = {}
+
+    def insert(self, index: int, value: Any) -> None:
+        super().insert(index, value)
+        self.__fingerprint_indexes__ = {}
+
+    def clear(self) -> None:
+        super().clear()
+        self.__fingerprint_indexes__ = {}
+
+    def iter_lines(self) -> Iterator[str]:
+        """
+        Iterate authorized keys lines from memory mapped file, skipping empty lines and comments
+
+        The lines are not parsed or stored in the object. Line endings are removed from the lines.
+        """
         if not self.path.is_file():
             raise SSHKeyError(f'Error loading SSH authorized keys list: No such file: {self.path}')
 
         try:
-            data = self.path.read_text(encoding='utf-8')
-            for line in data.splitlines():
-                if line.strip() == '' or line.startswith('#'):
-                    continue
-                self.__items__.append(PublicKey(line))
-        except OSError as error:
+            with self.path.open('rb') as handle:
+                if os.fstat(handle.fileno()).st_size == 0:
+                    return
+                with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    for line in iter(data.readline, b''):
+                        line = str(line, 'utf-8').rstrip('\r\n')
+                        if line.strip() == '' or line.startswith('#'):
+                            continue
+                        yield line
+        except (OSError, ValueError) as error:
             raise SSHKeyError(
                 f'Error loading SSH authorized keys list from {self.path}: {error}'
             ) from error
 
+    def iter_public_keys(self, lazy: bool = True) -> Iterator[PublicKey]:
+        """
+        Iterate public keys in authorized keys file without loading the file to memory
+
+        The items are not stored in the object. By default the public keys are lazy: options
+        are parsed and the public key is validated when the attributes are accessed.
+        """
+        for line in self.iter_lines():
+            yield PublicKey(line, lazy=lazy)
+
+    def refresh(self) -> bool:
+        """
+        Load the file if it was not loaded or was modified after loading
+
+        Returns
+        -------
+        True if the file was loaded, False if it was not modified
+        """
+        if not self.__requires_reload__ and not self.modified:
+            return False
+        self.update()
+        return True
+
+    def update(self) -> None:
+        """
+        Update items in authorized keys file data by reading the file
+
+        Keys for lines already parsed in previous update are reused
+        """
+        self.__start_update__()
+        self.__items__ = []
+        signature = self.__file_signature__()
+        public_keys: Dict[str, PublicKey] = {}
+        try:
+            for line in self.iter_lines():
+                public_key = public_keys.get(line, None) or self.__public_keys__.get(line, None)
+                if public_key is None:
+                    public_key = PublicKey(line)
+                public_keys[line] = public_key
+                self.__items__.append(public_key)
+        except SSHKeyError:
+            self.__reset__()
+            raise
+        self.__public_keys__ = public_keys
+        self.__signature__ = signature
+        self.__fingerprint_indexes__ = {}
         self.__finish_update__()
+
+    def get_fingerprint_index(self,
+                              hash_algorithm: KeyHashAlgorithm = DEFAULT_KEY_HASH_ALGORITHM) -> Dict[str, PublicKey]:
+        """
+        Return index of keys by fingerprint with specified hash algorithm, loading the file
+        if necessary
+
+        If the same key is in the file more than once, the first entry is indexed.
+
+        Returns
+        -------
+        Dictionary of PublicKey objects by fingerprint without the hash algorithm prefix
+        """
+        if self.__requires_reload__:
+            self.update()
+        index = self.__fingerprint_indexes__.get(hash_algorithm, None)
+        if index is None:
+            index = {}
+            for public_key in self.__items__:
+                index.setdefault(public_key.fingerprint(hash_algorithm), public_key)
+            self.__fingerprint_indexes__[hash_algorithm] = index
+        return index
+
+    @staticmethod
+    def __split_fingerprint__(fingerprint: str,
+                              hash_algorithm: KeyHashAlgorithm) -> Tuple[str, KeyHashAlgorithm]:
+        """
+        Split hash algorithm prefix like SHA256: from fingerprint, if the prefix is present
+        """
+        for algorithm, label in KEY_HASH_ALGORITHM_LABELS.items():
+            if fingerprint.startswith(f'{label}:'):
+                return fingerprint[len(label) + 1:], algorithm
+        return fingerprint, hash_algorithm
+
+    def find_by_fingerprint(self,
+                            fingerprint: str,
+                            hash_algorithm: KeyHashAlgorithm = DEFAULT_KEY_HASH_ALGORITHM) -> Optional[PublicKey]:
+        """
+        Return key with specified fingerprint or None if the key is not in the file
+
+        The fingerprint can be given with or without the hash algorithm prefix. If the prefix
+        is present, it overrides the hash_algorithm argument.
+        """
+        fingerprint, hash_algorithm = self.__split_fingerprint__(fingerprint, hash_algorithm)
+        return self.get_fingerprint_index(hash_algorithm).get(fingerprint, None)
+
+    def contains(self,
+                 fingerprint: str,
+                 hash_algorithm: KeyHashAlgorithm = DEFAULT_KEY_HASH_ALGORITHM) -> bool:
+        """
+        Check if key with specified fingerprint is in the file
+
+        Fingerprints of SSH key files and agent keys can be checked with the hash and
+        hash_algorithm attributes of the keys.
+        """
+        return self.find_by_fingerprint(fingerprint, hash_algorithm) is not None
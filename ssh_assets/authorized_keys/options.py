@@ -5,25 +5,23 @@
 #
 """
 Parser for OpenSSH authorized keys line command options
+
+Options are parsed with a single pass tokenizer. Option values are quoted with double quotes
+and may contain spaces, commas and double quotes escaped with backslash.
 """
 import re
+import sys
 
 from operator import ge, gt, le, lt
-from typing import Any, Callable, Tuple, Union
+from typing import Any, Callable, List, Optional, Tuple, Union
 
 from ..base import RichComparisonObject
 from ..exceptions import SSHKeyError
 from .constants import AUTHRORIZED_KEYS_OPTION_FLAGS, AUTHRORIZED_KEYS_OPTION_VALUE_FLAGS
 
-RE_OPTION_NAME = r'(?P<option>[a-zAZ0-9-]+)'
-RE_OPTION_NO_VALUE = (
-    re.compile(f'^{RE_OPTION_NAME},(?P<rest>.*)$'),
-    re.compile(f'^{RE_OPTION_NAME}$'),
-)
-RE_OPTION_WITH_VALUE = (
-    re.compile(f'^{RE_OPTION_NAME}="(?P<value>[^"]+)",(?P<rest>.*)$'),
-    re.compile(f'^{RE_OPTION_NAME}="(?P<value>[^"]+)"$'),
-)
+RE_OPTION_NAME = re.compile(r'[a-zA-Z0-9-]+')
+RE_OPTIONS_UNQUOTED = re.compile(r'[^\s"]*')
+RE_QUOTED_VALUE_SPECIAL = re.compile(r'[\\"]')
 
 
 # pylint: disable=too-few-public-methods
@@ -60,7 +58,8 @@ class AuthorizedKeyOptionValue(RichComparisonObject):
         self.value = value
 
     def __repr__(self) -> str:
-        return f'{self.option}="{self.value}"'
+        value = self.value.replace('"', '\\"')
+        return f'{self.option}="{value}"'
 
     def __compare__(self, operator: Callable, default: bool, other: Any) -> bool:
         """
@@ -91,27 +90,105 @@ class AuthorizedKeyOptionValue(RichComparisonObject):
         return self.__compare__(ge, True, other)
 
 
-def parse_option_flag(line: str) -> Union[AuthorizedKeyOptionFlag, AuthorizedKeyOptionValue]:
+def parse_quoted_value(text: str, index: int) -> Tuple[str, int]:
+    """
+    Parse quoted option value starting after the opening double quote at index
+
+    Double quotes escaped with backslash are unescaped, other backslashes are kept as is
+
+    Returns
+    -------
+    - Option value as string
+    - Index of text after the closing double quote
+    """
+    parts = []
+    while True:
+        match = RE_QUOTED_VALUE_SPECIAL.search(text, index)
+        if match is None:
+            raise SSHKeyError(f'Unterminated quoted value in OpenSSH authorized keys options: {text}')
+        position = match.start()
+        parts.append(text[index:position])
+        if match.group() == '"':
+            return ''.join(parts), position + 1
+        if text.startswith('"', position + 1):
+            parts.append('"')
+            index = position + 2
+        else:
+            parts.append('\\')
+            index = position + 1
+
+
+def split_options(line: str) -> Tuple[str, str]:
+    """
+    Split authorized keys line to the options string and rest of the line at first whitespace
+    not inside a quoted option value
+
+    Returns
+    -------
+    - Options string
+    - Rest of the line with leading whitespace removed
     """
-    Match plain authorized key option with no option value in middle of options or end of line'
+    index = 0
+    length = len(line)
+    while index < length:
+        index = RE_OPTIONS_UNQUOTED.match(line, index).end()
+        if index >= length or line[index] != '"':
+            break
+        _value, index = parse_quoted_value(line, index + 1)
+    return line[:index], line[index:].lstrip()
+
 
-    This method is called from parser in a loop to digest the options string
+def parse_option(text: str, index: int = 0) -> Tuple[Union[AuthorizedKeyOptionFlag, AuthorizedKeyOptionValue], int]:
+    """
+    Parse a single option from options string starting from specified index
+
+    Returns
+    -------
+    - Option as AuthorizedKeyOptionFlag or AuthorizedKeyOptionValue object
+    - Index of next option in text, or length of text if end of text is reached
+    """
+    match = RE_OPTION_NAME.match(text, index)
+    if not match:
+        raise SSHKeyError(f'Unexpected data in OpenSSH authorized keys options: {text[index:]}')
+    name = sys.intern(match.group())
+    index = match.end()
+
+    if text.startswith('="', index):
+        value, index = parse_quoted_value(text, index + 2)
+        option = AuthorizedKeyOptionValue(name, value)
+    else:
+        option = AuthorizedKeyOptionFlag(name)
+
+    length = len(text)
+    if index < length:
+        if text[index] != ',' or index + 1 == length:
+            raise SSHKeyError(f'Unexpected data in OpenSSH authorized keys options: {text[index:]}')
+        index += 1
+    return option, index
+
+
+def parse_options(text: str) -> List[Union[AuthorizedKeyOptionFlag, AuthorizedKeyOptionValue]]:
+    """
+    Parse all options from authorized keys options string
+    """
+    options = []
+    index = 0
+    length = len(text)
+    while index < length:
+        option, index = parse_option(text, index)
+        options.append(option)
+    return options
+
+
+def parse_option_flag(line: str) -> Tuple[
+        Union[AuthorizedKeyOptionFlag, AuthorizedKeyOptionValue], Optional[str]]:
+    """
+    Parse first authorized key option from options string
 
     Returns
     ---
     - Option name as AuthorizedKeyOptionFlag or AuthorizedKeyOptionValue object
     - Rest of line without initial , in option string as string or None if end of line is reached
     """
-    for pattern in RE_OPTION_NO_VALUE:
-        match = pattern.match(line)
-        if match:
-            data = match.groupdict()
-            return AuthorizedKeyOptionFlag(data['option']), data.get('rest', None)
-
-    for pattern in RE_OPTION_WITH_VALUE:
-        match = pattern.match(line)
-        if match:
-            data = match.groupdict()
-            return AuthorizedKeyOptionValue(data['option'], data['value']), data.get('rest', None)
-
-    raise SSHKeyError(f'Unexpected data in OpenSSH authorized keys options: {line}')
+    option, index = parse_option(line)
+    return option, line[index:] if index < len(line) else None
@@ -7,36 +7,93 @@
 SSH keys public key entry in user authorized keys files and exported .pub files
 """
 from base64 import b64decode
-from typing import List, Tuple, Union
+from typing import Dict, List, Tuple, Union
 
 from ..base import RichComparisonObject
 from ..exceptions import SSHKeyError
+from ..keys.constants import DEFAULT_KEY_HASH_ALGORITHM, KeyHashAlgorithm
+from ..keys.wire import get_key_blob_fingerprint
 
 from .constants import SshAuthorizedKeysKeyType
-from .options import AuthorizedKeyOptionFlag, AuthorizedKeyOptionValue, parse_option_flag
+from .options import AuthorizedKeyOptionFlag, AuthorizedKeyOptionValue, parse_options, split_options
 
-SSH_KEY_TYPE_STRINGS = [item.value for item in SshAuthorizedKeysKeyType]
+SSH_KEY_TYPE_STRINGS = frozenset(item.value for item in SshAuthorizedKeysKeyType)
 
 
 # pylint: disable=too-few-public-methods
 class PublicKey(RichComparisonObject):
     """
     Entry in OpenSSH authorized keys file
+
+    If lazy is True, the line is only split to fields when the object is created. The base64
+    encoded public key is validated and the options are parsed when the attributes are accessed.
     """
     key_type: str
-    base_64: str
     comment: str
-    options: List[Union[AuthorizedKeyOptionFlag, AuthorizedKeyOptionValue]]
 
     __compare_attributes__: Tuple[str] = ('key_type', 'base64',)
 
-    def __init__(self, line: str) -> None:
+    def __init__(self, line: str, lazy: bool = False) -> None:
         self.line = line
-        self.key_type, self.base64, self.comment, self.options = self.__parse_line__(line)
+        self.__base64_validated__ = False
+        self.__options__ = None
+        self.__fingerprints__: Dict[KeyHashAlgorithm, str] = {}
+        self.key_type, self.__base64__, self.comment, self.__options_string__ = self.__parse_line__(line)
+        if not lazy:
+            self.__load_lazy_attributes__()
 
     def __repr__(self) -> str:
         return self.line
 
+    def __load_lazy_attributes__(self) -> None:
+        """
+        Validate the public key and parse options
+        """
+        self.base64  # pylint: disable=pointless-statement
+        self.options  # pylint: disable=pointless-statement
+
+    @property
+    def base64(self) -> str:
+        """
+        Return base64 encoded public key, validating the value on first access
+        """
+        if not self.__base64_validated__ and self.__base64__ is not None:
+            self.__validate_base64__(self.__base64__)
+        self.__base64_validated__ = True
+        return self.__base64__
+
+    @property
+    def options(self) -> List[Union[AuthorizedKeyOptionFlag, AuthorizedKeyOptionValue]]:
+        """
+        Return options for the key, parsing the options on first access
+        """
+        if self.__options__ is None:
+            self.__options__ = parse_options(self.__options_string__)
+        return self.__options__
+
+    @property
+    def key_blob(self) -> bytes:
+        """
+        Return the decoded SSH wire format public key blob
+        """
+        if self.base64 is None:
+            raise SSHKeyError(f'Error parsing {self.line}: no public key found')
+        return b64decode(self.base64)
+
+    def fingerprint(self, hash_algorithm: KeyHashAlgorithm = DEFAULT_KEY_HASH_ALGORITHM) -> str:
+        """
+        Return fingerprint of the public key with specified hash algorithm
+
+        The fingerprint is calculated from the decoded public key blob and has same format as
+        the hash of SSH key files and keys loaded to the agent, without the algorithm prefix.
+        Calculated fingerprints are cached by hash algorithm.
+        """
+        fingerprint = self.__fingerprints__.get(hash_algorithm, None)
+        if fingerprint is None:
+            fingerprint = get_key_blob_fingerprint(self.key_blob, hash_algorithm)
+            self.__fingerprints__[hash_algorithm] = fingerprint
+        return fingerprint
+
     def __validate_base64__(self, base64_value: str) -> str:
         """
         Validate the base64 encoded public key value in data is actually valid base64 data
@@ -48,41 +105,22 @@ class PublicKey(RichComparisonObject):
         return base64_value
 
     @staticmethod
-    def __parse_options__(option_fields: str) -> List[Union[AuthorizedKeyOptionFlag, AuthorizedKeyOptionValue]]:
-        """
-        Parse options from specified option string
-        """
-        options = []
-        line = ' '.join(option_fields)
-        if line != '':
-            while line is not None:
-                option, rest = parse_option_flag(line)
-                options.append(option)
-                line = rest
-        return options
-
-    def __parse_line__(self, line: str) -> Tuple[
-            str, str, str, List[Union[AuthorizedKeyOptionFlag, AuthorizedKeyOptionValue]]]:
+    def __parse_line__(line: str) -> Tuple[str, str, str, str]:
         """
-        Parse the text entry for authorized keys item
+        Split the text entry for authorized keys item to key type, base64 encoded key,
+        comment and options string
         """
-        key_type = None
-        base64 = None
-        comment = None
-
-        option_fields = []
-        fields = line.split(' ')
-        for index, field in enumerate(fields):
-            if field in SSH_KEY_TYPE_STRINGS:
-                try:
-                    key_type = SshAuthorizedKeysKeyType(field)
-                    base64 = self.__validate_base64__(fields[index + 1])
-                    comment = ' '.join(fields[index + 2:])
-                    break
-                except IndexError as error:
-                    raise SSHKeyError(f'Invalid authorized keys line: {line}') from error
-            option_fields.append(field)
-
-        options = self.__parse_options__(option_fields)
+        fields = line.split(None, 1)
+        if fields and fields[0] in SSH_KEY_TYPE_STRINGS:
+            options = ''
+            rest = line.lstrip()
+        else:
+            options, rest = split_options(line)
 
+        fields = rest.split(' ')
+        if fields[0] not in SSH_KEY_TYPE_STRINGS or len(fields) < 2:
+            raise SSHKeyError(f'Invalid authorized keys line: {line}')
+        key_type = SshAuthorizedKeysKeyType(fields[0])
+        base64 = fields[1]
+        comment = ' '.join(fields[2:])
         return key_type, base64, comment, options
@@ -0,0 +1,217 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Writer for OpenSSH authorized keys files
+
+Keys from multiple sources are merged to the writer and deduplicated by the SHA256 hash of
+the public key blob, so merging is a single pass over the sources. The file is written with
+a temporary file replacing the authorized keys file, and the write is skipped if the file
+already has the same contents.
+"""
+import hashlib
+import os
+import stat
+import tempfile
+
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+
+from ..exceptions import SSHKeyError
+from ..keys.constants import KeyHashAlgorithm
+from .constants import DEFAULT_AUTHORIZED_KEYS_FILE
+from .loader import AuthorizedKeys
+from .options import AuthorizedKeyOptionFlag, AuthorizedKeyOptionValue
+from .public_key import PublicKey
+
+# Mode for new authorized keys files
+AUTHORIZED_KEYS_FILE_MODE = 0o600
+FILE_DIGEST_BLOCK_SIZE = 1024 * 1024
+
+
+def format_options(options: List[Union[AuthorizedKeyOptionFlag, AuthorizedKeyOptionValue]]) -> str:
+    """
+    Format options in canonical form for authorized keys line
+
+    Option values are quoted consistently and duplicate options are removed. The order of
+    options is kept, because later options may override earlier ones, for example pty after
+    restrict.
+    """
+    seen = set()
+    formatted = []
+    for option in options:
+        value = str(option)
+        if value not in seen:
+            seen.add(value)
+            formatted.append(value)
+    return ','.join(formatted)
+
+
+def get_file_digest(path: Path) -> Optional[bytes]:
+    """
+    Return SHA256 digest of file contents or None if the file does not exist
+    """
+    digest = hashlib.sha256()
+    try:
+        with path.open('rb') as handle:
+            for block in iter(lambda: handle.read(FILE_DIGEST_BLOCK_SIZE), b''):
+                digest.update(block)
+    except FileNotFoundError:
+        return None
+    return digest.digest()
+
+
+class AuthorizedKeysWriter:
+    """
+    Writer for OpenSSH authorized keys files
+
+    Keys are stored in the order they were added. A key already in the writer is not added
+    again, unless replace is True, in which case the entry is replaced in the same position.
+
+    By default the lines are written as they were in the source. With canonicalize_options
+    the options are written in canonical form and extra whitespace is removed from the lines.
+    """
+    path: Path
+    canonicalize_options: bool
+
+    def __init__(self,
+                 path: str = DEFAULT_AUTHORIZED_KEYS_FILE,
+                 canonicalize_options: bool = False) -> None:
+        self.path = Path(path).expanduser()
+        self.canonicalize_options = canonicalize_options
+        self.__keys__: Dict[str, PublicKey] = {}
+
+    def __repr__(self) -> str:
+        return f'{self.path} {len(self)} keys'
+
+    def __len__(self) -> int:
+        return len(self.__keys__)
+
+    def __iter__(self) -> Iterator[PublicKey]:
+        return iter(self.__keys__.values())
+
+    def __contains__(self, public_key: Union[PublicKey, str]) -> bool:
+        if isinstance(public_key, PublicKey):
+            public_key = public_key.fingerprint(KeyHashAlgorithm.SHA_256)
+        return public_key in self.__keys__
+
+    def add(self, public_key: Union[PublicKey, str], replace: bool = False) -> bool:
+        """
+        Add a public key or authorized keys line to the writer
+
+        Returns
+        -------
+        True if the key was added or replaced, False if the key was already in the writer
+        """
+        if isinstance(public_key, str):
+            public_key = PublicKey(public_key.strip())
+        fingerprint = public_key.fingerprint(KeyHashAlgorithm.SHA_256)
+        if not replace and fingerprint in self.__keys__:
+            return False
+        self.__keys__[fingerprint] = public_key
+        return True
+
+    def remove(self, public_key: Union[PublicKey, str]) -> bool:
+        """
+        Remove a public key or key with SHA256 fingerprint from the writer
+
+        Returns
+        -------
+        True if the key was removed, False if the key was not in the writer
+        """
+        if isinstance(public_key, PublicKey):
+            public_key = public_key.fingerprint(KeyHashAlgorithm.SHA_256)
+        return self.__keys__.pop(public_key, None) is not None
+
+    def merge(self, source: Iterable[Union[PublicKey, str]], replace: bool = False) -> int:
+        """
+        Merge public keys or authorized keys lines from a source to the writer
+
+        Empty lines and comments in the source are skipped
+
+        Returns
+        -------
+        Number of keys added or replaced
+        """
+        count = 0
+        for public_key in source:
+            if isinstance(public_key, str) and (not public_key.strip() or public_key.lstrip().startswith('#')):
+                continue
+            if self.add(public_key, replace):
+                count += 1
+        return count
+
+    def merge_file(self, path: str, replace: bool = False) -> int:
+        """
+        Merge public keys from an authorized keys file to the writer
+
+        The file is read without loading all keys to an AuthorizedKeys object
+
+        Returns
+        -------
+        Number of keys added or replaced
+        """
+        return self.merge(AuthorizedKeys(path).iter_public_keys(), replace)
+
+    def format_line(self, public_key: PublicKey) -> str:
+        """
+        Format authorized keys line for a public key
+        """
+        if not self.canonicalize_options:
+            return public_key.line.strip()
+        fields = (
+            format_options(public_key.options),
+            public_key.key_type.value,
+            public_key.base64,
+            public_key.comment.strip(),
+        )
+        return ' '.join(field for field in fields if field)
+
+    @property
+    def content(self) -> str:
+        """
+        Return contents of the authorized keys file
+        """
+        lines = [self.format_line(public_key) for public_key in self.__keys__.values()]
+        return ''.join(f'{line}\n' for line in lines)
+
+    def write(self, path: Optional[str] = None) -> bool:
+        """
+        Write the keys to the authorized keys file
+
+        The file is written to a temporary file in the same directory, which then replaces the
+        authorized keys file. Mode of an existing file is preserved, and ownership if running as
+        root. New files are created with mode 0600.
+
+        Returns
+        -------
+        True if the file was written, False if the file contents were not modified
+        """
+        path = Path(path).expanduser() if path is not None else self.path
+        data = bytes(self.content, 'utf-8')
+        try:
+            if get_file_digest(path) == hashlib.sha256(data).digest():
+                return False
+            try:
+                stat_result = os.stat(path)
+            except FileNotFoundError:
+                stat_result = None
+            handle, filename = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.')
+            try:
+                with os.fdopen(handle, 'wb') as filedescriptor:
+                    filedescriptor.write(data)
+                if stat_result is not None:
+                    os.chmod(filename, stat.S_IMODE(stat_result.st_mode))
+                    if os.geteuid() == 0:
+                        os.chown(filename, stat_result.st_uid, stat_result.st_gid)
+                else:
+                    os.chmod(filename, AUTHORIZED_KEYS_FILE_MODE)
+                os.replace(filename, path)
+            except OSError:
+                os.unlink(filename)
+                raise
+        except OSError as error:
+            raise SSHKeyError(f'Error writing SSH authorized keys file {path}: {error}') from error
+        return True
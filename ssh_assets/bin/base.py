@@ -7,23 +7,29 @@
 Base commands for all SSH assets CLI subcommands
 """
 from argparse import ArgumentParser, Namespace
+from typing import TYPE_CHECKING
 
 from cli_toolkit.command import Command
 
-from ..configuration.groups import GroupListConfigurationSection
-from ..configuration.keys import SshKeyListConfigurationSection
 from ..constants import NO_KEYS_CONFIGURED, NO_KEYS_MATCH
 from ..duration import Duration
-from ..keys.agent import SshAgent
-from ..keys.filter_set import SshKeyFilterSet
-from ..session import SshAssetSession
+
+if TYPE_CHECKING:
+    from ..configuration.groups import GroupListConfigurationSection
+    from ..configuration.keys import SshKeyListConfigurationSection
+    from ..keys.agent import SshAgent
+    from ..keys.filter_set import SshKeyFilterSet
+    from ..session import SshAssetSession
 
 
 class SshAssetsCommand(Command):
     """
     Common base class for 'ssh-assets' subcommands
+
+    The SSH assets session is created when it is first accessed. The session module is
+    imported only then, so that parsing arguments does not load the configuration modules.
     """
-    session = None
+    __session__ = None
 
     def register_parser_arguments(self, parser: ArgumentParser) -> ArgumentParser:
         """
@@ -39,10 +45,9 @@ class SshAssetsCommand(Command):
 
     def parse_args(self, args: Namespace = None, namespace: Namespace = None) -> Namespace:
         """
-        Parse arguments and add reference to the session
+        Parse arguments
         """
         args = super().parse_args(args, namespace)
-        self.session = SshAssetSession()
 
         if getattr(args, 'expire', None) is not None:
             try:
@@ -52,35 +57,41 @@ class SshAssetsCommand(Command):
 
         if args.groups:
             args.groups = [var for arg in args.groups for var in arg.split(',')]
-            args.group_matches = []
-            for name in args.groups:
-                group = self.groups.get_group_by_name(name)
-                if group:
-                    args.group_matches.append(group)
         return args
 
     @property
-    def agent(self) -> SshAgent:
+    def session(self) -> 'SshAssetSession':
+        """
+        Return SSH assets session, loading the configuration on first access
+        """
+        if self.__session__ is None:
+            # pylint: disable=import-outside-toplevel
+            from ..session import SshAssetSession
+            self.__session__ = SshAssetSession()
+        return self.__session__
+
+    @property
+    def agent(self) -> 'SshAgent':
         """
         Return SSH agent keys iterator
         """
         return self.session.agent
 
     @property
-    def groups(self) -> GroupListConfigurationSection:
+    def groups(self) -> 'GroupListConfigurationSection':
         """
         Return groups configured in the SSH assets configuration file
         """
         return self.session.configuration.groups  # pylint: disable=no-member
 
     @property
-    def keys(self) -> SshKeyListConfigurationSection:
+    def keys(self) -> 'SshKeyListConfigurationSection':
         """
         Return keys configured in the SSH assets configuration file
         """
         return self.session.configuration.keys  # pylint: disable=no-member
 
-    def get_filter_set(self, args: Namespace) -> SshKeyFilterSet:
+    def get_filter_set(self, args: Namespace) -> 'SshKeyFilterSet':
         """
         Return keys matching specified arguments
         """
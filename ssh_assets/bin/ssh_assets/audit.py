@@ -0,0 +1,97 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+CLI command 'ssh-assets audit'
+"""
+import json
+import sys
+
+from argparse import ArgumentParser, Namespace
+
+from cli_toolkit.command import Command
+
+from ssh_assets.authorized_keys.constants import DEFAULT_AUTHORIZED_KEYS_FILE
+
+USAGE = """Audit authorized keys files of users
+"""
+DESCRIPTION = f"""
+Audit OpenSSH authorized keys files of users in the password database or files matching
+glob patterns given with --glob. User names and --glob patterns can not be used together.
+Files are parsed in parallel in worker processes.
+
+Results are written to stdout as JSON lines, one line for each file with the user, path,
+fingerprints, options and comments of the keys in the file. With --index one line is
+written for each distinct key fingerprint with the users, options and comments for the key.
+
+Default authorized keys file in user home directories is {DEFAULT_AUTHORIZED_KEYS_FILE}.
+"""
+
+
+class AuditCommand(Command):
+    """
+    Subcommand to audit authorized keys files of multiple users
+    """
+    name = 'audit'
+    usage = USAGE
+    description = DESCRIPTION
+
+    def register_parser_arguments(self, parser: ArgumentParser) -> ArgumentParser:
+        """
+        Add arguments for the audit command
+        """
+        parser = super().register_parser_arguments(parser)
+        parser.add_argument(
+            '-g', '--glob',
+            action='append',
+            help='Audit files matching glob pattern instead of user home directories'
+        )
+        parser.add_argument(
+            '-f', '--filename',
+            default=DEFAULT_AUTHORIZED_KEYS_FILE,
+            help='Authorized keys file path relative to user home directory'
+        )
+        parser.add_argument(
+            '-p', '--processes',
+            type=int,
+            help='Number of worker processes, by default number of CPUs'
+        )
+        parser.add_argument(
+            '-i', '--index',
+            action='store_true',
+            help='Write index of keys by fingerprint instead of results for each file'
+        )
+        parser.add_argument(
+            'users',
+            nargs='*',
+            help='Names of users to audit, by default all users. Can not be used with --glob'
+        )
+        return parser
+
+    def run(self, args: Namespace) -> None:
+        """
+        Audit authorized keys files and write results as JSON lines
+        """
+        # The audit module loads multiprocessing modules, which are not needed by other commands
+        # pylint: disable=import-outside-toplevel
+        from ssh_assets.authorized_keys.audit import (
+            AuthorizedKeysAudit,
+            discover_glob_authorized_keys_files,
+            discover_user_authorized_keys_files,
+        )
+
+        if args.processes is not None and args.processes < 1:
+            self.exit(1, 'Number of processes must be a positive integer')
+        if args.glob and args.users:
+            self.exit(1, 'User names can not be used with --glob patterns')
+        if args.glob:
+            files = discover_glob_authorized_keys_files(args.glob)
+        else:
+            files = discover_user_authorized_keys_files(args.users, args.filename)
+
+        audit = AuthorizedKeysAudit(files, processes=args.processes)
+        results = audit.build_index() if args.index else audit
+        for result in results:
+            sys.stdout.write(f'{json.dumps(result, separators=(",", ":"))}\n')
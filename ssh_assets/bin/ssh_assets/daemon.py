@@ -0,0 +1,64 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+CLI command 'ssh-assets daemon'
+"""
+from argparse import ArgumentParser, Namespace
+
+from cli_toolkit.command import Command
+
+from ssh_assets.constants import USER_CONFIGURATION_FILE
+from ssh_assets.daemon.protocol import get_daemon_socket_path
+from ssh_assets.exceptions import SSHAssetsError
+
+USAGE = """Run ssh-assets daemon
+"""
+DESCRIPTION = f"""
+Run ssh-assets daemon in foreground, serving queries for configured SSH keys and keys
+loaded to the SSH agent over a UNIX socket. The configuration file is loaded again when
+it is modified.
+
+Default daemon socket path is {get_daemon_socket_path()}. The socket path can be
+changed with SSH_ASSETS_DAEMON_SOCKET environment variable.
+
+ User SSH assets configuration file path is {USER_CONFIGURATION_FILE}).
+"""
+
+
+class DaemonCommand(Command):
+    """
+    Subcommand to run the ssh-assets daemon
+    """
+    name = 'daemon'
+    usage = USAGE
+    description = DESCRIPTION
+
+    def register_parser_arguments(self, parser: ArgumentParser) -> ArgumentParser:
+        """
+        Add arguments for the daemon command
+        """
+        parser = super().register_parser_arguments(parser)
+        parser.add_argument(
+            '-s', '--socket',
+            help='Daemon socket path'
+        )
+        return parser
+
+    def run(self, args: Namespace) -> None:
+        """
+        Run the daemon until interrupted
+        """
+        # The daemon server loads the session modules, which are not needed by other commands
+        # pylint: disable=import-outside-toplevel
+        from ssh_assets.daemon.server import SshAssetsDaemon
+
+        daemon = SshAssetsDaemon(socket_path=args.socket)
+        try:
+            daemon.serve_forever()
+        except SSHAssetsError as error:
+            self.exit(1, error)
+        except KeyboardInterrupt:
+            daemon.close()
@@ -15,6 +15,7 @@ List configured key groups
 """
 
 DESCRIPTION = """
+List configured key groups, or groups matching group names given as arguments
 """
 
 
@@ -28,7 +29,8 @@ class ListGroupsCommand(SshKeyGroupListCommand):
 
     def run(self, args: Namespace) -> None:
         """
-        List the keys in asset configuration file or in the SSH agent
+        List the groups in asset configuration file, optionally limited to named groups
         """
-        for group in self.groups:
+        groups = self.groups.get_many(args.groups) if args.groups else self.groups
+        for group in groups:
             self.message(f'{group.expire} {group}')
@@ -7,9 +7,16 @@
 CLI 'ssh-assets keys list'
 """
 import itertools
+import os
+
 from argparse import ArgumentParser, Namespace
+from pathlib import Path
+from typing import Optional
 
-from ssh_assets.constants import USER_CONFIGURATION_FILE
+from ssh_assets.constants import NO_KEYS_CONFIGURED, NO_KEYS_MATCH, USER_CONFIGURATION_FILE
+from ssh_assets.daemon.client import SshAssetsDaemonClient
+from ssh_assets.daemon.constants import DaemonRequest
+from ssh_assets.keys.constants import SSH_AUTH_SOCK_ENV_VAR
 
 from .base import SshKeyListCommand
 
@@ -20,6 +27,8 @@ This command can be used to list SSH keys loaded to the agent (default mode) or
 SSH keys configured in the SSH assets configuration file.
 
  User SSH assets configuration file path is {USER_CONFIGURATION_FILE}).
+
+If the ssh-assets daemon is running, the keys are listed by the daemon.
 """
 
 
@@ -52,8 +61,79 @@ class ListKeysCommand(SshKeyListCommand):
             action='store_true',
             help='List loaded SSH keys'
         )
+        parser.add_argument(
+            '--no-daemon',
+            action='store_true',
+            help='Do not query the keys from ssh-assets daemon'
+        )
         return parser
 
+    @staticmethod
+    def query_daemon(args: Namespace, command: DaemonRequest, **kwargs) -> Optional[dict]:
+        """
+        Query the ssh-assets daemon if it is running
+
+        Returns
+        -------
+        Daemon response result, or None if the daemon is not used
+        """
+        if args.no_daemon:
+            return None
+        return SshAssetsDaemonClient().query(command, **kwargs)
+
+    def list_daemon_agent_keys(self, args: Namespace) -> bool:
+        """
+        List keys loaded to ssh agent from ssh-assets daemon
+
+        Keys are listed only if the daemon uses the same SSH agent socket
+
+        Returns
+        -------
+        True if the keys were listed by the daemon
+        """
+        result = self.query_daemon(args, DaemonRequest.AGENT)
+        if result is None or result.get('agent_socket', None) != os.environ.get(SSH_AUTH_SOCK_ENV_VAR, None):
+            return False
+        if args.autocomplete:
+            lines = result['parameters']
+        else:
+            lines = [key['line'] for key in result['keys']]
+        for line in lines:
+            self.message(line)
+        return True
+
+    def list_daemon_keys(self, args: Namespace) -> bool:
+        """
+        List keys in ssh-assets configuration from ssh-assets daemon
+
+        Returns
+        -------
+        True if the keys were listed by the daemon
+        """
+        # Key file paths are resolved here because the daemon has a different working directory
+        keys = [
+            str(Path(key).expanduser().resolve()) if os.sep in key else key
+            for key in args.keys or []
+        ]
+        result = self.query_daemon(
+            args,
+            DaemonRequest.KEYS,
+            keys=keys,
+            groups=args.groups or [],
+            available=bool(args.available),
+        )
+        if result is None:
+            return False
+        if not result['keys']:
+            self.exit(1, NO_KEYS_CONFIGURED if not args.groups and not args.keys else NO_KEYS_MATCH)
+        if args.autocomplete:
+            lines = result['parameters']
+        else:
+            lines = [f'{key["name"]} {key["path"]}' for key in result['keys']]
+        for line in lines:
+            self.message(line)
+        return True
+
     def list_agent_key_identity_parameters(self) -> None:
         """
         List autocomplete parameters for keys loaded in ssh-agent
@@ -74,6 +154,8 @@ class ListKeysCommand(SshKeyListCommand):
         """
         List keys loaded to ssh agent
         """
+        if self.list_daemon_agent_keys(args):
+            return
         if args.autocomplete:
             self.list_agent_key_identity_parameters()
         else:
@@ -84,6 +166,8 @@ class ListKeysCommand(SshKeyListCommand):
         """
         List keys in ssh-assets configuration
         """
+        if self.list_daemon_keys(args):
+            return
         keys = self.get_filter_set(args).keys
         if args.autocomplete:
             self.list_key_identity_parameters(keys)
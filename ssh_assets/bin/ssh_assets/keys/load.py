@@ -22,6 +22,9 @@ is specified, all keys in the configuration file are loaded.
 
 Unlike normal ssh-agent, the loaded keys in keyring are detected by the key
 checksum and are skipped if the key was already loaded to the ssh agent.
+
+Keys with same expiration value are loaded with a single ssh-add command. Errors
+loading keys are reported for each key.
 """
 
 
@@ -50,9 +53,14 @@ class LoadKeysCommand(SshKeyListCommand):
         Load SSH keys to the SSH agent
         """
         if not args.groups and not args.keys:
-            self.session.agent.load_keys_to_agent(load_all_keys=args.all)
+            results = self.session.agent.load_keys_to_agent(load_all_keys=args.all)
         else:
-            self.session.agent.load_keys_to_agent(
+            results = self.session.agent.load_keys_to_agent(
                 keys=self.get_filter_set(args).keys,
                 load_all_keys=True
             )
+        errors = [result for result in results if result.error]
+        for result in errors:
+            self.error(f'Error loading key {result.key}: {result.error}')
+        if errors:
+            self.exit(1)
@@ -20,6 +20,9 @@ keys are specified by key name in key configuration, not by key path.
 
 If --all is not specified, all keys in the agent are removed: this is done by
 normal 'ssh-add -D' call.
+
+Named keys are removed with a single connection to the SSH agent. Errors unloading
+keys are reported for each key.
 """
 
 
@@ -48,9 +51,14 @@ class UnLoadKeysCommand(SshKeyListCommand):
         UnLoad SSH keys from the SSH agent
         """
         if not args.groups and not args.keys:
-            self.session.agent.unload_keys_from_agent(unload_all_keys=True)
+            results = self.session.agent.unload_keys_from_agent(unload_all_keys=True)
         else:
-            self.session.agent.unload_keys_from_agent(
+            results = self.session.agent.unload_keys_from_agent(
                 keys=self.get_filter_set(args).keys,
                 unload_all_keys=False
             )
+        errors = [result for result in results if result.error]
+        for result in errors:
+            self.error(f'Error unloading key {result.key}: {result.error}')
+        if errors:
+            self.exit(1)
@@ -6,8 +6,15 @@
 """
 Command line tool 'ssh-assets'
 """
+from argparse import ArgumentParser
+from contextlib import ExitStack
+
 from cli_toolkit.script import Script
 
+from ssh_assets.subprocess import SUBPROCESS_DISPATCHER, JsonLinesTraceHandler
+
+from .audit import AuditCommand
+from .daemon import DaemonCommand
 from .groups.command import GroupsCommand
 from .keys.command import KeysCommand
 
@@ -17,6 +24,9 @@ USAGE = """SSH key and configuration file assets utility
 DESCRIPTION = """
 This command can be used to manage more complicated SSH key arrangement, like loading
 and using different keys for different tasks from the SSH agent.
+
+With --profile a summary of commands run by ssh-assets is shown when the command exits.
+With --trace each command run is written to the specified file as a JSON line.
 """
 
 
@@ -27,10 +37,54 @@ class SshAssetsScript(Script):
     usage = USAGE
     description = DESCRIPTION
     subcommands = (
+        AuditCommand,
+        DaemonCommand,
         GroupsCommand,
         KeysCommand,
     )
 
+    def register_parser_arguments(self, parser: ArgumentParser) -> ArgumentParser:
+        """
+        Register global arguments for profiling commands run by ssh-assets
+        """
+        parser = super().register_parser_arguments(parser)
+        parser.add_argument(
+            '--profile',
+            action='store_true',
+            help='Show summary of commands run by ssh-assets on exit'
+        )
+        parser.add_argument(
+            '--trace',
+            help='Write trace events for commands run by ssh-assets to file as JSON lines'
+        )
+        return parser
+
+    def show_profile_summary(self) -> None:
+        """
+        Show summary of commands run by ssh-assets to stderr
+        """
+        for line in SUBPROCESS_DISPATCHER.format_summary():
+            self.error(line)
+
+    def run(self) -> None:
+        """
+        Run script, optionally profiling and tracing the commands run by subcommands
+        """
+        args = self.parse_args()
+        with ExitStack() as stack:
+            if args.trace:
+                try:
+                    # pylint: disable=consider-using-with
+                    handler = JsonLinesTraceHandler(stack.enter_context(open(args.trace, 'a', encoding='utf-8')))
+                except OSError as error:
+                    self.exit(1, f'Error opening trace file {args.trace}: {error}')
+                SUBPROCESS_DISPATCHER.add_trace_handler(handler)
+                stack.callback(SUBPROCESS_DISPATCHER.remove_trace_handler, handler)
+            if args.profile:
+                stack.enter_context(SUBPROCESS_DISPATCHER.profile())
+                stack.callback(self.show_profile_summary)
+            self.run_subcommand(args)
+
 
 def main() -> None:
     """
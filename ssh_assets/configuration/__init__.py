@@ -6,5 +6,17 @@
 """
 SSH assets module configuration loader
 """
-# flake8: noqa: F401
-from .loader import SshAssetsConfiguration
+from typing import TYPE_CHECKING
+
+from ..lazy import lazy_attributes
+
+if TYPE_CHECKING:
+    from .loader import SshAssetsConfiguration  # noqa: F401
+
+__all__ = [
+    'SshAssetsConfiguration',
+]
+
+__getattr__, __dir__ = lazy_attributes(__name__, {
+    'SshAssetsConfiguration': '.loader',
+})
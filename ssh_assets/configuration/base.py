@@ -0,0 +1,121 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Common base classes for SSH assets configuration sections
+"""
+from typing import Any, Dict, Iterable, List, Optional, TYPE_CHECKING
+
+from sys_toolkit.configuration.base import ConfigurationList
+
+if TYPE_CHECKING:
+    from .index import KeyGroupIndex
+
+
+class NamedConfigurationList(ConfigurationList):
+    """
+    Configuration list of items with unique name attribute
+
+    The list keeps a lookup table from item names to list indexes, updated when items are
+    appended, inserted, replaced, deleted or renamed, for lookups by name without scanning
+    the list.
+    """
+    __name_index__: Dict[str, int]
+
+    def __load__(self, value: Any) -> None:
+        """
+        Load list of items and reset the name lookup and the key to group index of the configuration
+        """
+        self.__name_index__ = {}
+        super().__load__(value)
+        self.__reset_key_group_index__()
+
+    def __setitem__(self, index: int, value: Any) -> None:
+        self.__name_index__.pop(self.__values__[index].name, None)
+        super().__setitem__(index, value)
+        self.__update_name_index__()
+        self.__reset_key_group_index__()
+
+    def __delitem__(self, item: Any) -> None:
+        """
+        Delete item with specified name from the list
+        """
+        index = self.__name_index__.pop(str(getattr(item, 'name', item)), None)
+        if index is None:
+            return
+        del self.__values__[index]
+        self.__update_name_index__(index)
+
+    @property
+    def __key_group_index__(self) -> Optional['KeyGroupIndex']:
+        """
+        Return key to group index of the configuration if the index has been built
+        """
+        return getattr(self.__parent__, '__key_group_index__', None)
+
+    def __reset_key_group_index__(self) -> None:
+        """
+        Reset key to group index of the configuration to be rebuilt on next access
+        """
+        if self.__parent__ is not None:
+            self.__parent__.__key_group_index__ = None
+
+    def __update_name_index__(self, start: int = 0) -> None:
+        """
+        Update name lookup for items starting from specified list index
+        """
+        for index in range(start, len(self.__values__)):
+            self.__name_index__[self.__values__[index].name] = index
+
+    def __rename_item__(self, item: Any, name: str) -> None:
+        """
+        Update name lookup when item in the list is renamed from specified name
+        """
+        index = self.__name_index__.get(name, None)
+        if index is None or self.__values__[index] is not item:
+            return
+        del self.__name_index__[name]
+        self.__name_index__[item.name] = index
+        self.__reset_key_group_index__()
+
+    def append(self, value: Any) -> None:
+        """
+        Append an item to the list
+        """
+        super().append(value)
+        self.__name_index__[self.__values__[-1].name] = len(self.__values__) - 1
+
+    def insert(self, index: int, value: Any) -> None:
+        """
+        Insert an item to the list at specified index
+        """
+        super().insert(index, value)
+        self.__update_name_index__()
+
+    def get_item_by_name(self, name: str) -> Optional[Any]:
+        """
+        Return item by name
+
+        Returns
+        -------
+        Item with matching name or None if item is not found
+        """
+        index = self.__name_index__.get(name, None)
+        return self.__values__[index] if index is not None else None
+
+    def get_many(self, names: Iterable[Any]) -> List[Any]:
+        """
+        Return items matching list of names or items. Unknown names are ignored.
+
+        Returns
+        -------
+        List of unique items in order of the names
+        """
+        items = {}
+        for name in names:
+            index = self.__name_index__.get(str(getattr(name, 'name', name)), None)
+            if index is not None:
+                items[index] = self.__values__[index]
+        return list(items.values())
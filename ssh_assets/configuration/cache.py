@@ -0,0 +1,110 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Persistent cache for parsed SSH assets configuration files
+
+Parsed configuration data is stored in marshal format, which can be loaded much faster
+than parsing the YAML configuration file. Cache entries are valid only while the inode,
+size and modification time of the configuration file are unchanged.
+"""
+import hashlib
+import marshal
+import os
+import tempfile
+
+from pathlib import Path
+from typing import Any, List, Optional, Union
+
+from ..constants import USER_CACHE_DIRECTORY
+
+CONFIGURATION_CACHE_DIRECTORY = USER_CACHE_DIRECTORY.joinpath('configuration')
+CONFIGURATION_CACHE_VERSION = 1
+
+
+class ConfigurationCache:
+    """
+    Cache of parsed data for a configuration file
+
+    Errors reading or writing the cache file are ignored.
+    """
+    path: Path
+
+    def __init__(self, path: Union[str, Path], cache_directory: Optional[Union[str, Path]] = None) -> None:
+        self.path = Path(os.path.realpath(Path(path).expanduser()))
+        self.cache_directory = Path(
+            cache_directory if cache_directory is not None else CONFIGURATION_CACHE_DIRECTORY
+        ).expanduser()
+
+    def __repr__(self) -> str:
+        return str(self.cache_path)
+
+    @property
+    def cache_path(self) -> Path:
+        """
+        Return path to the cache file for the configuration file
+        """
+        digest = hashlib.sha256(bytes(str(self.path), 'utf-8')).hexdigest()[:32]
+        return self.cache_directory.joinpath(f'{digest}.bin')
+
+    def get_file_signature(self) -> Optional[List[int]]:
+        """
+        Return signature of configuration file as inode, size and modification time in nanoseconds
+        """
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return [stat.st_ino, stat.st_size, stat.st_mtime_ns]
+
+    def get(self, signature: Optional[List[int]] = None) -> Optional[Any]:
+        """
+        Get cached parsed data for configuration file
+
+        Returns
+        -------
+        Parsed configuration data or None if the file is not cached or has been modified
+        """
+        signature = signature if signature is not None else self.get_file_signature()
+        if signature is None:
+            return None
+        try:
+            entry = marshal.loads(self.cache_path.read_bytes())
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        if not isinstance(entry, dict) or entry.get('version', None) != CONFIGURATION_CACHE_VERSION:
+            return None
+        if entry.get('path', None) != str(self.path) or entry.get('signature', None) != signature:
+            return None
+        return entry.get('data', None)
+
+    def set(self, data: Any, signature: Optional[List[int]] = None) -> None:
+        """
+        Store parsed data for configuration file to the cache
+        """
+        signature = signature if signature is not None else self.get_file_signature()
+        if signature is None:
+            return
+        try:
+            value = marshal.dumps({
+                'version': CONFIGURATION_CACHE_VERSION,
+                'path': str(self.path),
+                'signature': signature,
+                'data': data,
+            })
+        except ValueError:
+            return
+        try:
+            self.cache_directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+            handle, filename = tempfile.mkstemp(dir=self.cache_directory, prefix=f'.{self.cache_path.name}.')
+            try:
+                with os.fdopen(handle, 'wb') as filedescriptor:
+                    filedescriptor.write(value)
+                os.replace(filename, self.cache_path)
+            except OSError:
+                os.unlink(filename)
+                raise
+        except OSError:
+            return
@@ -8,9 +8,10 @@ Configuration parser for 'groups' configuration section in SSH assets configurat
 """
 from typing import List, Optional, TYPE_CHECKING
 
-from sys_toolkit.configuration.base import ConfigurationList, ConfigurationSection
+from sys_toolkit.configuration.base import ConfigurationSection
 
 from ..duration import Duration
+from .base import NamedConfigurationList
 
 if TYPE_CHECKING:
     from .keys import SshKeyConfiguration, SshKeyListConfigurationSection
@@ -43,6 +44,18 @@ class GroupConfiguration(ConfigurationSection):
     def __repr__(self) -> str:
         return self.name if self.name else ''
 
+    def __setattr__(self, attr, value):
+        """
+        Override __setattr__ to update group name lookup of parent group list when group is renamed
+        """
+        if attr == 'name':
+            name = self.name
+            super().__setattr__(attr, value)
+            if name is not None and name != value and isinstance(self.__parent__, NamedConfigurationList):
+                self.__parent__.__rename_item__(self, name)
+            return
+        super().__setattr__(attr, value)
+
     @property
     def __key_configuration__(self) -> 'SshKeyListConfigurationSection':
         """
@@ -55,7 +68,7 @@ class GroupConfiguration(ConfigurationSection):
         """
         Return private key configuration items matching this group
         """
-        return [key for key in self.__key_configuration__ if key.name in self.keys]
+        return self.__parent__.__parent__.key_group_index.get_group_keys(self.name)
 
     def as_dict(self) -> dict:
         """
@@ -90,6 +103,9 @@ class GroupConfiguration(ConfigurationSection):
                     if not self.__key_configuration__.get_key_by_name(name):
                         raise ValueError(f'Invalid key name: {name}')
                 self.keys = keys
+                index = self.__parent__.__key_group_index__
+                if index is not None:
+                    index.update_group(self)
                 modified = True
         if 'expire' in kwargs:
             expire = kwargs['expire']
@@ -101,7 +117,7 @@ class GroupConfiguration(ConfigurationSection):
         return modified
 
 
-class GroupListConfigurationSection(ConfigurationList):
+class GroupListConfigurationSection(NamedConfigurationList):
     """
     Configuration section for gropus list
     """
@@ -110,14 +126,22 @@ class GroupListConfigurationSection(ConfigurationList):
 
     def __delitem__(self, name: str) -> None:
         """
-        Delete specified key from configuration
+        Delete specified group from configuration
+        """
+        group = self.get_group_by_name(name)
+        super().__delitem__(name)
+        if group is not None and self.__key_group_index__ is not None:
+            self.__key_group_index__.remove_group(group.name)
+
+    def append(self, value: GroupConfiguration) -> None:
+        """
+        Append a group to the group configuration
         """
-        for index, item in enumerate(self.__values__):
-            if item.name == name:
-                del self.__values__[index]
-                break
+        super().append(value)
+        if self.__key_group_index__ is not None:
+            self.__key_group_index__.add_group(value)
 
-    def get_group_by_name(self, name: str) -> GroupConfiguration:
+    def get_group_by_name(self, name: str) -> Optional[GroupConfiguration]:
         """
         Return configured group by name
 
@@ -125,10 +149,7 @@ class GroupListConfigurationSection(ConfigurationList):
         -------
         GroupConfiguration object or None if named group does not exist
         """
-        for group in self:
-            if group.name == name:
-                return group
-        return None
+        return self.get_item_by_name(name)
 
     def delete_group(self, name: str) -> None:
         """
@@ -0,0 +1,102 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Bidirectional index between configured SSH keys and groups in SSH assets configuration
+"""
+from typing import Dict, Iterable, List, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .groups import GroupConfiguration
+    from .keys import SshKeyConfiguration
+
+
+class KeyGroupIndex:
+    """
+    Index of groups referencing each key name and configured keys in each group
+
+    Groups may reference key names which are not configured. Such references are indexed
+    by name, and the key is linked to the groups when a key with the name is added.
+    """
+    def __init__(self,
+                 groups: Iterable['GroupConfiguration'] = (),
+                 keys: Iterable['SshKeyConfiguration'] = ()) -> None:
+        self.__key_groups__: Dict[str, Dict[str, 'GroupConfiguration']] = {}
+        self.__group_keys__: Dict[str, Dict[str, 'SshKeyConfiguration']] = {}
+        self.__group_key_names__: Dict[str, List[str]] = {}
+        self.__keys__: Dict[str, 'SshKeyConfiguration'] = {}
+        for key in keys:
+            self.add_key(key)
+        for group in groups:
+            self.add_group(group)
+
+    def add_key(self, key: 'SshKeyConfiguration') -> None:
+        """
+        Add key to the index and link it to groups referencing the key name
+        """
+        self.__keys__[key.name] = key
+        for group_name in self.__key_groups__.get(key.name, {}):
+            self.__group_keys__[group_name][key.name] = key
+
+    def remove_key(self, name: str) -> None:
+        """
+        Remove named key from the index. Group references to the key name are kept.
+        """
+        if self.__keys__.pop(name, None) is None:
+            return
+        for group_name in self.__key_groups__.get(name, {}):
+            self.__group_keys__[group_name].pop(name, None)
+
+    def add_group(self, group: 'GroupConfiguration') -> None:
+        """
+        Add group and the keys it references to the index
+        """
+        names = list(dict.fromkeys(group.keys if group.keys else []))
+        self.__group_key_names__[group.name] = names
+        group_keys = {}
+        for name in names:
+            self.__key_groups__.setdefault(name, {})[group.name] = group
+            key = self.__keys__.get(name, None)
+            if key is not None:
+                group_keys[name] = key
+        self.__group_keys__[group.name] = group_keys
+
+    def remove_group(self, name: str) -> None:
+        """
+        Remove named group from the index
+        """
+        self.__group_keys__.pop(name, None)
+        for key_name in self.__group_key_names__.pop(name, []):
+            groups = self.__key_groups__.get(key_name, {})
+            groups.pop(name, None)
+            if not groups:
+                self.__key_groups__.pop(key_name, None)
+
+    def update_group(self, group: 'GroupConfiguration') -> None:
+        """
+        Update index for group with modified keys
+        """
+        self.remove_group(group.name)
+        self.add_group(group)
+
+    def get_key_groups(self, name: str) -> List['GroupConfiguration']:
+        """
+        Return groups referencing the named key
+
+        Returns
+        -------
+        List of GroupConfiguration objects
+        """
+        return list(self.__key_groups__.get(name, {}).values())
+
+    def get_group_keys(self, name: str) -> List['SshKeyConfiguration']:
+        """
+        Return configured keys in the named group
+
+        Returns
+        -------
+        List of SshKeyConfiguration objects
+        """
+        return list(self.__group_keys__.get(name, {}).values())
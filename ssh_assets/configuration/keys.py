@@ -10,24 +10,29 @@ from operator import eq, ne, ge, gt, le, lt
 from pathlib import Path
 from typing import List, Optional
 
-from sys_toolkit.configuration.base import ConfigurationList, ConfigurationSection
+from sys_toolkit.configuration.base import ConfigurationSection
 
+from .base import NamedConfigurationList
 from .groups import GroupConfiguration, GroupListConfigurationSection
 from ..duration import Duration
 from ..exceptions import SSHKeyError
 from ..keys.agent import SshAgent
+from ..keys.cache import batch_fingerprint_cache_updates
 from ..keys.file import SSHKeyFile
 
 
 class SshKeyConfiguration(ConfigurationSection):
     """
     Configuration section for a single SSH key
+
+    The key file path is resolved and the SSHKeyFile object for the key is created on first
+    access to the path or private_key attributes.
     """
     name: str = None
-    path: Path = None
     autoload: bool = False
     expire: Optional[Duration] = None
     __literal_path__: Optional[Path] = None
+    __private_key__: Optional[SSHKeyFile] = None
 
     __required_settings__ = (
         'name',
@@ -41,7 +46,6 @@ class SshKeyConfiguration(ConfigurationSection):
                  silent: bool = False) -> None:
         super().__init__(data, parent, debug_enabled, silent)
         self.expire = Duration(self.expire) if self.expire is not None else None
-        self.private_key = SSHKeyFile(self.path)
 
     def __compare_method__(self, other, method, default: bool) -> int:
         """
@@ -79,18 +83,44 @@ class SshKeyConfiguration(ConfigurationSection):
 
     def __setattr__(self, attr, value):
         """
-        Override __setattr__ to store original value of path to __literal_path__
+        Override __setattr__ to store original value of path to __literal_path__ and to update
+        key name lookup of parent key list when key is renamed
         """
         if attr == 'path':
-            self.__literal_path__ = value
-            if value is not None:
-                value = Path(value).expanduser().resolve()
+            super().__setattr__('__literal_path__', value)
+            super().__setattr__('__private_key__', None)
+            return
+        if attr == 'name':
+            name = self.name
+            super().__setattr__(attr, value)
+            if name is not None and name != value and isinstance(self.__parent__, NamedConfigurationList):
+                self.__parent__.__rename_item__(self, name)
+            return
         super().__setattr__(attr, value)
 
+    @property
+    def path(self) -> Optional[Path]:
+        """
+        Return resolved path to the key file
+        """
+        private_key = self.private_key
+        return private_key.path if private_key is not None else None
+
+    @property
+    def private_key(self) -> Optional[SSHKeyFile]:
+        """
+        Return SSHKeyFile object for the key file
+        """
+        if self.__private_key__ is None and self.__literal_path__ is not None:
+            self.__private_key__ = SSHKeyFile(self.__literal_path__)
+        return self.__private_key__
+
     @property
     def __agent__(self) -> SshAgent:
         """
         Return handle to the ssh_assets.keys.agent.SshAgent object via session
+
+        The agent is shared by all keys in the session
         """
         return self.__parent__.__parent__.__session__.agent
 
@@ -149,7 +179,7 @@ class SshKeyConfiguration(ConfigurationSection):
         """
         if not self.path.is_file():
             return False
-        return self.private_key.hash in self.__agent__
+        return self.__agent__.contains_hash(self.private_key.hash)
 
     @property
     def minimum_expire(self) -> Optional[Duration]:
@@ -161,7 +191,7 @@ class SshKeyConfiguration(ConfigurationSection):
             if group.expire:
                 values.append(group.expire)
         if values:
-            return sorted(values)[-1]
+            return min(values)
         return None
 
     @property
@@ -169,7 +199,7 @@ class SshKeyConfiguration(ConfigurationSection):
         """
         Return groups where this key is referenced
         """
-        return [group for group in self.__group_configuration__ if self.name in group.keys]
+        return self.__parent__.__parent__.key_group_index.get_key_groups(self.name)
 
     def unload_from_agent(self) -> None:
         """
@@ -178,6 +208,7 @@ class SshKeyConfiguration(ConfigurationSection):
         if not self.path.is_file():
             raise SSHKeyError(f'Error unloading {self}: key file does not exist')
         self.private_key.unload_from_agent()
+        self.__agent__.mark_key_unloaded(self.private_key)
 
     def load_to_agent(self) -> None:
         """
@@ -186,6 +217,7 @@ class SshKeyConfiguration(ConfigurationSection):
         if not self.path.is_file():
             raise SSHKeyError(f'Error loading {self}: key file does not exist')
         self.private_key.load_to_agent(expire=self.minimum_expire)
+        self.__agent__.mark_key_loaded(self.private_key)
 
     def as_dict(self) -> dict:
         """
@@ -230,31 +262,21 @@ class SshKeyConfiguration(ConfigurationSection):
         return modified
 
 
-class SshKeyListConfigurationSection(ConfigurationList):
+class SshKeyListConfigurationSection(NamedConfigurationList):
     """
     Configuration section for SSH keys list
     """
     __dict_loader_class__ = SshKeyConfiguration
     __name__ = 'keys'
 
-    def __init__(self,
-                 setting: Optional[str] = None,
-                 data: Optional[dict] = None,
-                 parent: ConfigurationSection = None,
-                 debug_enabled: bool = False,
-                 silent: bool = False) -> None:
-        super().__init__(setting, data, parent)
-        self.__key_name_lookup__ = {}
-
     def __delitem__(self, key: SshKeyConfiguration) -> None:
         """
         Delete specified key from configuration
         """
-        for index, item in enumerate(self.__values__):
-            if item == key:
-                del self.__values__[index]
-                del self.__key_name_lookup__[item.name]
-                break
+        item = self.get_key_by_name(str(getattr(key, 'name', key)))
+        super().__delitem__(key)
+        if item is not None and self.__key_group_index__ is not None:
+            self.__key_group_index__.remove_key(item.name)
 
     @property
     def available(self) -> List[SshKeyConfiguration]:
@@ -264,6 +286,7 @@ class SshKeyListConfigurationSection(ConfigurationList):
         return [key for key in self if key.available]
 
     @property
+    @batch_fingerprint_cache_updates
     def pending(self) -> List[SshKeyConfiguration]:
         """
         Return available and autoloaded configured SSH keys not yet loaded to agent
@@ -274,17 +297,15 @@ class SshKeyListConfigurationSection(ConfigurationList):
         """
         Append an item to the key configuration
         """
-        self.__key_name_lookup__[value.name] = value
         super().append(value)
+        if self.__key_group_index__ is not None:
+            self.__key_group_index__.add_key(value)
 
-    def get_key_by_name(self, name: str) -> SshKeyConfiguration:
+    def get_key_by_name(self, name: str) -> Optional[SshKeyConfiguration]:
         """
         Get key by name
         """
-        try:
-            return self.__key_name_lookup__[name]
-        except KeyError:
-            return None
+        return self.get_item_by_name(name)
 
     def delete_key(self, name: str) -> None:
         """
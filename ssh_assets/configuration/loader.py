@@ -6,22 +6,34 @@
 """
 Configuration file processing for SSH assets utility
 """
+import fcntl
+import os
+import stat
+import tempfile
+
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional, TYPE_CHECKING
+from typing import Iterator, Optional, Tuple, Union, TYPE_CHECKING
 
 import yaml
 
 from sys_toolkit.configuration.base import ConfigurationSection
 from sys_toolkit.configuration.yaml import YamlConfiguration
+from sys_toolkit.exceptions import ConfigurationError
 
 from ..exceptions import SSHAssetsError
 
+from .cache import ConfigurationCache
 from .groups import GroupListConfigurationSection
+from .index import KeyGroupIndex
 from .keys import SshKeyListConfigurationSection
 
 if TYPE_CHECKING:
     from ..session import SshAssetSession
 
+# Use the libyaml based loader when PyYAML is built with libyaml
+SafeLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
 
 class SshAssetsConfiguration(YamlConfiguration):
     """
@@ -43,8 +55,45 @@ class SshAssetsConfiguration(YamlConfiguration):
                  debug_enabled: bool = False,
                  silent: bool = False) -> None:
         self.__session__ = session
+        self.__key_group_index__ = None
+        self.__batch_depth__ = 0
+        self.__save_pending__ = False
+        self.__saved_state__ = None
         super().__init__(path=path, parent=parent, debug_enabled=debug_enabled, silent=silent)
 
+    @property
+    def key_group_index(self) -> KeyGroupIndex:
+        """
+        Return index between configured keys and groups
+
+        The index is built on first access and updated when keys or groups are configured
+        or deleted
+        """
+        if self.__key_group_index__ is None:
+            # pylint: disable=no-member
+            self.__key_group_index__ = KeyGroupIndex(self.groups, self.keys)
+        return self.__key_group_index__
+
+    def load(self, path: Union[str, Path]) -> None:
+        """
+        Load specified YAML configuration file
+
+        Parsed configuration data is loaded from the configuration cache if the file has not
+        been modified after it was cached
+        """
+        path = self.__check_file_access__(path)
+        cache = ConfigurationCache(path)
+        signature = cache.get_file_signature()
+        data = cache.get(signature)
+        try:
+            if data is None:
+                with path.open('r', encoding=self.encoding) as handle:
+                    data = yaml.load(handle, Loader=SafeLoader)
+                cache.set(data, signature)
+            self.parse_data(data)
+        except Exception as error:
+            raise ConfigurationError(f'Error loading {path}: {error}') from error
+
     def as_dict(self) -> dict:
         """
         Return configuration as dictionary
@@ -61,16 +110,97 @@ class SshAssetsConfiguration(YamlConfiguration):
         """
         return yaml.dump(self.as_dict(), Dumper=SSHAssetsConfigurationDumper)
 
+    @staticmethod
+    def __file_signature__(path: Path) -> Optional[Tuple[int, int, int]]:
+        """
+        Return signature of file as inode, size and modification time in nanoseconds
+        """
+        try:
+            stat_result = os.stat(path)
+        except OSError:
+            return None
+        return stat_result.st_ino, stat_result.st_size, stat_result.st_mtime_ns
+
+    @staticmethod
+    def __write_file__(path: Path, data: str) -> None:
+        """
+        Write configuration data to a temporary file and replace the configuration file with it
+
+        The configuration file is not written if the contents are not modified. Writes are
+        serialized with an advisory lock on the configuration directory. The directory is locked
+        instead of the file, because replacing the file changes its inode, and instead of a
+        separate lock file to avoid leaving lock files in the directory.
+        """
+        if path.exists() and not os.access(path, os.W_OK):
+            raise OSError(f'Permission denied: {path}')
+        directory = os.open(path.parent, os.O_RDONLY)
+        try:
+            fcntl.flock(directory, fcntl.LOCK_EX)
+            try:
+                if path.read_text(encoding='utf-8') == data:
+                    return
+                mode = stat.S_IMODE(os.stat(path).st_mode)
+            except FileNotFoundError:
+                mode = None
+            handle, filename = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.')
+            try:
+                with os.fdopen(handle, 'w', encoding='utf-8') as filedescriptor:
+                    filedescriptor.write(data)
+                if mode is not None:
+                    os.chmod(filename, mode)
+                os.replace(filename, path)
+            except OSError:
+                os.unlink(filename)
+                raise
+        finally:
+            os.close(directory)
+
+    @contextmanager
+    def batch_edit(self) -> Iterator['SshAssetsConfiguration']:
+        """
+        Context manager to defer saving the configuration file until the block exits
+
+        Changes made with configure and delete methods of keys and groups inside the block are
+        saved with a single write when the outermost batch edit block exits. If the outermost
+        block raises an exception, the changes are not saved to the file. Changes are not
+        reverted in the loaded configuration.
+        """
+        self.__batch_depth__ += 1
+        try:
+            yield self
+        except BaseException:
+            self.__batch_depth__ -= 1
+            if not self.__batch_depth__:
+                self.__save_pending__ = False
+            raise
+        self.__batch_depth__ -= 1
+        if not self.__batch_depth__ and self.__save_pending__:
+            self.save()
+
     def save(self, path: Optional[str] = None) -> None:
         """
         Save configuration to specified file. If not path is specified original path is used.
+
+        Saving to the original path is deferred inside batch_edit() blocks, and skipped when
+        the configuration and the file are not modified since last save.
         """
-        path = Path(path).expanduser().resolve() if path is not None else self.__path__
-        data = self.as_yaml()
+        if path is None and self.__batch_depth__:
+            self.__save_pending__ = True
+            return
+        self.__save_pending__ = False
+
+        path = Path(os.path.realpath(Path(path).expanduser() if path is not None else self.__path__))
+        data = self.as_dict()
+        if self.__saved_state__ is not None:
+            saved_path, saved_data, saved_signature = self.__saved_state__
+            if saved_path == path and saved_data == data and saved_signature == self.__file_signature__(path):
+                return
         try:
-            path.write_text(data, encoding='utf-8')
+            self.__write_file__(path, yaml.dump(data, Dumper=SSHAssetsConfigurationDumper))
         except OSError as error:
             raise SSHAssetsError(f'Error writing file {path}: {error}') from error
+        self.__saved_state__ = (path, data, self.__file_signature__(path))
+        ConfigurationCache(path).set(data)
 
 
 class SSHAssetsConfigurationDumper(yaml.Dumper):
@@ -6,9 +6,12 @@
 """
 Constants for ssh_assets python module
 """
+import os
+
 from pathlib import Path
 
 USER_CONFIGURATION_FILE = Path('~/.ssh/assets.yml').expanduser()
+USER_CACHE_DIRECTORY = Path(os.environ.get('XDG_CACHE_HOME', '~/.cache')).expanduser().joinpath('ssh-assets')
 
 NO_KEYS_CONFIGURED = 'No keys are configured in the SSH assets configuration file'
 NO_KEYS_MATCH = 'No keys matching query arguments detected'
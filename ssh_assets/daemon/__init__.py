@@ -0,0 +1,25 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+SSH assets daemon serving key queries over a local UNIX socket
+"""
+from typing import TYPE_CHECKING
+
+from ..lazy import lazy_attributes
+
+if TYPE_CHECKING:
+    from .client import SshAssetsDaemonClient  # noqa: F401
+    from .server import SshAssetsDaemon  # noqa: F401
+
+__all__ = [
+    'SshAssetsDaemonClient',
+    'SshAssetsDaemon',
+]
+
+__getattr__, __dir__ = lazy_attributes(__name__, {
+    'SshAssetsDaemonClient': '.client',
+    'SshAssetsDaemon': '.server',
+})
@@ -0,0 +1,90 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Client for SSH assets daemon
+"""
+import socket
+
+from pathlib import Path
+from typing import Any, Optional, Union
+
+from ..exceptions import SSHAssetsError
+from .constants import DAEMON_SOCKET_TIMEOUT, DaemonRequest
+from .protocol import check_daemon_socket_permissions, encode_message, get_daemon_socket_path, read_message
+
+
+class SshAssetsDaemonClient:
+    """
+    Client for SSH assets daemon UNIX socket
+    """
+    socket_path: Path
+    timeout: float
+
+    def __init__(self,
+                 socket_path: Optional[Union[str, Path]] = None,
+                 timeout: float = DAEMON_SOCKET_TIMEOUT) -> None:
+        self.socket_path = Path(socket_path).expanduser() if socket_path is not None else get_daemon_socket_path()
+        self.timeout = timeout
+
+    def __repr__(self) -> str:
+        return str(self.socket_path)
+
+    @property
+    def available(self) -> bool:
+        """
+        Check if the daemon socket exists and can be trusted
+
+        Socket owned by another user or accessible by other users is not considered available
+        """
+        try:
+            check_daemon_socket_permissions(self.socket_path)
+        except (OSError, SSHAssetsError):
+            return False
+        return True
+
+    def request(self, command: Union[str, DaemonRequest], **args: Any) -> Any:
+        """
+        Send request to the SSH assets daemon
+
+        Returns
+        -------
+        Result of the command from the daemon response
+
+        Raises SSHAssetsError if the daemon socket can't be trusted or the request fails
+        """
+        command = command.value if isinstance(command, DaemonRequest) else command
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.settimeout(self.timeout)
+            try:
+                check_daemon_socket_permissions(self.socket_path)
+                client.connect(str(self.socket_path))
+                client.sendall(encode_message({'command': command, 'args': args}))
+                with client.makefile('rb') as stream:
+                    response = read_message(stream)
+            except OSError as error:
+                raise SSHAssetsError(
+                    f'Error communicating with SSH assets daemon {self.socket_path}: {error}'
+                ) from error
+        if response is None:
+            raise SSHAssetsError('SSH assets daemon closed the connection unexpectedly')
+        if response.get('status', None) != 'ok':
+            raise SSHAssetsError(f'SSH assets daemon error: {response.get("error", None)}')
+        return response.get('result', None)
+
+    def query(self, command: Union[str, DaemonRequest], **args: Any) -> Optional[Any]:
+        """
+        Send request to the daemon if the daemon is running
+
+        Returns
+        -------
+        Result of the command, or None if daemon is not running or the request failed
+        """
+        if not self.available:
+            return None
+        try:
+            return self.request(command, **args)
+        except SSHAssetsError:
+            return None
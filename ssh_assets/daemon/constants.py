@@ -0,0 +1,40 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Constants for SSH assets daemon
+"""
+import os
+import tempfile
+
+from enum import Enum
+from pathlib import Path
+
+DAEMON_SOCKET_ENV_VAR = 'SSH_ASSETS_DAEMON_SOCKET'
+DAEMON_RUNTIME_DIRECTORY = (
+    Path(os.environ['XDG_RUNTIME_DIR']).joinpath('ssh-assets')
+    if os.environ.get('XDG_RUNTIME_DIR', None)
+    else Path(tempfile.gettempdir()).joinpath(f'ssh-assets-{os.getuid()}')
+)
+DEFAULT_DAEMON_SOCKET = DAEMON_RUNTIME_DIRECTORY.joinpath('daemon.sock')
+DAEMON_RUNTIME_DIRECTORY_MODE = 0o700
+# Umask for binding the daemon socket to create the socket with mode 0600
+DAEMON_SOCKET_UMASK = 0o177
+
+DAEMON_PROTOCOL_VERSION = 1
+DAEMON_SOCKET_TIMEOUT = 30
+# Maximum length of a single JSON message line in bytes
+DAEMON_MAX_MESSAGE_SIZE = 4 * 1024 * 1024
+
+
+class DaemonRequest(Enum):
+    """
+    Request commands supported by the SSH assets daemon
+    """
+    STATUS = 'status'
+    KEYS = 'keys'
+    AGENT = 'agent'
+    LOAD = 'load'
+    UNLOAD = 'unload'
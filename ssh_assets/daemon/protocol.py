@@ -0,0 +1,117 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+SSH assets daemon JSON protocol
+
+Each request and response is a JSON object on a single line. Requests contain the command
+name and optional arguments:
+
+    {"command": "keys", "args": {"groups": ["demo"]}}
+
+Responses contain status 'ok' and the command result, or status 'error' and error message:
+
+    {"status": "ok", "result": {"keys": []}}
+    {"status": "error", "error": "Unknown command: x"}
+"""
+import json
+import os
+import stat
+
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Optional
+
+from ..exceptions import SSHAssetsError
+from .constants import DAEMON_MAX_MESSAGE_SIZE, DAEMON_SOCKET_ENV_VAR, DEFAULT_DAEMON_SOCKET
+
+
+def get_daemon_socket_path() -> Path:
+    """
+    Return path to the SSH assets daemon socket
+
+    The path can be overridden with SSH_ASSETS_DAEMON_SOCKET environment variable
+    """
+    return Path(os.environ.get(DAEMON_SOCKET_ENV_VAR, None) or DEFAULT_DAEMON_SOCKET).expanduser()
+
+
+def check_daemon_path_permissions(path: Path, is_file_type: Callable[[int], bool]) -> None:
+    """
+    Check daemon runtime directory or socket can be trusted
+
+    The path must not be a symbolic link, must be owned by the current user and must not have
+    any permissions for group or other users. This prevents other local users from creating the
+    runtime directory or socket before the daemon is started.
+
+    Raises SSHAssetsError if the path can't be trusted and OSError if the path can't be checked
+    """
+    details = os.lstat(path)
+    if stat.S_ISLNK(details.st_mode) or not is_file_type(details.st_mode):
+        raise SSHAssetsError(f'SSH assets daemon path {path} has unexpected file type')
+    if details.st_uid != os.getuid():
+        raise SSHAssetsError(f'SSH assets daemon path {path} is not owned by current user')
+    if stat.S_IMODE(details.st_mode) & 0o077:
+        raise SSHAssetsError(f'SSH assets daemon path {path} is accessible by other users')
+
+
+def check_daemon_socket_permissions(path: Path) -> None:
+    """
+    Check daemon socket and the directory containing the socket can be trusted
+
+    Raises SSHAssetsError if the paths can't be trusted and OSError if the paths can't be checked
+    """
+    check_daemon_path_permissions(path.parent, stat.S_ISDIR)
+    check_daemon_path_permissions(path, stat.S_ISSOCK)
+
+
+def encode_message(message: dict) -> bytes:
+    """
+    Encode message as a JSON line
+    """
+    return bytes(json.dumps(message, separators=(',', ':')), 'utf-8') + b'\n'
+
+
+def decode_message(line: bytes) -> dict:
+    """
+    Decode message from a JSON line
+
+    Raises SSHAssetsError if the line is not a valid JSON object
+    """
+    try:
+        message = json.loads(line)
+    except ValueError as error:
+        raise SSHAssetsError(f'Invalid SSH assets daemon message: {error}') from error
+    if not isinstance(message, dict):
+        raise SSHAssetsError('Invalid SSH assets daemon message: message is not an object')
+    return message
+
+
+def read_message(stream: BinaryIO) -> Optional[dict]:
+    """
+    Read a single message from stream
+
+    Returns
+    -------
+    Decoded message or None if the stream was closed
+    """
+    line = stream.readline(DAEMON_MAX_MESSAGE_SIZE + 1)
+    if not line:
+        return None
+    if len(line) > DAEMON_MAX_MESSAGE_SIZE or not line.endswith(b'\n'):
+        raise SSHAssetsError('Invalid SSH assets daemon message: message is too long or truncated')
+    return decode_message(line)
+
+
+def success_response(result: Any) -> dict:
+    """
+    Return response message for a successful request
+    """
+    return {'status': 'ok', 'result': result}
+
+
+def error_response(error: Any) -> dict:
+    """
+    Return response message for a failed request
+    """
+    return {'status': 'error', 'error': str(error)}
@@ -0,0 +1,357 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+SSH assets daemon server
+
+The daemon keeps an SSH assets session with the parsed configuration and key details in
+memory and answers queries from clients over a UNIX socket. The configuration file is
+loaded again when it is modified, and keys loaded to the SSH agent are listed again for
+each request accessing the agent.
+"""
+import os
+import socket
+import socketserver
+import stat
+import threading
+
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from sys_toolkit.exceptions import ConfigurationError
+
+from ..constants import USER_CONFIGURATION_FILE
+from ..exceptions import SSHAssetsError, SSHKeyError
+from ..keys.agent import SshKeyAgentResult
+from ..keys.cache import batch_fingerprint_cache_updates
+from ..keys.filter_set import SshKeyFilterSet, get_available_key_paths
+from ..session import SshAssetSession
+from .constants import (
+    DAEMON_PROTOCOL_VERSION,
+    DAEMON_RUNTIME_DIRECTORY_MODE,
+    DAEMON_SOCKET_TIMEOUT,
+    DAEMON_SOCKET_UMASK,
+    DaemonRequest,
+)
+from .protocol import (
+    check_daemon_path_permissions,
+    encode_message,
+    error_response,
+    get_daemon_socket_path,
+    read_message,
+    success_response,
+)
+
+
+class SshAssetsDaemonRequestHandler(socketserver.StreamRequestHandler):
+    """
+    Request handler for SSH assets daemon client connections
+
+    Each connection can send multiple requests, each answered with a single response. The
+    connection is closed if the client does not send a complete request within the timeout.
+    """
+    timeout = DAEMON_SOCKET_TIMEOUT
+
+    def handle(self) -> None:
+        """
+        Handle requests until client closes the connection or the read times out
+        """
+        while True:
+            try:
+                request = read_message(self.rfile)
+            except SSHAssetsError as error:
+                self.wfile.write(encode_message(error_response(error)))
+                return
+            except OSError:
+                return
+            if request is None:
+                return
+            self.wfile.write(encode_message(self.server.daemon.process_request(request)))
+
+
+class SshAssetsDaemonServer(socketserver.ThreadingUnixStreamServer):
+    """
+    Threaded UNIX socket server for SSH assets daemon
+    """
+    daemon_threads = True
+
+    def __init__(self, daemon: 'SshAssetsDaemon', socket_path: Path) -> None:
+        self.daemon = daemon
+        super().__init__(str(socket_path), SshAssetsDaemonRequestHandler)
+
+
+class SshAssetsDaemon:
+    """
+    SSH assets daemon
+
+    Requests are processed one at a time with the shared session
+    """
+    socket_path: Path
+    configuration_file: Path
+
+    def __init__(self,
+                 socket_path: Optional[Union[str, Path]] = None,
+                 configuration_file: Optional[Union[str, Path]] = None) -> None:
+        self.socket_path = Path(socket_path).expanduser() if socket_path is not None else get_daemon_socket_path()
+        self.configuration_file = Path(
+            configuration_file if configuration_file is not None else USER_CONFIGURATION_FILE
+        ).expanduser()
+        self.__lock__ = threading.Lock()
+        self.__session__ = None
+        self.__configuration_signature__ = None
+        self.__server__ = None
+
+    def __repr__(self) -> str:
+        return str(self.socket_path)
+
+    def __get_configuration_signature__(self) -> Optional[Tuple[int, int, int]]:
+        """
+        Return signature of configuration file as inode, size and modification time in nanoseconds
+        """
+        try:
+            details = os.stat(self.configuration_file)
+        except OSError:
+            return None
+        return details.st_ino, details.st_size, details.st_mtime_ns
+
+    @property
+    def __handlers__(self) -> Dict[str, Callable]:
+        """
+        Return request handler methods by command name
+        """
+        return {
+            DaemonRequest.STATUS.value: self.get_status,
+            DaemonRequest.KEYS.value: self.get_keys,
+            DaemonRequest.AGENT.value: self.get_agent_keys,
+            DaemonRequest.LOAD.value: self.load_keys,
+            DaemonRequest.UNLOAD.value: self.unload_keys,
+        }
+
+    @property
+    def session(self) -> SshAssetSession:
+        """
+        Return SSH assets session, loading the session again if configuration file was modified
+        """
+        signature = self.__get_configuration_signature__()
+        if self.__session__ is None or signature != self.__configuration_signature__:
+            self.__session__ = SshAssetSession(self.configuration_file)
+            self.__configuration_signature__ = signature
+        return self.__session__
+
+    @property
+    def running(self) -> bool:
+        """
+        Check if the daemon socket server has been started
+        """
+        return self.__server__ is not None
+
+    def __get_filter_set__(self, args: dict) -> SshKeyFilterSet:
+        """
+        Return key filter set matching key names, groups and available flag in request arguments
+        """
+        filter_set = self.session.key_filter_set
+        filter_set = filter_set.filter_names(args.get('keys', None) or [])
+        filter_set = filter_set.filter_groups(args.get('groups', None) or [])
+        if args.get('available', False):
+            filter_set = filter_set.filter_available(True)
+        return filter_set
+
+    @staticmethod
+    def __format_results__(results: List[SshKeyAgentResult]) -> List[dict]:
+        """
+        Format key load or unload results for response
+        """
+        formatted = []
+        for result in results:
+            item = {
+                'key': result.key.name,
+                'status': result.status.value,
+                'error': result.error,
+            }
+            expire = getattr(result, 'expire', None)
+            if expire is not None:
+                item['expire'] = str(expire)
+            formatted.append(item)
+        return formatted
+
+    # pylint: disable=unused-argument
+    def get_status(self, args: dict) -> dict:
+        """
+        Return daemon status
+        """
+        return {
+            'version': DAEMON_PROTOCOL_VERSION,
+            'pid': os.getpid(),
+            'socket': str(self.socket_path),
+            'configuration': str(self.configuration_file),
+        }
+
+    @batch_fingerprint_cache_updates
+    def get_keys(self, args: dict) -> dict:
+        """
+        Return configured keys matching key names, groups and available flag in arguments
+        """
+        session = self.session
+        session.invalidate_agent()
+        keys = self.__get_filter_set__(args).keys
+        available_paths = get_available_key_paths(keys)
+        items = []
+        for key in keys:
+            available = key.path in available_paths
+            items.append({
+                'name': key.name,
+                'path': str(key.path),
+                'autoload': bool(key.autoload),
+                'expire': str(key.expire) if key.expire is not None else None,
+                'groups': [group.name for group in key.groups],
+                'available': available,
+                'loaded': available and session.agent.contains_hash(key.private_key.hash),
+            })
+        return {
+            'keys': items,
+            'parameters': sorted({parameter for key in keys for parameter in key.identity_parameters}),
+        }
+
+    # pylint: disable=unused-argument
+    def get_agent_keys(self, args: dict) -> dict:
+        """
+        Return keys loaded to the SSH agent
+        """
+        agent = self.session.agent
+        agent.invalidate()
+        return {
+            'agent_socket': agent.agent_socket_path,
+            'keys': [
+                {
+                    'line': str(key),
+                    'bits': key.bits,
+                    'hash_algorithm': key.hash_algorithm.value,
+                    'hash': key.hash,
+                    'comment': key.comment,
+                    'key_type': key.key_type.value,
+                }
+                for key in agent
+            ],
+            'parameters': sorted({parameter for key in agent for parameter in key.identity_parameters}),
+        }
+
+    def load_keys(self, args: dict) -> dict:
+        """
+        Load keys matching arguments to the SSH agent
+
+        If no keys or groups are specified keys configured with autoload are loaded, or all
+        keys if 'all' argument is set
+        """
+        agent = self.session.agent
+        agent.invalidate()
+        if not args.get('keys', None) and not args.get('groups', None):
+            results = agent.load_keys_to_agent(load_all_keys=bool(args.get('all', False)))
+        else:
+            results = agent.load_keys_to_agent(keys=self.__get_filter_set__(args).keys, load_all_keys=True)
+        return {'results': self.__format_results__(results)}
+
+    def unload_keys(self, args: dict) -> dict:
+        """
+        Unload keys matching arguments from the SSH agent
+
+        All keys are removed from the agent only if 'all' argument is set. Request without
+        'all' argument must specify keys or groups to unload.
+
+        Raises SSHAssetsError if no keys, groups or 'all' argument are specified
+        """
+        if args.get('all', False) is True:
+            agent = self.session.agent
+            agent.invalidate()
+            results = agent.unload_keys_from_agent(unload_all_keys=True)
+        elif args.get('keys', None) or args.get('groups', None):
+            agent = self.session.agent
+            agent.invalidate()
+            results = agent.unload_keys_from_agent(keys=self.__get_filter_set__(args).keys, unload_all_keys=False)
+        else:
+            raise SSHAssetsError('Unload request must specify keys, groups or all')
+        return {'results': self.__format_results__(results)}
+
+    def process_request(self, request: dict) -> dict:
+        """
+        Process a decoded request message
+
+        Returns
+        -------
+        Response message as dictionary
+        """
+        command = request.get('command', None)
+        args = request.get('args', None) or {}
+        handler = self.__handlers__.get(command, None)
+        if handler is None:
+            return error_response(f'Unknown command: {command}')
+        if not isinstance(args, dict):
+            return error_response('Request arguments must be an object')
+        with self.__lock__:
+            try:
+                return success_response(handler(args))
+            except (ConfigurationError, SSHAssetsError, SSHKeyError, OSError, ValueError) as error:
+                return error_response(error)
+
+    def start(self) -> None:
+        """
+        Start listening for client connections on the daemon socket
+
+        The socket directory must be owned by the current user and not be accessible by other
+        users. The socket is bound with a restrictive umask so it is never accessible by other
+        users.
+
+        Raises SSHAssetsError if another daemon is listening on the socket or the socket
+        directory or an existing socket can't be trusted
+        """
+        if self.__server__ is not None:
+            return
+        try:
+            self.socket_path.parent.mkdir(mode=DAEMON_RUNTIME_DIRECTORY_MODE, parents=True, exist_ok=True)
+            check_daemon_path_permissions(self.socket_path.parent, stat.S_ISDIR)
+            if os.path.lexists(self.socket_path):
+                check_daemon_path_permissions(self.socket_path, stat.S_ISSOCK)
+                with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+                    try:
+                        client.connect(str(self.socket_path))
+                    except OSError:
+                        self.socket_path.unlink()
+                    else:
+                        raise SSHAssetsError(f'SSH assets daemon is already running on {self.socket_path}')
+            umask = os.umask(DAEMON_SOCKET_UMASK)
+            try:
+                self.__server__ = SshAssetsDaemonServer(self, self.socket_path)
+            finally:
+                os.umask(umask)
+        except OSError as error:
+            raise SSHAssetsError(f'Error creating SSH assets daemon socket {self.socket_path}: {error}') from error
+
+    def serve_forever(self, poll_interval: float = 0.5) -> None:
+        """
+        Start the daemon and serve client requests until shutdown() is called
+        """
+        self.start()
+        try:
+            self.__server__.serve_forever(poll_interval)
+        finally:
+            self.close()
+
+    def shutdown(self) -> None:
+        """
+        Stop serving requests. Must be called from another thread than serve_forever()
+        """
+        if self.__server__ is not None:
+            self.__server__.shutdown()
+
+    def close(self) -> None:
+        """
+        Close the daemon socket
+        """
+        if self.__server__ is not None:
+            self.__server__.server_close()
+            self.__server__ = None
+            try:
+                self.socket_path.unlink()
+            except OSError:
+                pass
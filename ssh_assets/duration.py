@@ -9,7 +9,8 @@ Utility functions for ssh_assets module
 import re
 
 from datetime import timedelta
-from typing import Any, Tuple
+from functools import lru_cache, total_ordering
+from typing import Any, Optional, Tuple, Union
 
 RE_TIME_VALUE = re.compile(r'^(?P<value>\d+)(?P<qualifier>[smhdw])(?P<rest>.*)$')
 
@@ -21,107 +22,129 @@ SECONDS_MULTIPLIERS = {
     'w': 604800,
 }
 
+DURATION_PARSER_CACHE_SIZE = 256
 
+
+@lru_cache(maxsize=DURATION_PARSER_CACHE_SIZE)
+def parse_duration(time_value: str) -> Tuple[int, str]:
+    """
+    Parse a duration string to total seconds and normalized duration string
+
+    Results are memoized, because same duration strings are parsed repeatedly from
+    key and group configuration.
+
+    Invalid strings, duplicate field names and non-positive durations raise ValueError
+
+    Arguments
+    ---------
+    time_value: a valid time string as specified in TIME FORMATS section on sshd manual page
+
+    Returns
+    -------
+    Total duration in seconds and duration string with fields ordered correctly
+    """
+    if not time_value:
+        raise ValueError('Invalid duration value')
+    fields = dict.fromkeys(SECONDS_MULTIPLIERS)
+    rest = str(time_value)
+    while rest:
+        match = RE_TIME_VALUE.match(rest)
+        try:
+            if match:
+                qualifier = match['qualifier']
+                value = int(match['value'])
+                rest = match['rest']
+            else:
+                qualifier = 's'
+                value = int(rest)
+                rest = ''
+        except ValueError as error:
+            raise ValueError(f'Invalid duration string: {time_value}') from error
+        if value <= 0:
+            raise ValueError(f'Invalid duration string: {time_value}')
+        if fields[qualifier] is not None:
+            raise ValueError(f'Duplicate qualifier in duration string: {time_value}')
+        fields[qualifier] = value
+    seconds = sum(value * SECONDS_MULTIPLIERS[field] for field, value in fields.items() if value is not None)
+    return seconds, ''.join(f'{value}{field}' for field, value in fields.items() if value is not None)
+
+
+@total_ordering
 class Duration:
     """
     Time duration string as defined in 'TIME FORMATS' section of sshd manual page
+
+    Durations are compared and hashed by the total duration in seconds. For compatibility,
+    durations can also be compared with duration strings and integer seconds. A duration has
+    the same hash as the equal integer seconds, but not as an equal string, because strings
+    are not parsed for hashing. Lookups in sets and dictionaries with Duration keys must not
+    use strings, for example use mapping[Duration('1h')] instead of mapping['1h'].
     """
-    def __init__(self, value: str) -> None:
-        self.__fields__ = {
-            's': None,
-            'm': None,
-            'h': None,
-            'd': None,
-            'w': None,
-        }
-        self.__parse_value__(value)
+    __slots__ = ('__seconds__', '__value__')
+
+    def __init__(self, value: Union[str, int, 'Duration']) -> None:
+        if isinstance(value, Duration):
+            self.__seconds__ = value.seconds
+            self.__value__ = str(value)
+        else:
+            self.__seconds__, self.__value__ = parse_duration(str(value) if value is not None else '')
 
     def __repr__(self) -> str:
         """
         Return duration as string, with fields ordered correctly
         """
-        return ''.join(
-            f'{value}{key}'
-            for key, value in self.__fields__.items() if value is not None
-        )
-
-    def __eq__(self, other: Any) -> bool:
-        return str(self) == str(other)
-
-    def __ne__(self, other: Any) -> bool:
-        return str(self) != str(other)
+        return self.__value__
 
-    def __lt__(self, other: Any) -> bool:
-        return str(self) < str(other)
-
-    def __gt__(self, other: Any) -> bool:
-        return str(self) > str(other)
-
-    def __le__(self, other: Any) -> bool:
-        return str(self) <= str(other)
+    def __hash__(self) -> int:
+        """
+        Return hash of total duration in seconds
 
-    def __ge__(self, other: Any) -> bool:
-        return str(self) >= str(other)
+        The hash is consistent with equality for Duration objects and integer seconds. Equal
+        duration strings have different hashes and do not match Duration keys in hashed lookups.
+        """
+        return hash(self.__seconds__)
 
     @staticmethod
-    def __parse_duration_field__(value: str) -> Tuple[str, int, str]:
+    def __get_seconds__(other: Any) -> Optional[int]:
         """
-        Get a single time value from specified string
+        Return value of duration as seconds for comparison
 
         Returns
         -------
-        qualifier, value, rest tuple
-        qualifier is valid key in self.__fields__
-        value is a valid
+        Seconds as integer or None if the value is not a valid duration
         """
-        match = RE_TIME_VALUE.match(value)
-        if match:
-            qualifier = match['qualifier']
-            value = int(match['value'])
-            rest = match['rest']
-        else:
-            qualifier = 's'
-            value = int(value)
-            rest = ''
-        if value <= 0:
-            raise ValueError
-        return qualifier, value, rest
-
-    def __parse_value__(self, time_value: str) -> None:
-        """
-        Parse specified duration value to fields in self.__fields__
+        if isinstance(other, Duration):
+            return other.seconds
+        if isinstance(other, (str, int)) and not isinstance(other, bool):
+            try:
+                return parse_duration(str(other))[0]
+            except ValueError:
+                return None
+        return None
 
-        Parsed values are stored to the __fields__ values in the object.
+    def __eq__(self, other: Any) -> bool:
+        return self.__seconds__ == self.__get_seconds__(other)
 
-        Invalid strings, duplicate field names and non-positive durations raise ValueError
+    def __lt__(self, other: Any) -> bool:
+        seconds = self.__get_seconds__(other)
+        if seconds is None:
+            return NotImplemented
+        return self.__seconds__ < seconds
 
-        Arguments
-        ---------
-        time_value: a valid time string as specified in TIME FORMATS section on sshd manual page
+    @property
+    def seconds(self) -> int:
         """
-        if not time_value:
-            raise ValueError('Invalid duration value')
-        rest = str(time_value)
-        while rest:
-            try:
-                qualifier, value, rest = self.__parse_duration_field__(rest)
-            except ValueError as error:
-                raise ValueError(f'Invalid duration string: {time_value}') from error
-            if self.__fields__[qualifier] is not None:
-                raise ValueError(f'Duplicate qualifier in duration string: {time_value}')
-            self.__fields__[qualifier] = value
+        Return total duration in seconds
+        """
+        return self.__seconds__
 
     @property
     def timedelta(self) -> timedelta:
         """
-        Convert data from fields to a datetime.timedelta value
+        Convert duration to a datetime.timedelta value
 
         Returns
         -------
         Value from duration as datetime.timedelta
         """
-        duration = timedelta(seconds=0)
-        for field, value in self.__fields__.items():
-            if value:
-                duration += timedelta(seconds=value * SECONDS_MULTIPLIERS[field])
-        return duration
+        return timedelta(seconds=self.__seconds__)
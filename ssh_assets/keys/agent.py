@@ -6,65 +6,161 @@
 """
 SSH agent client
 
-Allows listing, loading and flushing SSH keys loaded to SSH agent
+Allows listing, loading and flushing SSH keys loaded to SSH agent. Keys are listed with
+the SSH agent protocol over the agent socket, or with ssh-add command if requested.
+
+Keys are loaded to the agent in batches with ssh-add, one command for keys with same
+expiration value. Keys are unloaded from the agent with SSH agent protocol requests over
+a single connection, or with one ssh-add command.
 """
 import os
+
+from enum import Enum
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Optional, TYPE_CHECKING
+from typing import Any, Dict, List, Optional, Tuple, Union, TYPE_CHECKING
 
 from sys_toolkit.collection import CachedMutableSequence
 from sys_toolkit.exceptions import CommandError
-from sys_toolkit.subprocess import run_command_lineoutput, run_command
 
 from ..exceptions import SSHKeyError
+from ..subprocess import run_command_lineoutput, run_command
 
+from .agent_client import SshAgentClient
 from .base import SSHKeyLoader
+from .cache import batch_fingerprint_cache_updates
 from .constants import (
+    SshKeyType,
+    SshKeyLoadStatus,
+    SshKeyUnloadStatus,
     AGENT_KEY_IDENTITY_ATTRIBUTES,
     DEFAULT_KEY_HASH_ALGORITHM,
+    SSH_AGENT_LOAD_BATCH_SIZE,
+    SSH_AGENT_LOAD_MAX_WORKERS,
     SSH_AUTH_SOCK_ENV_VAR,
     SSH_AGENT_NO_KEYS_MESSAGE,
 )
+from .file import load_key_files_to_agent, unload_key_files_from_agent
+from .wire import format_key_info_line, get_key_blob_attributes
 if TYPE_CHECKING:
-    from ..configuration.keys import SshKeyListConfigurationSection
+    from ..configuration.keys import SshKeyConfiguration, SshKeyListConfigurationSection
+    from ..duration import Duration
     from ..session import SshAssetSession
 
 
 class AgentKey(SSHKeyLoader):
     """
     SSH key details from SSH agent key listing
+
+    Key details are parsed from the key info line on first access, unless attributes
+    are specified
     """
     line: str
+    key_blob: Optional[bytes]
     __identity_attributes__ = AGENT_KEY_IDENTITY_ATTRIBUTES
 
-    def __init__(self, line: str, hash_algorithm: str) -> None:
+    def __init__(self,
+                 line: str,
+                 hash_algorithm: str,
+                 key_blob: Optional[bytes] = None,
+                 attributes: Optional[dict] = None) -> None:
         super().__init__(hash_algorithm)
         self.line = line
-        self.__parse_key_info_line__(line)
+        self.key_blob = key_blob
+        if attributes is not None:
+            self.__key_attributes__ = attributes
 
     def __repr__(self) -> str:
         return self.line
 
+    @classmethod
+    def from_key_blob(cls, key_blob: bytes, comment: str, hash_algorithm: str) -> 'AgentKey':
+        """
+        Create agent key from public key blob and comment returned by SSH agent protocol
+        """
+        attributes = get_key_blob_attributes(key_blob, comment, hash_algorithm)
+        return cls(format_key_info_line(attributes), hash_algorithm, key_blob=key_blob, attributes=attributes)
+
     def __load_key_attributes__(self) -> None:
         """
-        This method is not required for agent keys, because the key data is provided
-        when object is initialized by 'line' parameter
+        Parse key attributes from the key info line
+        """
+        self.__parse_key_info_line__(self.line)
+
+
+class SshKeyAgentResult:
+    """
+    Result of loading or unloading a configured SSH key with the SSH agent
+    """
+    key: 'SshKeyConfiguration'
+    status: Enum
+    error: Optional[str]
+
+    __success_statuses__: Tuple[Enum] = ()
+
+    def __init__(self, key: 'SshKeyConfiguration', status: Enum, error: Optional[str] = None) -> None:
+        self.key = key
+        self.status = status
+        self.error = error
+
+    def __repr__(self) -> str:
+        if self.error:
+            return f'{self.key} {self.status.value}: {self.error}'
+        return f'{self.key} {self.status.value}'
+
+    @property
+    def success(self) -> bool:
+        """
+        Check if the key is in the requested state after the request
         """
-        return
+        return self.status in self.__success_statuses__
+
+
+# pylint: disable=too-few-public-methods
+class SshKeyLoadResult(SshKeyAgentResult):
+    """
+    Result of loading a configured SSH key to the SSH agent
+    """
+    expire: Optional['Duration']
+
+    __success_statuses__ = (SshKeyLoadStatus.LOADED, SshKeyLoadStatus.ALREADY_LOADED)
+
+    def __init__(self,
+                 key: 'SshKeyConfiguration',
+                 status: SshKeyLoadStatus,
+                 expire: Optional['Duration'] = None,
+                 error: Optional[str] = None) -> None:
+        super().__init__(key, status, error)
+        self.expire = expire
+
+
+# pylint: disable=too-few-public-methods
+class SshKeyUnloadResult(SshKeyAgentResult):
+    """
+    Result of unloading a configured SSH key from the SSH agent
+    """
+    __success_statuses__ = (SshKeyUnloadStatus.UNLOADED, SshKeyUnloadStatus.NOT_LOADED)
 
 
 class SshAgent(CachedMutableSequence):
     """
     Class to list, load and flush keys from ssh agent
+
+    Loaded keys are indexed by key hash, comment and key type for lookups. The indexes
+    are built on first lookup after the keys are listed.
     """
     session: 'SshAssetSession'
     hash_algorithm: str
+    use_ssh_add: bool
+    __key_indexes__: Optional[Dict[str, Dict]] = None
 
     def __init__(self,
                  session: 'SshAssetSession',
-                 hash_algorithm: str = DEFAULT_KEY_HASH_ALGORITHM) -> None:
+                 hash_algorithm: str = DEFAULT_KEY_HASH_ALGORITHM,
+                 use_ssh_add: bool = False) -> None:
         self.session = session
         self.hash_algorithm = hash_algorithm
+        self.use_ssh_add = use_ssh_add
 
     @property
     def configured_keys(self) -> 'SshKeyListConfigurationSection':
@@ -97,63 +193,479 @@ class SshAgent(CachedMutableSequence):
             return False
         return os.access(path, os.R_OK | os.W_OK)
 
+    @property
+    def client(self) -> SshAgentClient:
+        """
+        Return SSH agent protocol client for the agent socket
+        """
+        return SshAgentClient(self.agent_socket_path)
+
+    def __setitem__(self, index: int, value: AgentKey) -> None:
+        super().__setitem__(index, value)
+        self.__key_indexes__ = None
+
+    def __delitem__(self, index: int) -> None:
+        super().__delitem__(index)
+        self.__key_indexes__ = None
+
+    def __contains__(self, value: Any) -> bool:
+        """
+        Check if key is loaded to the agent
+
+        Strings are looked up from the key hash index
+        """
+        if isinstance(value, str):
+            return self.contains_hash(value)
+        return super().__contains__(value)
+
+    def insert(self, index: int, value: AgentKey) -> None:
+        super().insert(index, value)
+        self.__key_indexes__ = None
+
+    def clear(self) -> None:
+        super().clear()
+        self.__key_indexes__ = None
+
+    def __build_key_indexes__(self) -> Dict[str, Dict]:
+        """
+        Build indexes of loaded keys by key hash, comment and key type
+        """
+        indexes = {
+            'hash': {},
+            'comment': {},
+            'key_type': {},
+        }
+        for key in self.__items__:
+            self.__add_to_key_indexes__(indexes, key)
+        return indexes
+
+    @staticmethod
+    def __add_to_key_indexes__(indexes: Dict[str, Dict], key: AgentKey) -> None:
+        """
+        Add agent key to the key indexes
+        """
+        indexes['hash'].setdefault(key.hash, key)
+        indexes['comment'].setdefault(key.comment, []).append(key)
+        indexes['key_type'].setdefault(key.__get_key_attribute__('key_type'), []).append(key)
+
+    @property
+    def key_indexes(self) -> Dict[str, Dict]:
+        """
+        Return indexes of loaded keys, listing the keys if necessary
+        """
+        if self.__requires_reload__:
+            self.update()
+        if self.__key_indexes__ is None:
+            self.__key_indexes__ = self.__build_key_indexes__()
+        return self.__key_indexes__
+
+    def contains_hash(self, key_hash: str) -> bool:
+        """
+        Check if key with specified hash is loaded to the agent
+        """
+        return key_hash in self.key_indexes['hash']
+
+    def get_by_hash(self, key_hash: str) -> Optional[AgentKey]:
+        """
+        Return loaded key with specified hash or None if key is not loaded
+        """
+        return self.key_indexes['hash'].get(key_hash, None)
+
+    def get_by_comment(self, comment: str) -> List[AgentKey]:
+        """
+        Return loaded keys with specified comment
+        """
+        return list(self.key_indexes['comment'].get(comment, []))
+
+    def get_by_key_type(self, key_type: Union[SshKeyType, str]) -> List[AgentKey]:
+        """
+        Return loaded keys with specified key type
+        """
+        if isinstance(key_type, SshKeyType):
+            key_type = key_type.value
+        return list(self.key_indexes['key_type'].get(key_type, []))
+
+    @property
+    def __list_keys_command__(self) -> Tuple[str]:
+        """
+        Return ssh-add command to list keys loaded to the agent
+        """
+        return ('ssh-add', '-E', self.hash_algorithm.value, '-l')
+
+    def __parse_ssh_add_output__(self, stdout: List[str]) -> List[AgentKey]:
+        """
+        Parse agent keys from ssh-add -l command output lines
+        """
+        if len(stdout) == 1 and stdout[0] == SSH_AGENT_NO_KEYS_MESSAGE:
+            stdout = []
+        return [AgentKey(line, self.hash_algorithm) for line in stdout]
+
+    def __parse_identities__(self, identities: List[Tuple[bytes, str]]) -> List[AgentKey]:
+        """
+        Parse agent keys from public key blob and comment tuples returned by SSH agent protocol
+        """
+        return [
+            AgentKey.from_key_blob(key_blob, comment, self.hash_algorithm)
+            for key_blob, comment in identities
+        ]
+
+    def __load_keys_with_ssh_add__(self) -> List[AgentKey]:
+        """
+        List keys loaded to the agent with ssh-add -l command
+        """
+        try:
+            stdout, _stderr = run_command_lineoutput(*self.__list_keys_command__, expected_return_codes=(0, 1))
+        except CommandError as error:
+            raise SSHKeyError(f'Error listing SSH keys loaded to ssh-agent: {error}') from error
+        return self.__parse_ssh_add_output__(stdout)
+
+    def __load_keys_with_agent_protocol__(self) -> List[AgentKey]:
+        """
+        List keys loaded to the agent with SSH agent protocol request
+        """
+        try:
+            identities = self.client.list_identities()
+        except SSHKeyError as error:
+            raise SSHKeyError(f'Error listing SSH keys loaded to ssh-agent: {error}') from error
+        return self.__parse_identities__(identities)
+
+    def __set_loaded_keys__(self, keys: List[AgentKey]) -> None:
+        """
+        Store listed agent keys as the cached list of loaded keys
+        """
+        self.__items__ = list(keys)
+        self.__key_indexes__ = None
+        self.__finish_update__()
+
     def update(self) -> None:
         """
         Update list of keys loaded to the ssh agent
         """
         self.__start_update__()
         self.__items__ = []
+        self.__key_indexes__ = None
         try:
-            stdout, _stderr = run_command_lineoutput(
-                'ssh-add', '-E', self.hash_algorithm.value, '-l',
-                expected_return_codes=(0, 1)
-            )
-        except CommandError as error:
+            if self.use_ssh_add:
+                keys = self.__load_keys_with_ssh_add__()
+            else:
+                keys = self.__load_keys_with_agent_protocol__()
+        except SSHKeyError:
             self.__reset__()
-            raise SSHKeyError(f'Error listing SSH keys loaded to ssh-agent: {error}') from error
+            raise
+        self.__set_loaded_keys__(keys)
 
-        if len(stdout) == 1 and stdout[0] == SSH_AGENT_NO_KEYS_MESSAGE:
-            stdout = []
+    def invalidate(self) -> None:
+        """
+        Invalidate the cached list of loaded keys. Keys are listed again on next access.
+        """
+        self.clear()
 
-        for line in stdout:
-            self.append(AgentKey(line, self.hash_algorithm))
+    def mark_key_loaded(self, key: SSHKeyLoader) -> None:
+        """
+        Add a key loaded to the agent to the cached list of loaded keys
 
-        self.__finish_update__()
+        The cached list is not modified if the keys have not been listed yet. If the key
+        details can't be detected the cached list is invalidated instead.
+        """
+        if self.__requires_reload__:
+            return
+        try:
+            if key.hash_algorithm != self.hash_algorithm:
+                self.invalidate()
+                return
+            if self.contains_hash(key.hash):
+                return
+            attributes = dict(key.__key_attributes__)
+        except SSHKeyError:
+            self.invalidate()
+            return
+        agent_key = AgentKey(format_key_info_line(attributes), self.hash_algorithm, attributes=attributes)
+        self.__items__.append(agent_key)
+        self.__add_to_key_indexes__(self.__key_indexes__, agent_key)
 
-    @staticmethod
-    def unload_keys_from_agent(keys: Optional[List[str]] = None, unload_all_keys: bool = False) -> None:
+    def mark_key_unloaded(self, key: SSHKeyLoader) -> None:
         """
-        Unload any named or configured keys from SSH agent
+        Remove a key unloaded from the agent from the cached list of loaded keys
+        """
+        if self.__requires_reload__:
+            return
+        try:
+            key_hash = key.hash
+        except SSHKeyError:
+            self.invalidate()
+            return
+        self.__items__ = [item for item in self.__items__ if item.hash != key_hash]
+        self.__key_indexes__ = None
 
-        If unload_all_keys is True, all keys are removed from the agent
+    def unload_all_keys(self) -> None:
         """
-        if unload_all_keys:
+        Remove all keys from the SSH agent
+        """
+        if self.use_ssh_add:
             try:
                 run_command('ssh-add', '-D')
             except CommandError as error:
                 raise SSHKeyError(f'Error unloading SSH keys from agent: {error}') from error
+        else:
+            try:
+                if not self.client.remove_all_identities():
+                    raise SSHKeyError('SSH agent refused to remove all identities')
+            except SSHKeyError as error:
+                raise SSHKeyError(f'Error unloading SSH keys from agent: {error}') from error
+        self.__set_loaded_keys__([])
+
+    @staticmethod
+    def __unload_key_batch__(keys: List['SshKeyConfiguration']) -> List[SshKeyUnloadResult]:
+        """
+        Unload a batch of keys from the agent with one ssh-add command
+
+        If the command fails, the keys are unloaded one by one to detect which keys failed
+        """
+        try:
+            unload_key_files_from_agent([key.private_key for key in keys])
+            return [SshKeyUnloadResult(key, SshKeyUnloadStatus.UNLOADED) for key in keys]
+        except SSHKeyError as error:
+            if len(keys) == 1:
+                return [SshKeyUnloadResult(keys[0], SshKeyUnloadStatus.FAILED, str(error))]
+        results = []
+        for key in keys:
+            results.extend(SshAgent.__unload_key_batch__([key]))
+        return results
+
+    def __unload_keys_with_agent_protocol__(self, keys: List[Tuple]) -> List[SshKeyUnloadResult]:
+        """
+        Unload keys from the agent with REMOVE_IDENTITY requests over one agent connection
+
+        Keys are specified as tuples of configured key and public key blob
+        """
+        results = []
+        try:
+            with self.client as client:
+                for key, key_blob in keys:
+                    try:
+                        results.append(self.__get_remove_identity_result__(key, client.remove_identity(key_blob)))
+                    except SSHKeyError as error:
+                        results.append(SshKeyUnloadResult(key, SshKeyUnloadStatus.FAILED, str(error)))
+        except SSHKeyError as error:
+            self.__add_unload_error_results__(results, keys, error)
+        return results
+
+    @staticmethod
+    def __get_remove_identity_result__(key: 'SshKeyConfiguration', removed: bool) -> SshKeyUnloadResult:
+        """
+        Return unload result for a REMOVE_IDENTITY request
+        """
+        if removed:
+            return SshKeyUnloadResult(key, SshKeyUnloadStatus.UNLOADED)
+        return SshKeyUnloadResult(key, SshKeyUnloadStatus.FAILED, 'SSH agent refused to remove identity')
+
+    @staticmethod
+    def __add_unload_error_results__(results: List[SshKeyUnloadResult],
+                                     keys: List[Tuple],
+                                     error: SSHKeyError) -> None:
+        """
+        Add failed unload results for keys not processed before an agent connection error
+        """
+        processed = set(id(result.key) for result in results)
+        results.extend(
+            SshKeyUnloadResult(key, SshKeyUnloadStatus.FAILED, str(error))
+            for key, _key_blob in keys if id(key) not in processed
+        )
+
+    @staticmethod
+    def __get_key_blob__(key: 'SshKeyConfiguration', agent_key: AgentKey) -> Optional[bytes]:
+        """
+        Return public key blob for a loaded key from agent listing or public key file
+        """
+        if agent_key.key_blob is not None:
+            return agent_key.key_blob
+        try:
+            if key.private_key.has_public_key_file:
+                return key.private_key.public_key.key_blob
+        except (ValueError, SSHKeyError):
+            pass
+        return None
+
+    def unload_keys_from_agent(self,
+                               keys: Optional[List[str]] = None,
+                               unload_all_keys: bool = False) -> List[SshKeyUnloadResult]:
+        """
+        Unload any named or configured keys from SSH agent
+
+        If unload_all_keys is True, all keys are removed from the agent
+
+        Loaded keys are detected from one listing of agent keys. The keys are removed with SSH
+        agent protocol requests over one connection, or with one ssh-add -d command if ssh-add is
+        used or the public key for the key is not available.
+
+        Returns
+        -------
+        List of SshKeyUnloadResult objects for processed keys, in same order as the keys
+        """
+        if unload_all_keys:
+            self.unload_all_keys()
 
         if not keys:
-            return
+            return []
+        keys = list(keys)
+
+        results, protocol_keys, ssh_add_keys = self.__get_key_unload_batches__(keys)
+        if protocol_keys:
+            results.extend(self.__unload_keys_with_agent_protocol__(protocol_keys))
+        if ssh_add_keys:
+            results.extend(self.__unload_key_batch__(ssh_add_keys))
+        return self.__finish_unload_results__(keys, results)
+
+    @batch_fingerprint_cache_updates
+    def __get_key_unload_batches__(self, keys: List['SshKeyConfiguration']) -> Tuple[
+            List[SshKeyUnloadResult], List[Tuple], List['SshKeyConfiguration']]:
+        """
+        Detect loaded keys to be unloaded from the agent
 
+        Returns
+        -------
+        Tuple of results for keys that do not need unloading, keys to unload with SSH agent protocol
+        as tuples of key and public key blob, and keys to unload with ssh-add
+        """
+        results = []
+        protocol_keys = []
+        ssh_add_keys = []
         for key in keys:
-            if key.loaded:
-                key.unload_from_agent()
+            if not key.available:
+                results.append(SshKeyUnloadResult(key, SshKeyUnloadStatus.UNAVAILABLE))
+                continue
+            try:
+                agent_key = self.get_by_hash(key.hash)
+            except SSHKeyError as error:
+                results.append(SshKeyUnloadResult(key, SshKeyUnloadStatus.FAILED, str(error)))
+                continue
+            if agent_key is None:
+                results.append(SshKeyUnloadResult(key, SshKeyUnloadStatus.NOT_LOADED))
+                continue
+            key_blob = self.__get_key_blob__(key, agent_key) if not self.use_ssh_add else None
+            if key_blob is not None:
+                protocol_keys.append((key, key_blob))
+            else:
+                ssh_add_keys.append(key)
+        return results, protocol_keys, ssh_add_keys
+
+    def __finish_unload_results__(self,
+                                  keys: List['SshKeyConfiguration'],
+                                  results: List[SshKeyUnloadResult]) -> List[SshKeyUnloadResult]:
+        """
+        Sort unload results in order of the keys and remove unloaded keys from cached key list
+        """
+        order = {id(key): index for index, key in enumerate(keys)}
+        results.sort(key=lambda result: order[id(result.key)])
+        for result in results:
+            if result.status == SshKeyUnloadStatus.UNLOADED:
+                self.mark_key_unloaded(result.key.private_key)
+        return results
+
+    @staticmethod
+    def __load_key_batch__(keys: List['SshKeyConfiguration'],
+                           expire: Optional['Duration']) -> List[SshKeyLoadResult]:
+        """
+        Load a batch of keys with same expiration value to the agent with one ssh-add command
 
-    def load_keys_to_agent(self, keys: Optional[List[str]] = None, load_all_keys: bool = False) -> None:
+        If the command fails, the keys are loaded one by one to detect which keys failed
+        """
+        try:
+            load_key_files_to_agent([key.private_key for key in keys], expire=expire)
+            return [SshKeyLoadResult(key, SshKeyLoadStatus.LOADED, expire) for key in keys]
+        except SSHKeyError as error:
+            if len(keys) == 1:
+                return [SshKeyLoadResult(keys[0], SshKeyLoadStatus.FAILED, expire, str(error))]
+        results = []
+        for key in keys:
+            results.extend(SshAgent.__load_key_batch__([key], expire))
+        return results
+
+    @batch_fingerprint_cache_updates
+    def __get_key_load_batches__(self,
+                                 keys: List['SshKeyConfiguration'],
+                                 load_all_keys: bool) -> Tuple[
+            List[SshKeyLoadResult], List[Tuple], List[Tuple]]:
+        """
+        Group keys to be loaded to batches by expiration value
+
+        Returns
+        -------
+        Tuple of results for keys that do not need loading, batches of passphrase protected keys
+        and batches of keys without passphrase. Each batch is a tuple of keys and expiration value.
+        """
+        results = []
+        groups = {}
+        for key in keys:
+            if not load_all_keys and not key.autoload:
+                continue
+            if not key.available:
+                results.append(SshKeyLoadResult(key, SshKeyLoadStatus.UNAVAILABLE))
+                continue
+            try:
+                if key.loaded:
+                    results.append(SshKeyLoadResult(key, SshKeyLoadStatus.ALREADY_LOADED))
+                    continue
+            except SSHKeyError as error:
+                results.append(SshKeyLoadResult(key, SshKeyLoadStatus.FAILED, error=str(error)))
+                continue
+            expire = key.minimum_expire
+            groups.setdefault((expire, key.private_key.encrypted), []).append(key)
+
+        encrypted_batches = []
+        batches = []
+        for (expire, encrypted), group_keys in groups.items():
+            if encrypted:
+                encrypted_batches.append((group_keys, expire))
+                continue
+            for index in range(0, len(group_keys), SSH_AGENT_LOAD_BATCH_SIZE):
+                batches.append((group_keys[index:index + SSH_AGENT_LOAD_BATCH_SIZE], expire))
+        return results, encrypted_batches, batches
+
+    def load_keys_to_agent(self,
+                           keys: Optional[List[str]] = None,
+                           load_all_keys: bool = False,
+                           max_workers: int = SSH_AGENT_LOAD_MAX_WORKERS) -> List[SshKeyLoadResult]:
         """
         Load any available configured keys
 
         If load_all_keys is False, only keys mared as autoload are loaded
+
+        Keys with same expiration value are loaded with one ssh-add command. Batches of keys
+        without passphrase are loaded concurrently with max_workers threads. Passphrase protected
+        keys may ask for the passphrase and are loaded sequentially.
+
+        Returns
+        -------
+        List of SshKeyLoadResult objects for processed keys, in same order as the keys
         """
         if not keys:
             keys = self.configured_keys
-        for key in keys:
-            if not load_all_keys and not key.autoload:
+        keys = list(keys)
+
+        results, encrypted_batches, batches = self.__get_key_load_batches__(keys, load_all_keys)
+        for batch_keys, expire in encrypted_batches:
+            results.extend(self.__load_key_batch__(batch_keys, expire))
+        if batches:
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(batches)))) as executor:
+                for batch_results in executor.map(lambda batch: self.__load_key_batch__(*batch), batches):
+                    results.extend(batch_results)
+        return self.__finish_load_results__(keys, results)
+
+    def __finish_load_results__(self,
+                                keys: List['SshKeyConfiguration'],
+                                results: List[SshKeyLoadResult]) -> List[SshKeyLoadResult]:
+        """
+        Sort load results in order of the keys and add loaded keys to cached key list
+        """
+        order = {id(key): index for index, key in enumerate(keys)}
+        results.sort(key=lambda result: order[id(result.key)])
+        for result in results:
+            if result.status != SshKeyLoadStatus.LOADED:
                 continue
-            if not key.loaded and key.available:
-                key.load_to_agent()
-                if key.minimum_expire:
-                    self.session.configuration.message(
-                        f'key {key} loaded with expiration value {key.minimum_expire}'
-                    )
+            self.mark_key_loaded(result.key.private_key)
+            if result.expire:
+                self.session.configuration.message(
+                    f'key {result.key} loaded with expiration value {result.expire}'
+                )
+        return results
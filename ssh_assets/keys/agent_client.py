@@ -0,0 +1,222 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+SSH agent protocol client
+
+Communicates with the SSH agent directly over the agent UNIX socket instead of running
+ssh-add commands. The protocol is specified in draft-miller-ssh-agent.
+"""
+import os
+import socket
+
+from typing import List, Optional, Tuple
+
+from ..exceptions import SSHKeyError
+
+from .constants import (
+    SshAgentConstraint,
+    SshAgentMessage,
+    SSH_AGENT_MAX_MESSAGE_SIZE,
+    SSH_AGENT_SOCKET_TIMEOUT,
+    SSH_AUTH_SOCK_ENV_VAR,
+)
+from .wire import WireFormatReader, pack_string, pack_uint32
+
+
+class SshAgentClient:
+    """
+    Client for the SSH agent protocol over UNIX socket
+
+    The client can be used as context manager to send multiple requests over the same socket
+    connection. Otherwise a new connection is opened for each request.
+    """
+    socket_path: Optional[str]
+    timeout: float
+
+    def __init__(self, socket_path: Optional[str] = None, timeout: float = SSH_AGENT_SOCKET_TIMEOUT) -> None:
+        self.socket_path = socket_path if socket_path is not None else os.environ.get(SSH_AUTH_SOCK_ENV_VAR, None)
+        self.timeout = timeout
+        self.__socket__ = None
+
+    def __repr__(self) -> str:
+        return str(self.socket_path)
+
+    def __enter__(self) -> 'SshAgentClient':
+        self.connect()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    @property
+    def connected(self) -> bool:
+        """
+        Check if the client has an open connection to the agent
+        """
+        return self.__socket__ is not None
+
+    def connect(self) -> None:
+        """
+        Open connection to the SSH agent socket
+        """
+        if self.__socket__ is not None:
+            return
+        if not self.socket_path:
+            raise SSHKeyError(f'SSH agent socket is not defined: {SSH_AUTH_SOCK_ENV_VAR} is not set')
+        agent_socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        agent_socket.settimeout(self.timeout)
+        try:
+            agent_socket.connect(self.socket_path)
+        except OSError as error:
+            agent_socket.close()
+            raise SSHKeyError(f'Error connecting to SSH agent socket {self.socket_path}: {error}') from error
+        self.__socket__ = agent_socket
+
+    def close(self) -> None:
+        """
+        Close connection to the SSH agent socket
+        """
+        if self.__socket__ is not None:
+            self.__socket__.close()
+            self.__socket__ = None
+
+    def __receive__(self, length: int) -> bytes:
+        """
+        Receive specified number of bytes from the agent socket
+        """
+        data = b''
+        while len(data) < length:
+            chunk = self.__socket__.recv(length - len(data))
+            if not chunk:
+                raise SSHKeyError('SSH agent closed the connection unexpectedly')
+            data += chunk
+        return data
+
+    def __exchange__(self, message: bytes) -> Tuple[int, bytes]:
+        """
+        Send a framed message to the agent and return response message type and payload
+        """
+        self.__socket__.sendall(pack_uint32(len(message)) + message)
+        length = WireFormatReader(self.__receive__(4)).read_uint32()
+        if length == 0 or length > SSH_AGENT_MAX_MESSAGE_SIZE:
+            raise SSHKeyError(f'Invalid SSH agent response message length: {length}')
+        response = self.__receive__(length)
+        return response[0], response[1:]
+
+    def request(self, message_type: SshAgentMessage, payload: bytes = b'') -> Tuple[int, bytes]:
+        """
+        Send request to the SSH agent
+
+        Returns
+        -------
+        Response message type and response payload as tuple
+        """
+        close = not self.connected
+        self.connect()
+        try:
+            return self.__exchange__(bytes([message_type]) + payload)
+        except OSError as error:
+            close = True
+            raise SSHKeyError(f'Error communicating with SSH agent {self.socket_path}: {error}') from error
+        finally:
+            if close:
+                self.close()
+
+    @staticmethod
+    def __parse_success_response__(message_type: SshAgentMessage, response_type: int) -> bool:
+        """
+        Parse response to a request which expects a SUCCESS or FAILURE response from the agent
+        """
+        if response_type == SshAgentMessage.SUCCESS:
+            return True
+        if response_type == SshAgentMessage.FAILURE:
+            return False
+        raise SSHKeyError(f'Unexpected SSH agent response message type {response_type} to {message_type.name}')
+
+    @staticmethod
+    def __parse_identities_answer__(response_type: int, payload: bytes) -> List[Tuple[bytes, str]]:
+        """
+        Parse public key blob and comment tuples from response to REQUEST_IDENTITIES
+        """
+        if response_type != SshAgentMessage.IDENTITIES_ANSWER:
+            raise SSHKeyError(f'Unexpected SSH agent response message type {response_type} to REQUEST_IDENTITIES')
+        reader = WireFormatReader(payload)
+        identities = []
+        for _index in range(reader.read_uint32()):
+            key_blob = reader.read_string()
+            comment = reader.read_text()
+            identities.append((key_blob, comment))
+        return identities
+
+    @staticmethod
+    def __get_add_identity_request__(key_data: bytes,
+                                     comment: str,
+                                     lifetime: Optional[int] = None,
+                                     confirm: bool = False) -> Tuple[SshAgentMessage, bytes]:
+        """
+        Return message type and payload for a request to add a private key to the agent
+        """
+        constraints = b''
+        if lifetime:
+            constraints += bytes([SshAgentConstraint.LIFETIME]) + pack_uint32(int(lifetime))
+        if confirm:
+            constraints += bytes([SshAgentConstraint.CONFIRM])
+        message_type = SshAgentMessage.ADD_ID_CONSTRAINED if constraints else SshAgentMessage.ADD_IDENTITY
+        return message_type, key_data + pack_string(comment) + constraints
+
+    def __request_success__(self, message_type: SshAgentMessage, payload: bytes = b'') -> bool:
+        """
+        Send request which expects a SUCCESS or FAILURE response from the agent
+        """
+        response_type, _payload = self.request(message_type, payload)
+        return self.__parse_success_response__(message_type, response_type)
+
+    def list_identities(self) -> List[Tuple[bytes, str]]:
+        """
+        List identities loaded to the SSH agent
+
+        Returns
+        -------
+        List of public key blob and comment tuples
+        """
+        return self.__parse_identities_answer__(*self.request(SshAgentMessage.REQUEST_IDENTITIES))
+
+    def add_identity(self,
+                     key_data: bytes,
+                     comment: str,
+                     lifetime: Optional[int] = None,
+                     confirm: bool = False) -> bool:
+        """
+        Add private key to the SSH agent
+
+        Arguments
+        ---------
+        key_data:   private key in SSH wire format, starting with the key type string
+        comment:    comment for the key in agent
+        lifetime:   optional key lifetime in seconds
+        confirm:    require confirmation for each use of the key
+
+        Returns
+        -------
+        True if agent accepted the key
+        """
+        return self.__request_success__(*self.__get_add_identity_request__(key_data, comment, lifetime, confirm))
+
+    def remove_identity(self, key_blob: bytes) -> bool:
+        """
+        Remove key matching specified public key blob from SSH agent
+
+        Returns
+        -------
+        True if the key was removed, False if agent refused the request
+        """
+        return self.__request_success__(SshAgentMessage.REMOVE_IDENTITY, pack_string(key_blob))
+
+    def remove_all_identities(self) -> bool:
+        """
+        Remove all keys from the SSH agent
+        """
+        return self.__request_success__(SshAgentMessage.REMOVE_ALL_IDENTITIES)
@@ -0,0 +1,252 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Persistent cache for SSH key file fingerprint details
+
+Cache entries are keyed by key file path and hash algorithm, and are valid only while the
+inode, size and modification time of the key file, and of any source files the attributes
+were read from, are unchanged.
+
+Operations processing many keys defer cache writes with fingerprint_cache_batch() or the
+batch_fingerprint_cache_updates decorator, so that new entries are written to the cache
+file once when the operation finishes.
+"""
+import fcntl
+import json
+import os
+import tempfile
+import threading
+
+from contextlib import contextmanager
+from functools import wraps
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Union
+
+from ..constants import USER_CACHE_DIRECTORY
+from .constants import (
+    KeyHashAlgorithm,
+    FINGERPRINT_CACHE_ATTRIBUTES,
+    FINGERPRINT_CACHE_FILENAME,
+    FINGERPRINT_CACHE_VERSION,
+)
+
+FINGERPRINT_CACHE_FILE = USER_CACHE_DIRECTORY.joinpath(FINGERPRINT_CACHE_FILENAME)
+
+FINGERPRINT_CACHES = {}
+
+
+class FingerprintCache:
+    """
+    Fingerprint cache stored as JSON file
+
+    The cache file is replaced atomically and updates are merged with the file contents
+    while holding an exclusive lock, so concurrent processes do not lose each other's entries.
+    Errors reading or writing the cache file are ignored.
+
+    Inside batch() new entries are only stored in memory and are written to the cache file
+    with a single update when the outermost batch exits.
+    """
+    path: Path
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        self.path = Path(path).expanduser()
+        self.__entries__ = None
+        self.__pending__: Dict[str, dict] = {}
+        self.__batch_depth__ = 0
+        self.__lock__ = threading.RLock()
+
+    def __repr__(self) -> str:
+        return str(self.path)
+
+    @property
+    def lock_path(self) -> Path:
+        """
+        Return path to the lock file for cache updates
+        """
+        return self.path.with_name(f'{self.path.name}.lock')
+
+    @property
+    def entries(self) -> Dict[str, dict]:
+        """
+        Return cache entries, loading the cache file on first access
+        """
+        if self.__entries__ is None:
+            self.__entries__ = self.__read__()
+        return self.__entries__
+
+    @staticmethod
+    def __entry_key__(path: Path, hash_algorithm: KeyHashAlgorithm) -> str:
+        """
+        Return cache entry key for path and hash algorithm
+        """
+        return f'{hash_algorithm.value}:{path}'
+
+    @staticmethod
+    def __file_signature__(path: Path, source_paths: Iterable[Path] = ()) -> Optional[List[int]]:
+        """
+        Return signature of file and source files as inode, size and modification time in
+        nanoseconds of each file
+        """
+        signature = []
+        for item in (path, *source_paths):
+            try:
+                stat = os.stat(item)
+            except OSError:
+                return None
+            signature.extend((stat.st_ino, stat.st_size, stat.st_mtime_ns))
+        return signature
+
+    def __read__(self) -> Dict[str, dict]:
+        """
+        Read cache entries from the cache file
+        """
+        try:
+            data = json.loads(self.path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get('version', None) != FINGERPRINT_CACHE_VERSION:
+            return {}
+        entries = data.get('entries', None)
+        return entries if isinstance(entries, dict) else {}
+
+    def __write__(self, updates: Dict[str, dict]) -> None:
+        """
+        Merge updated entries to the cache file and replace the file atomically
+        """
+        try:
+            self.path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+            with self.lock_path.open('a', encoding='utf-8') as lock:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+                entries = self.__read__()
+                entries.update(updates)
+                handle, filename = tempfile.mkstemp(dir=self.path.parent, prefix=f'.{self.path.name}.')
+                try:
+                    with os.fdopen(handle, 'w', encoding='utf-8') as filedescriptor:
+                        json.dump({'version': FINGERPRINT_CACHE_VERSION, 'entries': entries}, filedescriptor)
+                    os.replace(filename, self.path)
+                except OSError:
+                    os.unlink(filename)
+                    raise
+        except OSError:
+            return
+        self.entries.update(entries)
+
+    def get(self,
+            path: Path,
+            hash_algorithm: KeyHashAlgorithm,
+            source_paths: Iterable[Path] = ()) -> Optional[dict]:
+        """
+        Get cached key attributes for key file
+
+        The entry is valid only if the key file and the source files the attributes were read
+        from, like the .pub file of a private key, are not modified.
+
+        Returns
+        -------
+        Dictionary of key attributes or None if the file is not cached or has been modified
+        """
+        entry = self.entries.get(self.__entry_key__(path, hash_algorithm), None)
+        if not isinstance(entry, dict):
+            return None
+        signature = self.__file_signature__(path, source_paths)
+        if signature is None or entry.get('signature', None) != signature:
+            return None
+        attributes = entry.get('attributes', None)
+        if not isinstance(attributes, dict) or set(attributes) != set(FINGERPRINT_CACHE_ATTRIBUTES):
+            return None
+        return dict(attributes)
+
+    def set(self,
+            path: Path,
+            hash_algorithm: KeyHashAlgorithm,
+            attributes: dict,
+            source_paths: Iterable[Path] = ()) -> None:
+        """
+        Store key attributes for key file and source files of the attributes to the cache
+        """
+        signature = self.__file_signature__(path, source_paths)
+        if signature is None:
+            return
+        entry = {
+            'signature': signature,
+            'attributes': {attr: attributes[attr] for attr in FINGERPRINT_CACHE_ATTRIBUTES},
+        }
+        key = self.__entry_key__(path, hash_algorithm)
+        with self.__lock__:
+            self.entries[key] = entry
+            self.__pending__[key] = entry
+            if not self.__batch_depth__:
+                self.flush()
+
+    @property
+    def pending(self) -> int:
+        """
+        Return number of entries not yet written to the cache file
+        """
+        return len(self.__pending__)
+
+    def flush(self) -> None:
+        """
+        Write pending entries to the cache file
+        """
+        with self.__lock__:
+            if not self.__pending__:
+                return
+            updates = self.__pending__
+            self.__pending__ = {}
+            self.__write__(updates)
+
+    @contextmanager
+    def batch(self) -> Iterator['FingerprintCache']:
+        """
+        Context manager to defer writing new cache entries until the outermost batch exits
+
+        Entries are written also if the block raises an exception, because the cached
+        attributes are valid regardless of the result of the operation.
+        """
+        with self.__lock__:
+            self.__batch_depth__ += 1
+        try:
+            yield self
+        finally:
+            with self.__lock__:
+                self.__batch_depth__ -= 1
+                if not self.__batch_depth__:
+                    self.flush()
+
+
+def get_fingerprint_cache(path: Optional[Union[str, Path]] = None) -> FingerprintCache:
+    """
+    Return shared fingerprint cache object for specified cache file
+
+    By default the user fingerprint cache file FINGERPRINT_CACHE_FILE is used
+    """
+    path = Path(path if path is not None else FINGERPRINT_CACHE_FILE).expanduser()
+    cache = FINGERPRINT_CACHES.get(path, None)
+    if cache is None:
+        cache = FingerprintCache(path)
+        FINGERPRINT_CACHES[path] = cache
+    return cache
+
+
+@contextmanager
+def fingerprint_cache_batch(path: Optional[Union[str, Path]] = None) -> Iterator[FingerprintCache]:
+    """
+    Context manager to defer writes to the shared fingerprint cache while processing many keys
+    """
+    with get_fingerprint_cache(path).batch() as cache:
+        yield cache
+
+
+def batch_fingerprint_cache_updates(method: Callable) -> Callable:
+    """
+    Decorator to defer writes to the shared fingerprint cache until the method returns
+    """
+    @wraps(method)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        with fingerprint_cache_batch():
+            return method(*args, **kwargs)
+    return wrapper
@@ -6,48 +6,162 @@
 """
 Classes to load SSH keys from text files
 """
+from base64 import b64decode
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional, Tuple, Union
 
 from sys_toolkit.exceptions import CommandError
-from sys_toolkit.subprocess import run_command, run_command_lineoutput
 
 from ..authorized_keys.public_key import PublicKey
 from ..exceptions import SSHKeyError
+from ..subprocess import run_command, run_command_lineoutput
 from .base import SSHKeyLoader
-from .constants import DEFAULT_KEY_HASH_ALGORITHM
+from .cache import FingerprintCache, get_fingerprint_cache
+from .constants import (
+    DEFAULT_KEY_HASH_ALGORITHM,
+    OPENSSH_PRIVATE_KEY_HEADER,
+    OPENSSH_PRIVATE_KEY_MAGIC,
+    OPENSSH_PRIVATE_KEY_NO_CIPHER,
+    PEM_ENCRYPTED_HEADER,
+    PKCS8_ENCRYPTED_HEADER,
+    SSH_KEYGEN_NO_COMMENT,
+)
+from .wire import WireFormatReader, get_key_blob_attributes
 
 
 class SSHKeyFile(SSHKeyLoader):
     """SSH key file base class
 
     Base class for SSH private and public keys based on text files
+
+    Key attributes are stored to the persistent fingerprint cache. The user fingerprint cache
+    is used unless a cache is specified.
+
+    The key file path is resolved on first access to the path attribute.
     """
-    def __init__(self, path: str, hash_algorithm: str = DEFAULT_KEY_HASH_ALGORITHM) -> None:
+    fingerprint_cache: FingerprintCache
+    __path__: Optional[Union[str, Path]] = None
+    __resolved_path__: Optional[Path] = None
+
+    def __init__(self,
+                 path: Union[str, Path],
+                 hash_algorithm: str = DEFAULT_KEY_HASH_ALGORITHM,
+                 fingerprint_cache: Optional[FingerprintCache] = None) -> None:
         super().__init__(hash_algorithm)
-        self.path = Path(path).expanduser().resolve()
+        self.path = path
+        self.fingerprint_cache = fingerprint_cache if fingerprint_cache is not None else get_fingerprint_cache()
 
     def __repr__(self) -> str:
         return str(self.path)
 
-    def __load_key_attributes__(self) -> None:
+    @property
+    def path(self) -> Optional[Path]:
+        """
+        Return resolved path to the key file
+        """
+        if self.__resolved_path__ is None and self.__path__ is not None:
+            self.__resolved_path__ = Path(self.__path__).expanduser().resolve()
+        return self.__resolved_path__
+
+    @path.setter
+    def path(self, value: Optional[Union[str, Path]]) -> None:
+        """
+        Set path to the key file, to be resolved on first access
+        """
+        self.__path__ = value
+        self.__resolved_path__ = None
+
+    def __load_public_key_attributes__(self) -> bool:
+        """
+        Load key attributes from the public key blob in .pub file without running ssh-keygen
+
+        The comment for keys without comment is set to same value as shown by ssh-keygen -l
+
+        Returns
+        -------
+        True if the attributes were loaded, False if the public key is not available or could
+        not be parsed
+        """
+        if self.path.suffix == '.pub':
+            path = self.path
+            default_comment = SSH_KEYGEN_NO_COMMENT
+        elif self.has_public_key_file:
+            path = self.public_key_file_path
+            default_comment = str(path)
+        else:
+            return False
+
+        try:
+            public_key = PublicKey(path.read_text(encoding='utf-8').strip())
+            self.__key_attributes__ = get_key_blob_attributes(
+                public_key.key_blob,
+                public_key.comment or default_comment,
+                self.hash_algorithm,
+            )
+        except (OSError, ValueError, SSHKeyError):
+            return False
+        return True
+
+    def __load_cached_key_attributes__(self) -> bool:
         """
-        Load key attributes with ssh-keygen -l command
+        Load key attributes from fingerprint cache or public key file without running ssh-keygen
+
+        Returns
+        -------
+        True if the attributes were loaded, False if ssh-keygen is required
         """
         if not self.path.is_file():
             raise SSHKeyError(f'Error loading SSH key attributes: no such file: {self.path}')
 
-        try:
-            stdout, _stderr = run_command_lineoutput(
-                'ssh-keygen', '-E', self.hash_algorithm.value, '-l', '-f', str(self.path)
+        attributes = self.fingerprint_cache.get(self.path, self.hash_algorithm, self.__cache_source_paths__)
+        if attributes is not None:
+            self.__key_attributes__ = attributes
+            return True
+
+        if self.__load_public_key_attributes__():
+            self.fingerprint_cache.set(
+                self.path, self.hash_algorithm, self.__key_attributes__, self.__cache_source_paths__
             )
-        except CommandError as error:
-            raise SSHKeyError(f'Error loading SSH key attributes: {error}') from error
+            return True
+        return False
+
+    @property
+    def __cache_source_paths__(self) -> Tuple[Path, ...]:
+        """
+        Return files the key attributes are read from in addition to the key file
+
+        Attributes of a private key are read from the .pub file if it exists, both directly and
+        by ssh-keygen, so the cache entry must be invalidated when the .pub file changes
+        """
+        return (self.public_key_file_path,) if self.has_public_key_file else ()
+
+    @property
+    def __key_info_command__(self) -> Tuple[str]:
+        """
+        Return ssh-keygen command to show key details
+        """
+        return ('ssh-keygen', '-E', self.hash_algorithm.value, '-l', '-f', str(self.path))
 
+    def __set_key_info_output__(self, stdout: List[str]) -> None:
+        """
+        Set key attributes from ssh-keygen -l command output lines and store them to the cache
+        """
         if not stdout:
             raise SSHKeyError('Error loading SSH key attributes: command output is empty')
+        self.__parse_key_info_line__(stdout[0])
+        self.fingerprint_cache.set(self.path, self.hash_algorithm, self.__key_attributes__, self.__cache_source_paths__)
 
-        return self.__parse_key_info_line__(stdout[0])
+    def __load_key_attributes__(self) -> None:
+        """
+        Load key attributes from fingerprint cache, public key file or with ssh-keygen -l command
+        """
+        if self.__load_cached_key_attributes__():
+            return
+        try:
+            stdout, _stderr = run_command_lineoutput(*self.__key_info_command__)
+        except CommandError as error:
+            raise SSHKeyError(f'Error loading SSH key attributes: {error}') from error
+        self.__set_key_info_output__(stdout)
 
     @property
     def public_key_file_path(self) -> Path:
@@ -63,6 +177,30 @@ class SSHKeyFile(SSHKeyLoader):
         """
         return self.public_key_file_path.is_file() if self.public_key_file_path is not None else False
 
+    @property
+    def encrypted(self) -> bool:
+        """
+        Check if the private key file is protected with a passphrase
+
+        Key files that can't be read are reported as encrypted
+        """
+        try:
+            lines = self.path.read_text(encoding='utf-8').strip().splitlines()
+        except (OSError, ValueError):
+            return True
+        if not lines or lines[0] == PKCS8_ENCRYPTED_HEADER:
+            return True
+        if lines[0] == OPENSSH_PRIVATE_KEY_HEADER:
+            try:
+                data = b64decode(''.join(lines[1:-1]))
+                if not data.startswith(OPENSSH_PRIVATE_KEY_MAGIC):
+                    return True
+                return WireFormatReader(data[len(OPENSSH_PRIVATE_KEY_MAGIC):]).read_text() != \
+                    OPENSSH_PRIVATE_KEY_NO_CIPHER
+            except (ValueError, SSHKeyError):
+                return True
+        return PEM_ENCRYPTED_HEADER in lines
+
     @property
     def public_key(self) -> PublicKey:
         """
@@ -79,23 +217,13 @@ class SSHKeyFile(SSHKeyLoader):
         """
         Unlad SSH key from agent
         """
-        try:
-            run_command('ssh-add', '-d', str(self.path))
-        except CommandError as error:
-            raise SSHKeyError(f'Error unloading key from SSH agent: {error}') from error
+        unload_key_files_from_agent([self])
 
     def load_to_agent(self, expire: Optional[bool] = None) -> None:
         """
         Load SSH key to agent
         """
-        if expire:
-            command = ('ssh-add', '-t', str(expire), str(self.path))
-        else:
-            command = ('ssh-add', str(self.path))
-        try:
-            run_command(*command)
-        except CommandError as error:
-            raise SSHKeyError(f'Error loading key to SSH agent: {error}') from error
+        load_key_files_to_agent([self], expire=expire)
 
     def generate_public_key_file(self, filename: Optional[str] = None, force: bool = False) -> Path:
         """
@@ -129,3 +257,43 @@ class SSHKeyFile(SSHKeyLoader):
             except OSError as error:
                 raise SSHKeyError(f'Error exporting public key file to {filename}: {error}') from error
         return filename
+
+
+def get_load_key_files_command(keys: List[SSHKeyFile], expire: Optional[bool] = None) -> List[str]:
+    """
+    Return ssh-add command to load SSH keys to agent with specified expiration value
+    """
+    command = ['ssh-add']
+    if expire:
+        command.extend(('-t', str(expire)))
+    command.extend(str(key.path) for key in keys)
+    return command
+
+
+def get_unload_key_files_command(keys: List[SSHKeyFile]) -> List[str]:
+    """
+    Return ssh-add command to unload SSH keys from agent
+    """
+    return ['ssh-add', '-d', *[str(key.path) for key in keys]]
+
+
+def load_key_files_to_agent(keys: List[SSHKeyFile], expire: Optional[bool] = None) -> None:
+    """
+    Load SSH keys to agent with a single ssh-add command
+
+    All keys are loaded with the same expiration value
+    """
+    try:
+        run_command(*get_load_key_files_command(keys, expire))
+    except CommandError as error:
+        raise SSHKeyError(f'Error loading key to SSH agent: {error}') from error
+
+
+def unload_key_files_from_agent(keys: List[SSHKeyFile]) -> None:
+    """
+    Unload SSH keys from agent with a single ssh-add command
+    """
+    try:
+        run_command(*get_unload_key_files_command(keys))
+    except CommandError as error:
+        raise SSHKeyError(f'Error unloading key from SSH agent: {error}') from error
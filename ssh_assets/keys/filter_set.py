@@ -5,123 +5,283 @@
 #
 """
 Module to filter SSH keys loaded in the agent by various methods
+
+Filters added to a filter set are not evaluated until the matching keys are requested. The
+filters are then applied cheapest first, and filters requiring file system or SSH agent
+access are evaluated in a single batch for the keys left by the cheaper filters.
 """
-from fnmatch import fnmatch
+import os
+import re
+
+from collections import defaultdict
+from fnmatch import translate
 from pathlib import Path
-from typing import List, Optional, Union, TYPE_CHECKING
+from typing import Iterable, List, Optional, Pattern, Set, Union, TYPE_CHECKING
 
 from ..configuration.groups import GroupConfiguration
 from ..configuration.keys import SshKeyConfiguration
+from .cache import batch_fingerprint_cache_updates
 
 if TYPE_CHECKING:
     from ssh_assets.session import SshAssetSession
 
 
-def filter_key_groups(session: 'SshAssetSession',
-                      keys: List[SshKeyConfiguration],
-                      groups: List[Union[str, GroupConfiguration]]) -> List[SshKeyConfiguration]:
+def compile_name_patterns(patterns: Iterable[str]) -> Optional[Pattern]:
     """
-    Filter list of keys by key group name
+    Compile list of shell style name patterns to a single regular expression
+
+    Returns
+    -------
+    Compiled regular expression or None if no patterns were given
     """
-    def match_groups(groups: List[str], key) -> bool:
-        """
-        Match key groups to list of groups
-        """
-        for group in groups:
-            if key.name in group.keys:
-                return True
-        return False
+    patterns = list(dict.fromkeys(patterns))
+    if not patterns:
+        return None
+    return re.compile('|'.join(f'(?:{translate(pattern)})' for pattern in patterns))
 
-    if not groups:
-        return list(keys)
 
-    group_matches = []
-    for item in groups:
-        group = session.configuration.groups.get_group_by_name(item)
-        if group:
-            group_matches.append(group)
+def get_available_key_paths(keys: Iterable[SshKeyConfiguration]) -> Set[Path]:
+    """
+    Return paths of key files which exist as regular files
+
+    Key files are checked by listing each key directory once instead of checking each file
+    separately.
 
-    matches = []
+    Returns
+    -------
+    Set of pathlib.Path objects
+    """
+    directories = defaultdict(set)
     for key in keys:
-        if match_groups(group_matches, key):
-            matches.append(key)
-    return matches
+        directories[key.path.parent].add(key.path.name)
 
+    available = set()
+    for directory, names in directories.items():
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.name in names and entry.is_file():
+                        available.add(directory.joinpath(entry.name))
+        except PermissionError:
+            # Directory may allow access to files without allowing listing
+            available.update(directory.joinpath(name) for name in names if directory.joinpath(name).is_file())
+        except OSError:
+            continue
+    return available
 
-def filter_key_names(keys: List[SshKeyConfiguration], names: List[str]) -> List[SshKeyConfiguration]:
+
+class SshKeyFilter:
     """
-    Filter list of keys by key name
+    Base class for SSH key filters in filter set
+
+    Filters are evaluated in order of the cost value. Filters with the batch flag set
+    are prepared with list of candidate keys before matching the keys.
     """
-    def match_keys(patterns: List[str], name: str):
+    cost: int = 0
+    batch: bool = False
+
+    def prepare(self, keys: List[SshKeyConfiguration]) -> None:
         """
-        Match specified key name to list of strings
+        Prepare filter for matching specified keys
         """
-        for pattern in patterns:
-            if fnmatch(name, pattern):
-                return True
-        return False
 
-    if not names:
+    def match(self, key: SshKeyConfiguration) -> bool:
+        """
+        Check if key matches the filter
+        """
+        raise NotImplementedError
+
+    def filter(self, keys: Iterable[SshKeyConfiguration]) -> List[SshKeyConfiguration]:
+        """
+        Return list of keys matching the filter
+        """
+        keys = list(keys)
+        self.prepare(keys)
+        return [key for key in keys if self.match(key)]
+
+
+class SshKeyGroupFilter(SshKeyFilter):
+    """
+    Filter SSH keys by group names
+    """
+    cost = 0
+
+    def __init__(self,
+                 session: 'SshAssetSession',
+                 groups: List[Union[str, GroupConfiguration]]) -> None:
+        self.names = set()
+        for group in session.configuration.groups.get_many(groups):
+            self.names.update(group.keys if group.keys else [])
+
+    def match(self, key: SshKeyConfiguration) -> bool:
+        return key.name in self.names
+
+
+class SshKeyNameFilter(SshKeyFilter):
+    """
+    Filter SSH keys by key name patterns or key file paths
+    """
+    cost = 1
+
+    def __init__(self, names: List[str]) -> None:
+        self.pattern = compile_name_patterns(names)
+        self.paths = {Path(name).expanduser().resolve() for name in names}
+
+    def match(self, key: SshKeyConfiguration) -> bool:
+        if self.pattern is not None and self.pattern.match(key.name):
+            return True
+        return key.path in self.paths
+
+
+class SshKeyAvailableFilter(SshKeyFilter):
+    """
+    Filter SSH keys by key available flag status
+    """
+    cost = 2
+    batch = True
+
+    def __init__(self, available: bool = True) -> None:
+        self.available = available
+        self.paths = set()
+
+    def prepare(self, keys: List[SshKeyConfiguration]) -> None:
+        self.paths = get_available_key_paths(keys)
+
+    def match(self, key: SshKeyConfiguration) -> bool:
+        return (key.path in self.paths) == self.available
+
+
+class SshKeyLoadedFilter(SshKeyFilter):
+    """
+    Filter SSH keys by key loaded flag status
+
+    All keys are checked against the same snapshot of keys loaded to the SSH agent
+    """
+    cost = 3
+    batch = True
+
+    def __init__(self, loaded: bool = True) -> None:
+        self.loaded = loaded
+        self.paths = set()
+        self.agent = None
+
+    def prepare(self, keys: List[SshKeyConfiguration]) -> None:
+        self.paths = get_available_key_paths(keys)
+        self.agent = keys[0].__agent__ if keys else None
+
+    def match(self, key: SshKeyConfiguration) -> bool:
+        loaded = key.path in self.paths and self.agent.contains_hash(key.private_key.hash)
+        return loaded == self.loaded
+
+
+def filter_key_groups(session: 'SshAssetSession',
+                      keys: List[SshKeyConfiguration],
+                      groups: List[Union[str, GroupConfiguration]]) -> List[SshKeyConfiguration]:
+    """
+    Filter list of keys by key group name
+    """
+    if not groups:
         return list(keys)
+    return SshKeyGroupFilter(session, groups).filter(keys)
 
-    paths = [Path(arg).expanduser().resolve() for arg in names]
 
-    matches = []
-    for key in keys:
-        full_path = key.path.expanduser().resolve()
-        if match_keys(names, key.name) or full_path in paths:
-            matches.append(key)
-    return matches
+def filter_key_names(keys: List[SshKeyConfiguration], names: List[str]) -> List[SshKeyConfiguration]:
+    """
+    Filter list of keys by key name
+    """
+    if not names:
+        return list(keys)
+    return SshKeyNameFilter(names).filter(keys)
 
 
 def filter_key_available(keys: List[SshKeyConfiguration], available: bool = True) -> List[SshKeyConfiguration]:
     """
     Filter list of keys by key available flag status
     """
-    return [key for key in keys if key.available == available]
+    return SshKeyAvailableFilter(available).filter(keys)
 
 
 def filter_key_loaded(keys: List[SshKeyConfiguration], loaded: bool = True) -> List[SshKeyConfiguration]:
     """
     Filter list of keys by key loaded flag status
     """
-    return [key for key in keys if key.loaded == loaded]
+    return SshKeyLoadedFilter(loaded).filter(keys)
 
 
-# pylint: disable=too-few-public-methods
 class SshKeyFilterSet:
     """
     SSH key filter set
+
+    Filter methods return a new filter set with the filter added. Keys are filtered only
+    when the keys property is accessed.
     """
     session: 'SshAssetSession'
-    keys: List[SshKeyConfiguration]
 
     def __init__(self,
                  session: 'SshAssetSession',
-                 keys: Optional[List[SshKeyConfiguration]] = None) -> None:
+                 keys: Optional[List[SshKeyConfiguration]] = None,
+                 filters: Optional[List[SshKeyFilter]] = None) -> None:
         self.session = session
-        self.keys = keys if keys is not None else list(self.session.configuration.keys)
+        self.__source_keys__ = keys
+        self.__filters__ = list(filters) if filters is not None else []
+        self.__keys__ = None
+
+    def __add_filter__(self, key_filter: SshKeyFilter) -> 'SshKeyFilterSet':
+        """
+        Return new filter set with specified filter added
+        """
+        return SshKeyFilterSet(self.session, self.__source_keys__, self.__filters__ + [key_filter])
+
+    @property
+    def filters(self) -> List[SshKeyFilter]:
+        """
+        Return filters in the order they are evaluated
+        """
+        return sorted(self.__filters__, key=lambda key_filter: key_filter.cost)
+
+    @property
+    @batch_fingerprint_cache_updates
+    def keys(self) -> List[SshKeyConfiguration]:
+        """
+        Return keys matching all filters in the filter set
+        """
+        if self.__keys__ is None:
+            keys = self.__source_keys__
+            if keys is None:
+                keys = self.session.configuration.keys
+            filters = self.filters
+            simple_filters = [key_filter for key_filter in filters if not key_filter.batch]
+            keys = [key for key in keys if all(key_filter.match(key) for key_filter in simple_filters)]
+            for key_filter in filters:
+                if key_filter.batch and keys:
+                    keys = key_filter.filter(keys)
+            self.__keys__ = keys
+        return self.__keys__
 
     def filter_available(self, available: bool = True) -> 'SshKeyFilterSet':
         """
         Filter keys by 'available' flag value
         """
-        return SshKeyFilterSet(self.session, filter_key_available(self.keys, available))
+        return self.__add_filter__(SshKeyAvailableFilter(available))
 
     def filter_groups(self, groups: List[Union[str, GroupConfiguration]]) -> 'SshKeyFilterSet':
         """
         Filter keys by groups or group names
         """
-        return SshKeyFilterSet(self.session, filter_key_groups(self.session, self.keys, groups))
+        if not groups:
+            return SshKeyFilterSet(self.session, self.__source_keys__, self.__filters__)
+        return self.__add_filter__(SshKeyGroupFilter(self.session, groups))
 
     def filter_loaded(self, loaded: bool = True) -> 'SshKeyFilterSet':
         """
         Filter keys by 'loaded' flag value
         """
-        return SshKeyFilterSet(self.session, filter_key_loaded(self.keys, loaded))
+        return self.__add_filter__(SshKeyLoadedFilter(loaded))
 
     def filter_names(self, names: List[str]) -> 'SshKeyFilterSet':
         """
         Filter keys by names
         """
-        return SshKeyFilterSet(self.session, filter_key_names(self.keys, names))
+        if not names:
+            return SshKeyFilterSet(self.session, self.__source_keys__, self.__filters__)
+        return self.__add_filter__(SshKeyNameFilter(names))
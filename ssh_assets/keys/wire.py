@@ -0,0 +1,202 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+SSH wire format data encoding and public key blob processing
+
+Allows parsing key details and fingerprints from SSH public key blobs without running
+ssh-keygen or ssh-add commands
+"""
+import hashlib
+import struct
+
+from base64 import b64encode
+from typing import Tuple
+
+from ..exceptions import SSHKeyError
+
+from .constants import (
+    KeyHashAlgorithm,
+    ECDSA_CURVE_BITS,
+    ED25519_KEY_BITS,
+    KEY_HASH_ALGORITHM_LABELS,
+    SSH_CERTIFICATE_PUBLIC_KEY_FIELDS,
+    SSH_KEY_BLOB_CERTIFICATE_SUFFIX,
+    SSH_KEY_BLOB_TYPES,
+)
+
+
+class WireFormatReader:
+    """
+    Reader for SSH wire format encoded data as specified in RFC 4251 section 5
+    """
+    data: bytes
+    offset: int
+
+    def __init__(self, data: bytes) -> None:
+        self.data = data
+        self.offset = 0
+
+    def __read__(self, length: int) -> bytes:
+        """
+        Read specified number of bytes from data
+        """
+        end = self.offset + length
+        if end > len(self.data):
+            raise SSHKeyError('Unexpected end of SSH wire format data')
+        value = self.data[self.offset:end]
+        self.offset = end
+        return value
+
+    @property
+    def remaining(self) -> int:
+        """
+        Return number of bytes not yet read from data
+        """
+        return len(self.data) - self.offset
+
+    def read_byte(self) -> int:
+        """
+        Read a single byte as integer
+        """
+        return self.__read__(1)[0]
+
+    def read_uint32(self) -> int:
+        """
+        Read unsigned 32 bit integer
+        """
+        return struct.unpack('>I', self.__read__(4))[0]
+
+    def read_string(self) -> bytes:
+        """
+        Read length prefixed binary string
+        """
+        return self.__read__(self.read_uint32())
+
+    def read_text(self) -> str:
+        """
+        Read length prefixed binary string as text
+        """
+        return str(self.read_string(), 'utf-8', errors='replace')
+
+    def read_mpint(self) -> int:
+        """
+        Read multiple precision integer
+        """
+        return int.from_bytes(self.read_string(), 'big', signed=True)
+
+
+def pack_uint32(value: int) -> bytes:
+    """
+    Encode unsigned 32 bit integer in SSH wire format
+    """
+    return struct.pack('>I', value)
+
+
+def pack_string(value: bytes) -> bytes:
+    """
+    Encode binary string or text in SSH wire format
+    """
+    if isinstance(value, str):
+        value = bytes(value, 'utf-8')
+    return pack_uint32(len(value)) + value
+
+
+def get_key_blob_fingerprint(key_blob: bytes, hash_algorithm: KeyHashAlgorithm) -> str:
+    """
+    Return fingerprint of SSH public key blob as shown by ssh-keygen and ssh-add, without
+    the hash algorithm prefix
+    """
+    if hash_algorithm == KeyHashAlgorithm.MD5:
+        digest = hashlib.md5(key_blob, usedforsecurity=False).hexdigest()
+        return ':'.join(digest[index:index + 2] for index in range(0, len(digest), 2))
+    if hash_algorithm == KeyHashAlgorithm.SHA_256:
+        return str(b64encode(hashlib.sha256(key_blob).digest()), 'ascii').rstrip('=')
+    raise SSHKeyError(f'Unsupported SSH key hash algorithm: {hash_algorithm}')
+
+
+def get_plain_key_blob(key_blob: bytes) -> bytes:
+    """
+    Return plain public key blob for SSH certificate blob
+
+    The plain key blob has the plain key type name followed by the public key fields, which
+    follow the nonce in the certificate blob. Other key blobs are returned as they are.
+    """
+    reader = WireFormatReader(key_blob)
+    blob_type = reader.read_text()
+    if not blob_type.endswith(SSH_KEY_BLOB_CERTIFICATE_SUFFIX):
+        return key_blob
+    try:
+        key_type, field_count = SSH_CERTIFICATE_PUBLIC_KEY_FIELDS[blob_type]
+    except KeyError as error:
+        raise SSHKeyError(f'Unsupported SSH certificate type: {blob_type}') from error
+    # Certificate nonce precedes the public key fields
+    reader.read_string()
+    return pack_string(key_type) + b''.join(pack_string(reader.read_string()) for _field in range(field_count))
+
+
+def get_key_blob_details(key_blob: bytes) -> Tuple[str, int]:
+    """
+    Parse key type and key size in bits from SSH public key blob
+
+    Returns
+    -------
+    Key type as shown in ssh-add -l output and key size in bits as integer
+    """
+    reader = WireFormatReader(key_blob)
+    blob_type = reader.read_text()
+    try:
+        key_type = SSH_KEY_BLOB_TYPES[blob_type]
+    except KeyError as error:
+        raise SSHKeyError(f'Unsupported SSH public key type: {blob_type}') from error
+
+    if blob_type.endswith(SSH_KEY_BLOB_CERTIFICATE_SUFFIX):
+        # Certificate nonce precedes the public key fields
+        reader.read_string()
+
+    base_type = key_type.split('-', maxsplit=1)[0]
+    if base_type == 'RSA':
+        # Public exponent precedes the modulus
+        reader.read_mpint()
+        bits = reader.read_mpint().bit_length()
+    elif base_type == 'DSA':
+        bits = reader.read_mpint().bit_length()
+    elif base_type == 'ECDSA':
+        curve = reader.read_text()
+        try:
+            bits = ECDSA_CURVE_BITS[curve]
+        except KeyError as error:
+            raise SSHKeyError(f'Unsupported ECDSA curve in SSH public key: {curve}') from error
+    else:
+        bits = ED25519_KEY_BITS
+    return key_type, bits
+
+
+def get_key_blob_attributes(key_blob: bytes, comment: str, hash_algorithm: KeyHashAlgorithm) -> dict:
+    """
+    Return SSH key attributes for public key blob
+
+    The returned dictionary has same fields as the parsed key info lines from ssh-keygen -l
+    and ssh-add -l commands. Fingerprint of a certificate is calculated from the plain public
+    key in the certificate.
+    """
+    key_type, bits = get_key_blob_details(key_blob)
+    return {
+        'bits': bits,
+        'hash_algorithm': KEY_HASH_ALGORITHM_LABELS[hash_algorithm],
+        'hash': get_key_blob_fingerprint(get_plain_key_blob(key_blob), hash_algorithm),
+        'comment': str(comment),
+        'key_type': key_type,
+    }
+
+
+def format_key_info_line(attributes: dict) -> str:
+    """
+    Format SSH key attributes to key info line in same format as ssh-add -l output
+    """
+    return (
+        f'{attributes["bits"]} {attributes["hash_algorithm"]}:{attributes["hash"]} '
+        f'{attributes["comment"]} ({attributes["key_type"]})'
+    )
@@ -0,0 +1,43 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Lazy attribute imports for package __init__ modules
+
+Packages export their public classes without importing the implementing modules when the
+package is imported. The module is imported when the attribute is first accessed, so for
+example importing ssh_assets.configuration.groups does not load the YAML configuration
+loader.
+"""
+from importlib import import_module
+from typing import Any, Callable, Dict, List, Tuple
+
+
+def lazy_attributes(package: str, attributes: Dict[str, str]) -> Tuple[Callable[[str], Any], Callable[[], List[str]]]:
+    """
+    Return module __getattr__ and __dir__ functions for a package
+
+    The attributes dictionary maps exported attribute names to relative names of the modules
+    implementing them. Imported attributes are stored to the package namespace, so each
+    attribute is looked up only once.
+
+    Returns
+    -------
+    Tuple of __getattr__ and __dir__ functions for the package module
+    """
+    namespace = import_module(package).__dict__
+
+    def getattr_lazy(name: str) -> Any:
+        module = attributes.get(name, None)
+        if module is None:
+            raise AttributeError(f'module {package} has no attribute {name}')
+        value = getattr(import_module(module, package), name)
+        namespace[name] = value
+        return value
+
+    def dir_lazy() -> List[str]:
+        return sorted(set(namespace) | set(attributes))
+
+    return getattr_lazy, dir_lazy
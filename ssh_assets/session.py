@@ -28,6 +28,8 @@ class SshAssetSession:
 
     def __init__(self, configuration_file: Optional[Union[Path, str]] = None) -> None:
         configuration_file = configuration_file if configuration_file is not None else USER_CONFIGURATION_FILE
+        self.__agent__ = None
+        self.__user_authorized_keys__ = None
         self.configuration = SshAssetsConfiguration(self, configuration_file)
 
     @property
@@ -35,18 +37,34 @@ class SshAssetSession:
         """
         Return SSH agent object
 
-        This is initialized separately on each call intentionally to trigger lookup for loaded keys
+        The agent object is shared by the session. Keys loaded to the agent are listed on first
+        access and the listing is updated when keys are loaded or unloaded with the session. Call
+        invalidate_agent() to list the keys again.
         """
-        return SshAgent(self)
+        if self.__agent__ is None:
+            self.__agent__ = SshAgent(self)
+        return self.__agent__
+
+    def invalidate_agent(self) -> None:
+        """
+        Invalidate the snapshot of keys loaded to the SSH agent
+        """
+        if self.__agent__ is not None:
+            self.__agent__.invalidate()
 
     @property
     def user_authorized_keys(self) -> AuthorizedKeys:
         """
         Return SSH authorized keys parser object for user default authorized keys file
 
-        This is initialized separately on each call intentionally to trigger lookup for loaded keys
+        The object is shared by the session. If the file was modified after it was loaded,
+        the keys are loaded again on next access
         """
-        return AuthorizedKeys()
+        if self.__user_authorized_keys__ is None:
+            self.__user_authorized_keys__ = AuthorizedKeys()
+        elif self.__user_authorized_keys__.modified:
+            self.__user_authorized_keys__.clear()
+        return self.__user_authorized_keys__
 
     @property
     def key_filter_set(self) -> SshKeyFilterSet:
@@ -0,0 +1,323 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Subprocess dispatcher with call accounting and tracing
+
+All commands run by ssh_assets are run with run_command and run_command_lineoutput functions
+in this module, which wrap the sys_toolkit.subprocess functions. When profiling is enabled
+in the dispatcher, calls are counted and timed by command and calling function. Trace
+handlers receive an event for each command run, for example to write JSON lines with
+JsonLinesTraceHandler.
+
+Event fields follow the span model used by tracing systems: name, start_time, end_time,
+duration, status and attributes with the command arguments and the caller.
+"""
+import json
+import os
+import sys
+import threading
+import time
+
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, TextIO, Tuple
+
+from sys_toolkit import subprocess
+
+# Modules skipped when looking for the function running a command. Frames of asyncio event
+# loop are skipped for commands run directly as asyncio tasks.
+DISPATCHER_MODULES = frozenset({
+    __name__,
+    'contextlib',
+    'ssh_assets.aio.subprocess',
+})
+DISPATCHER_MODULE_PREFIXES = ('asyncio.',)
+
+
+def get_command_name(args: Sequence[str]) -> str:
+    """
+    Return name of the program in command arguments
+    """
+    return os.path.basename(str(args[0])) if args else ''
+
+
+def get_caller() -> str:
+    """
+    Return module and qualified function name of the function running a command
+    """
+    # pylint: disable=protected-access
+    frame = sys._getframe(1)
+    while frame is not None:
+        module = frame.f_globals.get('__name__', '')
+        if module not in DISPATCHER_MODULES and not module.startswith(DISPATCHER_MODULE_PREFIXES):
+            code = frame.f_code
+            return f'{module}.{getattr(code, "co_qualname", code.co_name)}'
+        frame = frame.f_back
+    return ''
+
+
+class SubprocessCommandStatistics:
+    """
+    Statistics for commands run with same program by same caller
+    """
+    command: str
+    caller: str
+    count: int
+    errors: int
+    total_time: float
+    max_time: float
+
+    def __init__(self, command: str, caller: str) -> None:
+        self.command = command
+        self.caller = caller
+        self.count = 0
+        self.errors = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+
+    def __repr__(self) -> str:
+        return f'{self.command} {self.caller} {self.count}'
+
+    def add(self, duration: float, error: bool = False) -> None:
+        """
+        Add a command run to the statistics
+        """
+        self.count += 1
+        self.total_time += duration
+        self.max_time = max(self.max_time, duration)
+        if error:
+            self.errors += 1
+
+    def as_dict(self) -> dict:
+        """
+        Return statistics as dictionary
+        """
+        return {
+            'command': self.command,
+            'caller': self.caller,
+            'count': self.count,
+            'errors': self.errors,
+            'total_time': self.total_time,
+            'max_time': self.max_time,
+        }
+
+
+# pylint: disable=too-few-public-methods
+class JsonLinesTraceHandler:
+    """
+    Trace handler writing command trace events as JSON lines to a stream
+    """
+    stream: TextIO
+
+    def __init__(self, stream: TextIO) -> None:
+        self.stream = stream
+        self.__lock__ = threading.Lock()
+
+    def __call__(self, event: dict) -> None:
+        line = json.dumps(event, separators=(',', ':'), default=str)
+        with self.__lock__:
+            self.stream.write(f'{line}\n')
+            self.stream.flush()
+
+
+class SubprocessDispatcher:
+    """
+    Dispatcher for commands run by ssh_assets
+
+    Accounting is disabled by default. Commands are counted and timed when profiling is
+    enabled or any trace handlers are registered.
+    """
+    enabled: bool
+    trace_handlers: List[Callable[[dict], None]]
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.trace_handlers = []
+        self.__statistics__: Dict[Tuple[str, str], SubprocessCommandStatistics] = {}
+        self.__lock__ = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f'subprocess dispatcher {self.call_count} calls'
+
+    @property
+    def active(self) -> bool:
+        """
+        Check if command runs are accounted
+        """
+        return self.enabled or bool(self.trace_handlers)
+
+    @property
+    def statistics(self) -> List[SubprocessCommandStatistics]:
+        """
+        Return command statistics ordered by total time spent running the commands
+        """
+        with self.__lock__:
+            items = list(self.__statistics__.values())
+        return sorted(items, key=lambda item: (-item.total_time, item.command, item.caller))
+
+    @property
+    def call_count(self) -> int:
+        """
+        Return total number of accounted commands
+        """
+        return sum(item.count for item in self.statistics)
+
+    @property
+    def total_time(self) -> float:
+        """
+        Return total wall time of accounted commands in seconds
+        """
+        return sum(item.total_time for item in self.statistics)
+
+    def enable(self) -> None:
+        """
+        Enable counting and timing commands
+        """
+        self.enabled = True
+
+    def disable(self) -> None:
+        """
+        Disable counting and timing commands. Collected statistics are kept.
+        """
+        self.enabled = False
+
+    def reset(self) -> None:
+        """
+        Clear collected statistics
+        """
+        with self.__lock__:
+            self.__statistics__ = {}
+
+    @contextmanager
+    def profile(self) -> Iterator['SubprocessDispatcher']:
+        """
+        Context manager to collect statistics for commands run in the context
+
+        Statistics are reset when entering the context
+        """
+        enabled = self.enabled
+        self.reset()
+        self.enable()
+        try:
+            yield self
+        finally:
+            self.enabled = enabled
+
+    def add_trace_handler(self, handler: Callable[[dict], None]) -> None:
+        """
+        Register a callback to receive trace events for commands
+        """
+        if handler not in self.trace_handlers:
+            self.trace_handlers.append(handler)
+
+    def remove_trace_handler(self, handler: Callable[[dict], None]) -> None:
+        """
+        Unregister a trace event callback
+        """
+        if handler in self.trace_handlers:
+            self.trace_handlers.remove(handler)
+
+    def __record__(self,
+                   args: Sequence[str],
+                   caller: str,
+                   start_time: float,
+                   duration: float,
+                   error: Optional[BaseException]) -> None:
+        """
+        Record a command run to statistics and send the trace event to trace handlers
+        """
+        command = get_command_name(args)
+        if self.enabled:
+            with self.__lock__:
+                statistics = self.__statistics__.get((command, caller), None)
+                if statistics is None:
+                    statistics = SubprocessCommandStatistics(command, caller)
+                    self.__statistics__[(command, caller)] = statistics
+                statistics.add(duration, error is not None)
+        if not self.trace_handlers:
+            return
+        event = {
+            'name': command,
+            'start_time': start_time,
+            'end_time': start_time + duration,
+            'duration': duration,
+            'status': 'error' if error is not None else 'ok',
+            'attributes': {
+                'command': [str(arg) for arg in args],
+                'caller': caller,
+                'pid': os.getpid(),
+                'thread': threading.current_thread().name,
+            },
+        }
+        if error is not None:
+            event['attributes']['error'] = str(error)
+        for handler in list(self.trace_handlers):
+            handler(event)
+
+    @contextmanager
+    def trace(self, args: Sequence[str]) -> Iterator[None]:
+        """
+        Context manager to account a command run in the context
+        """
+        if not self.active:
+            yield
+            return
+        caller = get_caller()
+        start_time = time.time()
+        start = time.perf_counter()
+        error = None
+        try:
+            yield
+        except BaseException as exception:
+            error = exception
+            raise
+        finally:
+            self.__record__(args, caller, start_time, time.perf_counter() - start, error)
+
+    def format_summary(self) -> List[str]:
+        """
+        Return summary of command statistics as text lines
+        """
+        statistics = self.statistics
+        lines = [
+            f'Subprocess calls: {sum(item.count for item in statistics)} '
+            f'total time {sum(item.total_time for item in statistics):.3f}s'
+        ]
+        if statistics:
+            lines.append(f'{"count":>7} {"errors":>7} {"total":>9} {"max":>9}  {"command":16} caller')
+        for item in statistics:
+            lines.append(
+                f'{item.count:7d} {item.errors:7d} {item.total_time:8.3f}s {item.max_time:8.3f}s  '
+                f'{item.command:16} {item.caller}'
+            )
+        return lines
+
+
+SUBPROCESS_DISPATCHER = SubprocessDispatcher()
+
+
+def run_command(*args: str, **kwargs: Any) -> Tuple[bytes, bytes]:
+    """
+    Run command with sys_toolkit.subprocess.run_command, accounting the call in dispatcher
+
+    Returns
+    -------
+    Command stdout and stderr as bytes
+    """
+    with SUBPROCESS_DISPATCHER.trace(args):
+        return subprocess.run_command(*args, **kwargs)
+
+
+def run_command_lineoutput(*args: str, **kwargs: Any) -> Tuple[List[str], List[str]]:
+    """
+    Run command with sys_toolkit.subprocess.run_command_lineoutput, accounting the call in
+    dispatcher
+
+    Returns
+    -------
+    Command stdout and stderr as lists of lines
+    """
+    with SUBPROCESS_DISPATCHER.trace(args):
+        return subprocess.run_command_lineoutput(*args, **kwargs)
@@ -0,0 +1,230 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Unit tests for ssh_assets.aio.agent module
+"""
+import asyncio
+
+import pytest
+
+from sys_toolkit.exceptions import CommandError
+from sys_toolkit.tests.mock import MockCalledMethod, MockException, MockReturnFalse
+
+from ssh_assets.aio.agent import AsyncSshAgent
+from ssh_assets.duration import Duration
+from ssh_assets.exceptions import SSHKeyError
+from ssh_assets.keys.agent import SshAgent
+from ssh_assets.keys.constants import SshAgentMessage, SshKeyLoadStatus, SshKeyUnloadStatus
+from ssh_assets.session import SshAssetSession
+
+from ..utils import MockAsyncMethod
+
+
+# pylint: disable=unused-argument
+def test_aio_agent_list_keys(mock_basic_config, mock_agent_socket, mock_agent_key_list):
+    """
+    Test listing keys loaded to the agent with asyncio agent
+    """
+    session = SshAssetSession()
+    agent = AsyncSshAgent(session.agent)
+    assert repr(agent) == str(mock_agent_socket.path)
+    keys = asyncio.run(agent.get_keys())
+    assert len(keys) == len(mock_agent_key_list)
+
+    # The listing is shared with the session agent
+    assert len(session.agent) == len(mock_agent_key_list)
+    assert asyncio.run(agent.get_keys()) == keys
+    assert mock_agent_socket.count_requests(SshAgentMessage.REQUEST_IDENTITIES) == 1
+
+
+# pylint: disable=unused-argument
+def test_aio_agent_list_keys_ssh_add(mock_basic_config, mock_agent_key_list, monkeypatch):
+    """
+    Test listing keys loaded to the agent with asyncio agent using ssh-add
+    """
+    mock_command = MockCalledMethod(return_value=(mock_agent_key_list, []))
+    monkeypatch.setattr('ssh_assets.aio.agent.run_command_lineoutput', MockAsyncMethod(mock_command))
+    agent = AsyncSshAgent(SshAgent(SshAssetSession(), use_ssh_add=True))
+    assert [str(key) for key in asyncio.run(agent.get_keys())] == mock_agent_key_list
+    assert mock_command.args[0][:2] == ('ssh-add', '-E')
+
+    monkeypatch.setattr(
+        'ssh_assets.aio.agent.run_command_lineoutput',
+        MockAsyncMethod(MockException(CommandError))
+    )
+    with pytest.raises(SSHKeyError):
+        asyncio.run(agent.update())
+    assert agent.agent.__requires_reload__ is True
+
+
+def test_aio_agent_list_keys_error(mock_basic_config, mock_agent_dummy_env):
+    """
+    Test errors listing keys loaded to the agent with asyncio agent
+    """
+    agent = AsyncSshAgent(SshAssetSession().agent)
+    with pytest.raises(SSHKeyError):
+        asyncio.run(agent.get_keys())
+
+
+# pylint: disable=unused-argument
+def test_aio_agent_load_keys(mock_basic_config, mock_agent_socket, mock_agent_no_keys, monkeypatch):
+    """
+    Test loading keys to the agent with asyncio agent
+    """
+    mock_command = MockCalledMethod()
+    monkeypatch.setattr('ssh_assets.aio.agent.run_command', MockAsyncMethod(mock_command))
+    session = SshAssetSession()
+    agent = AsyncSshAgent(session.agent)
+    keys = session.agent.configured_keys
+    keys.get_key_by_name('noexpire').expire = Duration('1d')
+
+    results = asyncio.run(agent.load_keys_to_agent(load_all_keys=True))
+    assert [result.key for result in results] == list(keys)
+    statuses = [result.status for result in results]
+    assert statuses.count(SshKeyLoadStatus.LOADED) == 3
+    assert statuses.count(SshKeyLoadStatus.UNAVAILABLE) == 1
+    assert mock_command.call_count == 2
+    assert sorted(args[:3] for args in mock_command.args) == [('ssh-add', '-t', '1d'), ('ssh-add', '-t', '1h')]
+
+    results = asyncio.run(agent.load_keys_to_agent(load_all_keys=True))
+    assert mock_command.call_count == 2
+    assert [result.status for result in results].count(SshKeyLoadStatus.ALREADY_LOADED) == 3
+    assert mock_agent_socket.count_requests(SshAgentMessage.REQUEST_IDENTITIES) == 1
+
+
+# pylint: disable=unused-argument
+def test_aio_agent_load_unload_keys_not_blocking(
+        mock_basic_config, mock_agent_socket, mock_agent_no_keys, monkeypatch, mock_blocking_calls):
+    """
+    Test loading and unloading keys with asyncio agent does not check key files or access the
+    fingerprint cache in the event loop thread
+    """
+    monkeypatch.setattr('ssh_assets.aio.agent.run_command', MockAsyncMethod(MockCalledMethod()))
+    session = SshAssetSession()
+    agent = AsyncSshAgent(session.agent)
+    keys = list(session.agent.configured_keys)
+
+    asyncio.run(agent.load_keys_to_agent(load_all_keys=True))
+    asyncio.run(agent.unload_keys_from_agent(keys))
+    assert mock_blocking_calls == []
+
+
+# pylint: disable=unused-argument
+def test_aio_agent_load_keys_batch_error(mock_basic_config, mock_agent_socket, mock_agent_no_keys, monkeypatch):
+    """
+    Test loading keys with asyncio agent when loading a batch of keys fails for one key
+    """
+    def mock_run_command(*args):
+        if any('RFC4716' in arg for arg in args):
+            raise CommandError('Error loading key')
+
+    monkeypatch.setattr('ssh_assets.aio.agent.run_command', MockAsyncMethod(mock_run_command))
+    session = SshAssetSession()
+    keys = session.agent.configured_keys
+    keys.get_key_by_name('noexpire').expire = Duration('1d')
+
+    agent = AsyncSshAgent(session.agent, max_concurrency=1)
+    results = {result.key.name: result for result in asyncio.run(agent.load_keys_to_agent(load_all_keys=True))}
+    assert results['noexpire'].status == SshKeyLoadStatus.LOADED
+    assert results['manual'].status == SshKeyLoadStatus.LOADED
+    assert results['test'].status == SshKeyLoadStatus.FAILED
+    assert results['test'].error is not None
+    assert keys.get_key_by_name('test').loaded is False
+
+
+# pylint: disable=unused-argument
+def test_aio_agent_unload_keys(mock_basic_config, mock_agent_socket, mock_agent_key_list, monkeypatch):
+    """
+    Test unloading keys from the agent with asyncio agent
+    """
+    mock_command = MockCalledMethod()
+    monkeypatch.setattr('ssh_assets.aio.agent.run_command', MockAsyncMethod(mock_command))
+    session = SshAssetSession()
+    agent = AsyncSshAgent(session.agent)
+    keys = session.agent.configured_keys
+
+    assert asyncio.run(agent.unload_keys_from_agent()) == []
+    results = asyncio.run(agent.unload_keys_from_agent(keys=keys))
+    assert [result.key for result in results] == list(keys)
+    statuses = [result.status for result in results]
+    assert statuses.count(SshKeyUnloadStatus.UNLOADED) == 3
+    assert statuses.count(SshKeyUnloadStatus.UNAVAILABLE) == 1
+    assert mock_command.call_count == 0
+    assert mock_agent_socket.count_requests(SshAgentMessage.REMOVE_IDENTITY) == 3
+    assert len(session.agent) == len(mock_agent_key_list) - 3
+
+    asyncio.run(agent.unload_keys_from_agent(unload_all_keys=True))
+    assert mock_agent_socket.count_requests(SshAgentMessage.REMOVE_ALL_IDENTITIES) == 1
+    assert len(session.agent) == 0
+
+
+# pylint: disable=unused-argument
+def test_aio_agent_unload_keys_ssh_add(mock_basic_config, mock_agent_key_list, monkeypatch):
+    """
+    Test unloading keys from the agent with asyncio agent using ssh-add
+    """
+    def mock_run_command(*args):
+        if any('RFC4716' in arg for arg in args):
+            raise CommandError('Error unloading key')
+
+    mock_command = MockCalledMethod(return_value=(mock_agent_key_list, []))
+    monkeypatch.setattr('ssh_assets.aio.agent.run_command_lineoutput', MockAsyncMethod(mock_command))
+    monkeypatch.setattr('ssh_assets.aio.agent.run_command', MockAsyncMethod(mock_run_command))
+    agent = AsyncSshAgent(SshAgent(SshAssetSession(), use_ssh_add=True))
+    results = {
+        result.key.name: result
+        for result in asyncio.run(agent.unload_keys_from_agent(keys=agent.agent.configured_keys))
+    }
+    assert results['noexpire'].status == SshKeyUnloadStatus.UNLOADED
+    assert results['manual'].status == SshKeyUnloadStatus.UNLOADED
+    assert results['test'].status == SshKeyUnloadStatus.FAILED
+    assert results['missing'].status == SshKeyUnloadStatus.UNAVAILABLE
+
+    asyncio.run(agent.unload_all_keys())
+    monkeypatch.setattr('ssh_assets.aio.agent.run_command', MockAsyncMethod(MockException(CommandError)))
+    with pytest.raises(SSHKeyError):
+        asyncio.run(agent.unload_all_keys())
+
+
+# pylint: disable=unused-argument
+def test_aio_agent_unload_keys_protocol_errors(
+        mock_basic_config, mock_agent_socket, mock_agent_key_list, monkeypatch):
+    """
+    Test unloading keys with asyncio agent when the agent refuses requests
+    """
+    session = SshAssetSession()
+    agent = AsyncSshAgent(session.agent)
+    keys = session.agent.configured_keys[:1]
+
+    monkeypatch.setattr(
+        'ssh_assets.aio.agent_client.AsyncSshAgentClient.remove_identity',
+        MockAsyncMethod(MockReturnFalse())
+    )
+    results = asyncio.run(agent.unload_keys_from_agent(keys=keys))
+    assert results[0].status == SshKeyUnloadStatus.FAILED
+
+    monkeypatch.setattr(
+        'ssh_assets.aio.agent_client.AsyncSshAgentClient.remove_identity',
+        MockAsyncMethod(MockException(SSHKeyError))
+    )
+    results = asyncio.run(agent.unload_keys_from_agent(keys=keys))
+    assert results[0].status == SshKeyUnloadStatus.FAILED
+
+    monkeypatch.setattr(
+        'ssh_assets.aio.agent_client.AsyncSshAgentClient.connect',
+        MockAsyncMethod(MockException(SSHKeyError))
+    )
+    results = asyncio.run(agent.unload_keys_from_agent(keys=keys))
+    assert results[0].status == SshKeyUnloadStatus.FAILED
+    with pytest.raises(SSHKeyError):
+        asyncio.run(agent.unload_all_keys())
+
+    monkeypatch.setattr(
+        'ssh_assets.aio.agent_client.AsyncSshAgentClient.remove_all_identities',
+        MockAsyncMethod(MockReturnFalse())
+    )
+    with pytest.raises(SSHKeyError):
+        asyncio.run(agent.unload_all_keys())
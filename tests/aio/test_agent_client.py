@@ -0,0 +1,77 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Unit tests for ssh_assets.aio.agent_client module
+"""
+import asyncio
+
+import pytest
+
+from ssh_assets.aio.agent_client import AsyncSshAgentClient
+from ssh_assets.exceptions import SSHKeyError
+from ssh_assets.keys.constants import SshAgentMessage
+
+from ..conftest import MOCK_AGENT_KEY_COUNT
+
+
+# pylint: disable=unused-argument
+def test_aio_agent_client_no_socket(mock_agent_delete_socket_env):
+    """
+    Test asyncio agent client without SSH agent socket
+    """
+    client = AsyncSshAgentClient()
+    assert client.socket_path is None
+    assert repr(client) == 'None'
+    with pytest.raises(SSHKeyError):
+        asyncio.run(client.list_identities())
+
+
+def test_aio_agent_client_missing_socket(mock_agent_dummy_env):
+    """
+    Test asyncio agent client when agent socket does not exist
+    """
+    client = AsyncSshAgentClient()
+    assert client.socket_path == str(mock_agent_dummy_env)
+    with pytest.raises(SSHKeyError):
+        asyncio.run(client.list_identities())
+
+
+# pylint: disable=unused-argument
+def test_aio_agent_client_requests(mock_agent_socket, mock_agent_key_list):
+    """
+    Test sending requests to the SSH agent with asyncio client
+    """
+    async def run_requests(client: AsyncSshAgentClient) -> None:
+        identities = await client.list_identities()
+        assert len(identities) == MOCK_AGENT_KEY_COUNT
+        assert not client.connected
+
+        async with client:
+            assert client.connected
+            assert await client.remove_identity(identities[0][0]) is True
+            assert await client.remove_identity(identities[0][0]) is False
+            assert await client.add_identity(b'key', 'comment', lifetime=60, confirm=True) is True
+        assert not client.connected
+
+        assert len(await client.list_identities()) == MOCK_AGENT_KEY_COUNT - 1
+        assert await client.remove_all_identities() is True
+        assert await client.list_identities() == []
+
+    asyncio.run(run_requests(AsyncSshAgentClient()))
+    assert mock_agent_socket.count_requests(SshAgentMessage.REQUEST_IDENTITIES) == 3
+    assert mock_agent_socket.count_requests(SshAgentMessage.REMOVE_IDENTITY) == 2
+    assert mock_agent_socket.count_requests(SshAgentMessage.ADD_ID_CONSTRAINED) == 1
+    assert len(mock_agent_socket.added) == 1
+
+
+# pylint: disable=unused-argument
+def test_aio_agent_client_unexpected_response(mock_agent_socket):
+    """
+    Test unexpected responses from the SSH agent
+    """
+    client = AsyncSshAgentClient()
+    with pytest.raises(SSHKeyError):
+        asyncio.run(client.__request_success__(SshAgentMessage.REQUEST_IDENTITIES))
@@ -0,0 +1,49 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Unit tests for ssh_assets.aio.authorized_keys module
+"""
+import asyncio
+
+from sys_toolkit.tests.mock import MockCalledMethod
+
+import pytest
+
+from ssh_assets.aio.authorized_keys import update_authorized_keys
+from ssh_assets.authorized_keys import AuthorizedKeys
+
+from ..authorized_keys.constants import EXPECTED_KEYS_COUNT, VALID_AUTHORIZED_KEYS_FILE
+
+
+def test_aio_update_authorized_keys(tmp_path, monkeypatch):
+    """
+    Test loading multiple authorized keys files concurrently
+    """
+    items = [AuthorizedKeys(VALID_AUTHORIZED_KEYS_FILE) for _index in range(4)]
+    missing = AuthorizedKeys(tmp_path.joinpath('missing'))
+    errors = asyncio.run(update_authorized_keys(items + [missing], max_concurrency=2))
+    assert [item for item, _error in errors] == [missing]
+    for item in items:
+        assert len(item) == EXPECTED_KEYS_COUNT
+
+    # Unmodified files are not loaded again
+    mock_update = MockCalledMethod()
+    monkeypatch.setattr('ssh_assets.authorized_keys.loader.AuthorizedKeys.update', mock_update)
+    assert asyncio.run(update_authorized_keys(items)) == []
+    assert mock_update.call_count == 0
+    assert asyncio.run(update_authorized_keys(items, refresh=False)) == []
+    assert mock_update.call_count == len(items)
+
+
+def test_aio_update_authorized_keys_unexpected_error(monkeypatch):
+    """
+    Test unexpected errors loading authorized keys are raised
+    """
+    def mock_update(*args):
+        raise RuntimeError('unexpected')
+    monkeypatch.setattr('ssh_assets.authorized_keys.loader.AuthorizedKeys.update', mock_update)
+    with pytest.raises(RuntimeError):
+        asyncio.run(update_authorized_keys([AuthorizedKeys(VALID_AUTHORIZED_KEYS_FILE)]))
@@ -0,0 +1,96 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Unit tests for ssh_assets.aio.keys module
+"""
+import asyncio
+import shutil
+
+from sys_toolkit.exceptions import CommandError
+from sys_toolkit.tests.mock import MockCalledMethod, MockException
+
+from ssh_assets.aio.keys import load_key_attributes
+from ssh_assets.keys.file import SSHKeyFile
+
+from ..conftest import MOCK_AGENT_OUTPUT, MOCK_TEST_PUBLIC_KEYS
+from ..utils import MockAsyncMethod
+
+
+def test_aio_keys_load_key_attributes_public_keys(monkeypatch):
+    """
+    Test loading key attributes for keys with public key files without running ssh-keygen
+    """
+    mock_command = MockCalledMethod()
+    monkeypatch.setattr('ssh_assets.aio.keys.run_command_lineoutput', MockAsyncMethod(mock_command))
+    keys = [SSHKeyFile(path.with_suffix('')) for path in MOCK_TEST_PUBLIC_KEYS]
+    assert asyncio.run(load_key_attributes(keys + keys[:1])) == []
+    assert mock_command.call_count == 0
+    for key in keys:
+        assert key.__key_attributes__
+
+
+def test_aio_keys_load_key_attributes_ssh_keygen(tmp_path, monkeypatch):
+    """
+    Test loading key attributes with ssh-keygen for keys without public key files
+    """
+    lines = MOCK_AGENT_OUTPUT.read_text(encoding='utf-8').splitlines()
+    keys = []
+    for index, path in enumerate(MOCK_TEST_PUBLIC_KEYS[:3]):
+        filename = tmp_path.joinpath(f'key-{index}')
+        shutil.copyfile(path.with_suffix(''), filename)
+        keys.append(SSHKeyFile(filename))
+
+    mock_command = MockCalledMethod(return_value=(lines[:1], []))
+    monkeypatch.setattr('ssh_assets.aio.keys.run_command_lineoutput', MockAsyncMethod(mock_command))
+    assert asyncio.run(load_key_attributes(keys, max_concurrency=2)) == []
+    assert mock_command.call_count == len(keys)
+    assert all(key.hash == keys[0].hash for key in keys)
+
+    # Attributes are cached in the fingerprint cache
+    keys = [SSHKeyFile(key.path) for key in keys]
+    assert asyncio.run(load_key_attributes(keys)) == []
+    assert mock_command.call_count == len(keys)
+
+
+def test_aio_keys_load_key_attributes_errors(tmp_path, monkeypatch):
+    """
+    Test errors loading key attributes
+    """
+    filename = tmp_path.joinpath('key')
+    shutil.copyfile(MOCK_TEST_PUBLIC_KEYS[0].with_suffix(''), filename)
+    missing = SSHKeyFile(tmp_path.joinpath('missing'))
+    key = SSHKeyFile(filename)
+
+    monkeypatch.setattr(
+        'ssh_assets.aio.keys.run_command_lineoutput',
+        MockAsyncMethod(MockException(CommandError))
+    )
+    errors = asyncio.run(load_key_attributes([missing, key]))
+    assert [item for item, _error in errors] == [missing, key]
+
+    monkeypatch.setattr(
+        'ssh_assets.aio.keys.run_command_lineoutput',
+        MockAsyncMethod(MockCalledMethod(return_value=([], [])))
+    )
+    errors = asyncio.run(load_key_attributes([key]))
+    assert len(errors) == 1
+
+
+def test_aio_keys_load_key_attributes_not_blocking(tmp_path, monkeypatch, mock_blocking_calls):
+    """
+    Test loading key attributes does not read files or lock the fingerprint cache in the
+    event loop thread
+    """
+    lines = MOCK_AGENT_OUTPUT.read_text(encoding='utf-8').splitlines()
+    filename = tmp_path.joinpath('key')
+    shutil.copyfile(MOCK_TEST_PUBLIC_KEYS[0].with_suffix(''), filename)
+    keys = [SSHKeyFile(path.with_suffix('')) for path in MOCK_TEST_PUBLIC_KEYS] + [SSHKeyFile(filename)]
+
+    mock_command = MockCalledMethod(return_value=(lines[:1], []))
+    monkeypatch.setattr('ssh_assets.aio.keys.run_command_lineoutput', MockAsyncMethod(mock_command))
+    assert asyncio.run(load_key_attributes(keys)) == []
+    assert mock_command.call_count == 1
+    assert mock_blocking_calls == []
@@ -0,0 +1,59 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Unit tests for ssh_assets.aio.session module
+"""
+import asyncio
+import shutil
+
+from pathlib import Path
+
+import pytest
+
+from ssh_assets.aio.agent import AsyncSshAgent
+from ssh_assets.aio.session import AsyncSshAssetSession
+from ssh_assets.authorized_keys.constants import DEFAULT_AUTHORIZED_KEYS_FILE
+from ssh_assets.exceptions import SSHKeyError
+
+from ..authorized_keys.constants import EXPECTED_KEYS_COUNT, VALID_AUTHORIZED_KEYS_FILE
+from ..conftest import MOCK_BASIC_CONFIG_AVAILABLE_KEYS_COUNT, MOCK_BASIC_CONFIG_KEYS_COUNT
+
+
+# pylint: disable=unused-argument
+def test_aio_session_attributes(mock_basic_config, mock_agent_key_list):
+    """
+    Test attributes of asyncio SSH assets session
+    """
+    session = AsyncSshAssetSession()
+    assert len(session.configuration.keys) == MOCK_BASIC_CONFIG_KEYS_COUNT
+    assert isinstance(session.agent, AsyncSshAgent)
+    agent = session.agent
+    assert session.agent is agent
+    assert session.agent.agent is session.session.agent
+    assert AsyncSshAssetSession(session=session.session).session is session.session
+
+    assert asyncio.run(session.load_key_attributes()) == []
+    available = [key for key in session.configuration.keys if key.available]
+    assert len(available) == MOCK_BASIC_CONFIG_AVAILABLE_KEYS_COUNT
+    for key in available:
+        assert key.private_key.__key_attributes__
+
+
+def test_aio_session_user_authorized_keys(mock_basic_config, monkeypatch, tmpdir):
+    """
+    Test loading user authorized keys with asyncio session
+    """
+    monkeypatch.setenv('HOME', tmpdir.strpath)
+    path = Path(DEFAULT_AUTHORIZED_KEYS_FILE).expanduser()
+    with pytest.raises(SSHKeyError):
+        asyncio.run(AsyncSshAssetSession().get_user_authorized_keys())
+
+    path.parent.mkdir()
+    shutil.copyfile(VALID_AUTHORIZED_KEYS_FILE, path)
+    session = AsyncSshAssetSession()
+    authorized_keys = asyncio.run(session.get_user_authorized_keys())
+    assert authorized_keys is session.session.user_authorized_keys
+    assert len(authorized_keys) == EXPECTED_KEYS_COUNT
@@ -0,0 +1,55 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Unit tests for ssh_assets.aio.subprocess module
+"""
+import asyncio
+import sys
+
+import pytest
+
+from sys_toolkit.exceptions import CommandError
+
+from ssh_assets.aio.subprocess import parse_output_lines, run_command, run_command_lineoutput
+
+
+def test_aio_subprocess_run_command():
+    """
+    Test running commands as asyncio subprocesses
+    """
+    stdout, stderr = asyncio.run(run_command(sys.executable, '-c', 'print("test")'))
+    assert stdout == b'test\n'
+    assert stderr == b''
+
+    stdout, stderr = asyncio.run(run_command_lineoutput(
+        sys.executable, '-c', 'import sys; print("a\\nb"); sys.exit(1)',
+        expected_return_codes=(0, 1)
+    ))
+    assert stdout == ['a', 'b']
+    assert stderr == []
+
+
+def test_aio_subprocess_run_command_errors(tmp_path):
+    """
+    Test errors running commands as asyncio subprocesses
+    """
+    with pytest.raises(CommandError):
+        asyncio.run(run_command(sys.executable, '-c', 'import sys; sys.exit(1)'))
+    with pytest.raises(CommandError):
+        asyncio.run(run_command(str(tmp_path.joinpath('missing'))))
+    with pytest.raises(CommandError):
+        asyncio.run(run_command(sys.executable, '-V', cwd=str(tmp_path.joinpath('missing'))))
+    with pytest.raises(CommandError):
+        asyncio.run(run_command(sys.executable, '-c', 'import time; time.sleep(10)', timeout=0.1))
+
+
+def test_aio_subprocess_parse_output_lines():
+    """
+    Test parsing command output lines with multiple encodings
+    """
+    assert parse_output_lines(b'a\n\xe4\n', encodings=('utf-8', 'latin1')) == ['a', '\xe4']
+    with pytest.raises(CommandError):
+        parse_output_lines(b'\xe4', encodings=('utf-8',))
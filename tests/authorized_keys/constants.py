@@ -16,3 +16,10 @@ INVALID_BASE64_ENTRY = 'pty ssh-ed25519 info@example.net'
 INVALID_FORMAT_ENTRY = 'AAAAC3NzaC1lZDI1NTE5AAAAIJwd1cg2Uusi9BXiNP041Mav4 ssh-rsa'
 
 VALID_ENTRY = 'pty ssh-ed25519 AAAAC3NzaC1lZDI1NTE5AAAAIJwd1cg2Uusi9BXiNP041Mav4/WBdHPxuALr1iYzUT21 info@example.net'
+
+VALID_ENTRY_SHA256_FINGERPRINT = 'MGQYDcaNR7O8GnZZdPYVzAKpEtPFmrnAQvfjqEhbRpU'
+VALID_ENTRY_MD5_FINGERPRINT = '90:33:fe:5f:09:22:b0:05:cf:29:3d:66:13:8c:e9:78'
+
+# Line with only valid options and no key. Before the authorized keys parser was rewritten,
+# such lines were loaded as entries without key type; they are now rejected as invalid lines.
+MISSING_KEY_ENTRY = 'no-pty,restrict'
@@ -0,0 +1,171 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Unit tests for auditing authorized keys files of multiple users
+"""
+import os
+import pwd
+import shutil
+
+import pytest
+
+from ssh_assets.authorized_keys.audit import (
+    AuthorizedKeysAudit,
+    AuthorizedKeysIndex,
+    audit_authorized_keys_file,
+    discover_glob_authorized_keys_files,
+    discover_user_authorized_keys_files,
+    get_file_owner,
+)
+from ssh_assets.keys.constants import KeyHashAlgorithm
+
+from .constants import EXPECTED_KEYS_COUNT, INVALID_BASE64_ENTRY, VALID_AUTHORIZED_KEYS_FILE, VALID_ENTRY
+
+TEST_USERS = ('alice', 'bob', 'carol')
+
+
+def create_mock_home_directories(monkeypatch, tmp_path):
+    """
+    Create home directories with authorized keys files for test users and mock the password
+    database to return the test users
+    """
+    entries = []
+    for index, user in enumerate(TEST_USERS):
+        home = tmp_path.joinpath('home', user)
+        home.joinpath('.ssh').mkdir(parents=True)
+        if user != 'carol':
+            shutil.copyfile(VALID_AUTHORIZED_KEYS_FILE, home.joinpath('.ssh/authorized_keys'))
+        entries.append(pwd.struct_passwd((user, 'x', 1000 + index, 1000, '', str(home), '/bin/sh')))
+    entries.append(pwd.struct_passwd(('nohome', 'x', 2000, 2000, '', '', '/bin/false')))
+    entries.append(entries[0])
+    monkeypatch.setattr('ssh_assets.authorized_keys.audit.pwd.getpwall', lambda: entries)
+    return tmp_path.joinpath('home')
+
+
+def test_authorized_keys_audit_get_file_owner(tmp_path, monkeypatch):
+    """
+    Test getting owner of a file when the owner is known and unknown
+    """
+    path = tmp_path.joinpath('authorized_keys')
+    path.write_text('', encoding='utf-8')
+    assert get_file_owner(path) == pwd.getpwuid(os.getuid()).pw_name
+
+    monkeypatch.setattr('ssh_assets.authorized_keys.audit.pwd.getpwuid', lambda uid: {}[uid])
+    assert get_file_owner(path) == str(os.getuid())
+
+
+def test_authorized_keys_audit_discover_user_files(monkeypatch, tmp_path):
+    """
+    Test discovering authorized keys files of users from mocked password database
+    """
+    home = create_mock_home_directories(monkeypatch, tmp_path)
+    files = list(discover_user_authorized_keys_files())
+    assert files == [
+        ('alice', home.joinpath('alice/.ssh/authorized_keys')),
+        ('bob', home.joinpath('bob/.ssh/authorized_keys')),
+    ]
+    assert list(discover_user_authorized_keys_files(users=['bob', 'carol'])) == files[1:]
+    assert list(discover_user_authorized_keys_files(filename='.ssh/missing')) == []
+
+
+def test_authorized_keys_audit_discover_glob_files(monkeypatch, tmp_path):
+    """
+    Test discovering authorized keys files with glob patterns
+    """
+    home = create_mock_home_directories(monkeypatch, tmp_path)
+    patterns = [f'{home}/*/.ssh/authorized_keys', f'{home}/alice/.ssh/*']
+    files = list(discover_glob_authorized_keys_files(patterns))
+    assert [path for _user, path in files] == [
+        home.joinpath('alice/.ssh/authorized_keys'),
+        home.joinpath('bob/.ssh/authorized_keys'),
+    ]
+    for user, _path in files:
+        assert user == pwd.getpwuid(os.getuid()).pw_name
+
+
+def test_authorized_keys_audit_file_valid():
+    """
+    Test auditing a valid authorized keys file
+    """
+    result = audit_authorized_keys_file('alice', VALID_AUTHORIZED_KEYS_FILE)
+    assert result['user'] == 'alice'
+    assert result['path'] == str(VALID_AUTHORIZED_KEYS_FILE)
+    assert result['errors'] == []
+    assert len(result['keys']) == EXPECTED_KEYS_COUNT
+    for key in result['keys']:
+        assert key['fingerprint'].startswith('SHA256:')
+        assert isinstance(key['key_type'], str)
+
+    result = audit_authorized_keys_file('alice', VALID_AUTHORIZED_KEYS_FILE, KeyHashAlgorithm.MD5)
+    for key in result['keys']:
+        assert key['fingerprint'].startswith('MD5:')
+
+
+def test_authorized_keys_audit_file_errors(tmp_path):
+    """
+    Test auditing authorized keys files with invalid lines and a missing file
+    """
+    path = tmp_path.joinpath('authorized_keys')
+    path.write_text(f'{VALID_ENTRY}\n{INVALID_BASE64_ENTRY}\n', encoding='utf-8')
+    result = audit_authorized_keys_file('alice', path)
+    assert len(result['keys']) == 1
+    assert result['keys'][0]['options'] == 'pty'
+    assert result['keys'][0]['comment'] == 'info@example.net'
+    assert len(result['errors']) == 1
+
+    result = audit_authorized_keys_file('alice', tmp_path.joinpath('missing'))
+    assert result['keys'] == []
+    assert len(result['errors']) == 1
+
+
+def test_authorized_keys_audit_index():
+    """
+    Test aggregating audit results to an index by fingerprint
+    """
+    index = AuthorizedKeysIndex()
+    assert len(index) == 0
+    assert index.get('SHA256:missing') is None
+
+    result = audit_authorized_keys_file('alice', VALID_AUTHORIZED_KEYS_FILE)
+    index.add(result)
+    index.add(audit_authorized_keys_file('bob', VALID_AUTHORIZED_KEYS_FILE))
+    fingerprints = {key['fingerprint'] for key in result['keys']}
+    assert len(index) == len(fingerprints)
+    for entry in index:
+        assert entry['fingerprint'] in index
+        assert entry['users'] == ['alice', 'bob']
+
+
+@pytest.mark.parametrize('processes', (1, 2))
+def test_authorized_keys_audit_processes(monkeypatch, tmp_path, processes):
+    """
+    Test auditing files of users in current process and with a process pool
+    """
+    create_mock_home_directories(monkeypatch, tmp_path)
+    files = list(discover_user_authorized_keys_files()) * 5
+    audit = AuthorizedKeysAudit(files, processes=processes)
+    assert audit.processes == processes
+    assert isinstance(audit.__repr__(), str)
+
+    results = list(audit)
+    assert len(results) == len(files)
+    assert sorted(result['user'] for result in results) == sorted(user for user, _path in files)
+    for result in results:
+        assert len(result['keys']) == EXPECTED_KEYS_COUNT
+
+    index = audit.build_index()
+    assert len(index) > 0
+    for entry in index:
+        assert entry['users'] == ['alice', 'bob']
+
+
+def test_authorized_keys_audit_default_processes():
+    """
+    Test default number of audit processes
+    """
+    audit = AuthorizedKeysAudit([])
+    assert audit.processes == (os.cpu_count() or 1)
+    assert list(audit) == []
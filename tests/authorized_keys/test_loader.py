@@ -14,10 +14,17 @@ import pytest
 
 from ssh_assets.exceptions import SSHKeyError
 from ssh_assets.authorized_keys import AuthorizedKeys
+from ssh_assets.authorized_keys.public_key import PublicKey
+from ssh_assets.keys.constants import KeyHashAlgorithm
 
 from ..conftest import FILE_NO_PERMISSION
 from .constants import (
+    INVALID_BASE64_ENTRY,
+    MISSING_KEY_ENTRY,
     VALID_AUTHORIZED_KEYS_FILE,
+    VALID_ENTRY,
+    VALID_ENTRY_MD5_FINGERPRINT,
+    VALID_ENTRY_SHA256_FINGERPRINT,
     EXPECTED_KEYS_COUNT,
 )
 
@@ -53,3 +60,147 @@ def test_authorized_keys_loader_file_load_error(tmpdir):
     obj = AuthorizedKeys(path)
     with pytest.raises(SSHKeyError):
         obj.update()
+
+
+def test_authorized_keys_loader_iter_public_keys():
+    """
+    Test iterating public keys in a valid authorized keys file without loading the keys
+    """
+    obj = AuthorizedKeys(VALID_AUTHORIZED_KEYS_FILE)
+    keys = list(obj.iter_public_keys())
+    assert len(keys) == EXPECTED_KEYS_COUNT
+    assert obj.__requires_reload__ is True
+    assert keys == list(obj)
+    for key, item in zip(keys, obj):
+        assert key.options == item.options
+        assert key.comment == item.comment
+    assert list(obj.iter_public_keys(lazy=False)) == keys
+
+
+def test_authorized_keys_loader_iter_lines(tmpdir):
+    """
+    Test iterating lines in authorized keys file without parsing the lines
+    """
+    path = Path(tmpdir.strpath, 'authorized_keys')
+    path.write_text(f'\n# comment\n{VALID_ENTRY}\r\n{INVALID_BASE64_ENTRY}\n', encoding='utf-8')
+    obj = AuthorizedKeys(path)
+    assert list(obj.iter_lines()) == [VALID_ENTRY, INVALID_BASE64_ENTRY]
+    assert obj.__requires_reload__ is True
+
+    with pytest.raises(SSHKeyError):
+        list(AuthorizedKeys(Path(tmpdir.strpath, 'missing')).iter_lines())
+
+
+def test_authorized_keys_loader_iter_public_keys_lazy(tmpdir):
+    """
+    Test iterating public keys with invalid public keys which are detected only when accessed
+    """
+    path = Path(tmpdir.strpath, 'authorized_keys')
+    path.write_text(f'\n# comment\n{INVALID_BASE64_ENTRY}\r\n', encoding='utf-8')
+    keys = list(AuthorizedKeys(path).iter_public_keys())
+    assert len(keys) == 1
+    assert keys[0].line == INVALID_BASE64_ENTRY
+    with pytest.raises(SSHKeyError):
+        keys[0].base64  # pylint: disable=pointless-statement
+
+    obj = AuthorizedKeys(path)
+    with pytest.raises(SSHKeyError):
+        obj.update()
+    assert obj.__requires_reload__ is True
+
+
+def test_authorized_keys_loader_iter_public_keys_empty_file(tmpdir):
+    """
+    Test iterating public keys in an empty authorized keys file
+    """
+    path = Path(tmpdir.strpath, 'authorized_keys')
+    path.write_text('', encoding='utf-8')
+    assert list(AuthorizedKeys(path).iter_public_keys()) == []
+    assert len(AuthorizedKeys(path)) == 0
+
+
+def test_authorized_keys_loader_iter_public_keys_invalid_data(tmpdir):
+    """
+    Test iterating public keys in an authorized keys file with invalid UTF-8 data
+    """
+    path = Path(tmpdir.strpath, 'authorized_keys')
+    path.write_bytes(b'\xff\xfe\n')
+    with pytest.raises(SSHKeyError):
+        list(AuthorizedKeys(path).iter_public_keys())
+
+
+def test_authorized_keys_loader_refresh(tmpdir):
+    """
+    Test refreshing authorized keys reloads only modified files and reuses unchanged keys
+    """
+    path = Path(tmpdir.strpath, 'authorized_keys')
+    shutil.copyfile(VALID_AUTHORIZED_KEYS_FILE, path)
+    obj = AuthorizedKeys(path)
+    assert obj.modified is False
+    assert obj.refresh() is True
+    keys = list(obj)
+    assert len(keys) == EXPECTED_KEYS_COUNT
+
+    assert obj.modified is False
+    assert obj.refresh() is False
+    assert all(a is b for a, b in zip(obj, keys))
+
+    # Replace last key in the file, other keys are not parsed again
+    lines = path.read_text(encoding='utf-8').splitlines()
+    path.write_text('\n'.join(lines[:-1] + [VALID_ENTRY]) + '\n', encoding='utf-8')
+    assert obj.modified is True
+    assert obj.refresh() is True
+    assert len(obj) == EXPECTED_KEYS_COUNT
+    assert all(a is b for a, b in zip(obj[:-1], keys[:-1]))
+    assert obj[-1] is not keys[-1]
+    assert obj[-1].line == VALID_ENTRY
+
+    path.unlink()
+    assert obj.modified is True
+    with pytest.raises(SSHKeyError):
+        obj.refresh()
+
+
+def test_authorized_keys_loader_fingerprint_index(tmpdir):
+    """
+    Test looking up keys in authorized keys file by fingerprint
+    """
+    path = Path(tmpdir.strpath, 'authorized_keys')
+    public_key = VALID_ENTRY.split()[2]
+    lines = VALID_AUTHORIZED_KEYS_FILE.read_text(encoding='utf-8').splitlines()
+    path.write_text('\n'.join(line for line in lines if public_key not in line) + '\n', encoding='utf-8')
+    obj = AuthorizedKeys(path)
+    index = obj.get_fingerprint_index()
+    assert len(obj) > 0
+    assert obj.get_fingerprint_index() is index
+    for key in obj:
+        assert obj.find_by_fingerprint(key.fingerprint()) is index[key.fingerprint()]
+        assert obj.contains(f'SHA256:{key.fingerprint()}')
+        assert obj.contains(f'MD5:{key.fingerprint(KeyHashAlgorithm.MD5)}')
+        assert obj.contains(key.fingerprint(KeyHashAlgorithm.MD5), KeyHashAlgorithm.MD5)
+    assert not obj.contains(VALID_ENTRY_SHA256_FINGERPRINT)
+    assert obj.find_by_fingerprint(VALID_ENTRY_SHA256_FINGERPRINT) is None
+
+    # Index is rebuilt when the file is reloaded or the keys are modified
+    path.write_text(f'{path.read_text(encoding="utf-8")}{VALID_ENTRY}\n', encoding='utf-8')
+    assert obj.refresh() is True
+    assert obj.find_by_fingerprint(VALID_ENTRY_SHA256_FINGERPRINT) is obj[-1]
+    del obj[-1]
+    assert not obj.contains(f'MD5:{VALID_ENTRY_MD5_FINGERPRINT}')
+    obj.append(PublicKey(VALID_ENTRY))
+    assert obj.contains(VALID_ENTRY_SHA256_FINGERPRINT)
+    obj[-1] = obj[0]
+    assert not obj.contains(VALID_ENTRY_SHA256_FINGERPRINT)
+
+
+def test_authorized_keys_loader_line_without_key(tmpdir):
+    """
+    Test loading authorized keys file with a line without key type fails the whole file
+    """
+    path = Path(tmpdir.strpath, 'authorized_keys')
+    path.write_text(f'{VALID_ENTRY}\n{MISSING_KEY_ENTRY}\n', encoding='utf-8')
+    obj = AuthorizedKeys(path)
+    with pytest.raises(SSHKeyError):
+        obj.update()
+    with pytest.raises(SSHKeyError):
+        list(obj.iter_public_keys())
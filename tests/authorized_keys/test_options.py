@@ -6,6 +6,8 @@
 """
 Unit tests for ssh_assets.authorized_keys.options module
 """
+import sys
+
 import pytest
 
 from ssh_assets.exceptions import SSHKeyError
@@ -18,6 +20,8 @@ from ssh_assets.authorized_keys.options import (
     AuthorizedKeyOptionFlag,
     AuthorizedKeyOptionValue,
     parse_option_flag,
+    parse_options,
+    split_options,
 )
 
 DUMMY_VALUE = 'foo=bar baz=zyxxy'
@@ -186,3 +190,62 @@ def test_authorized_keys_option_parser_invalid_flag_value_quoting():
     """
     with pytest.raises(SSHKeyError):
         parse_option_flag(MOCK_INVALID_FLAG_VALUE)
+
+
+def test_authorized_keys_option_parser_options():
+    """
+    Test parsing options string with quoted values containing spaces, commas and escaped quotes
+    """
+    options = parse_options(
+        r'from="10.0.0.1,10.0.0.2",command="echo \"a, b\" c\d",no-X11-forwarding,environment=""'
+    )
+    assert options == [
+        AuthorizedKeyOptionValue('from', '10.0.0.1,10.0.0.2'),
+        AuthorizedKeyOptionValue('command', r'echo "a, b" c\d'),
+        AuthorizedKeyOptionFlag('no-X11-forwarding'),
+        AuthorizedKeyOptionValue('environment', ''),
+    ]
+    assert str(options[1]) == r'command="echo \"a, b\" c\d"'
+    assert parse_options(','.join(str(option) for option in options)) == options
+    assert options[0].option is sys.intern('from')
+    assert parse_options('') == []
+
+    option, rest = parse_option_flag('pty,command="ls"')
+    assert option == AuthorizedKeyOptionFlag('pty')
+    assert rest == 'command="ls"'
+    option, rest = parse_option_flag('command="ls"')
+    assert option == AuthorizedKeyOptionValue('command', 'ls')
+    assert rest is None
+
+
+def test_authorized_keys_option_parser_long_options():
+    """
+    Test parsing options string with long list of values
+    """
+    addresses = ','.join(f'10.0.{index // 256}.{index % 256}' for index in range(10000))
+    options = parse_options(f'from="{addresses}",' + ','.join(['permitopen="localhost:22"'] * 1000))
+    assert len(options) == 1001
+    assert options[0].value == addresses
+
+
+def test_authorized_keys_option_parser_invalid_options():
+    """
+    Test parsing invalid options strings
+    """
+    for value in ('pty,', 'pty,,no-pty', 'command="ls', 'command=ls', 'command="ls"pty', ',pty'):
+        with pytest.raises(SSHKeyError):
+            parse_options(value)
+
+
+def test_authorized_keys_option_split_options():
+    """
+    Test splitting authorized keys line to options and rest of the line
+    """
+    assert split_options('command="ssh-rsa a b" ssh-rsa AAAA comment') == (
+        'command="ssh-rsa a b"', 'ssh-rsa AAAA comment'
+    )
+    assert split_options('pty\\tssh-rsa AAAA') == ('pty\\tssh-rsa', 'AAAA')
+    assert split_options('pty\tssh-rsa AAAA') == ('pty', 'ssh-rsa AAAA')
+    assert split_options('') == ('', '')
+    with pytest.raises(SSHKeyError):
+        split_options('command="ls ssh-rsa AAAA')
@@ -9,14 +9,18 @@ Unit tests for ssh_assets.authorized_keys.public_key module
 import pytest
 
 from ssh_assets.exceptions import SSHKeyError
-from ssh_assets.authorized_keys.options import AuthorizedKeyOptionFlag
+from ssh_assets.authorized_keys.options import AuthorizedKeyOptionFlag, AuthorizedKeyOptionValue
 from ssh_assets.authorized_keys.public_key import PublicKey
+from ssh_assets.keys.constants import KeyHashAlgorithm
 
 from .constants import (
     INVALID_ENTRY,
     INVALID_FORMAT_ENTRY,
     INVALID_BASE64_ENTRY,
+    MISSING_KEY_ENTRY,
     VALID_ENTRY,
+    VALID_ENTRY_MD5_FINGERPRINT,
+    VALID_ENTRY_SHA256_FINGERPRINT,
 )
 
 
@@ -28,6 +32,17 @@ def test_authorized_keys_parser_invalid_missing_key_type():
         PublicKey(INVALID_ENTRY)
 
 
+def test_authorized_keys_parser_options_without_key():
+    """
+    Test parser for entry with valid options but no key type or key is rejected
+    """
+    for line in (MISSING_KEY_ENTRY, MISSING_KEY_ENTRY.replace(',', ' ')):
+        with pytest.raises(SSHKeyError):
+            PublicKey(line)
+        with pytest.raises(SSHKeyError):
+            PublicKey(line, lazy=True)
+
+
 def test_authorized_keys_parser_missing_base64_hash():
     """
     Test parser for trivial, invalid entry in SSH keys: missing base64 hash after key type
@@ -50,3 +65,49 @@ def test_authorized_keys_parser_valid_entry():
     """
     entry = PublicKey(VALID_ENTRY)
     assert entry.options == [AuthorizedKeyOptionFlag('pty')]
+
+
+def test_authorized_keys_parser_lazy_entry():
+    """
+    Test lazy parser for entries in SSH keys data
+    """
+    entry = PublicKey(INVALID_BASE64_ENTRY, lazy=True)
+    assert entry.comment == ''
+    assert entry.options == [AuthorizedKeyOptionFlag('pty')]
+    with pytest.raises(SSHKeyError):
+        entry.base64  # pylint: disable=pointless-statement
+
+    entry = PublicKey(VALID_ENTRY, lazy=True)
+    assert entry.__options__ is None
+    assert entry == PublicKey(VALID_ENTRY)
+    assert entry.options == [AuthorizedKeyOptionFlag('pty')]
+
+
+def test_authorized_keys_parser_quoted_options():
+    """
+    Test parser for entry with quoted option values containing spaces and key type strings
+    """
+    key = VALID_ENTRY.split(maxsplit=1)[1]
+    entry = PublicKey(f'command="ssh-rsa \\"x y\\"",no-pty {key}')
+    assert entry.key_type == PublicKey(VALID_ENTRY).key_type
+    assert entry.comment == 'info@example.net'
+    assert entry.options == [
+        AuthorizedKeyOptionValue('command', 'ssh-rsa "x y"'),
+        AuthorizedKeyOptionFlag('no-pty'),
+    ]
+
+
+def test_authorized_keys_parser_fingerprint(monkeypatch):
+    """
+    Test calculating and caching fingerprints of public key entries
+    """
+    entry = PublicKey(VALID_ENTRY, lazy=True)
+    assert entry.fingerprint() == VALID_ENTRY_SHA256_FINGERPRINT
+    assert entry.fingerprint(KeyHashAlgorithm.MD5) == VALID_ENTRY_MD5_FINGERPRINT
+
+    monkeypatch.setattr('ssh_assets.authorized_keys.public_key.get_key_blob_fingerprint', None)
+    assert entry.fingerprint(KeyHashAlgorithm.SHA_256) == VALID_ENTRY_SHA256_FINGERPRINT
+
+    entry = PublicKey(INVALID_BASE64_ENTRY, lazy=True)
+    with pytest.raises(SSHKeyError):
+        entry.fingerprint()
@@ -0,0 +1,153 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Unit tests for ssh_assets.authorized_keys.writer module
+"""
+import os
+import stat
+
+from pathlib import Path
+
+import pytest
+
+from ssh_assets.authorized_keys import AuthorizedKeys, AuthorizedKeysWriter
+from ssh_assets.authorized_keys.options import AuthorizedKeyOptionFlag, AuthorizedKeyOptionValue
+from ssh_assets.authorized_keys.public_key import PublicKey
+from ssh_assets.authorized_keys.writer import format_options, get_file_digest
+from ssh_assets.exceptions import SSHKeyError
+
+from .constants import (
+    EXPECTED_KEYS_COUNT,
+    INVALID_BASE64_ENTRY,
+    VALID_AUTHORIZED_KEYS_FILE,
+    VALID_ENTRY,
+    VALID_ENTRY_SHA256_FINGERPRINT,
+)
+
+VALID_ENTRY_KEY = VALID_ENTRY.split(maxsplit=1)[1]
+# Mocked valid authorized keys file has one key twice with different options
+UNIQUE_KEYS_COUNT = EXPECTED_KEYS_COUNT - 1
+
+
+def test_authorized_keys_writer_format_options():
+    """
+    Test formatting options in canonical form
+    """
+    options = [
+        AuthorizedKeyOptionFlag('restrict'),
+        AuthorizedKeyOptionValue('command', 'echo "hello"'),
+        AuthorizedKeyOptionFlag('pty'),
+        AuthorizedKeyOptionFlag('restrict'),
+    ]
+    assert format_options(options) == 'restrict,command="echo \\"hello\\"",pty'
+    assert format_options([]) == ''
+
+
+def test_authorized_keys_writer_file_digest(tmp_path):
+    """
+    Test calculating digest of file contents
+    """
+    path = tmp_path.joinpath('authorized_keys')
+    assert get_file_digest(path) is None
+    path.write_bytes(b'')
+    assert get_file_digest(path) is not None
+
+
+def test_authorized_keys_writer_add_remove():
+    """
+    Test adding and removing keys in authorized keys writer
+    """
+    writer = AuthorizedKeysWriter()
+    assert writer.path == Path('~/.ssh/authorized_keys').expanduser()
+    assert len(writer) == 0
+    assert writer.content == ''
+
+    assert writer.add(VALID_ENTRY) is True
+    assert writer.add(f'no-pty {VALID_ENTRY_KEY}') is False
+    assert len(writer) == 1
+    assert isinstance(writer.__repr__(), str)
+    assert PublicKey(VALID_ENTRY) in writer
+    assert VALID_ENTRY_SHA256_FINGERPRINT in writer
+    assert list(writer)[0].line == VALID_ENTRY
+
+    assert writer.add(f'no-pty {VALID_ENTRY_KEY}', replace=True) is True
+    assert writer.content == f'no-pty {VALID_ENTRY_KEY}\n'
+
+    with pytest.raises(SSHKeyError):
+        writer.add(INVALID_BASE64_ENTRY)
+
+    assert writer.remove(PublicKey(VALID_ENTRY)) is True
+    assert writer.remove(VALID_ENTRY_SHA256_FINGERPRINT) is False
+    assert len(writer) == 0
+
+
+def test_authorized_keys_writer_merge():
+    """
+    Test merging keys from multiple sources with duplicate keys
+    """
+    writer = AuthorizedKeysWriter()
+    assert writer.merge_file(VALID_AUTHORIZED_KEYS_FILE) == UNIQUE_KEYS_COUNT
+    assert writer.merge_file(VALID_AUTHORIZED_KEYS_FILE) == 0
+    assert writer.merge(['', '# comment', VALID_ENTRY]) == 0
+    assert len(writer) == UNIQUE_KEYS_COUNT
+
+    authorized_keys = AuthorizedKeys(VALID_AUTHORIZED_KEYS_FILE)
+    lines = writer.content.splitlines()
+    assert lines == [
+        public_key.line.strip() for public_key in authorized_keys.get_fingerprint_index().values()
+    ]
+    assert writer.merge(authorized_keys, replace=True) == EXPECTED_KEYS_COUNT
+    assert len(writer.content.splitlines()) == UNIQUE_KEYS_COUNT
+
+
+def test_authorized_keys_writer_canonicalize_options():
+    """
+    Test writing lines with canonical options
+    """
+    writer = AuthorizedKeysWriter(canonicalize_options=True)
+    writer.add(f'pty,command="ls",pty {VALID_ENTRY_KEY}')
+    assert writer.content == f'pty,command="ls" {VALID_ENTRY_KEY}\n'
+
+    writer = AuthorizedKeysWriter(canonicalize_options=True)
+    writer.add(' '.join(VALID_ENTRY_KEY.split()[:2]))
+    assert writer.content == f'{" ".join(VALID_ENTRY_KEY.split()[:2])}\n'
+
+
+def test_authorized_keys_writer_write(tmp_path):
+    """
+    Test writing authorized keys file and skipping writes of unmodified contents
+    """
+    path = tmp_path.joinpath('authorized_keys')
+    writer = AuthorizedKeysWriter(path)
+    writer.merge_file(VALID_AUTHORIZED_KEYS_FILE)
+    assert writer.write() is True
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+    assert len(AuthorizedKeys(path)) == UNIQUE_KEYS_COUNT
+
+    os.chmod(path, 0o644)
+    inode = os.stat(path).st_ino
+    assert writer.write() is False
+    assert os.stat(path).st_ino == inode
+
+    writer.remove(next(iter(writer)))
+    assert writer.write() is True
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o644
+    assert len(AuthorizedKeys(path)) == UNIQUE_KEYS_COUNT - 1
+    assert list(tmp_path.iterdir()) == [path]
+
+    other = tmp_path.joinpath('other')
+    assert writer.write(other) is True
+    assert other.read_text(encoding='utf-8') == path.read_text(encoding='utf-8')
+
+
+def test_authorized_keys_writer_write_error(tmp_path):
+    """
+    Test writing authorized keys file to a missing directory
+    """
+    writer = AuthorizedKeysWriter(tmp_path.joinpath('missing/authorized_keys'))
+    writer.add(VALID_ENTRY)
+    with pytest.raises(SSHKeyError):
+        writer.write()
@@ -41,3 +41,18 @@ def test_ssh_assets_cli_config_groups_list_basic_config(mock_basic_config, monke
     captured = capsys.readouterr()
     assert captured.err == ''
     assert len(captured.out.splitlines()) == BASIC_CONFIG_GROUPS_COUNT
+
+
+# pylint: disable=unused-argument
+def test_ssh_assets_cli_config_groups_list_names(mock_basic_config, monkeypatch, capsys):
+    """
+    Test running command 'ssh-assets config groups list' with group names
+    """
+    script = SshAssetsScript()
+    testargs = ['ssh-assets', 'groups', 'list', 'unconfigured,demo', 'missing', 'demo']
+    with monkeypatch.context() as context:
+        validate_script_run_exception_with_args(script, context, testargs, exit_code=0)
+
+    captured = capsys.readouterr()
+    assert captured.err == ''
+    assert [line.split()[-1] for line in captured.out.splitlines()] == ['unconfigured', 'demo']
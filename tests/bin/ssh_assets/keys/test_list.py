@@ -6,10 +6,13 @@
 """
 Unit tests for 'ssh-assets keys list' CLI command
 """
+from sys_toolkit.tests.mock import MockException
+
 from cli_toolkit.tests.script import validate_script_run_exception_with_args
 
 from ssh_assets.bin.ssh_assets.main import SshAssetsScript
-from ssh_assets.constants import NO_KEYS_CONFIGURED
+from ssh_assets.constants import NO_KEYS_CONFIGURED, NO_KEYS_MATCH
+from ssh_assets.exceptions import SSHAssetsError
 
 from ....conftest import (
     MOCK_BASIC_CONFIG_AVAILABLE_KEYS_COUNT,
@@ -186,3 +189,47 @@ def test_ssh_assets_cli_keys_list_match_group(mock_basic_config, monkeypatch, ca
     assert captured.err == ''
     # Matches group with 2 keys, but only one matches key names
     assert len(captured.out.splitlines()) == 1
+
+
+# pylint: disable=unused-argument
+def test_ssh_assets_cli_keys_list_daemon(mock_daemon, monkeypatch, capsys):
+    """
+    Test running 'ssh-assets keys list' with keys listed by the ssh-assets daemon
+
+    The output must match listing the keys without the daemon
+    """
+    for args in (
+            [],
+            ['--available', '--autocomplete'],
+            ['--groups', GROUP_MATCH_TEST, KEY_MATCH_MANUAL, KEY_MATCH_TEST],
+            ['--loaded'],
+            ['--loaded', '--autocomplete']):
+        script = SshAssetsScript()
+        testargs = ['ssh-assets', 'keys', 'list', '--no-daemon'] + args
+        with monkeypatch.context() as context:
+            validate_script_run_exception_with_args(script, context, testargs, exit_code=0)
+        expected = capsys.readouterr().out
+
+        script = SshAssetsScript()
+        testargs = ['ssh-assets', 'keys', 'list'] + args
+        with monkeypatch.context() as context:
+            context.setattr('ssh_assets.session.SshAssetSession', MockException(SSHAssetsError))
+            validate_script_run_exception_with_args(script, context, testargs, exit_code=0)
+        captured = capsys.readouterr()
+        assert captured.err == ''
+        assert captured.out == expected
+
+
+# pylint: disable=unused-argument
+def test_ssh_assets_cli_keys_list_daemon_no_match(mock_daemon, monkeypatch, capsys):
+    """
+    Test running 'ssh-assets keys list' with key names not matching keys in ssh-assets daemon
+    """
+    script = SshAssetsScript()
+    testargs = ['ssh-assets', 'keys', 'list', KEY_NO_MATCH]
+    with monkeypatch.context() as context:
+        validate_script_run_exception_with_args(script, context, testargs, exit_code=1)
+
+    captured = capsys.readouterr()
+    assert captured.out == ''
+    assert captured.err.splitlines() == [NO_KEYS_MATCH]
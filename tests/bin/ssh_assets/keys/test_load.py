@@ -6,11 +6,12 @@
 """
 Unit tests for 'ssh-assets load-keys' CLI command
 """
-from sys_toolkit.tests.mock import MockCalledMethod
+from sys_toolkit.tests.mock import MockCalledMethod, MockException
 
 from cli_toolkit.tests.script import validate_script_run_exception_with_args
 
 from ssh_assets.bin.ssh_assets.main import SshAssetsScript
+from ssh_assets.exceptions import SSHKeyError
 
 GROUP_MATCH_TEST = 'demo'
 
@@ -20,7 +21,7 @@ def test_ssh_assets_cli_keys_load_no_args(mock_basic_config, monkeypatch):
     """
     Test running command 'ssh-assets keys load' with no additional arguments
     """
-    mock_method = MockCalledMethod()
+    mock_method = MockCalledMethod(return_value=[])
     monkeypatch.setattr('ssh_assets.keys.agent.SshAgent.load_keys_to_agent', mock_method)
 
     script = SshAssetsScript()
@@ -40,7 +41,7 @@ def test_ssh_assets_cli_keys_load_all_keys(mock_basic_config, monkeypatch):
     """
     Test running command 'ssh-assets keys load' with all keys to load specified explicitly
     """
-    mock_method = MockCalledMethod()
+    mock_method = MockCalledMethod(return_value=[])
     monkeypatch.setattr('ssh_assets.keys.agent.SshAgent.load_keys_to_agent', mock_method)
 
     script = SshAssetsScript()
@@ -60,7 +61,7 @@ def test_ssh_assets_cli_keys_load_in_group(mock_basic_config, monkeypatch):
     """
     Test running command 'ssh-assets keys load' with group name to filter out specific keys
     """
-    mock_method = MockCalledMethod()
+    mock_method = MockCalledMethod(return_value=[])
     monkeypatch.setattr('ssh_assets.keys.agent.SshAgent.load_keys_to_agent', mock_method)
 
     script = SshAssetsScript()
@@ -74,3 +75,16 @@ def test_ssh_assets_cli_keys_load_in_group(mock_basic_config, monkeypatch):
     kwargs = mock_method.kwargs[0]
     assert len(kwargs['keys']) == 2
     assert kwargs['load_all_keys'] is True
+
+
+# pylint: disable=unused-argument
+def test_ssh_assets_cli_keys_load_errors(mock_basic_config, mock_agent_no_keys, monkeypatch):
+    """
+    Test running command 'ssh-assets keys load' with errors loading keys
+    """
+    monkeypatch.setattr('ssh_assets.keys.agent.load_key_files_to_agent', MockException(SSHKeyError))
+
+    script = SshAssetsScript()
+    testargs = ['ssh-assets', 'keys', 'load']
+    with monkeypatch.context() as context:
+        validate_script_run_exception_with_args(script, context, testargs, exit_code=1)
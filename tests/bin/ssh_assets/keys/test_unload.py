@@ -6,7 +6,7 @@
 """
 Unit tests for 'ssh-assets load-keys' CLI command
 """
-from sys_toolkit.tests.mock import MockCalledMethod
+from sys_toolkit.tests.mock import MockCalledMethod, MockReturnFalse
 
 from cli_toolkit.tests.script import validate_script_run_exception_with_args
 
@@ -20,7 +20,7 @@ def test_ssh_assets_cli_keys_unload_invalid_key_name(mock_basic_config, monkeypa
     """
     Test running command 'ssh-assets keys unload' with invalid key name
     """
-    mock_method = MockCalledMethod()
+    mock_method = MockCalledMethod(return_value=[])
     monkeypatch.setattr('ssh_assets.keys.agent.SshAgent.unload_keys_from_agent', mock_method)
 
     script = SshAssetsScript()
@@ -37,7 +37,7 @@ def test_ssh_assets_cli_keys_unload_no_args(mock_basic_config, monkeypatch):
 
     This command will unload any keys (ssh-add -D) from the agent
     """
-    mock_method = MockCalledMethod()
+    mock_method = MockCalledMethod(return_value=[])
     monkeypatch.setattr('ssh_assets.keys.agent.SshAgent.unload_keys_from_agent', mock_method)
 
     script = SshAssetsScript()
@@ -56,7 +56,7 @@ def test_ssh_assets_cli_keys_unload_in_group(mock_basic_config, monkeypatch):
     """
     Test running command 'ssh-assets keys unload' with group name to filter out specific keys
     """
-    mock_method = MockCalledMethod()
+    mock_method = MockCalledMethod(return_value=[])
     monkeypatch.setattr('ssh_assets.keys.agent.SshAgent.unload_keys_from_agent', mock_method)
 
     script = SshAssetsScript()
@@ -70,3 +70,16 @@ def test_ssh_assets_cli_keys_unload_in_group(mock_basic_config, monkeypatch):
     kwargs = mock_method.kwargs[0]
     assert len(kwargs['keys']) == 2
     assert kwargs['unload_all_keys'] is False
+
+
+# pylint: disable=unused-argument
+def test_ssh_assets_cli_keys_unload_errors(mock_basic_config, mock_agent_key_list, monkeypatch):
+    """
+    Test running command 'ssh-assets keys unload' with errors unloading keys
+    """
+    monkeypatch.setattr('ssh_assets.keys.agent_client.SshAgentClient.remove_identity', MockReturnFalse())
+
+    script = SshAssetsScript()
+    testargs = ['ssh-assets', 'keys', 'unload', '--groups', GROUP_MATCH_TEST]
+    with monkeypatch.context() as context:
+        validate_script_run_exception_with_args(script, context, testargs, exit_code=1)
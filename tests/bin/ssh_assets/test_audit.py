@@ -0,0 +1,90 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Unit tests for 'ssh-assets audit' CLI command
+"""
+import json
+import pwd
+import shutil
+
+from cli_toolkit.tests.script import validate_script_run_exception_with_args
+
+from ssh_assets.bin.ssh_assets.main import SshAssetsScript
+
+from ...authorized_keys.constants import EXPECTED_KEYS_COUNT, VALID_AUTHORIZED_KEYS_FILE
+
+
+def create_authorized_keys_files(tmp_path):
+    """
+    Create authorized keys files for two users in temporary directory
+    """
+    for user in ('alice', 'bob'):
+        path = tmp_path.joinpath(user, '.ssh/authorized_keys')
+        path.parent.mkdir(parents=True)
+        shutil.copyfile(VALID_AUTHORIZED_KEYS_FILE, path)
+
+
+def test_ssh_assets_cli_audit_users(monkeypatch, tmp_path, capsys):
+    """
+    Test running command 'ssh-assets audit' for users in mocked password database
+    """
+    create_authorized_keys_files(tmp_path)
+    entries = [
+        pwd.struct_passwd((user, 'x', 1000, 1000, '', str(tmp_path.joinpath(user)), '/bin/sh'))
+        for user in ('alice', 'bob')
+    ]
+    monkeypatch.setattr('ssh_assets.authorized_keys.audit.pwd.getpwall', lambda: entries)
+
+    script = SshAssetsScript()
+    testargs = ['ssh-assets', 'audit', '--processes', '1', 'alice']
+    with monkeypatch.context() as context:
+        validate_script_run_exception_with_args(script, context, testargs, exit_code=0)
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 1
+    result = json.loads(lines[0])
+    assert result['user'] == 'alice'
+    assert len(result['keys']) == EXPECTED_KEYS_COUNT
+
+
+def test_ssh_assets_cli_audit_glob_index(monkeypatch, tmp_path, capsys):
+    """
+    Test running command 'ssh-assets audit' with glob pattern and index output
+    """
+    create_authorized_keys_files(tmp_path)
+    script = SshAssetsScript()
+    testargs = ['ssh-assets', 'audit', '--processes', '2', '--index', '--glob', f'{tmp_path}/*/.ssh/authorized_keys']
+    with monkeypatch.context() as context:
+        validate_script_run_exception_with_args(script, context, testargs, exit_code=0)
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) > 0
+    for line in lines:
+        entry = json.loads(line)
+        assert entry['fingerprint'].startswith('SHA256:')
+        assert len(entry['users']) == 1
+
+
+def test_ssh_assets_cli_audit_invalid_processes(monkeypatch, capsys):
+    """
+    Test running command 'ssh-assets audit' with invalid number of processes
+    """
+    script = SshAssetsScript()
+    testargs = ['ssh-assets', 'audit', '--processes', '0']
+    with monkeypatch.context() as context:
+        validate_script_run_exception_with_args(script, context, testargs, exit_code=1)
+    assert len(capsys.readouterr().err.splitlines()) == 1
+
+
+def test_ssh_assets_cli_audit_glob_users(monkeypatch, tmp_path, capsys):
+    """
+    Test running command 'ssh-assets audit' with both glob pattern and user names
+    """
+    script = SshAssetsScript()
+    testargs = ['ssh-assets', 'audit', '--glob', f'{tmp_path}/*/.ssh/authorized_keys', 'alice']
+    with monkeypatch.context() as context:
+        validate_script_run_exception_with_args(script, context, testargs, exit_code=1)
+    captured = capsys.readouterr()
+    assert captured.out == ''
+    assert len(captured.err.splitlines()) == 1
@@ -0,0 +1,45 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Unit tests for 'ssh-assets daemon' CLI command
+"""
+from sys_toolkit.tests.mock import MockCalledMethod, MockException
+
+from cli_toolkit.tests.script import validate_script_run_exception_with_args
+
+from ssh_assets.bin.ssh_assets.main import SshAssetsScript
+from ssh_assets.exceptions import SSHAssetsError
+
+
+def test_ssh_assets_cli_daemon_run(mock_daemon_socket_env, monkeypatch):
+    """
+    Test running command 'ssh-assets daemon' until interrupted
+    """
+    mock_serve = MockException(KeyboardInterrupt)
+    mock_close = MockCalledMethod()
+    monkeypatch.setattr('ssh_assets.daemon.server.SshAssetsDaemon.serve_forever', mock_serve)
+    monkeypatch.setattr('ssh_assets.daemon.server.SshAssetsDaemon.close', mock_close)
+
+    script = SshAssetsScript()
+    testargs = ['ssh-assets', 'daemon', '--socket', str(mock_daemon_socket_env)]
+    with monkeypatch.context() as context:
+        validate_script_run_exception_with_args(script, context, testargs, exit_code=0)
+    assert mock_close.call_count == 1
+
+
+def test_ssh_assets_cli_daemon_error(monkeypatch, capsys):
+    """
+    Test running command 'ssh-assets daemon' when the daemon can't be started
+    """
+    monkeypatch.setattr(
+        'ssh_assets.daemon.server.SshAssetsDaemon.serve_forever',
+        MockException(SSHAssetsError)
+    )
+    script = SshAssetsScript()
+    testargs = ['ssh-assets', 'daemon']
+    with monkeypatch.context() as context:
+        validate_script_run_exception_with_args(script, context, testargs, exit_code=1)
+    assert len(capsys.readouterr().err.splitlines()) == 1
@@ -6,12 +6,64 @@
 """
 Unit tests for ssh-assets main CLI class
 """
+import json
+import os
+import subprocess
+import sys
+
 import pytest
 
 from cli_toolkit.tests.script import validate_script_run_exception_with_args
+from sys_toolkit.tests.mock import MockCalledMethod
 
 from ssh_assets.bin.ssh_assets.main import main, SshAssetsScript
 
+# Budget for cumulative import time of the CLI main module in microseconds, excluding the
+# cli_toolkit modules. Before lazy imports importing the module took about 80 ms. The check
+# depends on the speed and load of the machine and is run only if the budget is set in the
+# environment, for example SSH_ASSETS_IMPORT_TIME_BUDGET=50000
+IMPORT_TIME_BUDGET_ENV_VAR = 'SSH_ASSETS_IMPORT_TIME_BUDGET'
+IMPORT_TIME_BUDGET = os.environ.get(IMPORT_TIME_BUDGET_ENV_VAR, None)
+IMPORT_TIME_RUNS = 3
+# Modules which must not be imported before a subcommand is run
+LAZY_MODULES = (
+    'yaml',
+    'socketserver',
+    'concurrent.futures.process',
+    'ssh_assets.authorized_keys.audit',
+    'ssh_assets.authorized_keys.loader',
+    'ssh_assets.configuration.loader',
+    'ssh_assets.daemon.server',
+    'ssh_assets.keys.agent',
+    'ssh_assets.keys.filter_set',
+    'ssh_assets.session',
+    'ssh_assets.token',
+)
+
+
+def get_cli_import_times():
+    """
+    Import CLI main module in a new python process with -X importtime
+
+    Returns dictionary of cumulative import times in microseconds by module name
+    """
+    res = subprocess.run(
+        (
+            sys.executable, '-X', 'importtime', '-c',
+            'import cli_toolkit.script; import ssh_assets.bin.ssh_assets.main',
+        ),
+        capture_output=True,
+        check=True,
+        encoding='utf-8',
+    )
+    import_times = {}
+    for line in res.stderr.splitlines():
+        fields = line.split('|')
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue
+        import_times[fields[2].strip()] = int(fields[1])
+    return import_times
+
 
 def test_ssh_assets_cli_main_no_args():
     """
@@ -29,3 +81,63 @@ def test_ssh_assets_cli_main_help(monkeypatch):
     testargs = ['ssh-assets', '--help']
     with monkeypatch.context() as context:
         validate_script_run_exception_with_args(script, context, testargs, exit_code=0)
+
+
+def test_ssh_assets_cli_main_lazy_imports():
+    """
+    Test importing the CLI main module does not import modules needed only by subcommands
+    """
+    import_times = get_cli_import_times()
+    assert 'ssh_assets.bin.ssh_assets.main' in import_times
+    for module in LAZY_MODULES:
+        assert module not in import_times
+
+
+@pytest.mark.skipif(not IMPORT_TIME_BUDGET, reason=f'{IMPORT_TIME_BUDGET_ENV_VAR} is not set')
+def test_ssh_assets_cli_main_import_time_budget():
+    """
+    Test cumulative import time of the CLI main module is within the budget
+
+    Fastest of multiple runs is compared to the budget to ignore random delays
+    """
+    import_time = min(
+        get_cli_import_times()['ssh_assets.bin.ssh_assets.main']
+        for _run in range(IMPORT_TIME_RUNS)
+    )
+    assert import_time < int(IMPORT_TIME_BUDGET)
+
+
+# pylint: disable=unused-argument
+def test_ssh_assets_cli_main_profile_trace(mock_basic_config, mock_agent_no_keys, monkeypatch, capsys, tmp_path):
+    """
+    Test running command 'ssh-assets --profile --trace <file>' with a subcommand running commands
+    """
+    mock_run = MockCalledMethod(return_value=(b'', b''))
+    monkeypatch.setattr('ssh_assets.subprocess.subprocess.run_command', mock_run)
+    trace_file = tmp_path.joinpath('trace.json')
+    script = SshAssetsScript()
+    testargs = ['ssh-assets', '--profile', '--trace', str(trace_file), 'keys', 'load', 'test']
+    with monkeypatch.context() as context:
+        validate_script_run_exception_with_args(script, context, testargs, exit_code=0)
+    assert mock_run.call_count == 1
+
+    lines = capsys.readouterr().err.splitlines()
+    assert lines[0].startswith('Subprocess calls: 1 ')
+    fields = lines[2].split()
+    assert fields[:2] == ['1', '0']
+    assert fields[4:] == ['ssh-add', 'ssh_assets.keys.file.load_key_files_to_agent']
+
+    events = [json.loads(line) for line in trace_file.read_text(encoding='utf-8').splitlines()]
+    assert len(events) == 1
+    assert events[0]['name'] == 'ssh-add'
+    assert events[0]['status'] == 'ok'
+
+
+def test_ssh_assets_cli_main_trace_file_error(monkeypatch, tmp_path):
+    """
+    Test running command 'ssh-assets --trace <file>' with trace file which can't be opened
+    """
+    script = SshAssetsScript()
+    testargs = ['ssh-assets', '--trace', str(tmp_path.joinpath('missing/trace.json')), 'groups', 'list']
+    with monkeypatch.context() as context:
+        validate_script_run_exception_with_args(script, context, testargs, exit_code=1)
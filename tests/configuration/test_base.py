@@ -0,0 +1,92 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Unit tests for ssh_assets.configuration.base module
+"""
+from ssh_assets.configuration.groups import GroupConfiguration
+from ssh_assets.session import SshAssetSession
+
+from ..conftest import MOCK_BASIC_CONFIG_EXISTING_GROUP, MOCK_UNKNOWN_GROUP_NAME
+
+
+def validate_name_index(items):
+    """
+    Validate name lookup of configuration list matches the list items
+    """
+    assert items.__name_index__ == {item.name: index for index, item in enumerate(items)}
+    for item in items:
+        assert items.get_item_by_name(item.name) is item
+
+
+# pylint: disable=unused-argument
+def test_configuration_named_list_get_many(mock_basic_config):
+    """
+    Test looking up multiple configuration list items by names
+    """
+    session = SshAssetSession()
+    # pylint: disable=no-member
+    groups = session.configuration.groups
+    validate_name_index(groups)
+    validate_name_index(session.configuration.keys)
+
+    demo = groups.get_group_by_name(MOCK_BASIC_CONFIG_EXISTING_GROUP)
+    assert groups.get_many([]) == []
+    assert groups.get_many([MOCK_UNKNOWN_GROUP_NAME]) == []
+    assert groups.get_many(['unconfigured', MOCK_UNKNOWN_GROUP_NAME, demo, demo.name]) == [
+        groups.get_group_by_name('unconfigured'),
+        demo,
+    ]
+    assert [key.name for key in session.configuration.keys.get_many(['manual', 'test'])] == ['manual', 'test']
+
+
+# pylint: disable=unused-argument
+def test_configuration_named_list_modify(mock_basic_config):
+    """
+    Test name lookup of configuration list stays consistent when the list is modified
+    """
+    session = SshAssetSession()
+    # pylint: disable=no-member
+    groups = session.configuration.groups
+    demo = groups.get_group_by_name(MOCK_BASIC_CONFIG_EXISTING_GROUP)
+
+    del groups[groups[0].name]
+    validate_name_index(groups)
+    assert groups.get_group_by_name(demo.name) is None
+
+    groups.insert(0, demo)
+    validate_name_index(groups)
+    assert groups[0] is demo
+
+    groups[1] = GroupConfiguration(parent=groups, data={'name': 'replaced'})
+    validate_name_index(groups)
+    assert groups.get_group_by_name('noexpire-group') is None
+
+    del groups[MOCK_UNKNOWN_GROUP_NAME]
+    validate_name_index(groups)
+
+
+# pylint: disable=unused-argument
+def test_configuration_named_list_rename(mock_basic_config):
+    """
+    Test renaming configuration list items
+    """
+    session = SshAssetSession()
+    configuration = session.configuration
+    # pylint: disable=no-member
+    group = configuration.groups.get_group_by_name(MOCK_BASIC_CONFIG_EXISTING_GROUP)
+    key = configuration.keys.get_key_by_name('manual')
+    assert [item.name for item in key.groups] == [MOCK_BASIC_CONFIG_EXISTING_GROUP, 'noexpire-group']
+
+    group.name = 'renamed'
+    validate_name_index(configuration.groups)
+    assert configuration.groups.get_group_by_name(MOCK_BASIC_CONFIG_EXISTING_GROUP) is None
+    assert configuration.groups.get_group_by_name('renamed') is group
+    assert [item.name for item in key.groups] == ['renamed', 'noexpire-group']
+
+    key.name = 'renamed'
+    validate_name_index(configuration.keys)
+    assert configuration.keys.get_key_by_name('manual') is None
+    assert configuration.keys.get_key_by_name('renamed') is key
@@ -0,0 +1,88 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Unit tests for ssh_assets.configuration.cache module
+"""
+import os
+
+from sys_toolkit.tests.mock import MockCalledMethod, MockException
+
+from ssh_assets.configuration.cache import ConfigurationCache
+from ssh_assets.session import SshAssetSession
+
+from ..conftest import MOCK_BASIC_CONFIG_KEYS_COUNT
+
+
+def test_configuration_cache_get_set(mock_temporary_config, mock_configuration_cache):
+    """
+    Test storing and loading parsed configuration data to the cache
+    """
+    cache = ConfigurationCache(mock_temporary_config)
+    assert cache.cache_path.parent == mock_configuration_cache
+    assert isinstance(repr(cache), str)
+    assert cache.get() is None
+
+    data = {'keys': [{'name': 'test', 'path': '~/.ssh/id_ed25519', 'autoload': True}]}
+    cache.set(data)
+    assert cache.get() == data
+    assert ConfigurationCache(mock_temporary_config).get() == data
+
+    mock_temporary_config.write_text('keys: []\n', encoding='utf-8')
+    assert cache.get() is None
+
+
+def test_configuration_cache_invalid(mock_temporary_config, mock_configuration_cache):
+    """
+    Test invalid cache files and values which can't be cached
+    """
+    cache = ConfigurationCache(mock_temporary_config)
+    cache.set({'value': object()})
+    assert not cache.cache_path.exists()
+
+    mock_configuration_cache.mkdir(parents=True)
+    cache.cache_path.write_bytes(b'invalid data')
+    assert cache.get() is None
+
+    cache = ConfigurationCache(mock_temporary_config.parent.joinpath('missing.yml'))
+    cache.set({})
+    assert cache.get() is None
+
+
+def test_configuration_cache_write_error(mock_temporary_config, mock_configuration_cache, monkeypatch):
+    """
+    Test errors writing configuration cache are ignored
+    """
+    monkeypatch.setattr('ssh_assets.configuration.cache.os.replace', MockException(OSError))
+    cache = ConfigurationCache(mock_temporary_config)
+    cache.set({})
+    assert cache.get() is None
+    assert list(mock_configuration_cache.iterdir()) == []
+
+
+def test_configuration_cache_session_load(mock_temporary_config, monkeypatch):
+    """
+    Test loading configuration from cache without parsing the YAML file
+    """
+    session = SshAssetSession()
+    # pylint: disable=no-member
+    assert len(session.configuration.keys) == MOCK_BASIC_CONFIG_KEYS_COUNT
+
+    mock_yaml_load = MockCalledMethod()
+    monkeypatch.setattr('ssh_assets.configuration.loader.yaml.load', mock_yaml_load)
+    session = SshAssetSession()
+    assert mock_yaml_load.call_count == 0
+    assert len(session.configuration.keys) == MOCK_BASIC_CONFIG_KEYS_COUNT
+
+    # Configuration saved by the session is cached
+    session.configuration.keys.configure_key('cached', path='~/.ssh/cached')
+    session = SshAssetSession()
+    assert mock_yaml_load.call_count == 0
+    assert session.configuration.keys.get_key_by_name('cached') is not None
+
+    stat = mock_temporary_config.stat()
+    os.utime(mock_temporary_config, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000))
+    SshAssetSession()
+    assert mock_yaml_load.call_count == 1
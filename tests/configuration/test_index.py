@@ -0,0 +1,101 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Unit tests for ssh_assets.configuration.index module
+"""
+from ssh_assets.configuration.index import KeyGroupIndex
+from ssh_assets.session import SshAssetSession
+
+from ..conftest import MOCK_BASIC_CONFIG_EXISTING_GROUP, MOCK_BASIC_CONFIG_EXISTING_KEY
+
+
+def get_group_names(groups):
+    """
+    Return names of groups as list
+    """
+    return [group.name for group in groups]
+
+
+def get_key_names(keys):
+    """
+    Return names of keys as list
+    """
+    return [key.name for key in keys]
+
+
+# pylint: disable=unused-argument
+def test_configuration_key_group_index_load(mock_basic_config):
+    """
+    Test key to group index built from basic configuration
+    """
+    session = SshAssetSession()
+    configuration = session.configuration
+    # pylint: disable=no-member
+    assert configuration.__key_group_index__ is None
+    index = configuration.key_group_index
+    assert isinstance(index, KeyGroupIndex)
+    assert configuration.key_group_index is index
+
+    assert get_group_names(index.get_key_groups('manual')) == ['demo', 'noexpire-group']
+    assert get_group_names(index.get_key_groups('test')) == ['demo']
+    assert index.get_key_groups('noexpire') == []
+    assert get_key_names(index.get_group_keys('demo')) == ['test', 'manual']
+    assert index.get_group_keys('unconfigured') == []
+    assert index.get_group_keys('nosuchgroup') == []
+
+    # pylint: disable=no-member
+    for key in configuration.keys:
+        assert key.groups == [group for group in configuration.groups if key.name in group.keys]
+    for group in configuration.groups:
+        assert group.private_keys == [key for key in configuration.keys if key.name in group.keys]
+
+
+# pylint: disable=unused-argument
+def test_configuration_key_group_index_update_groups(mock_temporary_config):
+    """
+    Test updating key to group index when groups are configured and deleted
+    """
+    session = SshAssetSession()
+    configuration = session.configuration
+    # pylint: disable=no-member
+    groups = configuration.groups
+    key = configuration.keys.get_key_by_name(MOCK_BASIC_CONFIG_EXISTING_KEY)
+    assert get_group_names(key.groups) == [MOCK_BASIC_CONFIG_EXISTING_GROUP, 'noexpire-group']
+
+    groups.configure_group('temporary', keys=[key.name, 'test'], expire='1h')
+    assert get_group_names(key.groups) == [MOCK_BASIC_CONFIG_EXISTING_GROUP, 'noexpire-group', 'temporary']
+    assert get_key_names(groups.get_group_by_name('temporary').private_keys) == [key.name, 'test']
+
+    groups.configure_group(MOCK_BASIC_CONFIG_EXISTING_GROUP, keys=['test'])
+    assert get_group_names(key.groups) == ['noexpire-group', 'temporary']
+    assert get_key_names(groups.get_group_by_name(MOCK_BASIC_CONFIG_EXISTING_GROUP).private_keys) == ['test']
+
+    groups.delete_group('temporary')
+    assert get_group_names(key.groups) == ['noexpire-group']
+    assert get_group_names(configuration.keys.get_key_by_name('test').groups) == [MOCK_BASIC_CONFIG_EXISTING_GROUP]
+
+
+# pylint: disable=unused-argument
+def test_configuration_key_group_index_update_keys(mock_temporary_config):
+    """
+    Test updating key to group index when keys are configured and deleted
+    """
+    session = SshAssetSession()
+    configuration = session.configuration
+    # pylint: disable=no-member
+    group = configuration.groups.get_group_by_name(MOCK_BASIC_CONFIG_EXISTING_GROUP)
+    key = configuration.keys.get_key_by_name(MOCK_BASIC_CONFIG_EXISTING_KEY)
+    assert get_key_names(group.private_keys) == ['test', key.name]
+
+    configuration.keys.delete_key(key.name)
+    assert get_key_names(group.private_keys) == ['test']
+
+    configuration.keys.configure_key(key.name, path=str(key.path))
+    assert get_key_names(group.private_keys) == ['test', key.name]
+    assert get_group_names(configuration.keys.get_key_by_name(key.name).groups) == [
+        MOCK_BASIC_CONFIG_EXISTING_GROUP,
+        'noexpire-group',
+    ]
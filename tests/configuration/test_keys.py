@@ -14,7 +14,8 @@ from sys_toolkit.tests.mock import MockCalledMethod
 
 from ssh_assets.authorized_keys import AuthorizedKeys
 from ssh_assets.authorized_keys.constants import DEFAULT_AUTHORIZED_KEYS_FILE
-from ssh_assets.keys.constants import SshKeyType
+from ssh_assets.keys.constants import SshAgentMessage, SshKeyType
+from ssh_assets.keys.file import SSHKeyFile
 from ssh_assets.exceptions import SSHKeyError
 from ssh_assets.session import SshAssetSession
 
@@ -60,7 +61,8 @@ def test_keys_file_load_available_all_keys_to_agent(
 
 
 # pylint: disable=unused-argument
-def test_keys_configured_load_to_agent(mock_basic_config, mock_agent_no_keys, monkeypatch) -> None:
+def test_keys_configured_load_to_agent(mock_basic_config, mock_agent_socket, mock_agent_no_keys,
+                                       monkeypatch) -> None:
     """
     Load configured test key to agent
     """
@@ -74,6 +76,9 @@ def test_keys_configured_load_to_agent(mock_basic_config, mock_agent_no_keys, mo
     assert mock_load.call_count == 0
     key.load_to_agent()
     assert mock_load.call_count == 1
+    # Loaded key is added to the session agent snapshot without listing the keys again
+    assert key.loaded is True
+    assert mock_agent_socket.count_requests(SshAgentMessage.REQUEST_IDENTITIES) == 1
 
 
 # pylint: disable=unused-argument
@@ -91,6 +96,9 @@ def test_keys_configured_unload_from_agent(mock_basic_config, mock_agent_key_lis
     assert mock_unload.call_count == 0
     key.unload_from_agent()
     assert mock_unload.call_count == 1
+    # Unloaded key is removed from the session agent snapshot
+    assert key.loaded is False
+    assert len(session.agent) == len(mock_agent_key_list) - 1
 
 
 # pylint: disable=unused-argument
@@ -133,3 +141,27 @@ def test_keys_unavailable_unload_from_agent(mock_basic_config, mock_agent_key_li
     key = SshAssetSession().key_filter_set.filter_available(available=False).keys[0]
     with pytest.raises(SSHKeyError):
         key.unload_from_agent()
+
+
+# pylint: disable=unused-argument
+def test_keys_lazy_private_key(mock_temporary_config, monkeypatch) -> None:
+    """
+    Test key file paths are resolved and key file objects created only when used
+    """
+    session = SshAssetSession()
+    # pylint: disable=no-member
+    keys = session.configuration.keys
+    for key in keys:
+        assert key.__private_key__ is None
+
+    key = keys.get_key_by_name('manual')
+    assert key.path == Path(key.__literal_path__).expanduser().resolve()
+    assert key.path is key.private_key.path
+    assert isinstance(key.private_key, SSHKeyFile)
+    assert [item for item in keys if item.__private_key__ is not None] == [key]
+
+    private_key = key.private_key
+    keys.configure_key(key.name, path='~/.ssh/id_ed25519')
+    assert key.private_key is not private_key
+    assert key.path == Path('~/.ssh/id_ed25519').expanduser().resolve()
+    assert key.as_dict()['path'] == '~/.ssh/id_ed25519'
@@ -24,10 +24,12 @@ from ssh_assets.keys.file import SSHKeyFile
 
 from ..conftest import (
     FILE_READONLY,
+    FILE_READWRITE,
     MOCK_BASIC_CONFIG_AVAILABLE_KEYS_COUNT,
     MOCK_BASIC_CONFIG_AUTOLOAD_KEYS_COUNT,
     MOCK_BASIC_CONFIG_GROUP_COUNT,
     MOCK_BASIC_CONFIG_EXISTING_GROUP,
+    MOCK_BASIC_CONFIG_EXISTING_KEY,
     MOCK_BASIC_CONFIG_KEYS_COUNT,
     MOCK_UNKNOWN_KEY_NAME,
 )
@@ -189,6 +191,22 @@ def test_configuration_key_minimum_expire(mock_basic_config):
         assert key.minimum_expire == expire_value
 
 
+def test_configuration_key_minimum_expire_numeric(mock_temporary_config):
+    """
+    Check minimum expiration value is selected by duration, not by duration string
+    """
+    session = SshAssetSession()
+    # pylint: disable=no-member
+    key_configuration = session.configuration.keys
+    key = key_configuration.get_key_by_name(MOCK_BASIC_CONFIG_EXISTING_KEY)
+    assert MOCK_BASIC_CONFIG_EXISTING_GROUP in [group.name for group in key.groups]
+    # String ordering would select '9h' and '2m' as the minimum values
+    for key_expire, group_expire, expected in (('10m', '9h', '10m'), ('2m', '90s', '90s')):
+        key_configuration.configure_key(key.name, expire=key_expire)
+        session.configuration.groups.configure_group(MOCK_BASIC_CONFIG_EXISTING_GROUP, expire=group_expire)
+        assert str(key.minimum_expire) == expected
+
+
 def test_keys_file_load_available_autoload_keys_to_agent(
         mock_basic_config,
         mock_agent_no_keys,
@@ -240,6 +258,83 @@ def test_configuration_save_different_filename(mock_temporary_config):
     assert testfile.is_file()
 
 
+def test_configuration_save_unmodified(mock_temporary_config, monkeypatch):
+    """
+    Test saving configuration is skipped when configuration and file are not modified
+    """
+    session = SshAssetSession()
+    mock_temporary_config.chmod(FILE_READWRITE)
+    session.configuration.save()
+    data = mock_temporary_config.read_text(encoding='utf-8')
+    assert list(mock_temporary_config.parent.glob(f'.{mock_temporary_config.name}.*')) == []
+    assert mock_temporary_config.stat().st_mode & 0o777 == FILE_READWRITE
+
+    mock_write = MockCalledMethod()
+    monkeypatch.setattr(SshAssetsConfiguration, '__write_file__', mock_write)
+    session.configuration.save()
+    assert mock_write.call_count == 0
+
+    mock_temporary_config.write_text(f'{data}\n', encoding='utf-8')
+    session.configuration.save()
+    assert mock_write.call_count == 1
+
+
+def test_configuration_batch_edit(mock_temporary_config, monkeypatch):
+    """
+    Test configuration file is saved once after a batch of configuration changes
+    """
+    session = SshAssetSession()
+    configuration = session.configuration
+    # pylint: disable=no-member
+    key = configuration.keys[0]
+    mock_temporary_config.unlink()
+
+    with configuration.batch_edit():
+        for index in range(10):
+            configuration.keys.configure_key(f'batch-{index}', path=str(key.path))
+        with configuration.batch_edit():
+            configuration.groups.configure_group('batch', keys=['batch-0', 'batch-1'])
+        assert not mock_temporary_config.is_file()
+    assert mock_temporary_config.is_file()
+    data = yaml.safe_load(mock_temporary_config.read_text(encoding='utf-8'))
+    assert len(data['keys']) == MOCK_BASIC_CONFIG_KEYS_COUNT + 10
+    assert data['groups'][-1] == {'name': 'batch', 'keys': ['batch-0', 'batch-1']}
+
+    mock_save = MockCalledMethod()
+    monkeypatch.setattr(SshAssetsConfiguration, 'save', mock_save)
+    with configuration.batch_edit():
+        pass
+    assert mock_save.call_count == 0
+
+
+def test_configuration_batch_edit_error(mock_temporary_config):
+    """
+    Test configuration file is not saved when a batch of configuration changes fails
+    """
+    session = SshAssetSession()
+    configuration = session.configuration
+    # pylint: disable=no-member
+    key = configuration.keys[0]
+    data = mock_temporary_config.read_text(encoding='utf-8')
+
+    with pytest.raises(ValueError):
+        with configuration.batch_edit():
+            configuration.keys.configure_key('batch-error', path=str(key.path))
+            with configuration.batch_edit():
+                configuration.groups.configure_group('batch-error', keys=['batch-error'])
+            raise ValueError
+    assert mock_temporary_config.read_text(encoding='utf-8') == data
+
+    # Errors caught inside the outermost block do not prevent saving
+    with configuration.batch_edit():
+        with pytest.raises(ValueError):
+            with configuration.batch_edit():
+                configuration.keys.configure_key('batch-caught', path=str(key.path))
+                raise ValueError
+    assert 'batch-caught' in mock_temporary_config.read_text(encoding='utf-8')
+    assert not list(mock_temporary_config.parent.glob('*.lock'))
+
+
 def test_configuration_add_new_group(mock_temporary_config):
     """
     Test adding new group to configuration
@@ -6,9 +6,13 @@
 """
 Unit test configuration for ssh_assets module
 """
+import asyncio
+import fcntl
 import os
 import shutil
 import socket
+import tempfile
+import threading
 
 from pathlib import Path
 
@@ -20,15 +24,22 @@ from sys_toolkit.tests.mock import (
 
 import pytest
 
-from ssh_assets.keys.constants import SSH_AUTH_SOCK_ENV_VAR, SSH_AGENT_NO_KEYS_MESSAGE
+from ssh_assets.daemon.constants import DAEMON_SOCKET_ENV_VAR
+from ssh_assets.daemon.server import SshAssetsDaemon
+from ssh_assets.exceptions import SSHKeyError
+from ssh_assets.keys.base import RE_KEY_ATTRIBUTES
+from ssh_assets.keys.constants import FINGERPRINT_CACHE_FILENAME, SSH_AUTH_SOCK_ENV_VAR, SSH_AGENT_NO_KEYS_MESSAGE
 from ssh_assets.session import SshAssetSession
 
+from .utils import MockSshAgent, load_public_key_blob
+
 MOCK_DATA = Path(__file__).parent.joinpath('mock')
 MOCK_BASIC_CONFIG = MOCK_DATA.joinpath('config/basic_config.yml')
 MOCK_EMPTY_CONFIG = MOCK_DATA.joinpath('config/empty_config.yml')
 MOCK_BASIC_CONFIG_KEYS_COUNT = 4
 MOCK_BASIC_CONFIG_AUTOLOAD_KEYS_COUNT = 2
 MOCK_BASIC_CONFIG_AVAILABLE_KEYS_COUNT = 3
+MOCK_BASIC_CONFIG_AUTOLOAD_AVAILABLE_KEYS_COUNT = 2
 MOCK_BASIC_CONFIG_GROUP_COUNT = 3
 
 MOCK_BASIC_CONFIG_EXISTING_GROUP = 'demo'
@@ -37,9 +48,19 @@ MOCK_BASIC_CONFIG_EXISTING_GROUP_KEY_COUNT = 2
 
 MOCK_AGENT_OUTPUT = MOCK_DATA.joinpath('keys/agent.txt')
 MOCK_TEST_KEYS = MOCK_DATA.glob('keys/*/ssh_key_*')
+# Public keys for the keys listed in MOCK_AGENT_OUTPUT, in same order
+MOCK_TEST_PUBLIC_KEYS = sorted(MOCK_DATA.glob('keys/*/ssh_key_*.pub'))
+# Certificates for the PEM format test keys and ssh-add -l output with the certificates loaded
+MOCK_TEST_CERTIFICATES = sorted(MOCK_DATA.glob('certificates/*-cert.pub'))
+MOCK_CERTIFICATE_AGENT_OUTPUT = MOCK_DATA.joinpath('certificates/agent.txt')
 #  Number of keys loaded with mock_agent_key_list
 MOCK_AGENT_KEY_COUNT = 12
 
+MOCK_DAEMON_POLL_INTERVAL = 0.01
+
+# Blocking file operations that must not be called in the asyncio event loop thread
+MOCK_BLOCKING_PATH_METHODS = ('is_file', 'open', 'read_text', 'stat')
+
 MOCK_UNKNOWN_GROUP_NAME = 'nosuchgroup'
 MOCK_UNKNOWN_KEY_NAME = 'nosuchkey'
 
@@ -68,6 +89,49 @@ VALID_DURATION_VALUES = (
 )
 
 
+@pytest.fixture(autouse=True)
+def mock_fingerprint_cache(monkeypatch, tmp_path):
+    """
+    Store SSH key fingerprint cache to a temporary directory for each test
+
+    Returns
+    -------
+    Returns fingerprint cache file path as pathlib.Path
+    """
+    path = tmp_path.joinpath('cache', FINGERPRINT_CACHE_FILENAME)
+    monkeypatch.setattr('ssh_assets.keys.cache.FINGERPRINT_CACHE_FILE', path)
+    return path
+
+
+@pytest.fixture(autouse=True)
+def mock_configuration_cache(monkeypatch, tmp_path):
+    """
+    Store parsed configuration cache to a temporary directory for each test
+
+    Returns
+    -------
+    Returns configuration cache directory as pathlib.Path
+    """
+    path = tmp_path.joinpath('cache', 'configuration')
+    monkeypatch.setattr('ssh_assets.configuration.cache.CONFIGURATION_CACHE_DIRECTORY', path)
+    return path
+
+
+@pytest.fixture(autouse=True)
+def mock_daemon_socket_env(monkeypatch, tmp_path):
+    """
+    Point SSH assets daemon socket to a temporary path for each test, so that a daemon
+    running for the user is never used by the tests
+
+    Returns
+    -------
+    Returns daemon socket path as pathlib.Path
+    """
+    path = tmp_path.joinpath('daemon.sock')
+    monkeypatch.setenv(DAEMON_SOCKET_ENV_VAR, str(path))
+    return path
+
+
 @pytest.fixture(params=INVALID_DURATION_VALUES)
 def invalid_duration_value(request):
     """
@@ -141,6 +205,22 @@ def mock_test_key_file(request):
     yield path
 
 
+@pytest.fixture(params=MOCK_TEST_PUBLIC_KEYS)
+def mock_public_key_file(request):
+    """
+    Mock loading of the mocked test SSH public keys to the test case
+    """
+    yield request.param
+
+
+@pytest.fixture
+def mock_public_key_parse_error(monkeypatch):
+    """
+    Mock errors parsing public key files to force loading key attributes with ssh-keygen
+    """
+    monkeypatch.setattr('ssh_assets.keys.file.get_key_blob_attributes', MockException(SSHKeyError))
+
+
 @pytest.fixture
 def mock_agent_delete_socket_env(monkeypatch):
     """
@@ -174,6 +254,29 @@ def mock_agent_dummy_socket(mock_agent_dummy_env):
     return agent_socket
 
 
+def get_mock_agent_identities():
+    """
+    Return public key blobs and comments for the mocked SSH agent matching MOCK_AGENT_OUTPUT
+    """
+    lines = MOCK_AGENT_OUTPUT.read_text(encoding='utf-8').splitlines()
+    return [
+        (load_public_key_blob(path), RE_KEY_ATTRIBUTES.match(line)['comment'])
+        for path, line in zip(MOCK_TEST_PUBLIC_KEYS, lines)
+    ]
+
+
+# pylint: disable=redefined-outer-name, unused-argument
+@pytest.fixture
+def mock_agent_socket(mock_agent_delete_socket_env, monkeypatch, tmpdir):
+    """
+    Mock a SSH agent serving SSH agent protocol requests on a socket with no keys loaded
+    """
+    path = Path(tmpdir.strpath).joinpath('mock-agent.sock')
+    monkeypatch.setenv(SSH_AUTH_SOCK_ENV_VAR, str(path))
+    with MockSshAgent(path) as agent:
+        yield agent
+
+
 @pytest.fixture
 def mock_agent_key_load_error(monkeypatch):
     """
@@ -183,8 +286,9 @@ def mock_agent_key_load_error(monkeypatch):
     monkeypatch.setattr('ssh_assets.keys.agent.run_command_lineoutput', mock_error)
 
 
+# pylint: disable=redefined-outer-name
 @pytest.fixture
-def mock_agent_no_keys(monkeypatch):
+def mock_agent_no_keys(mock_agent_socket, monkeypatch):
     """
     Mock agent with no keys
     """
@@ -194,17 +298,35 @@ def mock_agent_no_keys(monkeypatch):
     return lines
 
 
+# pylint: disable=redefined-outer-name
 @pytest.fixture
-def mock_agent_key_list(monkeypatch):
+def mock_agent_key_list(mock_agent_socket, monkeypatch):
     """
     Mock agent with all mocked test keys loaded to the agent
     """
+    mock_agent_socket.identities = get_mock_agent_identities()
     lines = MOCK_AGENT_OUTPUT.read_text(encoding='utf-8').splitlines()
     mock_keys_list = MockRunCommandLineOutput(stdout=lines)
     monkeypatch.setattr('ssh_assets.keys.agent.run_command_lineoutput', mock_keys_list)
     return lines
 
 
+# pylint: disable=redefined-outer-name
+@pytest.fixture
+def mock_agent_certificate_list(mock_agent_socket, monkeypatch):
+    """
+    Mock agent with certificates of the PEM format test keys loaded to the agent
+    """
+    lines = MOCK_CERTIFICATE_AGENT_OUTPUT.read_text(encoding='utf-8').splitlines()
+    mock_agent_socket.identities = [
+        (load_public_key_blob(path), RE_KEY_ATTRIBUTES.match(line)['comment'])
+        for path, line in zip(MOCK_TEST_CERTIFICATES, lines)
+    ]
+    mock_keys_list = MockRunCommandLineOutput(stdout=lines)
+    monkeypatch.setattr('ssh_assets.keys.agent.run_command_lineoutput', mock_keys_list)
+    return lines
+
+
 @pytest.fixture
 def mock_session(mock_temporary_config, mock_agent_key_list):
     """
@@ -212,3 +334,52 @@ def mock_session(mock_temporary_config, mock_agent_key_list):
     and mocked agent key list
     """
     yield SshAssetSession()
+
+
+# pylint: disable=redefined-outer-name, unused-argument
+@pytest.fixture
+def mock_daemon(mock_basic_config, mock_agent_key_list, monkeypatch):
+    """
+    Run SSH assets daemon with basic configuration and mocked agent in a thread
+
+    The socket is created in a short temporary directory to stay within UNIX socket path
+    length limits
+    """
+    with tempfile.TemporaryDirectory(prefix='ssh-assets-') as directory:
+        path = Path(directory).joinpath('daemon.sock')
+        monkeypatch.setenv(DAEMON_SOCKET_ENV_VAR, str(path))
+        daemon = SshAssetsDaemon(socket_path=path, configuration_file=mock_basic_config)
+        daemon.start()
+        thread = threading.Thread(target=daemon.serve_forever, args=(MOCK_DAEMON_POLL_INTERVAL,), daemon=True)
+        thread.start()
+        yield daemon
+        daemon.shutdown()
+        thread.join()
+
+
+@pytest.fixture
+def mock_blocking_calls(monkeypatch):
+    """
+    Detect blocking file operations and fingerprint cache file locking called in the thread
+    running an asyncio event loop
+
+    Returns
+    -------
+    List of names of blocking calls made in the event loop thread
+    """
+    calls = []
+
+    def detect(name, method):
+        def wrapper(*args, **kwargs):
+            try:
+                asyncio.get_running_loop()
+                calls.append(name)
+            except RuntimeError:
+                pass
+            return method(*args, **kwargs)
+        return wrapper
+
+    for name in MOCK_BLOCKING_PATH_METHODS:
+        monkeypatch.setattr(Path, name, detect(f'Path.{name}', getattr(Path, name)))
+    monkeypatch.setattr(fcntl, 'flock', detect('fcntl.flock', fcntl.flock))
+    return calls
@@ -0,0 +1,65 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Unit tests for ssh_assets.daemon.client module
+"""
+import os
+
+import pytest
+
+from ssh_assets.daemon.client import SshAssetsDaemonClient
+from ssh_assets.daemon.constants import DaemonRequest
+from ssh_assets.exceptions import SSHAssetsError
+
+from ..conftest import MOCK_AGENT_KEY_COUNT, MOCK_BASIC_CONFIG_KEYS_COUNT
+
+
+def test_daemon_client_not_running(mock_daemon_socket_env):
+    """
+    Test daemon client when the daemon is not running
+    """
+    client = SshAssetsDaemonClient()
+    assert client.socket_path == mock_daemon_socket_env
+    assert repr(client) == str(mock_daemon_socket_env)
+    assert not client.available
+    assert client.query(DaemonRequest.STATUS) is None
+    with pytest.raises(SSHAssetsError):
+        client.request(DaemonRequest.STATUS)
+
+
+def test_daemon_client_requests(mock_daemon):
+    """
+    Test sending requests to a running daemon
+    """
+    client = SshAssetsDaemonClient()
+    assert client.available
+    assert client.request(DaemonRequest.STATUS)['socket'] == str(mock_daemon.socket_path)
+    assert len(client.request('keys')['keys']) == MOCK_BASIC_CONFIG_KEYS_COUNT
+    assert len(client.query(DaemonRequest.AGENT)['keys']) == MOCK_AGENT_KEY_COUNT
+
+    with pytest.raises(SSHAssetsError):
+        client.request('invalid')
+    assert client.query('invalid') is None
+
+
+def test_daemon_client_untrusted_socket(mock_daemon, monkeypatch):
+    """
+    Test daemon client does not send requests to socket accessible by other users or owned
+    by another user
+    """
+    client = SshAssetsDaemonClient()
+    mock_daemon.socket_path.chmod(0o666)
+    assert not client.available
+    assert client.query(DaemonRequest.STATUS) is None
+    with pytest.raises(SSHAssetsError):
+        client.request(DaemonRequest.STATUS)
+
+    mock_daemon.socket_path.chmod(0o600)
+    assert client.available
+    monkeypatch.setattr('ssh_assets.daemon.protocol.os.getuid', lambda: os.geteuid() + 1)
+    assert not client.available
+    with pytest.raises(SSHAssetsError):
+        client.request(DaemonRequest.STATUS)
@@ -0,0 +1,63 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Unit tests for ssh_assets.daemon.protocol module
+"""
+from io import BytesIO
+
+import pytest
+
+from ssh_assets.daemon.constants import DAEMON_MAX_MESSAGE_SIZE, DEFAULT_DAEMON_SOCKET, DAEMON_SOCKET_ENV_VAR
+from ssh_assets.daemon.protocol import (
+    decode_message,
+    encode_message,
+    error_response,
+    get_daemon_socket_path,
+    read_message,
+    success_response,
+)
+from ssh_assets.exceptions import SSHAssetsError
+
+
+def test_daemon_protocol_socket_path(mock_daemon_socket_env, monkeypatch):
+    """
+    Test detecting daemon socket path from environment
+    """
+    assert get_daemon_socket_path() == mock_daemon_socket_env
+    monkeypatch.delenv(DAEMON_SOCKET_ENV_VAR)
+    assert get_daemon_socket_path() == DEFAULT_DAEMON_SOCKET
+
+
+def test_daemon_protocol_encode_decode():
+    """
+    Test encoding and decoding daemon protocol messages
+    """
+    message = {'command': 'keys', 'args': {'groups': ['demo']}}
+    line = encode_message(message)
+    assert line.endswith(b'\n')
+    assert line.count(b'\n') == 1
+    assert decode_message(line) == message
+
+    stream = BytesIO(line + encode_message(success_response([])))
+    assert read_message(stream) == message
+    assert read_message(stream) == {'status': 'ok', 'result': []}
+    assert read_message(stream) is None
+
+    assert error_response(SSHAssetsError('test')) == {'status': 'error', 'error': 'test'}
+
+
+def test_daemon_protocol_invalid_messages():
+    """
+    Test decoding invalid daemon protocol messages
+    """
+    with pytest.raises(SSHAssetsError):
+        decode_message(b'not json\n')
+    with pytest.raises(SSHAssetsError):
+        decode_message(b'[]\n')
+    with pytest.raises(SSHAssetsError):
+        read_message(BytesIO(b'{}'))
+    with pytest.raises(SSHAssetsError):
+        read_message(BytesIO(b' ' * (DAEMON_MAX_MESSAGE_SIZE + 10)))
@@ -0,0 +1,248 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Unit tests for ssh_assets.daemon.server module
+"""
+import os
+import shutil
+import socket
+
+import pytest
+
+from sys_toolkit.tests.mock import MockCalledMethod
+
+from ssh_assets.daemon.constants import DaemonRequest
+from ssh_assets.daemon.server import SshAssetsDaemon, SshAssetsDaemonRequestHandler
+from ssh_assets.exceptions import SSHAssetsError
+
+from ..conftest import (
+    MOCK_AGENT_KEY_COUNT,
+    MOCK_BASIC_CONFIG,
+    MOCK_BASIC_CONFIG_AVAILABLE_KEYS_COUNT,
+    MOCK_BASIC_CONFIG_EXISTING_GROUP,
+    MOCK_BASIC_CONFIG_EXISTING_GROUP_KEY_COUNT,
+    MOCK_BASIC_CONFIG_KEYS_COUNT,
+)
+
+
+def create_stale_socket(path, mode=0o600):
+    """
+    Create a socket file not listened by any process with specified mode
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as stale:
+        stale.bind(str(path))
+    path.chmod(mode)
+
+
+def test_daemon_server_process_request_status(mock_basic_config, mock_daemon_socket_env):
+    """
+    Test processing daemon status requests without starting the server
+    """
+    daemon = SshAssetsDaemon(configuration_file=mock_basic_config)
+    assert daemon.socket_path == mock_daemon_socket_env
+    assert repr(daemon) == str(mock_daemon_socket_env)
+    assert not daemon.running
+
+    response = daemon.process_request({'command': DaemonRequest.STATUS.value})
+    assert response['status'] == 'ok'
+    assert response['result']['pid'] == os.getpid()
+    assert response['result']['configuration'] == str(mock_basic_config)
+
+
+def test_daemon_server_process_request_errors(mock_basic_config):
+    """
+    Test processing invalid daemon requests
+    """
+    daemon = SshAssetsDaemon(configuration_file=mock_basic_config)
+    assert daemon.process_request({'command': 'invalid'})['status'] == 'error'
+    assert daemon.process_request({'command': DaemonRequest.KEYS.value, 'args': []})['status'] == 'error'
+
+
+# pylint: disable=unused-argument
+def test_daemon_server_process_request_keys(mock_basic_config, mock_agent_key_list):
+    """
+    Test processing daemon requests to list configured keys
+    """
+    daemon = SshAssetsDaemon(configuration_file=mock_basic_config)
+    result = daemon.process_request({'command': DaemonRequest.KEYS.value})['result']
+    assert len(result['keys']) == MOCK_BASIC_CONFIG_KEYS_COUNT
+    assert result['parameters'] == sorted(result['parameters'])
+    for key in result['keys']:
+        assert key['loaded'] in (True, False)
+        assert key['loaded'] is False or key['available'] is True
+
+    result = daemon.process_request({'command': DaemonRequest.KEYS.value, 'args': {'available': True}})['result']
+    assert len(result['keys']) == MOCK_BASIC_CONFIG_AVAILABLE_KEYS_COUNT
+
+    result = daemon.process_request({
+        'command': DaemonRequest.KEYS.value,
+        'args': {'groups': [MOCK_BASIC_CONFIG_EXISTING_GROUP]},
+    })['result']
+    assert len(result['keys']) == MOCK_BASIC_CONFIG_EXISTING_GROUP_KEY_COUNT
+
+
+# pylint: disable=unused-argument
+def test_daemon_server_process_request_agent(mock_basic_config, mock_agent_key_list):
+    """
+    Test processing daemon requests to list keys loaded to SSH agent
+    """
+    daemon = SshAssetsDaemon(configuration_file=mock_basic_config)
+    result = daemon.process_request({'command': DaemonRequest.AGENT.value})['result']
+    assert len(result['keys']) == MOCK_AGENT_KEY_COUNT
+    assert result['agent_socket'] == daemon.session.agent.agent_socket_path
+
+
+# pylint: disable=unused-argument
+def test_daemon_server_process_request_load_unload(mock_basic_config, mock_agent_key_list, monkeypatch):
+    """
+    Test processing daemon requests to load and unload keys
+    """
+    mock_load = MockCalledMethod(return_value=[])
+    mock_unload = MockCalledMethod(return_value=[])
+    monkeypatch.setattr('ssh_assets.keys.agent.SshAgent.load_keys_to_agent', mock_load)
+    monkeypatch.setattr('ssh_assets.keys.agent.SshAgent.unload_keys_from_agent', mock_unload)
+
+    daemon = SshAssetsDaemon(configuration_file=mock_basic_config)
+    assert daemon.process_request({'command': DaemonRequest.LOAD.value})['result'] == {'results': []}
+    assert mock_load.kwargs[0] == {'load_all_keys': False}
+    daemon.process_request({
+        'command': DaemonRequest.LOAD.value,
+        'args': {'groups': [MOCK_BASIC_CONFIG_EXISTING_GROUP]},
+    })
+    assert len(mock_load.kwargs[1]['keys']) == MOCK_BASIC_CONFIG_EXISTING_GROUP_KEY_COUNT
+
+    assert daemon.process_request({'command': DaemonRequest.UNLOAD.value})['status'] == 'error'
+    response = daemon.process_request({'command': DaemonRequest.UNLOAD.value, 'args': {'keys': [], 'groups': []}})
+    assert response['status'] == 'error'
+    response = daemon.process_request({'command': DaemonRequest.UNLOAD.value, 'args': {'all': 'yes'}})
+    assert response['status'] == 'error'
+    assert mock_unload.call_count == 0
+
+    response = daemon.process_request({'command': DaemonRequest.UNLOAD.value, 'args': {'all': True}})
+    assert response['result'] == {'results': []}
+    assert mock_unload.kwargs[0] == {'unload_all_keys': True}
+    daemon.process_request({
+        'command': DaemonRequest.UNLOAD.value,
+        'args': {'groups': [MOCK_BASIC_CONFIG_EXISTING_GROUP]},
+    })
+    assert mock_unload.kwargs[1]['unload_all_keys'] is False
+    assert len(mock_unload.kwargs[1]['keys']) == MOCK_BASIC_CONFIG_EXISTING_GROUP_KEY_COUNT
+
+
+def test_daemon_server_configuration_reload(mock_temporary_config):
+    """
+    Test daemon session is loaded again when the configuration file is modified
+    """
+    daemon = SshAssetsDaemon(configuration_file=mock_temporary_config)
+    session = daemon.session
+    assert daemon.session is session
+
+    shutil.copyfile(MOCK_BASIC_CONFIG, mock_temporary_config)
+    stat = mock_temporary_config.stat()
+    os.utime(mock_temporary_config, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000))
+    assert daemon.session is not session
+
+
+def test_daemon_server_read_timeout(mock_daemon, monkeypatch):
+    """
+    Test daemon closes connection of a client not sending a complete request within timeout
+    """
+    monkeypatch.setattr(SshAssetsDaemonRequestHandler, 'timeout', 0.1)
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(5)
+        client.connect(str(mock_daemon.socket_path))
+        client.sendall(b'{"command": "status"')
+        assert client.recv(1024) == b''
+
+
+def test_daemon_server_start_existing(mock_daemon):
+    """
+    Test starting daemon when another daemon is listening on the socket
+    """
+    assert mock_daemon.running
+    daemon = SshAssetsDaemon(socket_path=mock_daemon.socket_path)
+    with pytest.raises(SSHAssetsError):
+        daemon.start()
+
+
+def test_daemon_server_start_stale_socket(mock_basic_config, tmp_path):
+    """
+    Test starting daemon when a stale socket file exists
+    """
+    path = tmp_path.joinpath('s.sock')
+    create_stale_socket(path)
+    assert path.is_socket()
+
+    daemon = SshAssetsDaemon(socket_path=path, configuration_file=mock_basic_config)
+    daemon.start()
+    assert daemon.running
+    assert path.stat().st_mode & 0o777 == 0o600
+    daemon.start()
+    daemon.close()
+    assert not daemon.running
+    assert not path.exists()
+
+
+def test_daemon_server_start_untrusted_socket(mock_basic_config, tmp_path):
+    """
+    Test starting daemon when existing socket is accessible by other users or is a symlink
+    """
+    path = tmp_path.joinpath('s.sock')
+    create_stale_socket(path, mode=0o666)
+    daemon = SshAssetsDaemon(socket_path=path, configuration_file=mock_basic_config)
+    with pytest.raises(SSHAssetsError):
+        daemon.start()
+    assert path.is_socket()
+
+    link = tmp_path.joinpath('link.sock')
+    path.chmod(0o600)
+    link.symlink_to(path)
+    daemon = SshAssetsDaemon(socket_path=link, configuration_file=mock_basic_config)
+    with pytest.raises(SSHAssetsError):
+        daemon.start()
+    assert not daemon.running
+
+
+def test_daemon_server_start_untrusted_directory(mock_basic_config, tmp_path, monkeypatch):
+    """
+    Test starting daemon when socket directory is accessible by other users, is a symlink or
+    is owned by another user
+    """
+    directory = tmp_path.joinpath('runtime')
+    directory.mkdir(mode=0o755)
+    directory.chmod(0o755)
+    daemon = SshAssetsDaemon(socket_path=directory.joinpath('s.sock'), configuration_file=mock_basic_config)
+    with pytest.raises(SSHAssetsError):
+        daemon.start()
+
+    directory.chmod(0o700)
+    link = tmp_path.joinpath('link')
+    link.symlink_to(directory)
+    daemon = SshAssetsDaemon(socket_path=link.joinpath('s.sock'), configuration_file=mock_basic_config)
+    with pytest.raises(SSHAssetsError):
+        daemon.start()
+
+    monkeypatch.setattr('ssh_assets.daemon.protocol.os.getuid', lambda: os.geteuid() + 1)
+    daemon = SshAssetsDaemon(socket_path=directory.joinpath('s.sock'), configuration_file=mock_basic_config)
+    with pytest.raises(SSHAssetsError):
+        daemon.start()
+    assert not directory.joinpath('s.sock').exists()
+
+
+def test_daemon_server_start_socket_mode(mock_basic_config, tmp_path):
+    """
+    Test daemon socket is created in a new runtime directory with restrictive permissions
+    """
+    path = tmp_path.joinpath('runtime', 's.sock')
+    umask = os.umask(0)
+    try:
+        daemon = SshAssetsDaemon(socket_path=path, configuration_file=mock_basic_config)
+        daemon.start()
+    finally:
+        os.umask(umask)
+    assert path.parent.stat().st_mode & 0o777 == 0o700
+    assert path.stat().st_mode & 0o777 == 0o600
+    daemon.close()
@@ -9,13 +9,23 @@ Unit tests for ssh_assets.keys.agent module
 import pytest
 
 from sys_toolkit.exceptions import CommandError
-from sys_toolkit.tests.mock import MockCalledMethod, MockException
+from sys_toolkit.tests.mock import MockCalledMethod, MockException, MockReturnFalse
 
+from ssh_assets.duration import Duration
 from ssh_assets.exceptions import SSHKeyError
 from ssh_assets.session import SshAssetSession
-from ssh_assets.keys.agent import AgentKey
-from ssh_assets.keys.constants import AGENT_KEY_IDENTITY_ATTRIBUTES
-
+from ssh_assets.keys.agent import AgentKey, SshAgent
+from ssh_assets.keys.constants import (
+    AGENT_KEY_IDENTITY_ATTRIBUTES,
+    KeyHashAlgorithm,
+    SshAgentMessage,
+    SshKeyLoadStatus,
+    SshKeyType,
+    SshKeyUnloadStatus,
+)
+from ssh_assets.keys.file import SSHKeyFile
+
+from ..conftest import MOCK_DATA, MOCK_TEST_CERTIFICATES
 from ..utils import validate_key
 
 
@@ -98,6 +108,50 @@ def test_ssh_agent_keys_list(mock_agent_key_list):
 
     for key in session.agent:
         validate_key(key, key_class=AgentKey)
+        assert isinstance(key.key_blob, bytes)
+
+
+def test_ssh_agent_keys_list_ssh_add(mock_agent_key_list):
+    """
+    Test listing of SSH agent keys with ssh-add command instead of the agent protocol
+
+    The agent protocol and ssh-add -l output must return matching key details
+    """
+    session = SshAssetSession()
+    agent = SshAgent(session, use_ssh_add=True)
+    assert len(agent) == len(mock_agent_key_list)
+    for key in agent:
+        validate_key(key, key_class=AgentKey)
+        assert key.key_blob is None
+    assert [str(key) for key in session.agent] == [str(key) for key in agent]
+    assert [key.hash for key in session.agent] == [key.hash for key in agent]
+
+
+def test_ssh_agent_certificates_list_ssh_add(mock_agent_certificate_list):
+    """
+    Test listing certificates loaded to SSH agent with agent protocol and ssh-add command
+
+    Certificate fingerprints are calculated from the plain public key like in ssh-add -l output
+    """
+    session = SshAssetSession()
+    agent = SshAgent(session, use_ssh_add=True)
+    assert len(session.agent) == len(mock_agent_certificate_list)
+    assert [str(key) for key in session.agent] == mock_agent_certificate_list
+    assert [str(key) for key in agent] == mock_agent_certificate_list
+    for key in session.agent:
+        assert key.key_type.value.endswith('-CERT')
+
+    for path in MOCK_TEST_CERTIFICATES:
+        key = SSHKeyFile(MOCK_DATA.joinpath('keys/PEM', path.name.replace('-cert.pub', '')))
+        assert session.agent.get_by_hash(key.hash).key_type.value == f'{key.key_type.value}-CERT'
+
+
+def test_ssh_agent_keys_list_ssh_add_error(mock_agent_key_load_error):
+    """
+    Test error listing SSH agent keys with ssh-add command
+    """
+    with pytest.raises(SSHKeyError):
+        list(SshAgent(SshAssetSession(), use_ssh_add=True))
 
 
 def test_ssh_agent_keys_unload_no_agent_socket(mock_basic_config, mock_agent_dummy_env):
@@ -115,26 +169,47 @@ def test_ssh_agent_keys_unload_error(mock_basic_config, mock_agent_key_list, mon
     mock_error = MockException(CommandError)
     monkeypatch.setattr('ssh_assets.keys.agent.SshAgent.is_available', True)
     monkeypatch.setattr('ssh_assets.keys.agent.run_command', mock_error)
+    with pytest.raises(SSHKeyError):
+        SshAgent(SshAssetSession(), use_ssh_add=True).unload_keys_from_agent(unload_all_keys=True)
+
+
+def test_ssh_agent_keys_unload_protocol_error(mock_basic_config, mock_agent_key_list, monkeypatch):
+    """
+    Test error unloading SSH keys from agent when agent refuses the request
+    """
+    monkeypatch.setattr('ssh_assets.keys.agent_client.SshAgentClient.remove_all_identities', MockReturnFalse())
     with pytest.raises(SSHKeyError):
         SshAssetSession().agent.unload_keys_from_agent(unload_all_keys=True)
 
 
 def test_ssh_agent_keys_unload(mock_agent_key_list, monkeypatch):
     """
-    Test mocked unloading of SSH agent keys
+    Test mocked unloading of SSH agent keys with ssh-add command
     """
     mock_command = MockCalledMethod()
     monkeypatch.setattr('ssh_assets.keys.agent.SshAgent.is_available', True)
     monkeypatch.setattr('ssh_assets.keys.agent.run_command', mock_command)
-    session = SshAssetSession()
-    assert len(session.agent) == len(mock_agent_key_list)
+    agent = SshAgent(SshAssetSession(), use_ssh_add=True)
+    assert len(agent) == len(mock_agent_key_list)
 
-    session.agent.unload_keys_from_agent(unload_all_keys=True)
+    agent.unload_keys_from_agent(unload_all_keys=True)
     assert mock_command.call_count == 1
     args = mock_command.args[0]
     assert args == ('ssh-add', '-D')
 
 
+def test_ssh_agent_keys_unload_agent_protocol(mock_agent_socket, mock_agent_key_list):
+    """
+    Test unloading all SSH agent keys with the SSH agent protocol
+    """
+    session = SshAssetSession()
+    assert len(session.agent) == len(mock_agent_key_list)
+
+    session.agent.unload_keys_from_agent(unload_all_keys=True)
+    assert mock_agent_socket.count_requests(SshAgentMessage.REMOVE_ALL_IDENTITIES) == 1
+    assert len(session.agent) == 0
+
+
 def test_ssh_agent_keys_unload_no_keys(mock_basic_config, mock_agent_key_list, monkeypatch):
     """
     Test mocked unloading of SSH agent keys with no listed keys and
@@ -162,15 +237,255 @@ def test_ssh_agent_keys_unload_single_key_not_loaded(mock_basic_config, mock_age
     assert mock_command.call_count == 0
 
 
-def test_ssh_agent_keys_unload_single_key_already_loaded(mock_basic_config, mock_agent_key_list, monkeypatch):
+def test_ssh_agent_keys_unload_single_key_already_loaded(
+        mock_basic_config, mock_agent_socket, mock_agent_key_list, monkeypatch):
     """
-    Test mocked unloading of SSH agent keys with no listed keys and
-    unload_all_keys set to False. The mock function should just return
+    Test mocked unloading of a single SSH agent key loaded to the agent with the
+    SSH agent protocol
     """
     mock_command = MockCalledMethod()
     monkeypatch.setattr('ssh_assets.keys.agent.SshAgent.is_available', True)
     monkeypatch.setattr('ssh_assets.keys.file.run_command', mock_command)
     session = SshAssetSession()
-    session.agent.unload_keys_from_agent(keys=[session.agent.configured_keys[0]], unload_all_keys=False)
+    key = session.agent.configured_keys[0]
+    results = session.agent.unload_keys_from_agent(keys=[key], unload_all_keys=False)
+    # Unload called normally, key was loaded as defined by mock_agent_key_list fixture
+    assert mock_command.call_count == 0
+    assert mock_agent_socket.count_requests(SshAgentMessage.REMOVE_IDENTITY) == 1
+    assert len(results) == 1
+    assert results[0].status == SshKeyUnloadStatus.UNLOADED
+    assert results[0].success is True
+    assert key.loaded is False
+
+
+def test_ssh_agent_keys_unload_single_key_already_loaded_ssh_add(
+        mock_basic_config, mock_agent_key_list, monkeypatch):
+    """
+    Test mocked unloading of a single SSH agent key loaded to the agent with ssh-add
+    """
+    mock_command = MockCalledMethod()
+    monkeypatch.setattr('ssh_assets.keys.agent.SshAgent.is_available', True)
+    monkeypatch.setattr('ssh_assets.keys.file.run_command', mock_command)
+    session = SshAssetSession()
+    agent = SshAgent(session, use_ssh_add=True)
+    results = agent.unload_keys_from_agent(keys=[agent.configured_keys[0]], unload_all_keys=False)
     # Unload called normally, key was loaded as defined by mock_agent_key_list fixture
     assert mock_command.call_count == 1
+    assert mock_command.args[0] == ('ssh-add', '-d', str(agent.configured_keys[0].path))
+    assert results[0].status == SshKeyUnloadStatus.UNLOADED
+
+
+# pylint: disable=unused-argument
+def test_ssh_agent_keys_unload_batch(mock_basic_config, mock_agent_socket, mock_agent_key_list, monkeypatch):
+    """
+    Test unloading multiple keys from the agent with one agent connection
+    """
+    mock_command = MockCalledMethod()
+    monkeypatch.setattr('ssh_assets.keys.file.run_command', mock_command)
+    session = SshAssetSession()
+    keys = session.agent.configured_keys
+    assert len(session.agent) == len(mock_agent_key_list)
+
+    results = session.agent.unload_keys_from_agent(keys=keys)
+    assert [result.key for result in results] == list(keys)
+    for result in results:
+        assert isinstance(result.__repr__(), str)
+    statuses = [result.status for result in results]
+    assert statuses.count(SshKeyUnloadStatus.UNLOADED) == 3
+    assert statuses.count(SshKeyUnloadStatus.UNAVAILABLE) == 1
+    assert mock_command.call_count == 0
+    assert mock_agent_socket.count_requests(SshAgentMessage.REQUEST_IDENTITIES) == 1
+    assert mock_agent_socket.count_requests(SshAgentMessage.REMOVE_IDENTITY) == 3
+    assert len(session.agent) == len(mock_agent_key_list) - 3
+
+    # Keys are not listed again, all keys already unloaded
+    results = session.agent.unload_keys_from_agent(keys=keys)
+    assert [result.status for result in results].count(SshKeyUnloadStatus.NOT_LOADED) == 3
+    assert mock_agent_socket.count_requests(SshAgentMessage.REQUEST_IDENTITIES) == 1
+    assert mock_agent_socket.count_requests(SshAgentMessage.REMOVE_IDENTITY) == 3
+
+
+# pylint: disable=unused-argument
+def test_ssh_agent_keys_unload_batch_ssh_add_error(mock_basic_config, mock_agent_key_list, monkeypatch):
+    """
+    Test unloading multiple keys with ssh-add when unloading one of the keys fails
+    """
+    def mock_unload_key_files_from_agent(keys):
+        if any(key.path.parent.name == 'RFC4716' for key in keys):
+            raise SSHKeyError('Error unloading key from SSH agent')
+
+    monkeypatch.setattr('ssh_assets.keys.agent.unload_key_files_from_agent', mock_unload_key_files_from_agent)
+    agent = SshAgent(SshAssetSession(), use_ssh_add=True)
+    results = {result.key.name: result for result in agent.unload_keys_from_agent(keys=agent.configured_keys)}
+    assert results['noexpire'].status == SshKeyUnloadStatus.UNLOADED
+    assert results['manual'].status == SshKeyUnloadStatus.UNLOADED
+    assert results['test'].status == SshKeyUnloadStatus.FAILED
+    assert results['test'].success is False
+    assert results['missing'].status == SshKeyUnloadStatus.UNAVAILABLE
+
+
+# pylint: disable=unused-argument
+def test_ssh_agent_keys_unload_protocol_refused(
+        mock_basic_config, mock_agent_socket, mock_agent_key_list, monkeypatch):
+    """
+    Test unloading keys when the agent refuses to remove the keys
+    """
+    monkeypatch.setattr('ssh_assets.keys.agent_client.SshAgentClient.remove_identity', MockReturnFalse())
+    session = SshAssetSession()
+    results = session.agent.unload_keys_from_agent(keys=session.agent.configured_keys[:1])
+    assert results[0].status == SshKeyUnloadStatus.FAILED
+    assert session.agent.configured_keys[0].loaded is True
+
+    monkeypatch.setattr('ssh_assets.keys.agent_client.SshAgentClient.connect', MockException(SSHKeyError))
+    results = session.agent.unload_keys_from_agent(keys=session.agent.configured_keys[:1])
+    assert results[0].status == SshKeyUnloadStatus.FAILED
+
+
+# pylint: disable=unused-argument
+def test_ssh_agent_mark_keys_loaded(mock_basic_config, mock_agent_socket, mock_agent_no_keys):
+    """
+    Test updating the cached list of agent keys when keys are loaded and unloaded
+    """
+    session = SshAssetSession()
+    agent = session.agent
+    key = agent.configured_keys[0].private_key
+
+    # Keys not yet listed, nothing is cached
+    agent.mark_key_loaded(key)
+    assert agent.__requires_reload__ is True
+
+    assert len(agent) == 0
+    agent.mark_key_loaded(key)
+    agent.mark_key_loaded(key)
+    assert len(agent) == 1
+    assert key.hash in agent
+    agent.mark_key_unloaded(key)
+    assert len(agent) == 0
+
+    md5_key = SSHKeyFile(key.path, hash_algorithm=KeyHashAlgorithm.MD5)
+    agent.mark_key_loaded(md5_key)
+    assert agent.__requires_reload__ is True
+    assert mock_agent_socket.count_requests(SshAgentMessage.REQUEST_IDENTITIES) == 1
+
+
+# pylint: disable=unused-argument
+def test_ssh_agent_load_keys_batches(mock_basic_config, mock_agent_socket, mock_agent_no_keys, monkeypatch):
+    """
+    Test loading keys with same expiration value to agent with one command
+    """
+    mock_load = MockCalledMethod()
+    monkeypatch.setattr('ssh_assets.keys.agent.load_key_files_to_agent', mock_load)
+    session = SshAssetSession()
+    keys = session.agent.configured_keys
+    keys.get_key_by_name('noexpire').expire = Duration('1d')
+
+    results = session.agent.load_keys_to_agent(load_all_keys=True)
+    assert [result.key for result in results] == list(keys)
+    for result in results:
+        assert isinstance(result.__repr__(), str)
+    statuses = [result.status for result in results]
+    assert statuses.count(SshKeyLoadStatus.LOADED) == 3
+    assert statuses.count(SshKeyLoadStatus.UNAVAILABLE) == 1
+    assert mock_load.call_count == 2
+    batches = sorted(
+        (str(kwargs['expire']), sorted(key.path.name for key in args[0]))
+        for args, kwargs in zip(mock_load.args, mock_load.kwargs)
+    )
+    assert batches[0] == ('1d', ['ssh_key_dsa', 'ssh_key_dsa'])
+    assert batches[1] == ('1h', ['ssh_key_ecdsa'])
+
+    # Loaded keys are added to the agent snapshot and skipped on next load
+    results = session.agent.load_keys_to_agent(load_all_keys=True)
+    assert mock_load.call_count == 2
+    assert [result.status for result in results].count(SshKeyLoadStatus.ALREADY_LOADED) == 3
+    assert all(result.success for result in results if result.status != SshKeyLoadStatus.UNAVAILABLE)
+    assert mock_agent_socket.count_requests(SshAgentMessage.REQUEST_IDENTITIES) == 1
+
+
+# pylint: disable=unused-argument
+def test_ssh_agent_load_keys_batch_error(mock_basic_config, mock_agent_socket, mock_agent_no_keys, monkeypatch):
+    """
+    Test loading keys when loading a batch of keys fails for one key
+    """
+    def mock_load_key_files_to_agent(keys, expire=None):
+        if any(key.path.parent.name == 'RFC4716' for key in keys):
+            raise SSHKeyError('Error loading key to SSH agent')
+
+    monkeypatch.setattr('ssh_assets.keys.agent.load_key_files_to_agent', mock_load_key_files_to_agent)
+    session = SshAssetSession()
+    keys = session.agent.configured_keys
+    keys.get_key_by_name('noexpire').expire = Duration('1d')
+
+    results = {result.key.name: result for result in session.agent.load_keys_to_agent(load_all_keys=True)}
+    assert results['noexpire'].status == SshKeyLoadStatus.LOADED
+    assert results['manual'].status == SshKeyLoadStatus.LOADED
+    assert results['test'].status == SshKeyLoadStatus.FAILED
+    assert results['test'].success is False
+    assert results['test'].error is not None
+    assert results['missing'].status == SshKeyLoadStatus.UNAVAILABLE
+    assert keys.get_key_by_name('noexpire').loaded is True
+    assert keys.get_key_by_name('test').loaded is False
+
+
+# pylint: disable=unused-argument
+def test_ssh_agent_load_encrypted_keys(mock_basic_config, mock_agent_socket, mock_agent_no_keys, monkeypatch):
+    """
+    Test passphrase protected keys are loaded sequentially in one batch
+    """
+    mock_load = MockCalledMethod()
+    monkeypatch.setattr('ssh_assets.keys.agent.load_key_files_to_agent', mock_load)
+    monkeypatch.setattr('ssh_assets.keys.file.SSHKeyFile.encrypted', True)
+    session = SshAssetSession()
+    results = session.agent.load_keys_to_agent(load_all_keys=True, max_workers=1)
+    assert [result.status for result in results].count(SshKeyLoadStatus.LOADED) == 3
+    assert mock_load.call_count == 3
+
+
+# pylint: disable=unused-argument
+def test_ssh_agent_key_indexes(mock_agent_socket, mock_agent_key_list):
+    """
+    Test looking up keys loaded to the agent by hash, comment and key type
+    """
+    agent = SshAgent(SshAssetSession())
+    keys = list(agent)
+    assert len(keys) == len(mock_agent_key_list)
+
+    for key in keys:
+        assert agent.contains_hash(key.hash) is True
+        assert key.hash in agent
+        assert agent.get_by_hash(key.hash) is key
+        assert key in agent.get_by_comment(key.comment)
+        assert key in agent.get_by_key_type(key.key_type)
+        assert key in agent.get_by_key_type(key.key_type.value)
+    assert agent.contains_hash('unknown') is False
+    assert agent.get_by_hash('unknown') is None
+    assert agent.get_by_comment('unknown') == []
+    assert len(agent.get_by_key_type(SshKeyType.RSA)) == 3
+    assert agent.get_by_key_type(SshKeyType.ED25519_SK) == []
+
+    # Indexes are updated when keys are modified
+    key = keys[0]
+    del agent[0]
+    assert agent.contains_hash(key.hash) is False
+    agent.insert(0, key)
+    assert agent.contains_hash(key.hash) is True
+    agent[0] = keys[1]
+    assert agent.contains_hash(key.hash) is False
+    agent.clear()
+    assert agent.contains_hash(key.hash) is True
+    assert mock_agent_socket.count_requests(SshAgentMessage.REQUEST_IDENTITIES) == 2
+
+
+def test_ssh_agent_key_lazy_parsing():
+    """
+    Test agent key details are parsed from key info line on first access
+    """
+    line = '256 SHA256:Em8g+F4WH/1EDGNWYxyyh5O8qUL+GZRKUvf0/X1Dcv8 test key (ED25519)'
+    key = AgentKey(line, KeyHashAlgorithm.SHA_256)
+    assert key.__key_attributes__ == {}
+    assert key.hash == 'Em8g+F4WH/1EDGNWYxyyh5O8qUL+GZRKUvf0/X1Dcv8'
+    assert key.comment == 'test key'
+
+    key = AgentKey('invalid line', KeyHashAlgorithm.SHA_256)
+    with pytest.raises(SSHKeyError):
+        key.hash  # pylint: disable=pointless-statement
@@ -0,0 +1,103 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Unit tests for ssh_assets.keys.agent_client module
+"""
+import pytest
+
+from ssh_assets.exceptions import SSHKeyError
+from ssh_assets.keys.agent_client import SshAgentClient
+from ssh_assets.keys.constants import SshAgentConstraint, SshAgentMessage
+from ssh_assets.keys.wire import pack_string, pack_uint32
+
+from ..conftest import get_mock_agent_identities
+
+MOCK_PRIVATE_KEY_DATA = pack_string('ssh-ed25519') + pack_string(b'\x01' * 32) + pack_string(b'\x02' * 64)
+MOCK_KEY_LIFETIME = 3600
+
+
+# pylint: disable=unused-argument
+def test_agent_client_no_socket_path(mock_agent_delete_socket_env):
+    """
+    Test agent client without SSH agent socket path defined
+    """
+    client = SshAgentClient()
+    assert client.socket_path is None
+    with pytest.raises(SSHKeyError):
+        client.list_identities()
+
+
+# pylint: disable=unused-argument
+def test_agent_client_connection_refused(mock_agent_dummy_socket):
+    """
+    Test agent client connecting to a socket where nothing is listening
+    """
+    with pytest.raises(SSHKeyError):
+        SshAgentClient().list_identities()
+
+
+def test_agent_client_list_identities(mock_agent_socket):
+    """
+    Test listing identities from mocked SSH agent
+    """
+    client = SshAgentClient()
+    assert client.list_identities() == []
+    mock_agent_socket.identities = get_mock_agent_identities()
+    assert client.list_identities() == mock_agent_socket.identities
+    assert client.connected is False
+
+
+def test_agent_client_shared_connection(mock_agent_socket):
+    """
+    Test sending multiple requests over the same agent connection
+    """
+    identities = get_mock_agent_identities()
+    mock_agent_socket.identities = list(identities)
+    with SshAgentClient() as client:
+        assert client.connected is True
+        assert client.remove_identity(identities[0][0]) is True
+        assert client.remove_identity(identities[0][0]) is False
+        assert len(client.list_identities()) == len(identities) - 1
+        assert client.remove_all_identities() is True
+        assert client.list_identities() == []
+    assert client.connected is False
+    assert mock_agent_socket.requests == [
+        SshAgentMessage.REMOVE_IDENTITY,
+        SshAgentMessage.REMOVE_IDENTITY,
+        SshAgentMessage.REQUEST_IDENTITIES,
+        SshAgentMessage.REMOVE_ALL_IDENTITIES,
+        SshAgentMessage.REQUEST_IDENTITIES,
+    ]
+
+
+def test_agent_client_add_identity(mock_agent_socket):
+    """
+    Test adding identities with and without constraints to the mocked agent
+    """
+    client = SshAgentClient()
+    assert client.add_identity(MOCK_PRIVATE_KEY_DATA, 'test') is True
+    assert client.add_identity(MOCK_PRIVATE_KEY_DATA, 'test', lifetime=MOCK_KEY_LIFETIME, confirm=True) is True
+    assert mock_agent_socket.requests == [SshAgentMessage.ADD_IDENTITY, SshAgentMessage.ADD_ID_CONSTRAINED]
+    assert mock_agent_socket.added[0] == MOCK_PRIVATE_KEY_DATA + pack_string('test')
+    assert mock_agent_socket.added[1] == (
+        MOCK_PRIVATE_KEY_DATA + pack_string('test') +
+        bytes([SshAgentConstraint.LIFETIME]) + pack_uint32(MOCK_KEY_LIFETIME) +
+        bytes([SshAgentConstraint.CONFIRM])
+    )
+
+
+def test_agent_client_unexpected_response(mock_agent_socket, monkeypatch):
+    """
+    Test unexpected response message types from the agent
+    """
+    client = SshAgentClient()
+    monkeypatch.setattr(client, 'request', lambda *args: (SshAgentMessage.IDENTITIES_ANSWER, b''))
+    with pytest.raises(SSHKeyError):
+        client.remove_all_identities()
+
+    monkeypatch.setattr(client, 'request', lambda *args: (SshAgentMessage.SUCCESS, b''))
+    with pytest.raises(SSHKeyError):
+        client.list_identities()
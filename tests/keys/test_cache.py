@@ -0,0 +1,191 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Unit tests for ssh_assets.keys.cache module
+"""
+import os
+import shutil
+
+from pathlib import Path
+
+import pytest
+
+from sys_toolkit.tests.mock import MockCalledMethod, MockException
+
+from ssh_assets.keys.cache import (
+    FingerprintCache,
+    batch_fingerprint_cache_updates,
+    fingerprint_cache_batch,
+    get_fingerprint_cache,
+)
+from ssh_assets.keys.constants import KeyHashAlgorithm, FINGERPRINT_CACHE_ATTRIBUTES
+from ssh_assets.keys.file import SSHKeyFile
+
+from ..conftest import MOCK_TEST_PUBLIC_KEYS
+
+
+def copy_key_file(path: Path, tmpdir) -> Path:
+    """
+    Copy test key file to temporary directory
+    """
+    target = Path(tmpdir, path.name)
+    shutil.copyfile(path, target)
+    return target
+
+
+def test_keys_fingerprint_cache_default(mock_fingerprint_cache):
+    """
+    Test the default shared fingerprint cache
+    """
+    cache = get_fingerprint_cache()
+    assert isinstance(cache, FingerprintCache)
+    assert cache.path == mock_fingerprint_cache
+    assert cache is get_fingerprint_cache()
+    assert isinstance(cache.__repr__(), str)
+    assert cache.entries == {}
+
+
+def test_keys_fingerprint_cache_hit(mock_public_key_file, mock_fingerprint_cache, monkeypatch):
+    """
+    Test cached key attributes are used without running ssh-keygen
+    """
+    key = SSHKeyFile(mock_public_key_file)
+    attributes = {attr: getattr(key, attr) for attr in ('bits', 'hash', 'comment')}
+    assert mock_fingerprint_cache.is_file()
+
+    monkeypatch.setattr('ssh_assets.keys.file.run_command_lineoutput', MockException(OSError))
+    cached = SSHKeyFile(mock_public_key_file, fingerprint_cache=FingerprintCache(mock_fingerprint_cache))
+    assert {attr: getattr(cached, attr) for attr in ('bits', 'hash', 'comment')} == attributes
+    assert cached.key_type == key.key_type
+
+
+def test_keys_fingerprint_cache_file_modified(mock_public_key_file, tmpdir):
+    """
+    Test cache entries are ignored when the key file is modified
+    """
+    path = copy_key_file(mock_public_key_file, tmpdir)
+    cache = get_fingerprint_cache()
+    key = SSHKeyFile(path)
+    key.__load_key_attributes__()
+    assert cache.get(key.path, key.hash_algorithm) is not None
+    assert cache.get(key.path, KeyHashAlgorithm.MD5) is None
+
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000))
+    assert cache.get(key.path, key.hash_algorithm) is None
+
+    path.unlink()
+    assert cache.get(key.path, key.hash_algorithm) is None
+    cache.set(key.path, key.hash_algorithm, key.__key_attributes__)
+    assert cache.get(key.path, key.hash_algorithm) is None
+
+
+def test_keys_fingerprint_cache_merge(mock_public_key_file, mock_fingerprint_cache, tmpdir):
+    """
+    Test updates from separate cache instances are merged in the cache file
+    """
+    path = copy_key_file(mock_public_key_file, tmpdir)
+    first = FingerprintCache(mock_fingerprint_cache)
+    second = FingerprintCache(mock_fingerprint_cache)
+    assert first.entries == {}
+    assert second.entries == {}
+
+    key = SSHKeyFile(path, fingerprint_cache=first)
+    key.__load_key_attributes__()
+    second.set(key.path, KeyHashAlgorithm.MD5, key.__key_attributes__)
+
+    entries = FingerprintCache(mock_fingerprint_cache).entries
+    assert len(entries) == 2
+    assert len(second.entries) == 2
+    for entry in entries.values():
+        assert tuple(entry['attributes']) == FINGERPRINT_CACHE_ATTRIBUTES
+    assert not list(mock_fingerprint_cache.parent.glob(f'.{mock_fingerprint_cache.name}.*'))
+
+
+def test_keys_fingerprint_cache_invalid_file(mock_public_key_file, mock_fingerprint_cache):
+    """
+    Test invalid cache file contents are ignored and replaced on update
+    """
+    mock_fingerprint_cache.parent.mkdir(parents=True)
+    for data in ('invalid json', '[]', '{"version": 0, "entries": {}}', '{"version": 1, "entries": []}'):
+        mock_fingerprint_cache.write_text(data, encoding='utf-8')
+        assert FingerprintCache(mock_fingerprint_cache).entries == {}
+
+    key = SSHKeyFile(mock_public_key_file, fingerprint_cache=FingerprintCache(mock_fingerprint_cache))
+    key.__load_key_attributes__()
+    assert len(FingerprintCache(mock_fingerprint_cache).entries) == 1
+
+
+def test_keys_fingerprint_cache_write_error(mock_public_key_file, mock_fingerprint_cache, monkeypatch):
+    """
+    Test errors writing the cache file are ignored and entries are kept in memory
+    """
+    monkeypatch.setattr('ssh_assets.keys.cache.tempfile.mkstemp', MockException(OSError))
+    key = SSHKeyFile(mock_public_key_file)
+    key.__load_key_attributes__()
+    assert key.__key_attributes__ != {}
+    assert not mock_fingerprint_cache.is_file()
+    assert get_fingerprint_cache().pending == 0
+    assert get_fingerprint_cache().get(key.path, key.hash_algorithm) == key.__key_attributes__
+    assert FingerprintCache(mock_fingerprint_cache).entries == {}
+
+
+def test_keys_fingerprint_cache_batch(tmpdir, monkeypatch):
+    """
+    Test cache entries set in a batch are written to the cache file once
+    """
+    paths = [copy_key_file(path, tmpdir) for path in MOCK_TEST_PUBLIC_KEYS[:3]]
+    cache = get_fingerprint_cache()
+    mock_write = MockCalledMethod()
+    monkeypatch.setattr(cache, '__write__', mock_write)
+    with fingerprint_cache_batch() as batch:
+        assert batch is cache
+        with cache.batch():
+            for path in paths:
+                SSHKeyFile(path).__load_key_attributes__()
+        assert cache.pending == len(paths)
+        assert mock_write.call_count == 0
+        for path in paths:
+            assert cache.get(path, KeyHashAlgorithm.SHA_256) is not None
+    assert cache.pending == 0
+    assert mock_write.call_count == 1
+    assert len(mock_write.args[0][0]) == len(paths)
+
+
+def test_keys_fingerprint_cache_batch_error(mock_public_key_file, mock_fingerprint_cache, tmpdir):
+    """
+    Test cache entries set in a decorated method are written if the method raises an error
+    """
+    path = copy_key_file(mock_public_key_file, tmpdir)
+
+    @batch_fingerprint_cache_updates
+    def load_attributes():
+        SSHKeyFile(path).__load_key_attributes__()
+        assert not mock_fingerprint_cache.is_file()
+        raise ValueError
+
+    with pytest.raises(ValueError):
+        load_attributes()
+    assert len(FingerprintCache(mock_fingerprint_cache).entries) == 1
+
+
+def test_keys_fingerprint_cache_public_key_file_modified(tmpdir, monkeypatch):
+    """
+    Test cached attributes of a private key are invalidated when the .pub file is replaced
+    """
+    first, second = MOCK_TEST_PUBLIC_KEYS[:2]
+    path = Path(tmpdir, 'id_test')
+    shutil.copyfile(str(first)[:-4], path)
+    shutil.copyfile(first, f'{path}.pub')
+    monkeypatch.setattr('ssh_assets.keys.file.run_command_lineoutput', MockException(OSError))
+
+    key = SSHKeyFile(path)
+    assert key.hash == SSHKeyFile(first).hash
+    assert SSHKeyFile(path).hash == key.hash
+
+    shutil.copyfile(second, f'{path}.pub')
+    assert SSHKeyFile(path).hash == SSHKeyFile(second).hash
+    assert SSHKeyFile(path).hash != key.hash
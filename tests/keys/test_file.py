@@ -13,15 +13,16 @@ from pathlib import Path
 import pytest
 
 from sys_toolkit.exceptions import CommandError
+from sys_toolkit.subprocess import run_command
 from sys_toolkit.tests.mock import MockCalledMethod, MockException, MockRunCommandLineOutput
 
 from ssh_assets.authorized_keys.public_key import PublicKey
 from ssh_assets.exceptions import SSHKeyError
 from ssh_assets.keys.base import KEY_COMPARE_ATTRIBUTES
 from ssh_assets.keys.constants import KeyHashAlgorithm, SshKeyType
-from ssh_assets.keys.file import SSHKeyFile
+from ssh_assets.keys.file import SSHKeyFile, load_key_files_to_agent
 
-from ..conftest import FILE_NO_PERMISSION, FILE_READONLY
+from ..conftest import FILE_NO_PERMISSION, FILE_READONLY, MOCK_TEST_PUBLIC_KEYS
 
 
 def validate_public_key_processing(obj, tmpdir):
@@ -112,7 +113,8 @@ def test_keys_file_load_missing_file(tmpdir):
         SSHKeyFile(path).generate_public_key_file()
 
 
-def test_keys_file_load_empty_output(mock_test_key_file, monkeypatch):
+# pylint: disable=unused-argument
+def test_keys_file_load_empty_output(mock_test_key_file, mock_public_key_parse_error, monkeypatch):
     """
     Test loading SSH key details with empty output from command
     """
@@ -123,7 +125,8 @@ def test_keys_file_load_empty_output(mock_test_key_file, monkeypatch):
         obj.__load_key_attributes__()
 
 
-def test_keys_file_load_error(mock_test_key_file, monkeypatch):
+# pylint: disable=unused-argument
+def test_keys_file_load_error(mock_test_key_file, mock_public_key_parse_error, monkeypatch):
     """
     Test loading SSH key details with error running command
     """
@@ -164,3 +167,82 @@ def test_keys_file_unload_from_agent_error(mock_test_key_file, monkeypatch):
     with pytest.raises(SSHKeyError):
         SSHKeyFile(mock_test_key_file).unload_from_agent()
     assert mock_error.call_count == 1
+
+
+def test_keys_file_load_public_key_attributes(mock_test_key_file, monkeypatch):
+    """
+    Test loading SSH key attributes from public key files matches ssh-keygen -l output
+    """
+    for hash_algorithm in KeyHashAlgorithm:
+        with monkeypatch.context() as context:
+            context.setattr('ssh_assets.keys.file.get_key_blob_attributes', MockException(SSHKeyError))
+            expected = SSHKeyFile(mock_test_key_file, hash_algorithm=hash_algorithm)
+            expected.__load_key_attributes__()
+
+        with monkeypatch.context() as context:
+            context.setattr('ssh_assets.keys.file.run_command_lineoutput', MockException(CommandError))
+            obj = SSHKeyFile(mock_test_key_file, hash_algorithm=hash_algorithm)
+            assert obj.__load_public_key_attributes__() is True
+        assert obj.__key_attributes__ == expected.__key_attributes__
+
+
+def test_keys_file_load_public_key_missing(mock_test_key_file, tmpdir):
+    """
+    Test loading SSH key attributes for private key without public key file
+    """
+    if mock_test_key_file.suffix == '.pub':
+        return
+    path = Path(tmpdir, mock_test_key_file.name)
+    shutil.copyfile(mock_test_key_file, path)
+    obj = SSHKeyFile(path)
+    assert obj.__load_public_key_attributes__() is False
+    assert obj.__key_attributes__ == {}
+
+
+def test_keys_file_encrypted(mock_test_key_file, tmpdir):
+    """
+    Test detecting passphrase protected private keys
+    """
+    assert SSHKeyFile(mock_test_key_file).encrypted is False
+    assert SSHKeyFile(Path(tmpdir, 'ssh_key_missing')).encrypted is True
+
+
+def test_keys_file_encrypted_key_formats(tmpdir):
+    """
+    Test detecting passphrase protected private keys in all key formats
+    """
+    for key_format in ('PEM', 'PKCS8', 'RFC4716'):
+        path = Path(tmpdir, f'ssh_key_{key_format}')
+        run_command(
+            'ssh-keygen', '-q', '-t', 'ecdsa', '-a', '1', '-N', 'passphrase', '-m', key_format, '-f', str(path)
+        )
+        assert SSHKeyFile(path).encrypted is True
+
+
+def test_keys_file_load_key_files_to_agent(monkeypatch):
+    """
+    Test loading multiple key files to agent with one command
+    """
+    mock_load = MockCalledMethod()
+    monkeypatch.setattr('ssh_assets.keys.file.run_command', mock_load)
+    keys = [SSHKeyFile(path) for path in MOCK_TEST_PUBLIC_KEYS]
+    load_key_files_to_agent(keys, expire='1h')
+    assert mock_load.call_count == 1
+    assert mock_load.args[0] == ('ssh-add', '-t', '1h', *[str(key.path) for key in keys])
+
+
+def test_keys_file_lazy_path(tmpdir):
+    """
+    Test key file path is resolved on first access
+    """
+    path = Path(tmpdir.strpath, 'link')
+    path.symlink_to(Path(tmpdir.strpath, 'ssh_key'))
+    key = SSHKeyFile(path)
+    assert key.__resolved_path__ is None
+    resolved_path = key.path
+    assert resolved_path == Path(tmpdir.strpath, 'ssh_key').resolve()
+    assert key.path is resolved_path
+
+    key.path = '~/.ssh/id_ed25519'
+    assert key.__resolved_path__ is None
+    assert key.path == Path('~/.ssh/id_ed25519').expanduser().resolve()
@@ -7,8 +7,15 @@
 Unit tests for ssh_assets.keys.filter_set module
 """
 from ssh_assets.configuration.keys import SshKeyConfiguration
+from ssh_assets.keys.constants import SshAgentMessage
 from ssh_assets.keys.filter_set import (
+    SshKeyAvailableFilter,
     SshKeyFilterSet,
+    SshKeyGroupFilter,
+    SshKeyLoadedFilter,
+    SshKeyNameFilter,
+    compile_name_patterns,
+    get_available_key_paths,
     filter_key_available,
     filter_key_groups,
     filter_key_loaded,
@@ -207,3 +214,63 @@ def test_filter_set_class_filter_loaded(mock_session):
     matches = mock_session.key_filter_set.filter_loaded(True)
     assert default.keys == matches.keys
     assert len(matches.keys) == MOCK_BASIC_CONFIG_AVAILABLE_KEYS_COUNT
+
+
+def test_filter_set_compile_name_patterns():
+    """
+    Test compiling shell style key name patterns to a single regular expression
+    """
+    assert compile_name_patterns([]) is None
+    pattern = compile_name_patterns(['man*', 'te?t', '[xy]', 'man*'])
+    for name in ('manual', 'man', 'test', 'text', 'x'):
+        assert pattern.match(name)
+    for name in ('amanual', 'tests', 'z', 'xy'):
+        assert not pattern.match(name)
+
+
+def test_filter_set_get_available_key_paths(mock_session):
+    """
+    Test checking available key files by listing key directories
+    """
+    keys = list(mock_session.configuration.keys)
+    paths = get_available_key_paths(keys)
+    assert paths == {key.path for key in keys if key.path.is_file()}
+    assert get_available_key_paths([]) == set()
+
+
+def test_filter_set_class_lazy_filters(mock_session, mock_agent_socket):
+    """
+    Test filters of filter set are evaluated cheapest first and only when keys are requested
+    """
+    filter_set = mock_session.key_filter_set.filter_loaded().filter_available().filter_names(
+        ['*']
+    ).filter_groups([MOCK_BASIC_CONFIG_EXISTING_GROUP])
+    assert filter_set.__keys__ is None
+    assert [type(key_filter) for key_filter in filter_set.filters] == [
+        SshKeyGroupFilter,
+        SshKeyNameFilter,
+        SshKeyAvailableFilter,
+        SshKeyLoadedFilter,
+    ]
+    assert mock_agent_socket.count_requests(SshAgentMessage.REQUEST_IDENTITIES) == 0
+
+    keys = filter_set.keys
+    validate_key_list(keys)
+    assert len(keys) == MOCK_BASIC_CONFIG_EXISTING_GROUP_KEY_COUNT
+    assert filter_set.keys is keys
+    assert mock_agent_socket.count_requests(SshAgentMessage.REQUEST_IDENTITIES) == 1
+
+    assert mock_session.key_filter_set.filter_loaded(False).filter_groups(
+        [MOCK_BASIC_CONFIG_EXISTING_GROUP]
+    ).keys == []
+    assert mock_agent_socket.count_requests(SshAgentMessage.REQUEST_IDENTITIES) == 1
+
+
+def test_filter_set_class_filter_names_path(mock_session):
+    """
+    Test filtering keys by key file path
+    """
+    key = mock_session.configuration.keys.get_key_by_name(MOCK_BASIC_CONFIG_EXISTING_KEY)
+    matches = mock_session.key_filter_set.filter_names([str(key.path)])
+    assert matches.keys == [key]
+    assert mock_session.key_filter_set.filter_names([]).keys == list(mock_session.configuration.keys)
@@ -0,0 +1,117 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Unit tests for ssh_assets.keys.wire module
+"""
+import pytest
+
+from sys_toolkit.subprocess import run_command_lineoutput
+
+from ssh_assets.exceptions import SSHKeyError
+from ssh_assets.keys.base import RE_KEY_ATTRIBUTES
+from ssh_assets.keys.constants import KeyHashAlgorithm, SshKeyType
+from ssh_assets.keys.wire import (
+    WireFormatReader,
+    format_key_info_line,
+    get_key_blob_attributes,
+    get_key_blob_details,
+    get_key_blob_fingerprint,
+    get_plain_key_blob,
+    pack_string,
+    pack_uint32,
+)
+
+from ..conftest import MOCK_DATA, MOCK_TEST_CERTIFICATES
+from ..utils import load_public_key_blob
+
+
+def test_wire_format_reader_pack_values():
+    """
+    Test reading packed SSH wire format values
+    """
+    data = pack_uint32(42) + pack_string('test') + pack_string(b'\x00\x80') + b'\x05'
+    reader = WireFormatReader(data)
+    assert reader.read_uint32() == 42
+    assert reader.read_text() == 'test'
+    assert reader.read_mpint() == 128
+    assert reader.read_byte() == 5
+    assert reader.remaining == 0
+    with pytest.raises(SSHKeyError):
+        reader.read_uint32()
+
+
+def test_wire_format_reader_truncated_string():
+    """
+    Test reading a string with length exceeding the data
+    """
+    with pytest.raises(SSHKeyError):
+        WireFormatReader(pack_uint32(10) + b'abc').read_string()
+
+
+def test_wire_key_blob_unsupported_type():
+    """
+    Test parsing key blob with unexpected key type and ECDSA curve
+    """
+    with pytest.raises(SSHKeyError):
+        get_key_blob_details(pack_string('ssh-unknown'))
+    with pytest.raises(SSHKeyError):
+        get_key_blob_details(pack_string('ecdsa-sha2-nistp256') + pack_string('nistp999'))
+
+
+def test_wire_key_blob_unsupported_hash_algorithm():
+    """
+    Test calculating fingerprint with invalid hash algorithm
+    """
+    with pytest.raises(SSHKeyError):
+        get_key_blob_fingerprint(b'', 'sha1')
+
+
+@pytest.mark.parametrize('hash_algorithm', list(KeyHashAlgorithm))
+def test_wire_key_blob_attributes_match_ssh_keygen(mock_public_key_file, hash_algorithm):
+    """
+    Test key attributes parsed from public key blob match the output of ssh-keygen -l
+    """
+    stdout, _stderr = run_command_lineoutput(
+        'ssh-keygen', '-E', hash_algorithm.value, '-l', '-f', str(mock_public_key_file)
+    )
+    expected = RE_KEY_ATTRIBUTES.match(stdout[0]).groupdict()
+
+    key_blob = load_public_key_blob(mock_public_key_file)
+    attributes = get_key_blob_attributes(key_blob, expected['comment'], hash_algorithm)
+    assert attributes['bits'] == int(expected['bits'])
+    assert attributes['hash_algorithm'] == expected['hash_algorithm']
+    assert attributes['hash'] == expected['hash']
+    assert attributes['key_type'] == expected['key_type']
+    assert isinstance(SshKeyType(attributes['key_type']), SshKeyType)
+    assert format_key_info_line(attributes) == stdout[0]
+
+
+@pytest.mark.parametrize('certificate', MOCK_TEST_CERTIFICATES)
+@pytest.mark.parametrize('hash_algorithm', list(KeyHashAlgorithm))
+def test_wire_certificate_blob_attributes_match_ssh_keygen(certificate, hash_algorithm):
+    """
+    Test certificate fingerprint is calculated from the plain public key as in ssh-keygen -l
+    """
+    stdout, _stderr = run_command_lineoutput(
+        'ssh-keygen', '-E', hash_algorithm.value, '-l', '-f', str(certificate)
+    )
+    expected = RE_KEY_ATTRIBUTES.match(stdout[0]).groupdict()
+
+    key_blob = load_public_key_blob(certificate)
+    public_key_blob = load_public_key_blob(MOCK_DATA.joinpath('keys/PEM', certificate.name.replace('-cert', '')))
+    assert get_plain_key_blob(key_blob) == public_key_blob
+    assert get_plain_key_blob(public_key_blob) == public_key_blob
+    attributes = get_key_blob_attributes(key_blob, expected['comment'], hash_algorithm)
+    assert attributes['key_type'] == expected['key_type']
+    assert format_key_info_line(attributes) == stdout[0]
+
+
+def test_wire_certificate_blob_unsupported_type():
+    """
+    Test getting plain public key blob from certificate with unexpected key type
+    """
+    with pytest.raises(SSHKeyError):
+        get_plain_key_blob(pack_string('ssh-unknown-cert-v01@openssh.com'))
@@ -0,0 +1,77 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Unit tests for benchmarks suite
+"""
+import json
+
+import pytest
+
+from benchmarks.__main__ import main
+from benchmarks.runner import compare_results
+from benchmarks.suites import BenchmarkSuite
+
+
+def test_benchmarks_suite_run(tmp_path):
+    """
+    Test running benchmarks offline with small data size
+    """
+    suite = BenchmarkSuite(tmp_path, size='small', repeat=1)
+    assert isinstance(repr(suite), str)
+    results = suite.run()
+    names = {result.name for result in results}
+    assert names == {
+        'session', 'filter_set', 'agent_update', 'pending', 'loaded', 'authorized_keys_load',
+        'authorized_keys_update', 'authorized_keys_refresh', 'authorized_keys_merge',
+        'public_key', 'duration',
+    }
+    for result in results:
+        assert isinstance(repr(result), str)
+        assert len(result.times) == 1
+
+    calls = {result.key: result.subprocess_calls for result in results}
+    assert calls['agent_update[agent_keys=50]'] == {'ssh_assets.keys.agent.run_command_lineoutput': 1}
+    assert calls['loaded[fingerprint_cache=False,keys=100]']['ssh_assets.keys.file.run_command_lineoutput'] == 25
+    assert 'ssh_assets.keys.file.run_command_lineoutput' not in calls['loaded[fingerprint_cache=True,keys=100]']
+
+
+def test_benchmarks_suite_errors(tmp_path):
+    """
+    Test benchmark suite with unknown size and benchmark names
+    """
+    with pytest.raises(ValueError):
+        BenchmarkSuite(tmp_path, size='unknown')
+    with pytest.raises(ValueError):
+        BenchmarkSuite(tmp_path, size='small').run(['unknown'])
+
+
+def test_benchmarks_main_compare(tmp_path, capsys):
+    """
+    Test running benchmarks from command line and comparing results
+    """
+    output = tmp_path.joinpath('results.json')
+    assert main(['--size', 'small', '--repeat', '1', '--output', str(output), 'duration', 'agent']) == 0
+    data = json.loads(output.read_text(encoding='utf-8'))
+    assert data['size'] == 'small'
+    assert [result['name'] for result in data['results']] == ['duration', 'duration', 'agent_update']
+
+    # Slow down previous results, so that timing noise in the compared run is not a regression
+    for result in data['results']:
+        result['median'] *= 100
+    output.write_text(json.dumps(data), encoding='utf-8')
+    assert main(['--size', 'small', '--repeat', '1', '--compare', str(output), 'duration']) == 0
+    data = json.loads(capsys.readouterr().out)
+    assert [item['key'] for item in data['comparison']] == [
+        'duration[cache=False,values=1000]',
+        'duration[cache=True,values=1000]',
+    ]
+
+    for result in data['results']:
+        result['median'] *= 10000
+    comparison = compare_results(json.loads(output.read_text(encoding='utf-8')), data)
+    assert comparison[0]['regression']
+
+    assert main(['--size', 'small', 'unknown']) == 1
@@ -10,7 +10,7 @@ from datetime import timedelta
 
 import pytest
 
-from ssh_assets.duration import Duration
+from ssh_assets.duration import Duration, parse_duration
 
 from .conftest import VALID_DURATION_VALUES
 
@@ -47,3 +47,61 @@ def test_duration_valid_value_compare():
     assert b > a
     assert a <= a  # pylint: disable=comparison-with-itself
     assert b >= b  # pylint: disable=comparison-with-itself
+
+
+def test_duration_numeric_compare():
+    """
+    Test comparing duration values by total duration instead of the duration strings
+    """
+    assert Duration('9m') < Duration('10h')
+    assert min(Duration('10h'), Duration('9m'), Duration('1d')) == '9m'
+    assert sorted([Duration('1w'), Duration('90s'), Duration('2m')]) == ['90s', '2m', '1w']
+    assert Duration('1m') == Duration('60s')
+    assert Duration('1h30m') == 5400
+    assert Duration('1h') != Duration('1d')
+    assert Duration('1h') != 'invalid'
+    assert Duration('1h') is not None
+    with pytest.raises(TypeError):
+        assert Duration('1h') < None
+
+
+def test_duration_seconds_and_hash():
+    """
+    Test duration seconds value and hashing of duration objects
+    """
+    duration = Duration('2w1d20s')
+    assert duration.seconds == 2 * 604800 + 86400 + 20
+    assert duration.timedelta == timedelta(seconds=duration.seconds)
+    assert str(duration) == '20s1d2w'
+    assert str(Duration(duration)) == str(duration)
+    assert Duration(duration) == duration
+    assert len({Duration('1m'), Duration('60s'), Duration(60)}) == 1
+    with pytest.raises(AttributeError):
+        duration.extra = True  # pylint: disable=assigning-non-slot
+
+
+def test_duration_mixed_type_lookups():
+    """
+    Test hashed lookups of Duration keys work with durations and integer seconds, but not with
+    duration strings, although durations compare equal to the strings
+    """
+    mapping = {Duration('1h'): 'hour'}
+    assert Duration('1h') == '1h'
+    assert Duration('1h') == 3600
+    assert mapping.get(Duration('60m')) == 'hour'
+    assert mapping.get(Duration(3600)) == 'hour'
+    assert mapping.get('1h') is None
+    assert mapping.get(3600) == 'hour'
+    assert '1h' not in set(mapping)
+
+
+def test_duration_parser_cache():
+    """
+    Test repeated duration strings are parsed only once
+    """
+    parse_duration.cache_clear()
+    for _index in range(10):
+        Duration('17m')
+    info = parse_duration.cache_info()
+    assert info.misses == 1
+    assert info.hits == 9
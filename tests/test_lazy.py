@@ -0,0 +1,34 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Unit tests for ssh_assets.lazy module
+"""
+import pytest
+
+import ssh_assets.configuration
+import ssh_assets.daemon
+
+from ssh_assets.configuration.loader import SshAssetsConfiguration
+from ssh_assets.daemon.client import SshAssetsDaemonClient
+
+
+def test_lazy_attributes_import():
+    """
+    Test accessing lazily imported package attributes
+    """
+    assert ssh_assets.configuration.SshAssetsConfiguration is SshAssetsConfiguration
+    assert ssh_assets.daemon.SshAssetsDaemonClient is SshAssetsDaemonClient
+    assert 'SshAssetsDaemonClient' in vars(ssh_assets.daemon)
+    assert 'SshAssetsDaemon' in dir(ssh_assets.daemon)
+
+
+def test_lazy_attributes_missing():
+    """
+    Test accessing unknown package attribute raises AttributeError
+    """
+    with pytest.raises(AttributeError):
+        ssh_assets.daemon.SshAssetsDaemonMissing  # pylint: disable=pointless-statement
+    assert not hasattr(ssh_assets.configuration, 'MissingConfiguration')
@@ -6,13 +6,21 @@
 """
 Unit tests for ssh_assets.session module
 """
+import shutil
+
+from pathlib import Path
+
 from sys_toolkit.tests.mock import MockCalledMethod
 
+from ssh_assets.authorized_keys.constants import DEFAULT_AUTHORIZED_KEYS_FILE
+
+from ssh_assets.keys.constants import SshAgentMessage, SshKeyLoadStatus
 from ssh_assets.session import SshAssetSession
 from ssh_assets.configuration.keys import SshKeyListConfigurationSection
 from ssh_assets.configuration.groups import GroupListConfigurationSection
 
-from .conftest import MOCK_BASIC_CONFIG_AVAILABLE_KEYS_COUNT
+from .authorized_keys.constants import EXPECTED_KEYS_COUNT, VALID_AUTHORIZED_KEYS_FILE
+from .conftest import MOCK_BASIC_CONFIG_AVAILABLE_KEYS_COUNT, MOCK_BASIC_CONFIG_AUTOLOAD_AVAILABLE_KEYS_COUNT
 
 
 # pylint: disable=unused-argument
@@ -38,9 +46,11 @@ def test_ssh_asset_session_load_configured_keys_all(mock_basic_config, mock_agen
     Mock calling the load_keys_to_agent method with all keys
     """
     mock_load_to_agent = MockCalledMethod()
-    monkeypatch.setattr('ssh_assets.configuration.keys.SshKeyConfiguration.load_to_agent', mock_load_to_agent)
-    SshAssetSession().agent.load_keys_to_agent(load_all_keys=True)
-    assert mock_load_to_agent.call_count == MOCK_BASIC_CONFIG_AVAILABLE_KEYS_COUNT
+    monkeypatch.setattr('ssh_assets.keys.agent.load_key_files_to_agent', mock_load_to_agent)
+    results = SshAssetSession().agent.load_keys_to_agent(load_all_keys=True)
+    loaded_keys = [key for keys in mock_load_to_agent.args for key in keys[0]]
+    assert len(loaded_keys) == MOCK_BASIC_CONFIG_AVAILABLE_KEYS_COUNT
+    assert len([result for result in results if result.status == SshKeyLoadStatus.LOADED]) == len(loaded_keys)
 
 
 # pylint: disable=unused-argument
@@ -49,9 +59,59 @@ def test_ssh_asset_session_load_configured_keys_one_key(mock_basic_config, mock_
     Mock calling the load_keys_to_agent method with no keys
     """
     mock_load_to_agent = MockCalledMethod()
-    monkeypatch.setattr('ssh_assets.configuration.keys.SshKeyConfiguration.load_to_agent', mock_load_to_agent)
+    monkeypatch.setattr('ssh_assets.keys.agent.load_key_files_to_agent', mock_load_to_agent)
     session = SshAssetSession()
     # pylint: disable=no-member
     keys = session.configuration.keys[:1]
-    session.agent.load_keys_to_agent(keys=keys, load_all_keys=True)
+    results = session.agent.load_keys_to_agent(keys=keys, load_all_keys=True)
     assert mock_load_to_agent.call_count == 1
+    assert len(results) == 1
+    assert results[0].key == keys[0]
+    assert results[0].success is True
+
+
+# pylint: disable=unused-argument
+def test_ssh_asset_session_agent_snapshot(mock_basic_config, mock_agent_socket, mock_agent_no_keys, monkeypatch):
+    """
+    Test the session agent is shared and loaded keys are listed only once during a load pass
+    """
+    mock_load_to_agent = MockCalledMethod()
+    monkeypatch.setattr('ssh_assets.keys.agent.load_key_files_to_agent', mock_load_to_agent)
+    session = SshAssetSession()
+    assert session.agent is session.agent  # pylint: disable=comparison-with-itself
+
+    # pylint: disable=no-member
+    assert len(session.configuration.keys.pending) == MOCK_BASIC_CONFIG_AUTOLOAD_AVAILABLE_KEYS_COUNT
+    session.agent.load_keys_to_agent()
+    loaded_keys = [key for keys in mock_load_to_agent.args for key in keys[0]]
+    assert len(loaded_keys) == MOCK_BASIC_CONFIG_AUTOLOAD_AVAILABLE_KEYS_COUNT
+    assert len(session.configuration.keys.pending) == 0
+    assert len(session.agent) == MOCK_BASIC_CONFIG_AUTOLOAD_AVAILABLE_KEYS_COUNT
+    assert mock_agent_socket.count_requests(SshAgentMessage.REQUEST_IDENTITIES) == 1
+
+    session.invalidate_agent()
+    assert len(session.agent) == 0
+    assert mock_agent_socket.count_requests(SshAgentMessage.REQUEST_IDENTITIES) == 2
+
+
+# pylint: disable=unused-argument
+def test_ssh_asset_session_user_authorized_keys(mock_basic_config, monkeypatch, tmpdir):
+    """
+    Test the session user authorized keys object is shared and reloaded when the file is modified
+    """
+    monkeypatch.setenv('HOME', tmpdir.strpath)
+    path = Path(DEFAULT_AUTHORIZED_KEYS_FILE).expanduser()
+    path.parent.mkdir()
+    shutil.copyfile(VALID_AUTHORIZED_KEYS_FILE, path)
+    session = SshAssetSession()
+    authorized_keys = session.user_authorized_keys
+    assert authorized_keys.path == path
+    assert authorized_keys is session.user_authorized_keys
+    assert len(authorized_keys) == EXPECTED_KEYS_COUNT
+    assert session.user_authorized_keys.__requires_reload__ is False
+
+    lines = path.read_text(encoding='utf-8').splitlines()
+    path.write_text('\n'.join(lines[:-1]) + '\n', encoding='utf-8')
+    assert session.user_authorized_keys is authorized_keys
+    assert authorized_keys.__requires_reload__ is True
+    assert len(authorized_keys) == EXPECTED_KEYS_COUNT - 1
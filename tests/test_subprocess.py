@@ -0,0 +1,134 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Unit tests for ssh_assets.subprocess module
+"""
+import asyncio
+import io
+import json
+import sys
+
+import pytest
+
+from sys_toolkit.exceptions import CommandError
+
+from ssh_assets.aio import subprocess as aio_subprocess
+from ssh_assets.subprocess import (
+    SUBPROCESS_DISPATCHER,
+    JsonLinesTraceHandler,
+    SubprocessDispatcher,
+    get_command_name,
+    run_command,
+    run_command_lineoutput,
+)
+
+CALLER = f'{__name__}.test_subprocess_dispatcher_profile'
+
+
+def test_subprocess_get_command_name():
+    """
+    Test getting program name from command arguments
+    """
+    assert get_command_name(['/usr/bin/ssh-add', '-l']) == 'ssh-add'
+    assert get_command_name(['ssh-keygen']) == 'ssh-keygen'
+    assert get_command_name([]) == ''
+
+
+def test_subprocess_dispatcher_inactive():
+    """
+    Test commands are not accounted when profiling is not enabled
+    """
+    dispatcher = SubprocessDispatcher()
+    assert not dispatcher.active
+    with dispatcher.trace(['true']):
+        pass
+    assert dispatcher.call_count == 0
+    assert dispatcher.statistics == []
+    assert isinstance(repr(dispatcher), str)
+
+
+def test_subprocess_dispatcher_profile():
+    """
+    Test counting and timing commands by command and caller
+    """
+    with SUBPROCESS_DISPATCHER.profile() as dispatcher:
+        stdout, _stderr = run_command(sys.executable, '-c', 'print("test")')
+        assert stdout == b'test\n'
+        stdout, _stderr = run_command_lineoutput(sys.executable, '-c', 'print("a\\nb")')
+        assert stdout == ['a', 'b']
+        with pytest.raises(CommandError):
+            run_command(sys.executable, '-c', 'import sys; sys.exit(1)')
+    assert not SUBPROCESS_DISPATCHER.enabled
+
+    statistics = dispatcher.statistics
+    assert len(statistics) == 1
+    item = statistics[0]
+    assert isinstance(repr(item), str)
+    assert item.as_dict() == {
+        'command': get_command_name([sys.executable]),
+        'caller': CALLER,
+        'count': 3,
+        'errors': 1,
+        'total_time': item.total_time,
+        'max_time': item.max_time,
+    }
+    assert dispatcher.call_count == 3
+    assert dispatcher.total_time == item.total_time
+    assert 0 < item.max_time <= item.total_time
+
+    lines = dispatcher.format_summary()
+    assert lines[0].startswith('Subprocess calls: 3 ')
+    assert lines[2].rstrip().endswith(CALLER)
+
+    dispatcher.reset()
+    assert dispatcher.format_summary() == [f'Subprocess calls: 0 total time {0:.3f}s']
+
+
+def test_subprocess_dispatcher_async_commands():
+    """
+    Test accounting commands run as asyncio subprocesses
+    """
+    async def run_commands():
+        await asyncio.gather(*[
+            aio_subprocess.run_command_lineoutput(sys.executable, '-c', 'pass')
+            for _index in range(3)
+        ])
+
+    with SUBPROCESS_DISPATCHER.profile() as dispatcher:
+        asyncio.run(run_commands())
+    assert dispatcher.call_count == 3
+    assert dispatcher.statistics[0].caller == f'{__name__}.test_subprocess_dispatcher_async_commands'
+
+
+def test_subprocess_dispatcher_trace_handler():
+    """
+    Test writing trace events for commands as JSON lines
+    """
+    SUBPROCESS_DISPATCHER.reset()
+    stream = io.StringIO()
+    handler = JsonLinesTraceHandler(stream)
+    SUBPROCESS_DISPATCHER.add_trace_handler(handler)
+    SUBPROCESS_DISPATCHER.add_trace_handler(handler)
+    try:
+        assert SUBPROCESS_DISPATCHER.active
+        run_command(sys.executable, '-c', 'pass')
+        with pytest.raises(CommandError):
+            run_command_lineoutput(sys.executable, '-c', 'import sys; sys.exit(2)')
+    finally:
+        SUBPROCESS_DISPATCHER.remove_trace_handler(handler)
+        SUBPROCESS_DISPATCHER.remove_trace_handler(handler)
+    assert not SUBPROCESS_DISPATCHER.active
+    assert SUBPROCESS_DISPATCHER.statistics == []
+
+    events = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [event['status'] for event in events] == ['ok', 'error']
+    for event in events:
+        assert event['name'] == get_command_name([sys.executable])
+        assert event['end_time'] == event['start_time'] + event['duration']
+        assert event['attributes']['command'][0] == sys.executable
+        assert event['attributes']['caller'] == f'{__name__}.test_subprocess_dispatcher_trace_handler'
+    assert 'error' not in events[0]['attributes']
+    assert 'returns 2' in events[1]['attributes']['error']
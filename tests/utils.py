@@ -6,11 +6,22 @@
 """
 Unit test utility methods for ssh_assets.keys module
 """
+import socketserver
+import threading
+
+from base64 import b64decode
+from pathlib import Path
+from typing import Any, Callable, List, Optional, Tuple
+
 from ssh_assets.keys.base import (
     KEY_COMPARE_ATTRIBUTES,
     KEY_INTEGER_ATTRIBUTES,
     KEY_STRING_ATTRIBUTES,
 )
+from ssh_assets.keys.constants import SshAgentMessage
+from ssh_assets.keys.wire import WireFormatReader, pack_string, pack_uint32
+
+MOCK_AGENT_POLL_INTERVAL = 0.01
 
 
 def validate_key(key, key_class):
@@ -35,3 +46,134 @@ def validate_key(key, key_class):
 
     # This must not cause any errors, it's a dummy method
     key.__load_key_attributes__()
+
+
+class MockSshAgentRequestHandler(socketserver.BaseRequestHandler):
+    """
+    Request handler for mocked SSH agent protocol server
+    """
+    def __receive__(self, length: int) -> bytes:
+        """
+        Receive specified number of bytes from client, returning empty bytes on EOF
+        """
+        data = b''
+        while len(data) < length:
+            chunk = self.request.recv(length - len(data))
+            if not chunk:
+                return b''
+            data += chunk
+        return data
+
+    def __respond__(self, message_type: int, payload: bytes = b'') -> None:
+        """
+        Send response message to the client
+        """
+        message = bytes([message_type]) + payload
+        self.request.sendall(pack_uint32(len(message)) + message)
+
+    def handle(self) -> None:
+        """
+        Handle SSH agent protocol messages until client closes connection
+        """
+        agent = self.server.agent
+        while True:
+            header = self.__receive__(4)
+            if not header:
+                return
+            message = self.__receive__(WireFormatReader(header).read_uint32())
+            message_type = message[0]
+            reader = WireFormatReader(message[1:])
+            with agent.lock:
+                agent.requests.append(message_type)
+                if message_type == SshAgentMessage.REQUEST_IDENTITIES:
+                    payload = pack_uint32(len(agent.identities))
+                    for key_blob, comment in agent.identities:
+                        payload += pack_string(key_blob) + pack_string(comment)
+                    self.__respond__(SshAgentMessage.IDENTITIES_ANSWER, payload)
+                elif message_type == SshAgentMessage.REMOVE_IDENTITY:
+                    key_blob = reader.read_string()
+                    count = len(agent.identities)
+                    agent.identities = [item for item in agent.identities if item[0] != key_blob]
+                    if len(agent.identities) < count:
+                        self.__respond__(SshAgentMessage.SUCCESS)
+                    else:
+                        self.__respond__(SshAgentMessage.FAILURE)
+                elif message_type == SshAgentMessage.REMOVE_ALL_IDENTITIES:
+                    agent.identities = []
+                    self.__respond__(SshAgentMessage.SUCCESS)
+                elif message_type in (SshAgentMessage.ADD_IDENTITY, SshAgentMessage.ADD_ID_CONSTRAINED):
+                    agent.added.append(message[1:])
+                    self.__respond__(SshAgentMessage.SUCCESS)
+                else:
+                    self.__respond__(SshAgentMessage.FAILURE)
+
+
+class MockSshAgent:
+    """
+    Mocked SSH agent listening on a UNIX socket in a background thread
+
+    Identities are stored as list of public key blob and comment tuples. Received message
+    types are stored to the requests list and added private key payloads to added list.
+    """
+    def __init__(self, path: Path, identities: Optional[List[Tuple[bytes, str]]] = None) -> None:
+        self.path = path
+        self.identities = list(identities) if identities else []
+        self.requests = []
+        self.added = []
+        self.lock = threading.Lock()
+        self.server = socketserver.ThreadingUnixStreamServer(str(path), MockSshAgentRequestHandler)
+        self.server.daemon_threads = True
+        self.server.agent = self
+        self.thread = threading.Thread(
+            target=self.server.serve_forever,
+            kwargs={'poll_interval': MOCK_AGENT_POLL_INTERVAL},
+            daemon=True
+        )
+
+    def __enter__(self) -> 'MockSshAgent':
+        self.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        """
+        Start serving SSH agent requests
+        """
+        self.thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop the agent and remove the socket file
+        """
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+        if self.path.exists():
+            self.path.unlink()
+
+    def count_requests(self, message_type: SshAgentMessage) -> int:
+        """
+        Return number of received requests with specified message type
+        """
+        return len([request for request in self.requests if request == message_type])
+
+
+def load_public_key_blob(path: Path) -> bytes:
+    """
+    Load SSH public key blob from a .pub file
+    """
+    return b64decode(path.read_text(encoding='utf-8').split()[1])
+
+
+# pylint: disable=too-few-public-methods
+class MockAsyncMethod:
+    """
+    Wrap a mocked method or function to be awaited as a coroutine function
+    """
+    def __init__(self, method: Callable) -> None:
+        self.method = method
+
+    async def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        return self.method(*args, **kwargs)